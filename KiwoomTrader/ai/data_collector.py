@@ -116,48 +116,30 @@ class DataCollector:
     def prepare_training_data(self, df, lookback=100):
         """
         학습 데이터 준비
-        
+
         Args:
-            df: OHLCV DataFrame with indicators
+            df: OHLCV DataFrame with indicators (여러 종목이면 DataFrame 리스트 / {종목: DataFrame})
             lookback: 시퀀스 길이
-        
+
         Returns:
-            X: (samples, lookback, features)
+            X: SequenceDataset - (samples, lookback, features) 윈도우 (복사 없는 view, 배치 단위로 스트리밍)
             y: (samples,) - 다음 캔들 상승(1) / 하락(0)
+            scaler: MinMaxScaler
         """
-        # 타겟 생성: 다음 캔들이 상승하면 1, 하락하면 0
-        df['target'] = (df['close'].shift(-1) > df['close']).astype(int)
-        
-        # NaN 제거
-        df = df.dropna()
-        
         # 특징 컬럼 선택
         from ai.indicators import IndicatorCalculator
+        from ai.sequence_dataset import SequenceDataset
         feature_cols = IndicatorCalculator.get_feature_names()
-        
-        # 정규화 (MinMaxScaling)
-        from sklearn.preprocessing import MinMaxScaler
-        scaler = MinMaxScaler()
-        
-        # 특징만 정규화
-        df_scaled = df.copy()
-        df_scaled[feature_cols] = scaler.fit_transform(df[feature_cols])
-        
-        X_list = []
-        y_list = []
-        
-        # 시퀀스 생성
-        for i in range(lookback, len(df_scaled)):
-            X_list.append(df_scaled[feature_cols].iloc[i-lookback:i].values)
-            y_list.append(df_scaled['target'].iloc[i])
-        
-        X = np.array(X_list)
-        y = np.array(y_list)
-        
-        logger.info(f"Prepared training data: X shape={X.shape}, y shape={y.shape}")
-        
+
+        frames = df if isinstance(df, (list, dict)) else [df]
+        X, scaler = SequenceDataset.from_frames(frames, feature_cols, lookback)
+        y = X.y
+
+        logger.info(f"Prepared training data: X shape={X.shape}, y shape={y.shape} "
+                    f"(features {X.features.nbytes / 1e6:.1f} MB)")
+
         return X, y, scaler
-    
+
     @staticmethod
     def convert_korean_code(code):
         """
@@ -6,7 +6,7 @@ import numpy as np
 from logger import logger
 from ai.lstm_model import LSTMPredictor
 from ai.xgboost_model import XGBoostPredictor
-from ai.sentiment import SentimentAnalyzer
+from ai.sentiment import get_sentiment_service
 
 class EnsemblePredictor:
     """앙상블 예측기 - LSTM + XGBoost + Sentiment"""
@@ -30,7 +30,7 @@ class EnsemblePredictor:
         # 모델 초기화
         self.lstm_model = LSTMPredictor(model_path=lstm_path)
         self.xgboost_model = XGBoostPredictor(model_path=xgboost_path)
-        self.sentiment_analyzer = SentimentAnalyzer()
+        self.sentiment = get_sentiment_service()
         
         # 모델 로드 시도
         self.lstm_loaded = self.lstm_model.load_model()
@@ -87,7 +87,7 @@ class EnsemblePredictor:
         # 3. Sentiment 분석
         if stock_code:
             try:
-                sentiment_score = await self.sentiment_analyzer.get_sentiment_score(stock_code)
+                sentiment_score = await self.sentiment.get_score(stock_code)
                 # -1 ~ +1을 0 ~ 1로 정규화
                 sentiment_score = (sentiment_score + 1) / 2
                 scores['sentiment'] = sentiment_score
@@ -173,6 +173,40 @@ class EnsemblePredictor:
         
         return final_score
     
+    def predict_batch(self, lstm_inputs, xgboost_inputs):
+        """
+        여러 종목 동기 예측 (predict_sync와 같은 가중 평균, 모델마다 한 번만 호출)
+        
+        Args:
+            lstm_inputs: (n, lookback, features) - LSTM 입력
+            xgboost_inputs: (n, features) - XGBoost 입력
+        
+        Returns:
+            scores: (n,) 최종 예측 점수 (0-1)
+        """
+        total = np.zeros(len(xgboost_inputs))
+        total_weight = 0.0
+        
+        # 1. LSTM 예측
+        if self.lstm_loaded:
+            try:
+                total += np.asarray(self.lstm_model.predict(lstm_inputs)) * self.lstm_weight
+                total_weight += self.lstm_weight
+            except Exception as e:
+                logger.warning(f"LSTM batch prediction failed: {e}")
+        
+        # 2. XGBoost 예측
+        if self.xgboost_loaded:
+            try:
+                total += np.asarray(self.xgboost_model.predict(xgboost_inputs)) * self.xgboost_weight
+                total_weight += self.xgboost_weight
+            except Exception as e:
+                logger.warning(f"XGBoost batch prediction failed: {e}")
+        
+        if total_weight == 0:
+            return np.full(len(xgboost_inputs), 0.5)
+        return total / total_weight
+    
     def is_ready(self):
         """모델이 예측 가능한 상태인지 확인"""
         return self.lstm_loaded or self.xgboost_loaded
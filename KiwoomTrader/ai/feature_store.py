@@ -0,0 +1,292 @@
+"""
+Feature Store
+종목/간격별 기술적 지표를 디스크에 컬럼 단위로 저장하고 증분 갱신하는 저장소
+"""
+import hashlib
+import inspect
+import json
+import os
+import shutil
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from logger import logger
+from ai.indicators import IndicatorCalculator
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+
+def definition_hash(calculator=IndicatorCalculator):
+    """지표 정의(계산 코드 + 특징 이름)의 해시. 정의가 바뀌면 저장된 특징은 무효화됨"""
+    source = inspect.getsource(calculator)
+    names = ','.join(calculator.get_feature_names())
+    return hashlib.sha256(f"{source}\n{names}".encode('utf-8')).hexdigest()[:16]
+
+
+class FeatureSet:
+    """
+    한 종목/간격/지표 정의의 저장된 특징 (디렉터리 하나)
+
+    컬럼마다 float64 바이너리 파일(<컬럼>.f64) 하나, 타임스탬프는 timestamp.i8 (ns).
+    manifest.json의 rows가 유효한 행 수이며, 추가는 파일 끝에 쓰고 manifest를 원자적으로
+    교체하는 순서라 중간에 중단되어도 manifest 기준으로 잘라내고 이어서 씁니다.
+    읽기는 memmap이라 범위 읽기/최신 행 읽기가 전체 파일을 읽지 않습니다.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, path, definition, columns=None):
+        self.path = path
+        self.manifest_path = os.path.join(path, 'manifest.json')
+        self.manifest = {
+            'format_version': self.FORMAT_VERSION,
+            'definition': definition,
+            'columns': list(columns or []),
+            'rows': 0,
+            'updated_at': None
+        }
+        self._mtime = None
+        self._maps = {}
+        self.refresh()
+
+    def refresh(self):
+        """다른 프로세스가 추가했으면 manifest 다시 읽기 (stat 한 번)"""
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime != self._mtime:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                self.manifest = json.load(f)
+            self._mtime = mtime
+
+    @property
+    def rows(self):
+        return self.manifest['rows']
+
+    @property
+    def columns(self):
+        return self.manifest['columns']
+
+    def _file(self, column):
+        return os.path.join(self.path, 'timestamp.i8' if column is None else f"{column}.f64")
+
+    def _map(self, column):
+        """컬럼 memmap (rows 기준, 갱신되면 다시 매핑)"""
+        cached = self._maps.get(column)
+        if cached is not None and len(cached) == self.rows:
+            return cached
+        dtype = '<i8' if column is None else '<f8'
+        array = np.memmap(self._file(column), dtype=dtype, mode='r', shape=(self.rows,)) if self.rows else np.empty(0, dtype)
+        self._maps[column] = array
+        return array
+
+    def timestamps(self):
+        return self._map(None)
+
+    def last_timestamp(self):
+        return pd.Timestamp(int(self.timestamps()[-1])) if self.rows else None
+
+    def append(self, frame):
+        """frame(DatetimeIndex, columns 포함)의 행을 끝에 추가"""
+        if frame.empty:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        if not self.columns:
+            self.manifest['columns'] = list(frame.columns)
+        self._maps.clear() # 파일 크기가 바뀌므로 기존 매핑은 버림
+
+        for column in [None] + self.columns:
+            path = self._file(column)
+            itemsize = 8
+            # manifest 이후에 쓰다 만 꼬리 제거
+            if os.path.exists(path) and os.path.getsize(path) != self.rows * itemsize:
+                os.truncate(path, self.rows * itemsize)
+            if column is None:
+                values = frame.index.asi8.astype('<i8')
+            else:
+                values = frame[column].to_numpy(dtype='<f8')
+            with open(path, 'ab') as f:
+                f.write(values.tobytes())
+
+        self.manifest['rows'] = self.rows + len(frame)
+        self._write_manifest()
+
+    def truncate(self, rows):
+        """유효 행 수를 rows로 줄임 (파일 꼬리는 다음 append가 잘라냄)"""
+        if rows >= self.rows:
+            return
+        self._maps.clear()
+        self.manifest['rows'] = rows
+        self._write_manifest()
+
+    def _write_manifest(self):
+        self.manifest['updated_at'] = datetime.now().isoformat()
+        tmp = self.manifest_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp, self.manifest_path)
+        self._mtime = os.stat(self.manifest_path).st_mtime_ns
+
+    def read(self, start=None, stop=None, columns=None):
+        """행 번호 [start, stop) 구간의 DataFrame"""
+        columns = columns or self.columns
+        index = pd.DatetimeIndex(np.array(self.timestamps()[start:stop], dtype='datetime64[ns]'))
+        data = {column: np.array(self._map(column)[start:stop]) for column in columns}
+        return pd.DataFrame(data, index=index, columns=columns)
+
+    def row(self, position, columns=None):
+        """한 행 (Series), O(컬럼 수)"""
+        columns = columns or self.columns
+        values = [float(self._map(column)[position]) for column in columns]
+        return pd.Series(values, index=columns, name=pd.Timestamp(int(self.timestamps()[position])))
+
+
+class FeatureStore:
+    """
+    기술적 지표 특징 저장소
+
+    IndicatorCalculator.calculate_all 결과를 종목/간격별로 저장합니다
+    (<root>/<종목>/<간격>/<정의 해시>/). 새 캔들이 들어오면 마지막 warmup 행 +
+    새 행만 다시 계산해 추가하고(증분 갱신), 학습은 read()로 구간을 한 번에,
+    실시간 추론은 latest()로 최신 행을 O(1)에 읽습니다.
+
+    지표 코드가 바뀌면 정의 해시가 달라져 기존 특징은 쓰이지 않고, 이전 디렉터리에
+    저장된 OHLCV로 새 정의의 특징을 다시 계산합니다 (재다운로드 불필요).
+
+    - warmup: 증분 계산 시 앞에 붙이는 기존 행 수. 이동평균(최대 60)보다 충분히 길어야 하며,
+      EMA 계열은 warmup 길이만큼 수렴하므로 전체 재계산과의 차이는 무시할 수준입니다.
+    - OBV처럼 시작점부터 누적되는 컬럼(CUMULATIVE_COLUMNS)은 겹치는 행의 저장값에 맞춰 보정합니다.
+    - 마지막으로 저장된 캔들이 형성 중이던 봉이면(같은 시각의 OHLCV가 달라졌으면) 그 행을
+      버리고 다시 계산합니다. 그보다 이전 시각의 행은 무시합니다 (추가 전용).
+    - 시각은 UTC 기준(타임존 없음)으로 저장됩니다.
+    """
+
+    CUMULATIVE_COLUMNS = ('OBV', 'OBV_EMA')
+
+    def __init__(self, root='data/features', warmup=500, calculator=IndicatorCalculator):
+        self.root = root
+        self.warmup = warmup
+        self.calculator = calculator
+        self.definition = definition_hash(calculator)
+        self._sets = {}
+
+    def _dir(self, symbol, interval):
+        return os.path.join(self.root, str(symbol), str(interval))
+
+    def _open(self, symbol, interval):
+        """현재 정의의 FeatureSet (정의가 바뀌었으면 이전 OHLCV로 재계산)"""
+        key = (symbol, interval)
+        feature_set = self._sets.get(key)
+        if feature_set is not None:
+            feature_set.refresh()
+            return feature_set
+
+        base = self._dir(symbol, interval)
+        feature_set = FeatureSet(os.path.join(base, self.definition), self.definition)
+        stale = [name for name in (os.listdir(base) if os.path.isdir(base) else []) if name != self.definition]
+        if stale:
+            if feature_set.rows == 0:
+                previous = self._latest_stale(base, stale)
+                if previous is not None and previous.rows:
+                    logger.info(f"Feature definition changed for {symbol} {interval}: "
+                                f"recomputing {previous.rows} rows")
+                    candles = previous.read(columns=OHLCV_COLUMNS)
+                    feature_set.append(self.calculator.calculate_all(candles))
+            for name in stale:
+                shutil.rmtree(os.path.join(base, name), ignore_errors=True)
+
+        self._sets[key] = feature_set
+        return feature_set
+
+    @staticmethod
+    def _latest_stale(base, names):
+        sets = [FeatureSet(os.path.join(base, name), name) for name in names]
+        sets = [s for s in sets if all(column in s.columns for column in OHLCV_COLUMNS)]
+        return max(sets, key=lambda s: s.manifest.get('updated_at') or '', default=None)
+
+    def update(self, symbol, interval, candles):
+        """
+        새 캔들 반영
+
+        Args:
+            candles: OHLCV DataFrame (DatetimeIndex). 저장된 마지막 시각 이후의 행을 추가하고,
+                마지막 시각의 봉이 바뀌었으면 그 행을 다시 씀
+
+        Returns:
+            추가(또는 다시 쓴) 행 수
+        """
+        if not isinstance(candles.index, pd.DatetimeIndex):
+            raise ValueError("candles must have a DatetimeIndex")
+        feature_set = self._open(symbol, interval)
+        candles = candles[OHLCV_COLUMNS]
+        if candles.index.tz is not None:
+            candles = candles.tz_convert(None)
+        last = feature_set.last_timestamp()
+        if last is not None and last in candles.index:
+            stored = feature_set.row(feature_set.rows - 1, OHLCV_COLUMNS).to_numpy()
+            current = candles.loc[[last]].to_numpy(dtype=float)[-1]
+            if not np.array_equal(stored, current, equal_nan=True):
+                # 형성 중이던 마지막 봉이 갱신됨: 그 행을 버리고 새 행과 함께 다시 계산
+                feature_set.truncate(feature_set.rows - 1)
+                last = feature_set.last_timestamp()
+        new = candles[candles.index > last] if last is not None else candles
+        if new.empty:
+            return 0
+
+        if feature_set.rows == 0:
+            features = self.calculator.calculate_all(new)
+        else:
+            # 마지막 warmup 행 + 새 행만 다시 계산
+            tail = feature_set.read(max(0, feature_set.rows - self.warmup), None)
+            computed = self.calculator.calculate_all(pd.concat([tail[OHLCV_COLUMNS], new]))
+            features = computed.iloc[len(tail):].copy()
+            overlap = computed.iloc[len(tail) - 1]
+            for column in self.CUMULATIVE_COLUMNS:
+                if column in features.columns:
+                    features[column] += tail[column].iloc[-1] - overlap[column]
+
+        feature_set.append(features[feature_set.columns or list(features.columns)])
+        return len(new)
+
+    def features_for(self, symbol, interval, candles):
+        """
+        candles 구간의 특징 (저장소 갱신 후 읽기). calculate_all(candles) 대신 사용
+
+        DatetimeIndex가 아닌 데이터는 저장하지 않고 바로 계산합니다.
+        """
+        if not isinstance(candles.index, pd.DatetimeIndex) or candles.empty:
+            return self.calculator.calculate_all(candles)
+        self.update(symbol, interval, candles)
+        return self.read(symbol, interval, start=candles.index[0])
+
+    def read(self, symbol, interval, start=None, end=None, columns=None):
+        """
+        구간 읽기 (학습/백테스트용)
+
+        Args:
+            start, end: 시각 (포함). None이면 처음/끝까지
+            columns: 읽을 컬럼 (None이면 전체)
+        """
+        feature_set = self._open(symbol, interval)
+        timestamps = feature_set.timestamps()
+        lo = int(np.searchsorted(timestamps, pd.Timestamp(start).value, 'left')) if start is not None else 0
+        hi = int(np.searchsorted(timestamps, pd.Timestamp(end).value, 'right')) if end is not None else feature_set.rows
+        return feature_set.read(lo, hi, columns)
+
+    def tail(self, symbol, interval, n, columns=None):
+        """최근 n행"""
+        feature_set = self._open(symbol, interval)
+        return feature_set.read(max(0, feature_set.rows - n), None, columns)
+
+    def latest(self, symbol, interval, columns=None):
+        """최신 행 (Series, 없으면 None) - 실시간 추론용"""
+        feature_set = self._open(symbol, interval)
+        if feature_set.rows == 0:
+            return None
+        return feature_set.row(feature_set.rows - 1, columns)
+
+    def rows(self, symbol, interval):
+        return self._open(symbol, interval).rows
@@ -138,16 +138,9 @@ class IndicatorCalculator:
         df['Volume_Ratio'] = df['volume'] / df['Volume_SMA_20']
         
         # OBV (On-Balance Volume)
-        obv = [0]
-        for i in range(1, len(df)):
-            if df['close'].iloc[i] > df['close'].iloc[i-1]:
-                obv.append(obv[-1] + df['volume'].iloc[i])
-            elif df['close'].iloc[i] < df['close'].iloc[i-1]:
-                obv.append(obv[-1] - df['volume'].iloc[i])
-            else:
-                obv.append(obv[-1])
-        
-        df['OBV'] = obv
+        # 상승 캔들 +거래량, 하락 캔들 -거래량의 누적합 (첫 캔들 0)
+        direction = np.sign(df['close'].diff()).fillna(0)
+        df['OBV'] = (direction * df['volume']).cumsum()
         df['OBV_EMA'] = df['OBV'].ewm(span=20, adjust=False).mean()
         
         return df
@@ -0,0 +1,74 @@
+"""
+Keyword Matcher
+여러 키워드를 한 번의 텍스트 순회로 찾는 Aho-Corasick 매처
+"""
+from collections import deque
+
+
+class KeywordMatcher:
+    """
+    키워드별 가중치를 가진 다중 패턴 매처 (Aho-Corasick)
+
+    모든 키워드를 하나의 트라이 + 실패 링크 오토마톤으로 만들어 두고, 텍스트를 한 글자씩
+    한 번만 순회하며 포함된 키워드를 모두 찾습니다 (키워드 수와 무관하게 O(텍스트 길이 + 매치 수)).
+    `keyword in text`를 키워드마다 검사하는 것과 같은 결과이며, 겹치는 키워드
+    ("bull"/"bullish")도 각각 찾습니다. 대소문자는 구분하지 않습니다.
+    """
+
+    def __init__(self, weights):
+        """
+        Args:
+            weights: {키워드: 가중치} (같은 키워드가 여러 번 주어지면 가중치를 합산하도록 dict로 미리 합칠 것)
+        """
+        self.keywords = [keyword.lower() for keyword in weights]
+        self.weights = list(weights.values())
+        self._goto = [{}]   # 상태 -> {글자: 다음 상태}
+        self._fail = [0]
+        self._output = [()] # 상태 -> 이 상태에서 끝나는 키워드 번호들 (실패 링크 포함)
+
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                nxt = self._goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                state = nxt
+            self._output[state] += (index,)
+
+        # BFS로 실패 링크 계산 (깊이 1 상태는 루트로 실패, 더 얕은 상태의 출력을 이어받음)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(char, 0)
+                self._output[nxt] += self._output[self._fail[nxt]]
+
+    def find(self, text):
+        """텍스트에 포함된 키워드 번호 집합"""
+        goto, fail, output = self._goto, self._fail, self._output
+        found = set()
+        state = 0
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
+
+    def matches(self, text):
+        """텍스트에 포함된 키워드 리스트"""
+        return [self.keywords[index] for index in sorted(self.find(text))]
+
+    def score(self, text):
+        """포함된 키워드 가중치 합 (키워드마다 한 번)"""
+        weights = self.weights
+        return sum(weights[index] for index in self.find(text))
@@ -18,8 +18,33 @@ except Exception:
 
 from sklearn.model_selection import train_test_split
 from logger import logger
+from ai.sequence_dataset import SequenceDataset
 import os
 
+if TENSORFLOW_AVAILABLE:
+    class WindowBatches(keras.utils.Sequence):
+        """SequenceDataset 샘플을 배치 단위로 Keras에 공급 (배치마다 윈도우만 복사)"""
+
+        def __init__(self, dataset, positions, batch_size, shuffle=False):
+            super().__init__()
+            self.dataset = dataset
+            self.positions = np.array(positions)
+            self.batch_size = batch_size
+            self.shuffle = shuffle
+            self.rng = np.random.default_rng(42)
+            if shuffle:
+                self.rng.shuffle(self.positions)
+
+        def __len__(self):
+            return int(np.ceil(len(self.positions) / self.batch_size))
+
+        def __getitem__(self, index):
+            return self.dataset.batch(self.positions[index * self.batch_size:(index + 1) * self.batch_size])
+
+        def on_epoch_end(self):
+            if self.shuffle:
+                self.rng.shuffle(self.positions)
+
 class LSTMPredictor:
     """LSTM 기반 주가 예측 모델"""
     
@@ -74,7 +99,7 @@ class LSTMPredictor:
         모델 학습
         
         Args:
-            X: (samples, lookback, features)
+            X: (samples, lookback, features) 또는 SequenceDataset (미니배치로 스트리밍, y는 데이터셋 라벨 사용)
             y: (samples,) - binary labels
             validation_split: 검증 데이터 비율
             epochs: 학습 에포크 수
@@ -107,22 +132,37 @@ class LSTMPredictor:
             verbose=1
         )
         
-        # Train
-        history = self.model.fit(
-            X, y,
-            validation_split=validation_split,
-            epochs=epochs,
-            batch_size=batch_size,
-            callbacks=[early_stop, checkpoint],
-            verbose=1
-        )
-        
-        # Evaluate
-        val_loss, val_acc, val_auc = self.model.evaluate(
-            X[-int(len(X)*validation_split):], 
-            y[-int(len(y)*validation_split):],
-            verbose=0
-        )
+        if isinstance(X, SequenceDataset):
+            # 마지막 validation_split 비율을 검증용으로 (validation_split 인자와 동일한 분할)
+            train_positions, val_positions = X.split(validation_split)
+            train_batches = WindowBatches(X, train_positions, batch_size, shuffle=True)
+            val_batches = WindowBatches(X, val_positions, batch_size)
+
+            history = self.model.fit(
+                train_batches,
+                validation_data=val_batches,
+                epochs=epochs,
+                callbacks=[early_stop, checkpoint],
+                verbose=1
+            )
+            val_loss, val_acc, val_auc = self.model.evaluate(val_batches, verbose=0)
+        else:
+            # Train
+            history = self.model.fit(
+                X, y,
+                validation_split=validation_split,
+                epochs=epochs,
+                batch_size=batch_size,
+                callbacks=[early_stop, checkpoint],
+                verbose=1
+            )
+
+            # Evaluate
+            val_loss, val_acc, val_auc = self.model.evaluate(
+                X[-int(len(X)*validation_split):], 
+                y[-int(len(y)*validation_split):],
+                verbose=0
+            )
         
         logger.info(f"Training completed!")
         logger.info(f"Validation - Loss: {val_loss:.4f}, Accuracy: {val_acc:.4f}, AUC: {val_auc:.4f}")
@@ -8,6 +8,7 @@ import pandas as pd
 from logger import logger
 from ai.ensemble_predictor import EnsemblePredictor
 from ai.indicators import IndicatorCalculator
+from ai.streaming_features import StreamingFeaturePipeline
 
 class AIPredictor:
     """고급 AI 예측기 - 앙상블 기반"""
@@ -16,12 +17,13 @@ class AIPredictor:
         self.ensemble = None
         self.use_ensemble = True
         self.lookback = 100
-        self.lookback = 100
         self.recent_data = []  # 최근 데이터 저장 (LSTM용)
         self.scaler = None
         
         # Scaler 로드
         self.load_scaler()
+        # 캔들마다 지표/정규화/LSTM 윈도우를 증분 갱신
+        self.features = StreamingFeaturePipeline(self.lookback, self.scaler)
         
         try:
             # 앙상블 모델 초기화
@@ -63,6 +65,8 @@ class AIPredictor:
         """
         # OHLCV 데이터 추가
         self.recent_data.append(market_data)
+        if all(key in market_data for key in ('open', 'high', 'low', 'close', 'volume')):
+            self.features.update(market_data)
         
         # 최대 lookback + 여유분만 유지
         if len(self.recent_data) > self.lookback + 100:
@@ -94,49 +98,71 @@ class AIPredictor:
     
     def _ensemble_predict(self, market_data):
         """앙상블 예측 (동기 버전)"""
-        # 1. 최근 데이터를 DataFrame으로 변환
-        df = pd.DataFrame(self.recent_data[-self.lookback - 60:])  # 지표 계산을 위해 여유분 추가
-        
-        # 필수 컬럼 확인
-        required_cols = ['open', 'high', 'low', 'close', 'volume']
-        for col in required_cols:
-            if col not in df.columns:
-                logger.warning(f"Missing column: {col}. Using mock predictor")
-                return self._mock_predict(market_data)
-        
-        # 2. 기술적 지표 계산
-        df = IndicatorCalculator.calculate_all(df)
-        df = df.dropna()
-        
-        if len(df) < self.lookback:
-            logger.warning(f"Insufficient data after indicators: {len(df)}/{self.lookback}")
+        # 1. 스트리밍 파이프라인의 최신 특징 (캔들마다 증분 계산됨)
+        if self.scaler is None:
+            logger.warning("Scaler not loaded. Using mock predictor.")
             return self._mock_predict(market_data)
         
-        # 3. LSTM 입력 준비 (최근 lookback개)
-        feature_cols = IndicatorCalculator.get_feature_names()
-        lstm_input = df[feature_cols].iloc[-self.lookback:].values
-        
-        # 정규화 (저장된 Scaler 사용)
-        if self.scaler:
-            try:
-                lstm_input = self.scaler.transform(lstm_input)
-            except Exception as e:
-                logger.error(f"Scaling failed: {e}")
-                return self._mock_predict(market_data)
-        else:
-            logger.warning("Scaler not loaded. Using mock predictor.")
+        if not self.features.ready:
+            logger.warning(f"Insufficient data after indicators: {self.features.valid_rows}/{self.lookback}")
             return self._mock_predict(market_data)
         
-        # 4. XGBoost 입력 준비 (현재 시점)
-        xgboost_input = df[feature_cols].iloc[-1].values
+        # 2. LSTM 입력 (최근 lookback개, 정규화됨) / XGBoost 입력 (현재 시점, 정규화 전)
+        lstm_input = self.features.window()
+        xgboost_input = self.features.latest_features
         
-        # 5. 앙상블 예측 (동기 버전 - 감성분석 제외)
+        # 3. 앙상블 예측 (동기 버전 - 감성분석 제외)
         score = self.ensemble.predict_sync(lstm_input, xgboost_input)
         
         logger.debug(f"Ensemble prediction: {score:.4f}")
         
         return score
     
+    def predict_history(self, df):
+        """
+        지표가 계산된 과거 데이터의 마지막 시점 예측 (스트리밍 상태는 건드리지 않음)
+        
+        Args:
+            df: calculate_all 결과 DataFrame (dropna 후)
+        
+        Returns:
+            score: 0.0 ~ 1.0 (앙상블을 쓸 수 없으면 predict()처럼 Mock 예측)
+        """
+        return self.predict_history_batch([df])[0]
+    
+    def predict_history_batch(self, frames):
+        """
+        여러 종목의 predict_history를 한 번의 배치 추론으로 수행
+        
+        Args:
+            frames: calculate_all 결과 DataFrame 리스트 (dropna 후)
+        
+        Returns:
+            scores: 종목별 점수 리스트 (데이터가 부족한 종목은 Mock 예측)
+        """
+        scores = []
+        for df in frames:
+            change = df['close'].iloc[-1] - df['close'].iloc[-2] if len(df) > 1 else 0
+            scores.append(self._mock_predict({'change': change}))
+        
+        ready = [i for i, df in enumerate(frames) if len(df) >= self.lookback]
+        if not self.use_ensemble or self.scaler is None or not ready:
+            return scores
+        
+        feature_cols = IndicatorCalculator.get_feature_names()
+        try:
+            values = np.stack([frames[i][feature_cols].values[-self.lookback:] for i in ready])
+            n, lookback, n_features = values.shape
+            lstm_inputs = self.scaler.transform(values.reshape(-1, n_features)).reshape(n, lookback, n_features)
+            batch_scores = self.ensemble.predict_batch(lstm_inputs, values[:, -1])
+        except Exception as e:
+            logger.error(f"Ensemble prediction failed: {e}")
+            return scores
+        
+        for i, score in zip(ready, batch_scores):
+            scores[i] = float(score)
+        return scores
+    
     def _mock_predict(self, market_data):
         """Mock 예측 (Fallback)"""
         # Simulation: Random score with slight bias if price is up
@@ -169,7 +195,7 @@ class AIPredictor:
             'use_ensemble': self.use_ensemble,
             'data_points': len(self.recent_data),
             'lookback_required': self.lookback,
-            'ready': len(self.recent_data) >= self.lookback
+            'ready': self.features.ready
         }
         
         if self.ensemble:
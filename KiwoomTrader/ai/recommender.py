@@ -3,20 +3,46 @@ Stock Recommender
 AI 기반 종목 추천 시스템
 """
 import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
 from logger import logger
 from ai.predictor import AIPredictor
-from ai.sentiment import SentimentAnalyzer
+from ai.sentiment import get_sentiment_service
 from ai.indicators import IndicatorCalculator
 from ai.data_collector import DataCollector
+from ai.feature_store import FeatureStore
 import pandas as pd
 
+_worker_stores = {}
+
+def compute_features(root, stock_code, interval, df):
+    """
+    프로세스 풀 작업: 특징 저장소 갱신 후 df 구간의 지표 (dropna)
+    (모듈 최상위 함수 - spawn 방식 프로세스에서도 import 가능)
+    """
+    store = _worker_stores.get(root)
+    if store is None:
+        store = _worker_stores[root] = FeatureStore(root)
+    return store.features_for(stock_code, interval, df).dropna()
+
 class StockRecommender:
     """AI 기반 종목 추천기"""
     
-    def __init__(self):
+    def __init__(self, max_concurrency=8, processes=None, batch_size=32):
+        """
+        Args:
+            max_concurrency: 동시에 내려받는 종목 수 (데이터/뉴스 각각)
+            processes: 지표 계산 프로세스 수 (0이면 스레드에서 계산, None이면 CPU 수 기준)
+            batch_size: 한 번의 모델 추론에 묶는 최대 종목 수
+        """
         self.predictor = AIPredictor()
-        self.sentiment_analyzer = SentimentAnalyzer()
+        self.sentiment = get_sentiment_service()
         self.data_collector = DataCollector()
+        self.feature_store = FeatureStore()
+        self.max_concurrency = max_concurrency
+        self.processes = min(4, os.cpu_count() or 1) if processes is None else processes
+        self.batch_size = batch_size
+        self._process_pool = None
     
     async def analyze_stock(self, stock_code):
         """
@@ -36,142 +62,217 @@ class StockRecommender:
                 return None
             
             # 2. 기술적 지표 계산
-            df = IndicatorCalculator.calculate_all(df)
+            df = self.feature_store.features_for(stock_code, '1h', df)
             df = df.dropna()
             
             if len(df) < 50:
                 return None
             
-            # 3. AI 예측 (최근 데이터로)
-            latest_data = {
-                'open': df['open'].iloc[-1],
-                'high': df['high'].iloc[-1],
-                'low': df['low'].iloc[-1],
-                'close': df['close'].iloc[-1],
-                'volume': df['volume'].iloc[-1],
-                'change': df['close'].iloc[-1] - df['close'].iloc[-2]
-            }
-            
-            # 데이터 업데이트
-            for i in range(min(100, len(df))):
-                self.predictor.update_data({
-                    'open': df['open'].iloc[-(100-i)],
-                    'high': df['high'].iloc[-(100-i)],
-                    'low': df['low'].iloc[-(100-i)],
-                    'close': df['close'].iloc[-(100-i)],
-                    'volume': df['volume'].iloc[-(100-i)],
-                    'change': 0
-                })
-            
-            ai_score = self.predictor.predict(latest_data)
+            # 3. AI 예측 (최근 데이터로, 이미 계산된 지표 사용)
+            ai_score = self.predictor.predict_history(df)
             
             # 4. 감성 분석
-            sentiment_score = await self.sentiment_analyzer.get_sentiment_score(stock_code)
-            
-            # 5. 기술적 신호
-            current = df.iloc[-1]
-            signals = {
-                'rsi': current['RSI'],
-                'rsi_signal': 'oversold' if current['RSI'] < 30 else ('overbought' if current['RSI'] > 70 else 'neutral'),
-                'macd_signal': 'bullish' if current['MACD'] > current['MACD_Signal'] else 'bearish',
-                'bb_position': current['BB_Position'],
-                'volume_ratio': current['Volume_Ratio'],
-                'trend': 'uptrend' if current['close'] > current['SMA_20'] else 'downtrend'
-            }
+            sentiment_score = await self.get_sentiment(stock_code)
             
-            # 6. 종합 점수 계산
-            # AI (40%) + Sentiment (30%) + Technical (30%)
-            technical_score = 0.5  # 기본값
+            return self._build_result(stock_code, df, ai_score, sentiment_score)
             
-            # RSI oversold → 매수 기회
-            if current['RSI'] < 35:
-                technical_score += 0.3
-            elif current['RSI'] < 50:
-                technical_score += 0.1
-            elif current['RSI'] > 65:
-                technical_score -= 0.2
-            
-            # MACD bullish
-            if current['MACD'] > current['MACD_Signal']:
-                technical_score += 0.2
-            
-            # Volume 증가
-            if current['Volume_Ratio'] > 1.5:
-                technical_score += 0.1
-            
-            technical_score = max(0, min(1, technical_score))
-            
-            # 정규화된 감성 점수 (−1~1 → 0~1)
-            normalized_sentiment = (sentiment_score + 1) / 2
+        except Exception as e:
+            logger.error(f"Error analyzing {stock_code}: {e}")
+            return None
+    
+    def _build_result(self, stock_code, df, ai_score, sentiment_score):
+        """지표/AI/감성 점수로 추천 결과 생성"""
+        # 5. 기술적 신호
+        current = df.iloc[-1]
+        signals = {
+            'rsi': current['RSI'],
+            'rsi_signal': 'oversold' if current['RSI'] < 30 else ('overbought' if current['RSI'] > 70 else 'neutral'),
+            'macd_signal': 'bullish' if current['MACD'] > current['MACD_Signal'] else 'bearish',
+            'bb_position': current['BB_Position'],
+            'volume_ratio': current['Volume_Ratio'],
+            'trend': 'uptrend' if current['close'] > current['SMA_20'] else 'downtrend'
+        }
+        
+        # 6. 종합 점수 계산
+        # AI (40%) + Sentiment (30%) + Technical (30%)
+        technical_score = 0.5  # 기본값
+        
+        # RSI oversold → 매수 기회
+        if current['RSI'] < 35:
+            technical_score += 0.3
+        elif current['RSI'] < 50:
+            technical_score += 0.1
+        elif current['RSI'] > 65:
+            technical_score -= 0.2
+        
+        # MACD bullish
+        if current['MACD'] > current['MACD_Signal']:
+            technical_score += 0.2
+        
+        # Volume 증가
+        if current['Volume_Ratio'] > 1.5:
+            technical_score += 0.1
+        
+        technical_score = max(0, min(1, technical_score))
+        
+        # 정규화된 감성 점수 (−1~1 → 0~1)
+        normalized_sentiment = (sentiment_score + 1) / 2
+        
+        # 최종 점수
+        final_score = (
+            ai_score * 0.4 +
+            normalized_sentiment * 0.3 +
+            technical_score * 0.3
+        )
+        
+        # 7. 추천 등급
+        if final_score >= 0.75:
+            recommendation = '강력 매수'
+            grade = 'A'
+        elif final_score >= 0.65:
+            recommendation = '매수'
+            grade = 'B'
+        elif final_score >= 0.55:
+            recommendation = '관망'
+            grade = 'C'
+        elif final_score >= 0.45:
+            recommendation = '중립'
+            grade = 'D'
+        else:
+            recommendation = '매도 고려'
+            grade = 'F'
+        
+        result = {
+            'code': stock_code,
+            'score': final_score,
+            'ai_score': ai_score,
+            'sentiment_score': sentiment_score,
+            'technical_score': technical_score,
+            'signals': signals,
+            'recommendation': recommendation,
+            'grade': grade,
+            'current_price': current['close']
+        }
+        
+        logger.info(f"{stock_code}: {recommendation} (Score: {final_score:.2f})")
+        return result
+    
+    async def get_sentiment(self, stock_code):
+        """감성 점수 (공유 서비스의 TTL 캐시)"""
+        return await self.sentiment.get_score(stock_code)
+    
+    async def _load_features(self, stock_code, semaphore):
+        """데이터 다운로드(스레드) + 지표 계산(프로세스 풀) - 부족하면 None"""
+        try:
+            yf_symbol = DataCollector.convert_korean_code(stock_code)
+            async with semaphore:
+                df = await asyncio.to_thread(
+                    self.data_collector.get_stock_data, yf_symbol, period='1mo', interval='1h', use_cache=True)
             
-            # 최종 점수
-            final_score = (
-                ai_score * 0.4 +
-                normalized_sentiment * 0.3 +
-                technical_score * 0.3
-            )
+            if df is None or len(df) < 100:
+                return stock_code, None
             
-            # 7. 추천 등급
-            if final_score >= 0.75:
-                recommendation = '강력 매수'
-                grade = 'A'
-            elif final_score >= 0.65:
-                recommendation = '매수'
-                grade = 'B'
-            elif final_score >= 0.55:
-                recommendation = '관망'
-                grade = 'C'
-            elif final_score >= 0.45:
-                recommendation = '중립'
-                grade = 'D'
+            loop = asyncio.get_running_loop()
+            if self.processes > 0:
+                if self._process_pool is None:
+                    self._process_pool = ProcessPoolExecutor(self.processes)
+                df = await loop.run_in_executor(
+                    self._process_pool, compute_features, self.feature_store.root, stock_code, '1h', df)
             else:
-                recommendation = '매도 고려'
-                grade = 'F'
-            
-            result = {
-                'code': stock_code,
-                'score': final_score,
-                'ai_score': ai_score,
-                'sentiment_score': sentiment_score,
-                'technical_score': technical_score,
-                'signals': signals,
-                'recommendation': recommendation,
-                'grade': grade,
-                'current_price': current['close']
-            }
-            
-            logger.info(f"{stock_code}: {recommendation} (Score: {final_score:.2f})")
-            return result
+                df = await asyncio.to_thread(compute_features, self.feature_store.root, stock_code, '1h', df)
             
+            return stock_code, df if len(df) >= 50 else None
         except Exception as e:
             logger.error(f"Error analyzing {stock_code}: {e}")
-            return None
+            return stock_code, None
     
-    async def get_recommendations(self, stock_list, top_n=5):
+    async def _sentiment_or_neutral(self, stock_code, semaphore):
+        try:
+            async with semaphore:
+                return await self.get_sentiment(stock_code)
+        except Exception as e:
+            logger.warning(f"Sentiment analysis failed for {stock_code}: {e}")
+            return 0.0
+    
+    async def iter_recommendations(self, stock_list):
         """
-        여러 종목 분석 후 상위 N개 추천
+        여러 종목 동시 분석 - 결과를 완료되는 대로 생성 (async generator)
+        
+        데이터는 max_concurrency개씩 동시에 받고, 지표는 프로세스 풀에서 계산하며,
+        감성 분석은 처음부터 동시에 진행합니다. 지표가 준비된 종목은 batch_size개
+        (또는 남은 다운로드가 끝날 때까지 모인 만큼)씩 한 번의 모델 추론으로 점수를 매깁니다.
+        
+        Yields:
+            분석 결과 dict (analyze_stock과 같은 형식, 실패한 종목은 생략)
+        """
+        codes = list(dict.fromkeys(stock_list))
+        data_slots = asyncio.Semaphore(self.max_concurrency)
+        news_slots = asyncio.Semaphore(self.max_concurrency)
+        sentiments = {code: asyncio.create_task(self._sentiment_or_neutral(code, news_slots)) for code in codes}
+        loads = [asyncio.create_task(self._load_features(code, data_slots)) for code in codes]
+        
+        try:
+            ready = []
+            remaining = len(loads)
+            for next_load in asyncio.as_completed(loads):
+                stock_code, df = await next_load
+                remaining -= 1
+                if df is not None:
+                    ready.append((stock_code, df))
+                
+                # 배치가 찼거나, 더 기다릴 다운로드가 없으면 추론
+                if ready and (len(ready) >= self.batch_size or remaining == 0):
+                    batch, ready = ready, []
+                    scores = await asyncio.to_thread(self.predictor.predict_history_batch, [df for _, df in batch])
+                    for (code, df), ai_score in zip(batch, scores):
+                        yield self._build_result(code, df, ai_score, await sentiments[code])
+        finally:
+            for task in loads + list(sentiments.values()):
+                task.cancel()
+    
+    async def recommend_batch(self, stock_list, top_n=None, progress_callback=None):
+        """
+        여러 종목 동시 분석 후 점수순 정렬
         
         Args:
             stock_list: 종목 코드 리스트
-            top_n: 추천할 종목 수
+            top_n: 반환할 종목 수 (None이면 전체)
+            progress_callback: callback(완료 수, 전체 수) - 결과가 나올 때마다 호출
         
         Returns:
             list of recommendations sorted by score
         """
         logger.info(f"Analyzing {len(stock_list)} stocks...")
+        results = []
+        async for result in self.iter_recommendations(stock_list):
+            results.append(result)
+            if progress_callback:
+                progress_callback(len(results), len(stock_list))
+        if progress_callback:
+            progress_callback(len(stock_list), len(stock_list)) # 실패한 종목 포함 완료
         
-        tasks = [self.analyze_stock(code) for code in stock_list]
-        results = await asyncio.gather(*tasks)
+        sorted_results = sorted(results, key=lambda x: x['score'], reverse=True)
+        return sorted_results[:top_n] if top_n else sorted_results
+    
+    async def get_recommendations(self, stock_list, top_n=5):
+        """
+        여러 종목 분석 후 상위 N개 추천
         
-        # None 제거 및 점수순 정렬
-        valid_results = [r for r in results if r is not None]
-        sorted_results = sorted(valid_results, key=lambda x: x['score'], reverse=True)
+        Args:
+            stock_list: 종목 코드 리스트
+            top_n: 추천할 종목 수
         
-        return sorted_results[:top_n]
+        Returns:
+            list of recommendations sorted by score
+        """
+        return await self.recommend_batch(stock_list, top_n=top_n)
 
     async def analyze_stocks(self, stock_list, progress_callback=None):
         """UI 호환성을 위한 별칭 메서드"""
-        # progress_callback은 여기서 직접 처리하기 어려우므로 무시하거나 
-        # get_recommendations 내부 로직을 수정해야 함.
-        # 일단 단순 래퍼로 구현
-        return await self.get_recommendations(stock_list, top_n=len(stock_list))
+        return await self.recommend_batch(stock_list, progress_callback=progress_callback)
+    
+    def close(self):
+        """지표 계산 프로세스 풀 종료"""
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
@@ -0,0 +1,236 @@
+"""
+Scalping Simulator
+배열 기반 초단타 백테스트 (TP/SL/시간 청산/쿨다운)
+
+Backtester와 StrategyOptimizer가 공유하며, 모델/UI 의존성이 없어 최적화 작업 프로세스에서
+가볍게 import 됩니다.
+"""
+import numpy as np
+import pandas as pd
+
+# Scalping Fee Settings
+FEE_BUY = 0.00015
+FEE_SELL = 0.0023
+SLIPPAGE = 0.0005
+WARMUP = 60 # 지표 안정화 전 구간 (이 봉부터 매매)
+
+
+class ScalpingData:
+    """
+    시뮬레이션 입력 배열 (파라미터와 무관하게 한 번만 계산)
+
+    가격/거래량과 지표(MA20, RSI, 거래량 MA20), 봉별 AI 점수를 연속 배열로 들고 있어
+    모든 파라미터 조합이 같은 배열을 공유합니다 (작업 프로세스에는 한 번만 전달).
+    """
+
+    def __init__(self, index, price, volume, ai_score=None):
+        """
+        Args:
+            index: 봉 시각 (거래 내역 날짜)
+            price, volume: 봉별 가격/거래량
+            ai_score: 봉별 AI 점수 (None이면 set_mock_ai_scores로 설정)
+        """
+        self.index = index
+        self.price = np.asarray(price)
+        self.volume = np.asarray(volume)
+        self.ai_score = None if ai_score is None else np.asarray(ai_score, dtype=np.float64)
+
+        # Indicators (기존 Backtester와 같은 pandas rolling 계산)
+        series = pd.Series(self.price, dtype=np.float64)
+        self.ma20 = series.rolling(window=20).mean().to_numpy()
+        delta = series.diff()
+        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+        rs = gain / loss
+        self.rsi = (100 - (100 / (1 + rs))).fillna(50).to_numpy()
+        self.ma20_vol = pd.Series(self.volume, dtype=np.float64).rolling(window=20).mean().to_numpy()
+
+    def __len__(self):
+        return len(self.price)
+
+    def set_mock_ai_scores(self, use_model, rng):
+        """
+        봉별 AI 점수 (Backtester의 기존 분당 계산을 한 번에)
+
+        Args:
+            use_model: True면 추세(MA20 괴리) 기반 점수 + 잡음, False면 AIPredictor mock과 같은 가격 변화 기반 점수
+            rng: np.random.Generator (시드 고정 시 모든 조합이 같은 점수 사용)
+        """
+        price = self.price.astype(np.float64)
+        if use_model:
+            score = 0.5 + (price - self.ma20) / self.ma20 * 10 + rng.normal(0, 0.1, len(price))
+        else:
+            change = np.diff(price, prepend=price[:1])
+            score = 0.5 + 0.1 * np.sign(change) + rng.uniform(-0.2, 0.2, len(price))
+        self.ai_score = np.clip(np.nan_to_num(score, nan=0.5), 0, 1)
+        return self
+
+    def entries(self, vol_multiplier, ai_threshold, rsi_threshold):
+        """매수 신호 봉 번호 (WARMUP 이후, 오름차순)"""
+        signal = (
+            (self.volume[WARMUP:] > self.ma20_vol[WARMUP:] * vol_multiplier) &
+            (self.ai_score[WARMUP:] >= ai_threshold) &
+            (self.rsi[WARMUP:] < rsi_threshold)
+        )
+        return np.flatnonzero(signal) + WARMUP
+
+
+def simulate(data, params, initial_balance=10000000, entries=None, record_trades=True, progress_callback=None):
+    """
+    초단타 전략 시뮬레이션
+
+    봉마다 돌지 않고 매수 신호 봉 사이를 searchsorted로 건너뛰며, 보유 구간은 최대
+    time_exit개 봉만 배열 연산으로 검사합니다 (거래 수에 비례하는 반복).
+    결과는 기존 분당 루프와 같습니다: 보유 중에는 신호를 보지 않고, 청산한 봉에서는
+    매수하지 않으며, 손실 청산 후 cooldown개 봉은 건너뜁니다 (자산 곡선에서도 제외).
+
+    Args:
+        data: ScalpingData
+        params: 전략 파라미터 (vol_multiplier, ai_threshold, rsi_threshold, take_profit, stop_loss, time_exit, cooldown)
+        entries: 미리 계산한 매수 신호 봉 (None이면 params로 계산)
+        record_trades: False면 거래 내역 dict를 만들지 않음 (최적화용)
+        progress_callback: 진행률 콜백 (10% 단위)
+
+    Returns:
+        dict - final_balance, total_profit, profit_pct, trade_count, win_rate, profit_factor, mdd, trades, total_fees
+    """
+    take_profit_pct = params.get('take_profit', 1.0)
+    stop_loss_pct = params.get('stop_loss', 0.5)
+    time_exit_minutes = params.get('time_exit', 10)
+    cooldown_minutes = params.get('cooldown', 10)
+    if entries is None:
+        entries = data.entries(params.get('vol_multiplier', 3.0), params.get('ai_threshold', 0.7),
+                               params.get('rsi_threshold', 70))
+
+    price = data.price
+    n = len(price)
+    balance = initial_balance
+    position = 0
+    total_fees = 0
+    trades = []
+    profits = []
+
+    equity = np.empty(max(n, 0), dtype=np.float64)
+    counted = np.zeros(max(n, 0), dtype=bool) # 자산 곡선에 들어가는 봉 (쿨다운 제외)
+    counted[WARMUP:] = True
+    flat_from = WARMUP # 이 봉부터 현금만 보유
+    i = WARMUP
+    last_pct = -1
+
+    while i < n:
+        if progress_callback:
+            pct = int((i - WARMUP) / (n - WARMUP) * 10) * 10
+            if pct != last_pct:
+                progress_callback(pct)
+                last_pct = pct
+
+        k = np.searchsorted(entries, i)
+        if k == len(entries):
+            break
+        entry = int(entries[k])
+
+        # 매수
+        entry_price = price[entry] * (1 + SLIPPAGE)
+        qty = int(balance / (entry_price * (1 + FEE_BUY)))
+        if qty <= 0:
+            i = entry + 1
+            continue
+        cost = qty * entry_price
+        fee = cost * FEE_BUY
+        equity[flat_from:entry] = balance
+        balance -= (cost + fee)
+        total_fees += fee
+        position = qty
+        if record_trades:
+            trades.append({
+                "date": str(data.index[entry]),
+                "type": "BUY",
+                "price": entry_price,
+                "qty": qty,
+                "fee": fee,
+                "ai_score": f"{data.ai_score[entry]:.2f}"
+            })
+
+        # 청산 봉 찾기: entry+1 ~ entry+time_exit 중 TP/SL 첫 도달, 없으면 time_exit 봉
+        last = entry + max(time_exit_minutes, 1)
+        exec_prices = price[entry + 1:min(last, n - 1) + 1] * (1 - SLIPPAGE)
+        profit_pcts = (exec_prices - entry_price) / entry_price * 100
+        hits = np.flatnonzero((profit_pcts >= take_profit_pct) | (profit_pcts <= -stop_loss_pct))
+        if len(hits):
+            offset = int(hits[0])
+        elif last < n:
+            offset = last - entry - 1
+        else:
+            # 데이터 끝까지 보유
+            equity[entry:n] = balance + qty * price[entry:n]
+            flat_from = n
+            break
+        exit_bar = entry + 1 + offset
+        exec_price = exec_prices[offset]
+        curr_profit_pct = profit_pcts[offset]
+
+        equity[entry:exit_bar] = balance + qty * price[entry:exit_bar]
+        revenue = position * exec_price
+        fee = revenue * FEE_SELL
+        net_revenue = revenue - fee
+        balance += net_revenue
+        total_fees += fee
+        profit = net_revenue - (position * entry_price)
+        profits.append(profit)
+        if record_trades:
+            take_profit = curr_profit_pct >= take_profit_pct
+            stop_loss = curr_profit_pct <= -stop_loss_pct
+            trades.append({
+                "date": str(data.index[exit_bar]),
+                "type": "SELL",
+                "price": exec_price,
+                "qty": position,
+                "profit": profit,
+                "profit_pct": curr_profit_pct,
+                "reason": "TP" if take_profit else ("SL" if stop_loss else "TimeExit"),
+                "ai_score": f"{data.ai_score[exit_bar]:.2f}",
+                "fee": fee
+            })
+        position = 0
+        flat_from = exit_bar
+
+        i = exit_bar + 1
+        if profit < 0:
+            counted[i:i + cooldown_minutes] = False
+            i += cooldown_minutes
+
+    equity[flat_from:n] = balance
+    if progress_callback:
+        progress_callback(100)
+
+    # Finalize & Calculate Metrics
+    final_balance = balance + (position * price[-1]) if n else balance
+    total_profit = final_balance - initial_balance
+    profit_pct = (total_profit / initial_balance) * 100
+
+    equity_curve = equity[counted]
+    if len(equity_curve):
+        running_max = np.maximum.accumulate(equity_curve)
+        mdd = ((equity_curve - running_max) / running_max).min() * 100
+    else:
+        mdd = 0.0
+
+    wins = [p for p in profits if p > 0]
+    losses = [p for p in profits if p <= 0]
+    total_trades = len(profits)
+    win_rate = (len(wins) / total_trades * 100) if total_trades > 0 else 0.0
+    gross_profit = sum(wins)
+    gross_loss = abs(sum(losses))
+    profit_factor = (gross_profit / gross_loss) if gross_loss > 0 else 99.99
+
+    return {
+        "final_balance": final_balance,
+        "total_profit": total_profit,
+        "profit_pct": profit_pct,
+        "trade_count": total_trades,
+        "win_rate": win_rate,
+        "profit_factor": profit_factor,
+        "mdd": mdd,
+        "trades": trades,
+        "total_fees": total_fees
+    }
@@ -1,12 +1,17 @@
 import aiohttp
 import asyncio
+import time
+from contextlib import suppress
 from bs4 import BeautifulSoup
 from logger import logger
+from ai.keyword_matcher import KeywordMatcher
 import re
 import json
 
+KEYWORD_WEIGHT = 0.3
+
 class SentimentAnalyzer:
-    def __init__(self):
+    def __init__(self, max_connections=20, timeout=10):
         # Domestic (Korean) Keywords
         self.positive_keywords_kr = [
             "상승", "급등", "호재", "수주", "계약", "최대", "성장", "이익", "흑자", 
@@ -31,6 +36,39 @@ class SentimentAnalyzer:
             "lawsuit", "ban", "sanction", "halt", "debt"
         ]
 
+        # KR/EN 긍정·부정 키워드를 하나의 매처로 (제목당 한 번 순회)
+        weights = {}
+        for keywords, weight in ((self.positive_keywords_kr, KEYWORD_WEIGHT), (self.negative_keywords_kr, -KEYWORD_WEIGHT),
+                                 (self.positive_keywords_en, KEYWORD_WEIGHT), (self.negative_keywords_en, -KEYWORD_WEIGHT)):
+            for k in keywords:
+                weights[k.lower()] = weights.get(k.lower(), 0.0) + weight
+        self.matcher = KeywordMatcher(weights)
+
+        # 공유 HTTP 세션 (연결/DNS 재사용)
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._session = None
+        self._session_loop = None
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """
+        공유 HTTP 세션. 세션은 이벤트 루프에 묶이므로 다른 루프에서 호출되면 새로 만듭니다.
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+            self._session_loop = loop
+        return self._session
+
+    async def close(self):
+        """공유 세션 종료"""
+        if self._session is not None and not self._session.closed and self._session_loop is asyncio.get_running_loop():
+            await self._session.close()
+        self._session = None
+
     async def fetch_news_titles_kr(self, code: str, limit: int = 10) -> list:
         """
         Fetches recent news titles for a given stock code from Naver Finance.
@@ -39,19 +77,19 @@ class SentimentAnalyzer:
         titles = []
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers={'User-Agent': 'Mozilla/5.0'}) as response:
-                    if response.status == 200:
-                        html = await response.text()
-                        soup = BeautifulSoup(html, 'lxml')
-                        links = soup.select('.title a')
-                        
-                        for link in links[:limit]:
-                            title = link.get_text(strip=True)
-                            if title:
-                                titles.append(title)
-                    else:
-                        logger.warning(f"Failed to fetch KR news for {code}: Status {response.status}")
+            session = await self.get_session()
+            async with session.get(url, headers={'User-Agent': 'Mozilla/5.0'}) as response:
+                if response.status == 200:
+                    html = await response.text()
+                    soup = BeautifulSoup(html, 'lxml')
+                    links = soup.select('.title a')
+                    
+                    for link in links[:limit]:
+                        title = link.get_text(strip=True)
+                        if title:
+                            titles.append(title)
+                else:
+                    logger.warning(f"Failed to fetch KR news for {code}: Status {response.status}")
         except Exception as e:
             logger.error(f"Error fetching KR news for {code}: {e}")
             
@@ -68,17 +106,17 @@ class SentimentAnalyzer:
         
         try:
             headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        children = data.get('data', {}).get('children', [])
-                        for child in children:
-                            title = child.get('data', {}).get('title', '')
-                            if title:
-                                titles.append(title)
-                    else:
-                        logger.warning(f"Failed to fetch Reddit data for {keyword}: Status {response.status}")
+            session = await self.get_session()
+            async with session.get(url, headers=headers) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    children = data.get('data', {}).get('children', [])
+                    for child in children:
+                        title = child.get('data', {}).get('title', '')
+                        if title:
+                            titles.append(title)
+                else:
+                    logger.warning(f"Failed to fetch Reddit data for {keyword}: Status {response.status}")
         except Exception as e:
             logger.error(f"Error fetching Reddit data for {keyword}: {e}")
             
@@ -93,19 +131,19 @@ class SentimentAnalyzer:
         titles = []
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers={'User-Agent': 'Mozilla/5.0'}) as response:
-                    if response.status == 200:
-                        xml_data = await response.text()
-                        soup = BeautifulSoup(xml_data, 'xml')
-                        items = soup.find_all('item')
-                        
-                        for item in items[:limit]:
-                            title = item.title.text if item.title else ""
-                            if title:
-                                titles.append(title)
-                    else:
-                        logger.warning(f"Failed to fetch Yahoo news for {ticker}: Status {response.status}")
+            session = await self.get_session()
+            async with session.get(url, headers={'User-Agent': 'Mozilla/5.0'}) as response:
+                if response.status == 200:
+                    xml_data = await response.text()
+                    soup = BeautifulSoup(xml_data, 'xml')
+                    items = soup.find_all('item')
+                    
+                    for item in items[:limit]:
+                        title = item.title.text if item.title else ""
+                        if title:
+                            titles.append(title)
+                else:
+                    logger.warning(f"Failed to fetch Yahoo news for {ticker}: Status {response.status}")
         except Exception as e:
             logger.error(f"Error fetching Yahoo news for {ticker}: {e}")
             
@@ -116,21 +154,7 @@ class SentimentAnalyzer:
         Analyzes text sentiment (supports KR and EN).
         Returns a score between -1.0 (Negative) and 1.0 (Positive).
         """
-        score = 0.0
-        text = text.lower()
-        
-        # Check Korean keywords
-        for k in self.positive_keywords_kr:
-            if k in text: score += 0.3
-        for k in self.negative_keywords_kr:
-            if k in text: score -= 0.3
-            
-        # Check English keywords
-        for k in self.positive_keywords_en:
-            if k in text: score += 0.3
-        for k in self.negative_keywords_en:
-            if k in text: score -= 0.3
-                
+        score = self.matcher.score(text)
         return max(-1.0, min(1.0, score))
 
     async def get_sentiment_score(self, code: str, ticker_symbol: str = None) -> float:
@@ -140,6 +164,13 @@ class SentimentAnalyzer:
         :param ticker_symbol: US/Global ticker symbol (e.g., 'SSNLF' or just usage of code if applicable)
                               If None, tries to map or just uses code for KR news.
         """
+        score, _ = await self.score_with_count(code, ticker_symbol)
+        return score
+
+    async def score_with_count(self, code: str, ticker_symbol: str = None) -> tuple:
+        """
+        get_sentiment_score와 같지만 점수 계산에 쓴 제목 수도 반환 (0이면 조회 실패/뉴스 없음)
+        """
         tasks = [self.fetch_news_titles_kr(code)]
         
         # If a ticker symbol is provided (or we want to search global sources for the code)
@@ -157,7 +188,7 @@ class SentimentAnalyzer:
             all_titles.extend(res)
         
         if not all_titles:
-            return 0.0
+            return 0.0, 0
             
         total_score = 0.0
         for title in all_titles:
@@ -167,7 +198,127 @@ class SentimentAnalyzer:
         final_score = max(-1.0, min(1.0, avg_score))
         
         logger.info(f"Sentiment for {code}/{ticker_symbol}: {final_score:.2f} (based on {len(all_titles)} items)")
-        return final_score
+        return final_score, len(all_titles)
+
+class SentimentService:
+    """
+    종목별 감성 점수 캐시 서비스
+
+    - get_score: TTL 안의 캐시는 바로 반환, 아니면 조회 (같은 종목 동시 요청은 한 번만 조회)
+      뉴스를 하나도 받지 못한 중립 점수는 empty_ttl 동안만 유지, 예외는 캐시하지 않음
+    - cached_score: 네트워크 없이 캐시만 O(1) 조회 (주문 경로용)
+    - start_prefetch: 관심종목/보유종목을 백그라운드에서 TTL 만료 전에 미리 갱신
+    """
+
+    def __init__(self, analyzer: SentimentAnalyzer = None, ttl: float = 600, prefetch_interval: float = 60,
+                 max_concurrency: int = 8, empty_ttl: float = 60):
+        """
+        Args:
+            analyzer: 뉴스 수집/점수 계산기 (None이면 새로 생성, HTTP 세션 공유)
+            ttl: 점수 캐시 유지 시간 (초)
+            empty_ttl: 뉴스를 받지 못한 (조회 실패/뉴스 없음) 중립 점수의 캐시 유지 시간 (초)
+            prefetch_interval: 백그라운드 갱신 주기 (초)
+            max_concurrency: 동시에 조회하는 종목 수
+        """
+        self.analyzer = analyzer or SentimentAnalyzer()
+        self.ttl = ttl
+        self.prefetch_interval = prefetch_interval
+        self.max_concurrency = max_concurrency
+        self.empty_ttl = empty_ttl
+        self._scores = {}   # 종목 -> (시각, 점수, 유지 시간)
+        self._pending = {}  # 종목 -> 조회 중인 Task
+        self._prefetch_task = None
+
+    def age(self, code: str) -> float:
+        """캐시된 점수의 경과 시간 (초, 없으면 inf)"""
+        entry = self._scores.get(code)
+        return time.monotonic() - entry[0] if entry else float('inf')
+
+    def cached_score(self, code: str, default: float = None) -> float:
+        """캐시된 점수 (만료 여부와 무관, 없으면 default) - 네트워크 요청 없음"""
+        entry = self._scores.get(code)
+        return entry[1] if entry else default
+
+    async def get_score(self, code: str, ticker_symbol: str = None, max_age: float = None) -> float:
+        """
+        감성 점수 (-1.0 ~ 1.0)
+
+        Args:
+            max_age: 이보다 오래된 캐시는 다시 조회 (None이면 ttl)
+        """
+        max_age = self.ttl if max_age is None else max_age
+        entry = self._scores.get(code)
+        if entry and time.monotonic() - entry[0] < min(max_age, entry[2]):
+            return entry[1]
+
+        task = self._pending.get(code)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.create_task(self._fetch(code, ticker_symbol))
+            self._pending[code] = task
+        # 기다리던 호출이 취소되어도 다른 호출이 공유하는 조회는 계속
+        return await asyncio.shield(task)
+
+    async def _fetch(self, code, ticker_symbol):
+        try:
+            score, count = await self.analyzer.score_with_count(code, ticker_symbol)
+            self._scores[code] = (time.monotonic(), score, self.ttl if count else self.empty_ttl)
+            return score
+        finally:
+            if self._pending.get(code) is asyncio.current_task():
+                del self._pending[code]
+
+    async def prefetch(self, codes):
+        """다음 갱신 주기 전에 만료될 종목만 동시에 조회"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        max_age = max(0.0, self.ttl - self.prefetch_interval)
+
+        async def refresh(code):
+            async with semaphore:
+                try:
+                    await self.get_score(code, max_age=max_age)
+                except Exception as e:
+                    logger.warning(f"Sentiment prefetch failed for {code}: {e}")
+
+        await asyncio.gather(*(refresh(code) for code in dict.fromkeys(codes)))
+
+    def start_prefetch(self, symbols):
+        """
+        백그라운드 갱신 시작 (실행 중인 이벤트 루프에서 호출)
+
+        Args:
+            symbols: 종목 코드 리스트, 또는 매 주기 종목 코드를 반환하는 callable
+        """
+        if self._prefetch_task is not None and not self._prefetch_task.done():
+            return
+        self._prefetch_task = asyncio.create_task(self._prefetch_loop(symbols))
+
+    async def _prefetch_loop(self, symbols):
+        while True:
+            codes = list(symbols() if callable(symbols) else symbols)
+            if codes:
+                await self.prefetch(codes)
+            await asyncio.sleep(self.prefetch_interval)
+
+    async def stop_prefetch(self):
+        task, self._prefetch_task = self._prefetch_task, None
+        if task is not None:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+
+    async def close(self):
+        await self.stop_prefetch()
+        await self.analyzer.close()
+
+
+_service = None
+
+def get_sentiment_service() -> SentimentService:
+    """프로세스 전체에서 공유하는 감성 점수 서비스 (캐시/세션 공유)"""
+    global _service
+    if _service is None:
+        _service = SentimentService()
+    return _service
 
 if __name__ == "__main__":
     async def test():
@@ -176,6 +327,7 @@ if __name__ == "__main__":
         print("Analyzing Samsung Electronics...")
         score = await analyzer.get_sentiment_score("005930", "Samsung Electronics")
         print(f"Score: {score}")
+        await analyzer.close()
         
         # Test Tesla (if we were to use it, though code might be different)
         # print("Analyzing Tesla...")
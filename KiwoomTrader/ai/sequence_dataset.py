@@ -0,0 +1,147 @@
+"""
+Sequence Dataset for LSTM Training
+하나의 float32 특징 행렬 위의 strided window view로 LSTM 학습 시퀀스를 제공 (X를 복사하지 않음)
+"""
+import numpy as np
+
+
+class SequenceDataset:
+    """
+    LSTM 학습용 (lookback, features) 윈도우 데이터셋
+
+    특징 행렬(rows, features)을 float32로 한 번만 보관하고, 샘플 i의 입력은
+    features[i-lookback:i] 윈도우(복사 없는 view), 라벨은 targets[i]입니다.
+    메모리는 O(rows × features) + 샘플 인덱스뿐이며, 배치를 요청할 때만
+    (batch, lookback, features) 복사본이 만들어집니다.
+
+    여러 종목을 이어붙인 경우 boundaries로 종목 경계를 넘는 윈도우를 제외합니다.
+    """
+
+    def __init__(self, features, targets, lookback, boundaries=None):
+        """
+        Args:
+            features: (rows, features) 정규화된 특징 행렬
+            targets: (rows,) 라벨
+            lookback: 시퀀스 길이
+            boundaries: [(start, end), ...] 종목별 행 구간 (None이면 전체가 한 구간)
+        """
+        self.features = np.ascontiguousarray(features, dtype=np.float32)
+        self.targets = np.asarray(targets)
+        self.lookback = lookback
+        self.boundaries = boundaries or [(0, len(self.features))]
+
+        # 샘플 i = 윈도우 끝(미포함) 행 번호
+        self.indices = np.concatenate(
+            [np.arange(start + lookback, end, dtype=np.int64) for start, end in self.boundaries]
+            + [np.empty(0, dtype=np.int64)]
+        )
+        # (rows - lookback + 1, lookback, features) view, windows[s] = features[s:s+lookback]
+        if len(self.features) >= lookback:
+            self.windows = np.lib.stride_tricks.sliding_window_view(
+                self.features, lookback, axis=0).transpose(0, 2, 1)
+        else:
+            self.windows = np.empty((0, lookback, self.features.shape[1]), dtype=np.float32)
+
+    @classmethod
+    def from_frames(cls, frames, feature_cols, lookback, scaler=None):
+        """
+        종목별 DataFrame(지표 포함)에서 데이터셋 생성
+
+        Args:
+            frames: DataFrame 리스트 또는 {종목: DataFrame}
+            feature_cols: 특징 컬럼
+            lookback: 시퀀스 길이
+            scaler: 학습된 scaler (None이면 전체 종목으로 MinMaxScaler 학습)
+
+        Returns:
+            (SequenceDataset, scaler)
+        """
+        if isinstance(frames, dict):
+            frames = list(frames.values())
+
+        # 타겟 생성: 다음 캔들이 상승하면 1, 하락하면 0 (종목별)
+        prepared = []
+        for df in frames:
+            target = (df['close'].shift(-1) > df['close']).astype(int)
+            df = df.assign(target=target).dropna()
+            prepared.append(df)
+
+        if scaler is None:
+            from sklearn.preprocessing import MinMaxScaler
+            scaler = MinMaxScaler()
+            for df in prepared:
+                scaler.partial_fit(df[feature_cols].values)
+
+        # 특징 행렬을 한 번에 할당하고 종목별로 정규화해 채움
+        rows = sum(len(df) for df in prepared)
+        features = np.empty((rows, len(feature_cols)), dtype=np.float32)
+        targets = np.empty(rows, dtype=np.int8)
+        boundaries = []
+        offset = 0
+        for df in prepared:
+            end = offset + len(df)
+            if len(df):
+                features[offset:end] = scaler.transform(df[feature_cols].values)
+                targets[offset:end] = df['target'].values
+            boundaries.append((offset, end))
+            offset = end
+
+        return cls(features, targets, lookback, boundaries), scaler
+
+    def __len__(self):
+        return len(self.indices)
+
+    @property
+    def shape(self):
+        """materialize()했을 때의 X shape"""
+        return (len(self), self.lookback, self.features.shape[1])
+
+    @property
+    def y(self):
+        return self.targets[self.indices]
+
+    def batch(self, positions):
+        """
+        샘플 위치들의 (X, y) 배치
+
+        Args:
+            positions: 샘플 번호 배열 (0 ~ len-1)
+
+        Returns:
+            X: (batch, lookback, features) float32, y: (batch,)
+        """
+        ends = self.indices[positions]
+        return self.windows[ends - self.lookback], self.targets[ends]
+
+    def iter_batches(self, batch_size=64, positions=None, shuffle=False, seed=None):
+        """
+        미니배치 (X, y) 생성기
+
+        Args:
+            batch_size: 배치 크기
+            positions: 사용할 샘플 번호 (None이면 전체)
+            shuffle: 섞기 여부
+            seed: 섞기 시드
+        """
+        if positions is None:
+            positions = np.arange(len(self))
+        if shuffle:
+            positions = np.random.default_rng(seed).permutation(positions)
+        for start in range(0, len(positions), batch_size):
+            yield self.batch(positions[start:start + batch_size])
+
+    def split(self, validation_split=0.2):
+        """
+        학습/검증 샘플 번호 (마지막 validation_split 비율이 검증, Keras validation_split과 동일)
+        """
+        n_val = int(len(self) * validation_split)
+        positions = np.arange(len(self))
+        return positions[:len(self) - n_val], positions[len(self) - n_val:]
+
+    def materialize(self):
+        """전체 X 배열 (작은 데이터셋/기존 코드 호환용)"""
+        return self.batch(np.arange(len(self)))[0]
+
+    def __array__(self, dtype=None, copy=None):
+        X = self.materialize()
+        return X.astype(dtype) if dtype is not None else X
@@ -1,87 +1,151 @@
 import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import matplotlib
 matplotlib.use('Agg') # Force Agg backend
 from logger import logger
-from ai.backtester import Backtester
+from ai.scalping_simulator import simulate
+
+# 파라미터 그리드 정의 (보수적 옵션 추가)
+PARAM_GRID = {
+    'vol_multiplier': [2.0, 3.0, 5.0],
+    'ai_threshold': [0.7, 0.8, 0.9],
+    'rsi_threshold': [50, 60, 70],
+    'take_profit': [0.5, 1.0, 2.0, 3.0],
+    'stop_loss': [0.5, 1.0, 2.0],
+    'time_exit': [5, 10, 30],
+    'cooldown': [10, 30, 60]
+}
+
+# 진입 조건 파라미터 - 같은 값끼리 묶으면 매수 신호 봉을 한 번만 계산
+ENTRY_KEYS = ('vol_multiplier', 'ai_threshold', 'rsi_threshold')
+
+_worker_data = None
+
+def _init_worker(data):
+    """작업 프로세스 초기화: 시뮬레이션 데이터를 프로세스당 한 번만 받아 보관"""
+    global _worker_data
+    _worker_data = data
+
+def _run_group(positions, param_sets, data=None):
+    """
+    진입 조건이 같은 파라미터 묶음 실행 (작업 프로세스 또는 현재 프로세스)
+
+    Returns:
+        [(조합 번호, 결과), ...] - 결과에는 거래 내역을 넣지 않음
+    """
+    data = data if data is not None else _worker_data
+    entries = data.entries(*(param_sets[0][k] for k in ENTRY_KEYS))
+    return [(position, simulate(data, params, entries=entries, record_trades=False))
+            for position, params in zip(positions, param_sets)]
 
 class StrategyOptimizer:
     """전략 파라미터 최적화 클래스"""
-    
-    def __init__(self):
+
+    def __init__(self, workers=None):
+        """
+        Args:
+            workers: 작업 프로세스 수 (None이면 CPU 수, 1이면 현재 프로세스에서 실행)
+        """
+        self.workers = workers or os.cpu_count() or 1
         self.best_params = None
         self.best_result = None
         self.all_results = []
-    
-    def optimize(self, code, start_date, end_date, progress_callback=None):
+
+    def optimize(self, code, start_date, end_date, progress_callback=None, param_grid=None):
         """
         여러 파라미터 조합을 테스트하여 최적의 전략을 찾습니다.
+
+        가상 데이터/지표/AI 점수는 한 번만 만들고 모든 조합이 공유합니다.
         """
+        # 작업 프로세스가 모델 의존성(TensorFlow 등)을 불러오지 않도록 여기서 import
+        from ai.backtester import Backtester
+
         logger.info("전략 최적화 시작...")
-        
-        # 파라미터 그리드 정의
-        # 파라미터 그리드 정의 (보수적 옵션 추가)
-        param_grid = {
-            'vol_multiplier': [2.0, 3.0, 5.0],
-            'ai_threshold': [0.7, 0.8, 0.9],
-            'rsi_threshold': [50, 60, 70],
-            'take_profit': [0.5, 1.0, 2.0, 3.0],
-            'stop_loss': [0.5, 1.0, 2.0],
-            'time_exit': [5, 10, 30],
-            'cooldown': [10, 30, 60]
-        }
-        
+        data = Backtester().prepare_data(code, start_date, end_date)
+        return self.optimize_data(data, param_grid or PARAM_GRID, progress_callback)
+
+    def optimize_data(self, data, param_grid=None, progress_callback=None):
+        """
+        준비된 ScalpingData로 그리드 탐색
+
+        진입 조건이 같은 조합끼리 묶어 작업 프로세스에 나눠 실행하고, 묶음이 끝날 때마다
+        진행률을 알립니다. all_results는 조합 순서대로이며 거래 내역은 best_result에만 있습니다.
+
+        Returns:
+            (best_result, best_params, all_results)
+        """
+        param_grid = param_grid or PARAM_GRID
+
         # 모든 조합 생성
         keys = list(param_grid.keys())
         values = [param_grid[k] for k in keys]
-        combinations = list(itertools.product(*values))
-        
+        combinations = [dict(zip(keys, combo)) for combo in itertools.product(*values)]
+
         total_combinations = len(combinations)
         logger.info(f"총 {total_combinations}개 조합 테스트 예정")
-        
+
+        groups = {}
+        for position, params in enumerate(combinations):
+            key = tuple(params.get(k) for k in ENTRY_KEYS)
+            groups.setdefault(key, ([], []))
+            groups[key][0].append(position)
+            groups[key][1].append(params)
+
+        results = [None] * total_combinations
+        done = 0
+
+        def collect(batch):
+            nonlocal done
+            for position, result in batch:
+                results[position] = result
+            done += len(batch)
+            # 진행률 업데이트 (묶음 단위)
+            if progress_callback and done < total_combinations:
+                progress_callback(int((done / total_combinations) * 100))
+
+        if self.workers > 1 and len(groups) > 1:
+            with ProcessPoolExecutor(min(self.workers, len(groups)), initializer=_init_worker,
+                                     initargs=(data,)) as pool:
+                futures = [pool.submit(_run_group, positions, param_sets) for positions, param_sets in groups.values()]
+                for future in as_completed(futures):
+                    collect(future.result())
+        else:
+            for positions, param_sets in groups.values():
+                collect(_run_group(positions, param_sets, data))
+
+        # 평가 점수 계산 (수익률 - MDD/2)
+        # 높은 수익률과 낮은 MDD를 선호
         best_score = -float('inf')
-        self.all_results = []
-        
-        backtester = Backtester()
-        
-        for idx, combo in enumerate(combinations):
-            params = dict(zip(keys, combo))
-            
-            # 진행률 업데이트
-            if progress_callback:
-                pct = int((idx / total_combinations) * 100)
-                progress_callback(pct)
-            
-            # 백테스트 실행
-            result = backtester.run(
-                code, 
-                start_date, 
-                end_date, 
-                strategy_params=params
-            )
-            
-            # 평가 점수 계산 (수익률 - MDD/2)
-            # 높은 수익률과 낮은 MDD를 선호
+        best_index = None
+        for position, (params, result) in enumerate(zip(combinations, results)):
             score = result['profit_pct'] - (result['mdd'] / 2)
-            
             result['params'] = params
             result['score'] = score
-            self.all_results.append(result)
-            
+
             # 최고 결과 업데이트
             if score > best_score:
                 best_score = score
-                self.best_params = params
-                self.best_result = result
-                logger.info(f"새로운 최고 점수: {score:.2f} (수익률: {result['profit_pct']:.2f}%, MDD: {result['mdd']:.2f}%)")
-        
+                best_index = position
+        self.all_results = results
+
+        if best_index is not None:
+            # 최고 조합만 거래 내역 포함해서 다시 실행
+            self.best_params = combinations[best_index]
+            self.best_result = simulate(data, self.best_params)
+            self.best_result['params'] = self.best_params
+            self.best_result['score'] = best_score
+            self.all_results[best_index] = self.best_result
+            logger.info(f"최고 점수: {best_score:.2f} (수익률: {self.best_result['profit_pct']:.2f}%, MDD: {self.best_result['mdd']:.2f}%)")
+
         if progress_callback:
             progress_callback(100)
-        
+
         logger.info(f"최적화 완료. 최고 점수: {best_score:.2f}")
         logger.info(f"최적 파라미터: {self.best_params}")
-        
+
         return self.best_result, self.best_params, self.all_results
-    
+
     def get_top_results(self, n=5):
         """상위 N개 결과 반환"""
         sorted_results = sorted(self.all_results, key=lambda x: x['score'], reverse=True)
@@ -0,0 +1,257 @@
+"""
+Streaming Features
+새 캔들마다 기술적 지표를 증분 갱신하는 실시간 특징 파이프라인
+(IndicatorCalculator.calculate_all과 같은 값을 캔들당 O(특징 수)로 계산)
+"""
+import math
+from collections import deque
+
+import numpy as np
+
+from ai.indicators import IndicatorCalculator
+
+NAN = float('nan')
+
+
+class RollingWindow:
+    """고정 길이 윈도우의 합계 (pandas rolling(window) - 윈도우가 차야 값이 있음)"""
+
+    def __init__(self, size):
+        self.size = size
+        self.values = deque(maxlen=size)
+        self.total = 0.0
+
+    def push(self, value):
+        if len(self.values) == self.size:
+            self.total -= self.values[0]
+        self.values.append(value)
+        self.total += value
+
+    @property
+    def full(self):
+        return len(self.values) == self.size
+
+    def mean(self):
+        return self.total / self.size if self.full else NAN
+
+    def std(self):
+        """표본 표준편차 (ddof=1)"""
+        if not self.full:
+            return NAN
+        mean = self.total / self.size
+        return math.sqrt(sum((v - mean) ** 2 for v in self.values) / (self.size - 1))
+
+    def min(self):
+        return min(self.values) if self.full else NAN
+
+    def max(self):
+        return max(self.values) if self.full else NAN
+
+
+class EMA:
+    """지수이동평균 (pandas ewm(span, adjust=False): 첫 값에서 시작)"""
+
+    def __init__(self, span):
+        self.alpha = 2.0 / (span + 1)
+        self.value = None
+
+    def push(self, x):
+        self.value = x if self.value is None else self.alpha * x + (1 - self.alpha) * self.value
+        return self.value
+
+
+def _ratio(numerator, denominator):
+    """pandas 나눗셈과 같은 결과 (0으로 나누면 inf / nan)"""
+    if denominator == 0:
+        if numerator == 0 or math.isnan(numerator):
+            return NAN
+        return math.copysign(math.inf, numerator)
+    return numerator / denominator
+
+
+class StreamingIndicators:
+    """
+    IndicatorCalculator.get_feature_names() 순서의 특징 벡터를 캔들마다 증분 계산
+
+    이동평균/볼린저/스토캐스틱/ATR/거래량은 고정 길이 윈도우, EMA/MACD/OBV는 이전 상태만
+    유지하므로 캔들 하나당 계산량은 윈도우 길이 합 정도로 일정합니다.
+    워밍업 동안(SMA_60 등 윈도우가 차기 전)은 해당 특징이 NaN입니다.
+    """
+
+    FEATURES = IndicatorCalculator.get_feature_names()
+
+    def __init__(self):
+        self.sma = {period: RollingWindow(period) for period in (5, 10, 20, 60)}
+        self.ema = {span: EMA(span) for span in (5, 10, 20)}
+        self.ema_fast, self.ema_slow, self.macd_signal = EMA(12), EMA(26), EMA(9)
+        self.gain, self.loss = RollingWindow(14), RollingWindow(14)
+        self.lows, self.highs = RollingWindow(14), RollingWindow(14)
+        self.stoch_k = deque(maxlen=3) # 워밍업 중 NaN이 들어오므로 누적합 대신 직접 평균
+        self.true_range = RollingWindow(14)
+        self.volume = RollingWindow(20)
+        self.closes = deque(maxlen=11) # ROC/Momentum용 최근 종가
+        self.obv = 0.0
+        self.obv_ema = EMA(20)
+        self.count = 0
+
+    def update(self, open_, high, low, close, volume):
+        """
+        캔들 하나 반영
+
+        Returns:
+            np.ndarray (len(FEATURES),) - 이 캔들 시점의 특징 (워밍업 중에는 NaN 포함)
+        """
+        prev_close = self.closes[-1] if self.closes else None
+        self.closes.append(close)
+        self.count += 1
+
+        # 이동평균
+        for window in self.sma.values():
+            window.push(close)
+        ema_values = [self.ema[span].push(close) for span in (5, 10, 20)]
+
+        # RSI (첫 캔들의 변화량은 0으로 취급 - calculate_all과 동일)
+        delta = close - prev_close if prev_close is not None else 0.0
+        self.gain.push(delta if delta > 0 else 0.0)
+        self.loss.push(-delta if delta < 0 else 0.0)
+        rs = _ratio(self.gain.mean(), self.loss.mean())
+        rsi = 100 - (100 / (1 + rs))
+
+        # MACD
+        macd = self.ema_fast.push(close) - self.ema_slow.push(close)
+        macd_signal = self.macd_signal.push(macd)
+
+        # 볼린저 밴드
+        middle = self.sma[20].mean()
+        std = self.sma[20].std()
+        upper = middle + (std * 2)
+        lower = middle - (std * 2)
+        bb_width = _ratio(upper - lower, middle)
+        bb_position = _ratio(close - lower, upper - lower)
+
+        # 스토캐스틱
+        self.lows.push(low)
+        self.highs.push(high)
+        low_min, high_max = self.lows.min(), self.highs.max()
+        stoch_k = 100 * _ratio(close - low_min, high_max - low_min)
+        self.stoch_k.append(stoch_k)
+        if len(self.stoch_k) == 3 and all(math.isfinite(k) for k in self.stoch_k):
+            stoch_d = sum(self.stoch_k) / 3
+        else:
+            stoch_d = NAN
+
+        # ATR
+        true_range = high - low
+        if prev_close is not None:
+            true_range = max(true_range, abs(high - prev_close), abs(low - prev_close))
+        self.true_range.push(true_range)
+        atr_ratio = self.true_range.mean() / close
+
+        # ROC / Momentum
+        momentum = {}
+        for period in (5, 10):
+            if len(self.closes) > period:
+                past = self.closes[-1 - period]
+                momentum[period] = close - past
+            else:
+                momentum[period] = NAN
+        roc_5 = _ratio(momentum[5], self.closes[-6]) * 100 if len(self.closes) > 5 else NAN
+        roc_10 = _ratio(momentum[10], self.closes[-11]) * 100 if len(self.closes) > 10 else NAN
+
+        # 거래량
+        self.volume.push(volume)
+        volume_ratio = _ratio(volume, self.volume.mean())
+        if prev_close is not None:
+            self.obv += volume if close > prev_close else (-volume if close < prev_close else 0.0)
+        obv_ema = self.obv_ema.push(self.obv)
+
+        return np.array([
+            self.sma[5].mean(), self.sma[10].mean(), self.sma[20].mean(), self.sma[60].mean(),
+            ema_values[0], ema_values[1], ema_values[2],
+            rsi, macd, macd_signal, macd - macd_signal,
+            bb_width, bb_position,
+            stoch_k, stoch_d,
+            atr_ratio,
+            roc_5, roc_10,
+            momentum[5], momentum[10],
+            volume_ratio, obv_ema
+        ])
+
+
+class StreamingFeaturePipeline:
+    """
+    실시간 예측용 특징 파이프라인
+
+    캔들마다 StreamingIndicators로 특징 벡터를 만들고, 저장된 scaler로 정규화해
+    LSTM 입력 링 버퍼에 넣습니다. 링 버퍼는 행을 i와 i+lookback 두 곳에 써서
+    최근 lookback행이 항상 연속된 구간이므로 window()는 복사 없는 view입니다.
+
+    calculate_all 후 dropna()처럼 NaN이 있는 캔들은 버퍼에 넣지 않습니다.
+    """
+
+    def __init__(self, lookback=100, scaler=None):
+        self.lookback = lookback
+        self.indicators = StreamingIndicators()
+        self.n_features = len(StreamingIndicators.FEATURES)
+        self.set_scaler(scaler)
+        self._buffer = np.zeros((2 * lookback, self.n_features), dtype=np.float32)
+        self._position = 0 # 다음에 쓸 위치 (0 ~ lookback-1)
+        self.valid_rows = 0 # 버퍼에 들어간 (NaN 없는) 캔들 수
+        self.latest_features = None # 최신 캔들의 정규화 전 특징 (XGBoost 입력)
+
+    def set_scaler(self, scaler):
+        """MinMaxScaler/StandardScaler는 x * scale + offset으로 직접 계산 (그 외는 transform 호출)"""
+        self.scaler = scaler
+        self._scale = self._offset = None
+        if scaler is None:
+            return
+        if hasattr(scaler, 'data_min_') and hasattr(scaler, 'min_'): # MinMaxScaler
+            self._scale, self._offset = np.asarray(scaler.scale_), np.asarray(scaler.min_)
+        elif hasattr(scaler, 'with_mean'): # StandardScaler
+            mean = scaler.mean_ if scaler.with_mean else np.zeros(self.n_features)
+            std = scaler.scale_ if scaler.with_std else np.ones(self.n_features)
+            self._scale, self._offset = 1.0 / std, -mean / std
+
+    def _transform(self, features):
+        if self._scale is not None:
+            return features * self._scale + self._offset
+        return self.scaler.transform(features.reshape(1, -1))[0]
+
+    def update(self, market_data):
+        """
+        캔들 하나 반영
+
+        Args:
+            market_data: dict with 'open', 'high', 'low', 'close', 'volume'
+
+        Returns:
+            bool - 이 캔들이 유효(NaN 없음, dropna 기준)해 버퍼에 들어갔는지
+        """
+        features = self.indicators.update(
+            market_data['open'], market_data['high'], market_data['low'],
+            market_data['close'], market_data['volume'])
+        if np.isnan(features).any():
+            return False
+
+        self.latest_features = features
+        if self.scaler is not None:
+            row = self._transform(features)
+            self._buffer[self._position] = row
+            self._buffer[self._position + self.lookback] = row
+            self._position = (self._position + 1) % self.lookback
+        self.valid_rows += 1
+        return True
+
+    def extend(self, frame):
+        """OHLCV DataFrame의 캔들을 순서대로 반영 (과거 데이터로 상태 초기화)"""
+        columns = [frame[col].to_numpy(dtype=float) for col in ('open', 'high', 'low', 'close', 'volume')]
+        for open_, high, low, close, volume in zip(*columns):
+            self.update({'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume})
+
+    @property
+    def ready(self):
+        return self.scaler is not None and self.valid_rows >= self.lookback
+
+    def window(self):
+        """최근 lookback개 정규화 특징 (lookback, features) - 복사 없는 view"""
+        return self._buffer[self._position:self._position + self.lookback]
@@ -0,0 +1,168 @@
+"""
+Synthetic Market
+백테스트/최적화/벤치마크용 가상 시장 데이터 생성기 (regime-switching GBM, 벡터화)
+"""
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+SESSION_OPEN = 9 * 60       # 09:00 (분)
+SESSION_CLOSE = 15 * 60 + 30 # 15:30 (분, 포함)
+
+
+def session_minutes(start_date, end_date):
+    """
+    장 운영 시간(평일 09:00~15:30)의 분 단위 시각 (start_date ~ end_date, 양 끝 포함)
+
+    전체 분 단위 달력을 만들어 거르지 않고 평일 × 장중 분 오프셋으로 바로 만듭니다.
+    """
+    start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+    days = pd.bdate_range(start.normalize(), end.normalize()).asi8
+    offsets = np.arange(SESSION_OPEN, SESSION_CLOSE + 1, dtype=np.int64) * 60_000_000_000
+    stamps = (days[:, None] + offsets).ravel()
+    stamps = stamps[(stamps >= start.value) & (stamps <= end.value)]
+    return pd.DatetimeIndex(stamps.view('datetime64[ns]'))
+
+
+def stable_seed(*parts):
+    """종목/기간 등으로 만드는 고정 시드 (실행마다, 프로세스마다 같은 값)"""
+    return zlib.crc32('|'.join(str(p) for p in parts).encode('utf-8'))
+
+
+class SyntheticMarket:
+    """
+    Regime-switching GBM 가상 시장
+
+    국면(횡보/상승/하락)을 min_duration~max_duration 분 길이의 구간으로 뽑고, 국면별
+    drift/변동성으로 로그수익률을 한 번에 만든 뒤 누적합으로 가격을 계산합니다 (분당 루프 없음).
+    거래량은 로그정규 기본값 × 국면 배수 × 장중 U자형 × 간헐적 급증입니다.
+
+    같은 시드면 같은 데이터가 나오고, market_data()는 결과를 캐시해 최적화의 모든
+    파라미터 조합/여러 번의 최적화 실행이 같은 데이터를 공유합니다.
+    """
+
+    # (국면, 선택 확률, 분당 drift, 분당 변동성, 거래량 배수)
+    REGIMES = (
+        ('range', 0.4, 0.0, 0.0005, 1.0),
+        ('bull', 0.4, 0.0002, 0.001, 1.3),
+        ('bear', 0.2, -0.0002, 0.0015, 1.6),
+    )
+
+    def __init__(self, start_price=10000, min_duration=60, max_duration=300,
+                 volume_mean=30000, volume_sigma=0.5, spike_prob=0.02, spike_range=(3.0, 8.0),
+                 cache_size=8):
+        """
+        Args:
+            start_price: 시작 가격
+            min_duration, max_duration: 국면 길이 범위 (봉, max 미포함)
+            volume_mean: 평균 거래량 (국면/장중 배수 적용 전)
+            volume_sigma: 거래량 로그정규 표준편차
+            spike_prob: 거래량 급증 확률 (봉당)
+            spike_range: 급증 배수 범위
+            cache_size: market_data() 캐시 개수
+        """
+        self.start_price = start_price
+        self.min_duration = min_duration
+        self.max_duration = max_duration
+        self.volume_mean = volume_mean
+        self.volume_sigma = volume_sigma
+        self.spike_prob = spike_prob
+        self.spike_range = spike_range
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+
+        probs = np.array([r[1] for r in self.REGIMES])
+        self._probs = probs / probs.sum()
+        self._sigma = np.array([r[3] for r in self.REGIMES])
+        self._drift = np.array([r[2] for r in self.REGIMES]) - 0.5 * self._sigma ** 2
+        self._volume_mult = np.array([r[4] for r in self.REGIMES])
+
+    def regimes(self, n, rng):
+        """봉별 국면 번호 (0=횡보, 1=상승, 2=하락)"""
+        segments = n // self.min_duration + 1
+        labels = rng.choice(len(self.REGIMES), size=segments, p=self._probs)
+        durations = rng.integers(self.min_duration, self.max_duration, size=segments)
+        return np.repeat(labels.astype(np.int8), durations)[:n]
+
+    def log_returns(self, regimes, rng):
+        """국면별 GBM 로그수익률 (mu - sigma²/2 + sigma·Z)"""
+        returns = rng.standard_normal(len(regimes))
+        returns *= self._sigma[regimes]
+        returns += self._drift[regimes]
+        return returns
+
+    def volumes(self, regimes, rng, minute_of_day=None):
+        """거래량 (정수). minute_of_day가 있으면 장 시작/마감에 몰리는 U자형 적용"""
+        n = len(regimes)
+        volume = rng.standard_normal(n)
+        volume *= self.volume_sigma
+        volume += np.log(self.volume_mean)
+        np.exp(volume, out=volume) # 로그정규
+        volume *= self._volume_mult[regimes]
+        if minute_of_day is not None:
+            half = (SESSION_CLOSE - SESSION_OPEN) / 2
+            position = (np.asarray(minute_of_day) - SESSION_OPEN - half) / half # -1(개장) ~ 1(마감)
+            volume *= 0.6 + 0.8 * position ** 2
+        spikes = rng.random(n) < self.spike_prob
+        volume[spikes] *= rng.uniform(*self.spike_range, size=int(spikes.sum()))
+        return np.maximum(volume, 1).astype(np.int64)
+
+    def minute_bars(self, start_date, end_date, seed=None):
+        """
+        장중 분봉 (가격은 Backtester와 같은 정수 종가)
+
+        Returns:
+            DataFrame(index=장중 시각, columns=['price', 'volume', 'regime'])
+        """
+        dates = session_minutes(start_date, end_date)
+        rng = np.random.default_rng(seed)
+        regimes = self.regimes(len(dates), rng)
+        prices = self.start_price * np.exp(np.cumsum(self.log_returns(regimes, rng)))
+        minute_of_day = (dates.asi8 // 60_000_000_000) % (24 * 60)
+        volume = self.volumes(regimes, rng, minute_of_day)
+        return pd.DataFrame({
+            'price': np.floor(prices).astype(np.int64),
+            'volume': volume,
+            'regime': regimes
+        }, index=dates)
+
+    def ohlcv(self, periods, start='2020-01-01', freq='D', steps=30, seed=None):
+        """
+        OHLCV 봉 (봉마다 steps개의 GBM 경로로 시가/고가/저가/종가 생성)
+
+        Args:
+            periods: 봉 개수
+            steps: 봉 하나를 만드는 내부 경로 길이 (국면은 내부 경로 단위)
+        """
+        rng = np.random.default_rng(seed)
+        regimes = self.regimes(periods * steps, rng)
+        path = self.start_price * np.exp(np.cumsum(self.log_returns(regimes, rng))).reshape(periods, steps)
+        volume = self.volumes(regimes, rng).reshape(periods, steps).sum(axis=1)
+        return pd.DataFrame({
+            'open': path[:, 0],
+            'high': path.max(axis=1),
+            'low': path.min(axis=1),
+            'close': path[:, -1],
+            'volume': volume
+        }, index=pd.date_range(start=start, periods=periods, freq=freq))
+
+    def market_data(self, code, start_date, end_date, seed=None):
+        """
+        종목/기간의 분봉 (캐시). seed가 없으면 종목/기간으로 고정 시드를 만듭니다.
+
+        반환된 DataFrame은 캐시와 공유되므로 수정하지 말고 복사해서 사용하세요.
+        """
+        if seed is None:
+            seed = stable_seed(code, start_date, end_date)
+        key = (str(start_date), str(end_date), seed)
+        data = self._cache.get(key)
+        if data is None:
+            data = self.minute_bars(start_date, end_date, seed)
+            self._cache[key] = data
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+        return data
@@ -4,7 +4,7 @@ AI Model Trainer
 from logger import logger
 from ai.data_collector import DataCollector
 from ai.indicators import IndicatorCalculator
-from ai.indicators import IndicatorCalculator
+from ai.feature_store import FeatureStore
 from ai.lstm_model import LSTMPredictor, TENSORFLOW_AVAILABLE
 from ai.xgboost_model import XGBoostPredictor
 import numpy as np
@@ -43,7 +43,8 @@ class AITrainer:
         
         # 2. 기술적 지표 계산
         logger.info("Step 2: Calculating technical indicators...")
-        df = IndicatorCalculator.calculate_all(df)
+        # 저장소에 없는 캔들만 계산해 추가 (지표 정의가 바뀌면 자동 재계산)
+        df = FeatureStore().features_for(stock_code, interval, df)
         
         # NaN 제거
         df = df.dropna()
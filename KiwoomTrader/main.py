@@ -5,11 +5,13 @@ from qasync import QEventLoop
 from ui.main_window import MainWindow
 from logger import logger
 import os
+import multiprocessing
 
 # Suppress TensorFlow warnings
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support() # 실행 파일(PyInstaller)에서 최적화/지표 계산 작업 프로세스 지원
     try:
         app = QApplication(sys.argv)
         loop = QEventLoop(app)
@@ -0,0 +1,133 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from ai.indicators import IndicatorCalculator
+from ai.feature_store import FeatureStore, OHLCV_COLUMNS
+
+
+def make_candles(n=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    close = np.round(10000 * np.exp(np.cumsum(rng.normal(0, 2e-3, n))), -1)
+    return pd.DataFrame({
+        'open': np.roll(close, 1),
+        'high': close + rng.integers(0, 5, n) * 10,
+        'low': close - rng.integers(0, 5, n) * 10,
+        'close': close,
+        'volume': rng.integers(0, 1000, n).astype(float)
+    }, index=pd.date_range('2024-01-02 09:00', periods=n, freq='min'))
+
+
+def assert_matches_full(stored, candles):
+    """증분 결과 = 전체 재계산 (상대 오차 4e-10 이내, NaN 위치 동일)"""
+    full = IndicatorCalculator.calculate_all(candles)
+    assert list(stored.columns) == list(full.columns)
+    assert stored.index.equals(full.index)
+    np.testing.assert_allclose(stored.to_numpy(), full.to_numpy(), rtol=4e-10, atol=1e-12)
+
+
+def test_incremental_update_matches_full_calculation(tmp_path):
+    df = make_candles()
+    store = FeatureStore(str(tmp_path))
+
+    assert store.update('005930', '1m', df.iloc[:2000]) == 2000
+    for end in list(range(2037, 3000, 37)) + [3000]:
+        store.update('005930', '1m', df.iloc[:end])
+    # 이미 저장된 구간은 다시 추가하지 않음
+    assert store.update('005930', '1m', df) == 0
+
+    stored = store.read('005930', '1m')
+    assert_matches_full(stored, df)
+    # OBV는 겹치는 행에 맞춰 이어지므로 누적값이 전체 계산과 같음
+    full = IndicatorCalculator.calculate_all(df)
+    np.testing.assert_allclose(stored['OBV'], full['OBV'], rtol=0, atol=1e-6)
+    np.testing.assert_allclose(stored['OBV_EMA'], full['OBV_EMA'], rtol=1e-12, atol=1e-6)
+
+
+def test_forming_last_bar_is_rewritten(tmp_path):
+    df = make_candles(800)
+    store = FeatureStore(str(tmp_path))
+
+    # 마지막 봉이 형성 중일 때 저장
+    forming = df.iloc[:600].copy()
+    forming.iloc[-1, forming.columns.get_loc('close')] += 50
+    forming.iloc[-1, forming.columns.get_loc('volume')] = 1.0
+    store.update('005930', '1m', forming)
+
+    # 완성된 봉 + 새 봉: 마지막 행을 다시 쓰고 이어서 추가
+    assert store.update('005930', '1m', df.iloc[:700]) == 101
+    assert store.rows('005930', '1m') == 700
+    assert_matches_full(store.read('005930', '1m'), df.iloc[:700])
+
+    # 바뀌지 않았으면 그대로
+    assert store.update('005930', '1m', df.iloc[:700]) == 0
+
+
+def test_definition_change_recomputes_from_stored_ohlcv(tmp_path):
+    df = make_candles(1000)
+    FeatureStore(str(tmp_path)).update('005930', '1m', df)
+
+    class ScaledCalculator(IndicatorCalculator):
+        @staticmethod
+        def calculate_all(df):
+            result = IndicatorCalculator.calculate_all(df)
+            result['RSI'] = result['RSI'] / 100
+            return result
+
+    store = FeatureStore(str(tmp_path), calculator=ScaledCalculator)
+    assert store.definition != FeatureStore(str(tmp_path)).definition
+    stored = store.read('005930', '1m')
+
+    np.testing.assert_allclose(stored.to_numpy(), ScaledCalculator.calculate_all(df).to_numpy(), rtol=1e-12)
+    # 이전 정의의 디렉터리는 지워짐
+    assert os.listdir(os.path.join(str(tmp_path), '005930', '1m')) == [store.definition]
+
+
+def test_torn_append_is_truncated(tmp_path):
+    df = make_candles(1200)
+    store = FeatureStore(str(tmp_path))
+    store.update('005930', '1m', df.iloc[:1000])
+
+    # manifest를 쓰기 전에 중단된 추가: 일부 컬럼 파일에만 꼬리가 남음
+    directory = os.path.join(str(tmp_path), '005930', '1m', store.definition)
+    for name in ('timestamp.i8', 'close.f64', 'RSI.f64'):
+        with open(os.path.join(directory, name), 'ab') as f:
+            f.write(np.arange(7, dtype='<f8').tobytes()[:50])
+
+    reopened = FeatureStore(str(tmp_path))
+    assert reopened.rows('005930', '1m') == 1000
+    reopened.update('005930', '1m', df)
+    assert reopened.rows('005930', '1m') == 1200
+    assert os.path.getsize(os.path.join(directory, 'close.f64')) == 1200 * 8
+    assert_matches_full(reopened.read('005930', '1m'), df)
+
+
+def test_read_ranges_and_latest(tmp_path):
+    df = make_candles(500)
+    store = FeatureStore(str(tmp_path))
+    assert store.latest('005930', '1m') is None
+    store.update('005930', '1m', df)
+    full = IndicatorCalculator.calculate_all(df)
+
+    # start/end 모두 포함
+    part = store.read('005930', '1m', start=df.index[100], end=df.index[199], columns=['close', 'RSI'])
+    assert part.index.equals(df.index[100:200]) and list(part.columns) == ['close', 'RSI']
+    np.testing.assert_allclose(part.to_numpy(), full[['close', 'RSI']].iloc[100:200].to_numpy(), rtol=1e-12)
+    # 저장 구간 밖/사이 시각
+    assert store.read('005930', '1m', start=df.index[-1] + pd.Timedelta('1min')).empty
+    assert len(store.read('005930', '1m', end=df.index[0] + pd.Timedelta('30s'))) == 1
+
+    assert store.tail('005930', '1m', 3).index.equals(df.index[-3:])
+    latest = store.latest('005930', '1m', OHLCV_COLUMNS)
+    assert latest.name == df.index[-1]
+    np.testing.assert_array_equal(latest.to_numpy(), df.iloc[-1].to_numpy())
+
+    # 다른 인스턴스(프로세스)가 추가하면 refresh로 보임
+    other = FeatureStore(str(tmp_path))
+    assert other.rows('005930', '1m') == 500
+    store.update('005930', '1m', pd.concat([df, make_candles(510).iloc[500:].set_axis(
+        pd.date_range(df.index[-1] + pd.Timedelta('1min'), periods=10, freq='min'))]))
+    assert other.rows('005930', '1m') == 510
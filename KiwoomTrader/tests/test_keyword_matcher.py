@@ -0,0 +1,32 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+
+from ai.keyword_matcher import KeywordMatcher
+
+POSITIVE = ["상승", "급등", "호재", "최대", "최고", "bull", "bullish", "buy", "gain", "record"]
+NEGATIVE = ["하락", "급락", "최저", "bear", "bearish", "sell", "ban", "fall", "debt", "risk"]
+
+
+def naive_score(text):
+    """기존 SentimentAnalyzer.analyze_text 방식 (키워드마다 `in` 검사)"""
+    text = text.lower()
+    return sum(0.3 for k in POSITIVE if k in text) - sum(0.3 for k in NEGATIVE if k in text)
+
+
+def test_matches_substring_checks():
+    weights = {**{k: 0.3 for k in POSITIVE}, **{k: -0.3 for k in NEGATIVE}}
+    matcher = KeywordMatcher(weights)
+
+    assert matcher.matches("Bullish rally after record gain") == ["bull", "bullish", "gain", "record"]
+    assert matcher.matches("삼성전자 급등 후 하락") == ["급등", "하락"]
+    assert matcher.matches("no keywords here") == []
+
+    # 겹치는/이어지는 키워드가 많은 임의 문자열로 기존 방식과 비교
+    rng = random.Random(0)
+    pieces = POSITIVE + NEGATIVE + ["bu", "bea", "최", "급", " ", "x", "BULL", "Sell"]
+    for _ in range(500):
+        text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+        assert abs(matcher.score(text) - naive_score(text)) < 1e-9, text
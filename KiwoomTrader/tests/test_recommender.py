@@ -0,0 +1,183 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import threading
+import time
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import MinMaxScaler
+
+from ai.indicators import IndicatorCalculator
+from ai.feature_store import FeatureStore
+
+
+def make_candles(n=160, seed=0):
+    rng = np.random.default_rng(seed)
+    close = np.round(10000 * np.exp(np.cumsum(rng.normal(0, 5e-3, n))), -1)
+    return pd.DataFrame({
+        'open': np.roll(close, 1),
+        'high': close + rng.integers(0, 5, n) * 10,
+        'low': close - rng.integers(0, 5, n) * 10,
+        'close': close,
+        'volume': rng.integers(1, 1000, n).astype(float)
+    }, index=pd.date_range('2024-01-02 09:00', periods=n, freq='h'))
+
+
+class FakeCollector:
+    """yfinance 대신 가상 데이터 (스레드에서 호출됨) - 동시 다운로드 수 기록"""
+
+    def __init__(self, delay=0.02, slow=None):
+        self.delay = delay
+        self.slow = slow or {}
+        self.active = 0
+        self.max_active = 0
+        self.finished = set()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def convert_korean_code(code):
+        return f"{code}.KS"
+
+    def get_stock_data(self, symbol, period='1mo', interval='1h', use_cache=True):
+        code = symbol.split('.')[0]
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.slow.get(code, self.delay))
+            if code.startswith('FAIL'):
+                raise ConnectionError("download failed")
+            if code.startswith('SHORT'):
+                return make_candles(60)
+            return make_candles(seed=sum(map(ord, code)))
+        finally:
+            with self.lock:
+                self.active -= 1
+                self.finished.add(code)
+
+
+class FakePredictor:
+    """배치 크기를 기록하고 종목별 고정 점수 반환"""
+
+    def __init__(self):
+        self.batches = []
+
+    def predict_history_batch(self, frames):
+        self.batches.append(len(frames))
+        return [float(df['close'].iloc[-1] % 100) / 100 for df in frames]
+
+
+class FakeSentiment:
+    async def get_score(self, code):
+        await asyncio.sleep(0)
+        if code.startswith('NEWSFAIL'):
+            raise ConnectionError("news failed")
+        return 0.4
+
+
+@pytest.fixture
+def make_recommender(monkeypatch, tmp_path):
+    """외부 의존성(모델/뉴스/yfinance) 모듈을 가짜로 바꾼 StockRecommender 생성기"""
+    monkeypatch.setitem(sys.modules, 'ai.predictor', types.SimpleNamespace(AIPredictor=FakePredictor))
+    monkeypatch.setitem(sys.modules, 'ai.sentiment', types.SimpleNamespace(get_sentiment_service=FakeSentiment))
+    monkeypatch.setitem(sys.modules, 'ai.data_collector', types.SimpleNamespace(DataCollector=FakeCollector))
+    monkeypatch.delitem(sys.modules, 'ai.recommender', raising=False)
+    from ai.recommender import StockRecommender
+    monkeypatch.delitem(sys.modules, 'ai.recommender')
+
+    def make(collector=None, **kwargs):
+        recommender = StockRecommender(processes=0, **kwargs)
+        recommender.feature_store = FeatureStore(str(tmp_path))
+        if collector is not None:
+            recommender.data_collector = collector
+        return recommender
+    return make
+
+
+def test_recommend_batch_bounds_concurrency_and_batches(make_recommender):
+    codes = [f"{i:06d}" for i in range(12)] + ['SHORT1', 'FAIL1', 'NEWSFAIL1']
+    recommender = make_recommender(max_concurrency=3, batch_size=4)
+    progress = []
+
+    results = asyncio.run(recommender.recommend_batch(codes + codes[:2], progress_callback=lambda *p: progress.append(p)))
+
+    # 데이터가 부족하거나 다운로드에 실패한 종목은 생략 (중복 종목은 한 번만)
+    assert sorted(r['code'] for r in results) == sorted(codes[:12] + ['NEWSFAIL1'])
+    assert [r['score'] for r in results] == sorted((r['score'] for r in results), reverse=True)
+    # 뉴스 조회 실패는 중립
+    assert {r['code']: r['sentiment_score'] for r in results}['NEWSFAIL1'] == 0.0
+
+    assert recommender.data_collector.max_active == 3
+    assert all(size <= 4 for size in recommender.predictor.batches)
+    assert sum(recommender.predictor.batches) == 13
+
+    # 결과마다 진행률, 마지막은 실패 종목 포함 완료
+    assert progress[:-1] == [(i, 17) for i in range(1, 14)]
+    assert progress[-1] == (17, 17)
+
+    top = asyncio.run(make_recommender().recommend_batch(codes, top_n=5))
+    assert [r['code'] for r in top] == [r['code'] for r in results[:5]]
+
+
+def test_iter_recommendations_streams_before_slow_downloads(make_recommender):
+    collector = FakeCollector(delay=0.01, slow={'SLOW01': 1.0})
+    recommender = make_recommender(collector, max_concurrency=4, batch_size=2)
+
+    async def first_results():
+        stream = recommender.iter_recommendations(['SLOW01', '000001', '000002', '000003'])
+        results = [await stream.__anext__(), await stream.__anext__()]
+        pending = 'SLOW01' not in collector.finished
+        await stream.aclose()
+        return results, pending
+
+    results, pending = asyncio.run(first_results())
+    # 배치가 차면 느린 다운로드를 기다리지 않고 바로 추론
+    assert pending
+    assert {r['code'] for r in results} <= {'000001', '000002', '000003'}
+    assert recommender.predictor.batches[0] == 2
+
+
+def test_predict_history_batch_uses_ensemble_for_ready_frames(monkeypatch):
+    class FakeEnsemble:
+        def __init__(self):
+            self.calls = []
+
+        def is_ready(self):
+            return True
+
+        def predict_batch(self, lstm_inputs, xgb_inputs):
+            self.calls.append((lstm_inputs, xgb_inputs))
+            return np.linspace(0.1, 0.9, len(lstm_inputs))
+
+    monkeypatch.setitem(sys.modules, 'ai.ensemble_predictor', types.SimpleNamespace(EnsemblePredictor=FakeEnsemble))
+    monkeypatch.delitem(sys.modules, 'ai.predictor', raising=False)
+    from ai.predictor import AIPredictor
+    monkeypatch.delitem(sys.modules, 'ai.predictor')
+
+    feature_cols = IndicatorCalculator.get_feature_names()
+    frames = [IndicatorCalculator.calculate_all(make_candles(300, seed=s)).dropna() for s in range(3)]
+    frames.insert(1, frames[0].iloc[:50])  # lookback보다 짧으면 Mock 예측
+
+    predictor = AIPredictor()
+    predictor.scaler = MinMaxScaler().fit(pd.concat(frames)[feature_cols].values)
+    scores = predictor.predict_history_batch(frames)
+
+    # 데이터가 충분한 종목만 한 번의 배치 추론
+    (lstm_inputs, xgb_inputs), = predictor.ensemble.calls
+    assert lstm_inputs.shape == (3, predictor.lookback, len(feature_cols))
+    for row, i in enumerate([0, 2, 3]):
+        window = frames[i][feature_cols].values[-predictor.lookback:]
+        np.testing.assert_allclose(lstm_inputs[row], predictor.scaler.transform(window))
+        np.testing.assert_array_equal(xgb_inputs[row], window[-1])
+    np.testing.assert_allclose([scores[0], scores[2], scores[3]], [0.1, 0.5, 0.9])
+    assert 0.0 <= scores[1] <= 1.0
+
+    # 앙상블을 쓸 수 없으면 전부 Mock 예측
+    predictor.use_ensemble = False
+    assert len(predictor.predict_history_batch(frames)) == 4
+    assert len(predictor.ensemble.calls) == 1
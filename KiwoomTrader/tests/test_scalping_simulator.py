@@ -0,0 +1,99 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ai.scalping_simulator import FEE_BUY, FEE_SELL, SLIPPAGE, ScalpingData, simulate
+from ai.synthetic_market import SyntheticMarket
+from ai.strategy_optimizer import StrategyOptimizer
+
+
+def reference_run(data, params, initial_balance=10000000):
+    """기존 Backtester.run의 분당 루프 (AI 점수만 data.ai_score 사용)"""
+    df = pd.DataFrame({'price': data.price, 'MA20_Vol': data.ma20_vol, 'RSI': data.rsi,
+                       'volume': data.volume}, index=data.index)
+    balance, position, avg_price = initial_balance, 0, 0
+    trades, equity_curve = [], []
+    total_fees, cooldown, entry_idx = 0, 0, 0
+    for i in range(60, len(df)):
+        if cooldown > 0:
+            cooldown -= 1
+            continue
+        curr_price = df['price'].iloc[i]
+        ai_score = data.ai_score[i]
+        buy_signal = (df['volume'].iloc[i] > df['MA20_Vol'].iloc[i] * params['vol_multiplier']
+                      and ai_score >= params['ai_threshold'] and df['RSI'].iloc[i] < params['rsi_threshold'])
+        if position > 0:
+            exec_price = curr_price * (1 - SLIPPAGE)
+            curr_profit_pct = (exec_price - avg_price) / avg_price * 100
+            take_profit = curr_profit_pct >= params['take_profit']
+            stop_loss = curr_profit_pct <= -params['stop_loss']
+            if take_profit or stop_loss or i - entry_idx >= params['time_exit']:
+                revenue = position * exec_price
+                fee = revenue * FEE_SELL
+                balance += revenue - fee
+                total_fees += fee
+                profit = revenue - fee - position * avg_price
+                trades.append(("SELL", i, exec_price, position, profit,
+                               "TP" if take_profit else ("SL" if stop_loss else "TimeExit")))
+                position = 0
+                if profit < 0:
+                    cooldown = params['cooldown']
+        elif buy_signal:
+            exec_price = curr_price * (1 + SLIPPAGE)
+            qty = int(balance / (exec_price * (1 + FEE_BUY)))
+            if qty > 0:
+                fee = qty * exec_price * FEE_BUY
+                balance -= qty * exec_price + fee
+                total_fees += fee
+                position, avg_price, entry_idx = qty, exec_price, i
+                trades.append(("BUY", i, exec_price, qty))
+        equity_curve.append(balance + position * curr_price)
+
+    equity = pd.Series(equity_curve)
+    mdd = ((equity - equity.cummax()) / equity.cummax()).min() * 100
+    return trades, balance + position * data.price[-1], mdd, total_fees
+
+
+@pytest.fixture(scope='module')
+def data():
+    bars = SyntheticMarket().minute_bars('2024-01-01', '2024-01-13', seed=3)
+    data = ScalpingData(bars.index, bars['price'].to_numpy(), bars['volume'].to_numpy())
+    return data.set_mock_ai_scores(True, np.random.default_rng(0))
+
+
+def test_simulate_matches_per_minute_loop(data):
+    grid = itertools.product([2.0, 3.0], [0.6, 0.8], [50, 70], [0.5, 2.0], [0.5, 1.0], [5, 30], [10, 60])
+    keys = ['vol_multiplier', 'ai_threshold', 'rsi_threshold', 'take_profit', 'stop_loss', 'time_exit', 'cooldown']
+    traded = 0
+    for combo in itertools.islice(grid, 0, None, 4):
+        params = dict(zip(keys, combo))
+        trades, final_balance, mdd, total_fees = reference_run(data, params)
+        result = simulate(data, params)
+
+        position = {d: i for i, d in enumerate(data.index.astype(str))}
+        simulated = [(t['type'], position[t['date']], t['price'], t['qty'])
+                     + ((t['profit'], t['reason']) if t['type'] == 'SELL' else ()) for t in result['trades']]
+        assert simulated == trades
+        assert result['final_balance'] == final_balance
+        assert result['mdd'] == mdd and result['total_fees'] == total_fees
+        traded += len(trades) > 0
+    assert traded > 10
+
+
+def test_parallel_optimizer_matches_serial(data):
+    grid = {'vol_multiplier': [2.0, 3.0], 'ai_threshold': [0.7], 'rsi_threshold': [60, 70],
+            'take_profit': [0.5, 1.0], 'stop_loss': [0.5], 'time_exit': [5, 10], 'cooldown': [10]}
+    progress = []
+    serial = StrategyOptimizer(workers=1).optimize_data(data, grid, progress_callback=progress.append)
+    parallel = StrategyOptimizer(workers=2).optimize_data(data, grid)
+
+    assert [r['params'] for r in serial[2]] == [r['params'] for r in parallel[2]]
+    assert [r['score'] for r in serial[2]] == [r['score'] for r in parallel[2]]
+    assert serial[1] == parallel[1] and serial[0]['trades'] == parallel[0]['trades']
+    assert progress[-1] == 100 and len(progress) <= 10
@@ -0,0 +1,192 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import types
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+
+class FakeAnalyzer:
+    """뉴스 조회 대신 정해진 (점수, 제목 수) 반환 - 호출 기록"""
+
+    def __init__(self, results=None, delay=0.0):
+        self.results = results or {}
+        self.delay = delay
+        self.calls = []
+
+    async def score_with_count(self, code, ticker_symbol=None):
+        self.calls.append(code)
+        await asyncio.sleep(self.delay)
+        result = self.results.get(code, (0.5, 3))
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def close(self):
+        pass
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def sentiment(monkeypatch):
+    """bs4 없이 ai.sentiment import (HTML 파싱은 테스트하지 않음), 시계 고정"""
+    monkeypatch.setitem(sys.modules, 'bs4', types.SimpleNamespace(BeautifulSoup=None))
+    monkeypatch.delitem(sys.modules, 'ai.sentiment', raising=False)
+    import ai.sentiment as module
+    monkeypatch.delitem(sys.modules, 'ai.sentiment')
+    module.clock = Clock()
+    monkeypatch.setattr(module, 'time', module.clock)
+    return module
+
+
+def test_score_is_cached_until_ttl(sentiment):
+    analyzer = FakeAnalyzer()
+    service = sentiment.SentimentService(analyzer, ttl=600)
+
+    async def run():
+        assert service.cached_score('005930') is None
+        assert await service.get_score('005930') == 0.5
+        sentiment.clock.now += 599
+        assert await service.get_score('005930') == 0.5
+        assert analyzer.calls == ['005930']
+
+        sentiment.clock.now += 1
+        analyzer.results['005930'] = (-0.2, 2)
+        assert await service.get_score('005930') == -0.2
+        assert analyzer.calls == ['005930', '005930']
+        # max_age가 더 짧으면 TTL 안이어도 다시 조회
+        sentiment.clock.now += 10
+        assert await service.get_score('005930', max_age=5) == -0.2
+        assert len(analyzer.calls) == 3
+
+    asyncio.run(run())
+    assert service.cached_score('005930') == -0.2
+    assert service.age('005930') == 0
+
+
+def test_empty_and_failed_results_are_not_kept_for_full_ttl(sentiment):
+    analyzer = FakeAnalyzer({'EMPTY': (0.0, 0), 'FAIL': ConnectionError("down")})
+    service = sentiment.SentimentService(analyzer, ttl=600, empty_ttl=60)
+
+    async def run():
+        # 뉴스를 받지 못한 중립 점수는 empty_ttl 동안만
+        assert await service.get_score('EMPTY') == 0.0
+        sentiment.clock.now += 59
+        await service.get_score('EMPTY')
+        assert analyzer.calls == ['EMPTY']
+        sentiment.clock.now += 1
+        analyzer.results['EMPTY'] = (0.3, 4)
+        assert await service.get_score('EMPTY') == 0.3
+        sentiment.clock.now += 300
+        assert await service.get_score('EMPTY') == 0.3
+        assert analyzer.calls == ['EMPTY', 'EMPTY']
+
+        # 예외는 캐시하지 않고 다음 호출에서 다시 조회
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                await service.get_score('FAIL')
+        assert analyzer.calls.count('FAIL') == 2
+        assert service.cached_score('FAIL') is None and not service._pending
+
+    asyncio.run(run())
+
+
+def test_concurrent_requests_share_one_fetch(sentiment):
+    analyzer = FakeAnalyzer(delay=0.05)
+    service = sentiment.SentimentService(analyzer)
+
+    async def run():
+        waiters = [asyncio.create_task(service.get_score('005930')) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        # 기다리던 호출 하나가 취소되어도 공유된 조회는 계속
+        waiters[0].cancel()
+        results = await asyncio.gather(*waiters[1:], service.get_score('000660'))
+        return results
+
+    assert asyncio.run(run()) == [0.5] * 5
+    assert sorted(analyzer.calls) == ['000660', '005930']
+    assert service.cached_score('005930') == 0.5 and not service._pending
+
+
+def test_prefetch_refreshes_only_entries_expiring_before_next_cycle(sentiment):
+    analyzer = FakeAnalyzer()
+    service = sentiment.SentimentService(analyzer, ttl=600, prefetch_interval=60, max_concurrency=2)
+
+    async def run():
+        await service.get_score('OLD')
+        sentiment.clock.now += 500
+        await service.get_score('FRESH')
+        sentiment.clock.now += 45
+        analyzer.calls.clear()
+
+        # OLD는 545초 (> 600 - 60) → 갱신, FRESH는 45초 → 유지, NEW는 처음 조회
+        await service.prefetch(['OLD', 'FRESH', 'NEW', 'OLD'])
+        assert sorted(analyzer.calls) == ['NEW', 'OLD']
+        assert service.age('OLD') == 0 and service.age('FRESH') == 45
+
+    asyncio.run(run())
+
+
+def test_prefetch_loop_runs_in_background(sentiment):
+    analyzer = FakeAnalyzer({'FAIL': ConnectionError("down")})
+    service = sentiment.SentimentService(analyzer, prefetch_interval=0.01)
+    symbols = ['005930']
+
+    async def run():
+        service.start_prefetch(lambda: symbols + ['FAIL'])
+        await asyncio.sleep(0.005)
+        # 실패한 종목이 있어도 루프는 계속되고, 매 주기 종목 목록을 다시 읽음
+        symbols.append('000660')
+        await asyncio.sleep(0.03)
+        await service.stop_prefetch()
+
+    asyncio.run(run())
+    assert service.cached_score('005930') == 0.5 and service.cached_score('000660') == 0.5
+    assert analyzer.calls.count('FAIL') >= 2
+    assert service._prefetch_task is None
+
+
+def test_buy_reads_cached_sentiment_only(sentiment, monkeypatch):
+    monkeypatch.setitem(sys.modules, 'database', types.SimpleNamespace(get_db=None, TradeLog=None))
+    monkeypatch.delitem(sys.modules, 'trading_manager', raising=False)
+    from trading_manager import TradingManager
+    monkeypatch.delitem(sys.modules, 'trading_manager')
+
+    analyzer = FakeAnalyzer()
+    manager = TradingManager.__new__(TradingManager)
+    manager.sentiment = sentiment.SentimentService(analyzer)
+    manager.api = MagicMock(send_order=AsyncMock(return_value=True))
+    manager.notifier = MagicMock()
+    manager._log_trade = MagicMock()
+    manager._update_assets = MagicMock()
+    manager.is_running = True
+    manager.watchlist = set()
+    manager.portfolio = {}
+    manager.balance = 10_000_000
+
+    async def run():
+        # 캐시가 없으면 중립으로 주문하고 다음 갱신 대상에 추가 (네트워크 조회 없음)
+        await manager.buy('005930', 10, 70000)
+        assert manager.watchlist == {'005930'}
+        assert manager.api.send_order.await_count == 1
+
+        # 부정적인 캐시 점수면 주문하지 않음
+        analyzer.results['000660'] = (-0.8, 5)
+        await manager.sentiment.get_score('000660')
+        analyzer.calls.clear()
+        await manager.buy('000660', 1, 100000)
+        assert manager.api.send_order.await_count == 1
+        assert analyzer.calls == []
+
+    asyncio.run(run())
+    assert manager.sentiment_symbols() == ['005930']
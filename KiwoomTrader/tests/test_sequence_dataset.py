@@ -0,0 +1,103 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
+
+from ai.sequence_dataset import SequenceDataset
+
+FEATURES = ['f0', 'f1', 'f2']
+
+
+def make_frame(n, seed=0, warmup=5):
+    """지표처럼 앞부분이 NaN인 특징 컬럼 + close"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.normal(size=(n, len(FEATURES))), columns=FEATURES,
+                      index=pd.date_range('2024-01-02 09:00', periods=n, freq='min'))
+    df['close'] = np.round(10000 * np.exp(np.cumsum(rng.normal(0, 2e-3, n))), -1)
+    df.iloc[:warmup, 0] = np.nan
+    return df
+
+
+def reference_windows(df, lookback, scaler=None):
+    """기존 prepare_training_data의 iloc 루프"""
+    df = df.copy()
+    df['target'] = (df['close'].shift(-1) > df['close']).astype(int)
+    df = df.dropna()
+    if scaler is None:
+        scaler = MinMaxScaler().fit(df[FEATURES].values)
+    df_scaled = df.copy()
+    df_scaled[FEATURES] = scaler.transform(df[FEATURES].values)
+    X_list, y_list = [], []
+    for i in range(lookback, len(df_scaled)):
+        X_list.append(df_scaled[FEATURES].iloc[i - lookback:i].values)
+        y_list.append(df_scaled['target'].iloc[i])
+    return np.array(X_list).reshape(-1, lookback, len(FEATURES)), np.array(y_list, dtype=int)
+
+
+def test_single_symbol_matches_iloc_loop():
+    df = make_frame(400)
+    dataset, scaler = SequenceDataset.from_frames([df], FEATURES, lookback=30)
+    X_ref, y_ref = reference_windows(df, 30)
+
+    assert dataset.shape == X_ref.shape
+    X = np.asarray(dataset)
+    assert X.dtype == np.float32
+    np.testing.assert_allclose(X, X_ref, atol=1e-6)
+    np.testing.assert_array_equal(dataset.y, y_ref)
+
+
+def test_multi_symbol_windows_stay_inside_each_symbol():
+    frames = {'A': make_frame(300, seed=1), 'B': make_frame(250, seed=2), 'C': make_frame(200, seed=3)}
+    dataset, scaler = SequenceDataset.from_frames(frames, FEATURES, lookback=20)
+
+    # 종목별 기존 루프(같은 scaler)를 이어붙인 것과 같음 = 종목 경계를 넘는 윈도우 없음
+    refs = [reference_windows(df, 20, scaler) for df in frames.values()]
+    np.testing.assert_allclose(np.asarray(dataset), np.concatenate([X for X, _ in refs]), atol=1e-6)
+    np.testing.assert_array_equal(dataset.y, np.concatenate([y for _, y in refs]))
+
+    # 샘플 윈도우 [end - lookback, end)가 한 구간 안에 있음
+    starts = dataset.indices - dataset.lookback
+    segment = np.searchsorted([end for _, end in dataset.boundaries], starts, side='right')
+    ends_segment = np.searchsorted([end for _, end in dataset.boundaries], dataset.indices - 1, side='right')
+    np.testing.assert_array_equal(segment, ends_segment)
+
+
+def test_symbol_shorter_than_lookback_is_skipped():
+    frames = [make_frame(120, seed=1), make_frame(15, seed=2), make_frame(120, seed=3)]
+    dataset, scaler = SequenceDataset.from_frames(frames, FEATURES, lookback=20)
+
+    # dropna로 종목마다 warmup 5행 제외
+    assert len(dataset) == 2 * (120 - 5 - 20)
+    refs = [reference_windows(df, 20, scaler) for df in frames]
+    assert len(refs[1][0]) == 0
+    np.testing.assert_allclose(np.asarray(dataset), np.concatenate([X for X, _ in refs]), atol=1e-6)
+
+    # 모든 종목이 lookback보다 짧으면 빈 데이터셋
+    empty, _ = SequenceDataset.from_frames([make_frame(15)], FEATURES, lookback=20)
+    assert len(empty) == 0 and empty.shape == (0, 20, len(FEATURES))
+    assert np.asarray(empty).shape == (0, 20, len(FEATURES))
+
+
+def test_split_and_iter_batches():
+    dataset, _ = SequenceDataset.from_frames([make_frame(300, seed=1), make_frame(200, seed=2)], FEATURES, lookback=25)
+    X_all, y_all = np.asarray(dataset), dataset.y
+
+    train, val = dataset.split(0.2)
+    assert len(val) == int(len(dataset) * 0.2)
+    np.testing.assert_array_equal(np.concatenate([train, val]), np.arange(len(dataset)))
+
+    batches = list(dataset.iter_batches(batch_size=64, positions=val))
+    assert [len(y) for _, y in batches[:-1]] == [64] * (len(batches) - 1) and 0 < len(batches[-1][1]) <= 64
+    np.testing.assert_array_equal(np.concatenate([X for X, _ in batches]), X_all[val])
+    np.testing.assert_array_equal(np.concatenate([y for _, y in batches]), y_all[val])
+
+    # 섞어도 샘플과 라벨의 짝은 유지되고, 같은 seed면 같은 순서
+    shuffled = list(dataset.iter_batches(batch_size=50, shuffle=True, seed=7))
+    X_s = np.concatenate([X for X, _ in shuffled])
+    y_s = np.concatenate([y for _, y in shuffled])
+    order = np.random.default_rng(7).permutation(len(dataset))
+    np.testing.assert_array_equal(X_s, X_all[order])
+    np.testing.assert_array_equal(y_s, y_all[order])
@@ -0,0 +1,57 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
+
+from ai.indicators import IndicatorCalculator
+from ai.streaming_features import StreamingIndicators, StreamingFeaturePipeline
+
+FEATURES = IndicatorCalculator.get_feature_names()
+
+
+def make_candles(n=1500, seed=0):
+    """호가 단위(10원)로 반올림된 가격 - 보합 캔들/같은 고저가도 나오도록"""
+    rng = np.random.default_rng(seed)
+    close = np.round(10000 * np.exp(np.cumsum(rng.normal(0, 2e-3, n))), -1)
+    return pd.DataFrame({
+        'open': np.roll(close, 1),
+        'high': close + rng.integers(0, 5, n) * 10,
+        'low': close - rng.integers(0, 5, n) * 10,
+        'close': close,
+        'volume': rng.integers(0, 1000, n).astype(float)
+    }, index=pd.date_range('2024-01-02 09:00', periods=n, freq='min'))
+
+
+def test_streaming_indicators_match_calculate_all():
+    df = make_candles()
+    expected = IndicatorCalculator.calculate_all(df)[FEATURES].values
+
+    indicators = StreamingIndicators()
+    streamed = np.array([indicators.update(*row) for row in df[['open', 'high', 'low', 'close', 'volume']].values])
+
+    # 워밍업 NaN 위치까지 동일
+    assert (np.isnan(streamed) == np.isnan(expected)).all()
+    valid = ~np.isnan(expected)
+    assert np.allclose(streamed[valid], expected[valid], rtol=1e-9, atol=1e-9)
+
+
+def test_pipeline_window_matches_batch_preparation():
+    df = make_candles()
+    batch = IndicatorCalculator.calculate_all(df).dropna()
+    scaler = MinMaxScaler().fit(batch[FEATURES].values)
+    lookback = 50
+
+    pipeline = StreamingFeaturePipeline(lookback, scaler)
+    pipeline.extend(df.iloc[:59 + lookback - 1]) # SMA_60 워밍업 후 lookback-1개
+    assert not pipeline.ready
+    for end in range(59 + lookback, len(df) + 1, 97):
+        pipeline.extend(df.iloc[pipeline.indicators.count:end]) # 이어서 반영
+        rows = batch[FEATURES].values[:end - 59]
+        assert pipeline.ready and pipeline.valid_rows == len(rows)
+        window = pipeline.window()
+        assert window.shape == (lookback, len(FEATURES)) and window.base is not None # 복사 없는 view
+        assert np.allclose(window, scaler.transform(rows[-lookback:]), atol=1e-6)
+        assert np.allclose(pipeline.latest_features, rows[-1])
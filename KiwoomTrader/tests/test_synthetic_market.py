@@ -0,0 +1,59 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from ai.synthetic_market import SyntheticMarket, session_minutes
+
+
+def test_session_minutes_match_calendar_filter():
+    for start, end in [('2024-01-01', '2024-03-01'), ('2024-01-03 10:15', '2024-01-05 11:00:30'),
+                       ('2023-12-30', '2024-01-01 09:00')]:
+        # 기존 Backtester 방식 (분 단위 전체 달력 + 시각 비교)
+        dates = pd.date_range(start=start, end=end, freq='1min')
+        mask = (
+            (dates.weekday < 5) &
+            (dates.time >= datetime.time(9, 0)) &
+            (dates.time <= datetime.time(15, 30))
+        )
+        assert session_minutes(start, end).equals(dates[mask])
+
+
+def test_minute_bars_are_seeded_and_regime_switching():
+    market = SyntheticMarket()
+    bars = market.minute_bars('2024-01-01', '2024-07-01', seed=7)
+    assert bars.equals(market.minute_bars('2024-01-01', '2024-07-01', seed=7))
+    assert not bars.equals(market.minute_bars('2024-01-01', '2024-07-01', seed=8))
+
+    assert bars['price'].dtype == np.int64 and (bars['volume'] >= 1).all()
+    # 국면 구간 길이는 min_duration 이상 (마지막 구간 제외)
+    changes = np.flatnonzero(np.diff(bars['regime'].to_numpy())) + 1
+    assert (np.diff(changes) >= market.min_duration).all()
+    assert set(bars['regime'].unique()) == {0, 1, 2}
+
+    # 변동성: 하락 > 상승 > 횡보
+    returns = np.log(bars['price']).diff()
+    vol = returns.groupby(bars['regime']).std()
+    assert vol[2] > vol[1] > vol[0]
+
+
+def test_market_data_is_cached_per_code_and_period():
+    market = SyntheticMarket(cache_size=2)
+    first = market.market_data('005930', '2024-01-01', '2024-02-01')
+    assert market.market_data('005930', '2024-01-01', '2024-02-01') is first
+    assert not market.market_data('000660', '2024-01-01', '2024-02-01').equals(first)
+
+    market.market_data('035420', '2024-01-01', '2024-02-01') # 가장 오래된 항목 제거
+    again = market.market_data('005930', '2024-01-01', '2024-02-01')
+    assert again is not first and again.equals(first)
+
+
+def test_ohlcv_bars_are_consistent():
+    bars = SyntheticMarket().ohlcv(500, seed=0)
+    assert len(bars) == 500
+    assert (bars['high'] >= bars[['open', 'close']].max(axis=1)).all()
+    assert (bars['low'] <= bars[['open', 'close']].min(axis=1)).all()
@@ -5,14 +5,16 @@ from logger import logger
 from database import get_db, TradeLog
 from kiwoom_api import KiwoomAPI
 from notifier import Notifier
-from ai.sentiment import SentimentAnalyzer
+from ai.sentiment import get_sentiment_service
+from watchlist_manager import WatchlistManager
 
 class TradingManager:
     def __init__(self):
         self.api = KiwoomAPI()
         self.notifier = Notifier()
         self.db = get_db()
-        self.sentiment = SentimentAnalyzer()
+        self.sentiment = get_sentiment_service()
+        self.watchlist = set() # 감성 점수를 미리 갱신할 종목 (보유 종목은 자동 포함)
         self.is_running = False
         self.is_virtual = Config.IS_VIRTUAL
         
@@ -31,6 +33,10 @@ class TradingManager:
         logger.info("Trading Manager Started")
         self.notifier.send("Trading System Started")
         
+        # 관심종목/보유종목 감성 점수 백그라운드 갱신 (매수 시 캐시만 읽음)
+        self.watchlist.update(s['code'] for s in WatchlistManager().watchlist)
+        self.sentiment.start_prefetch(self.sentiment_symbols)
+        
         # Load initial account info
         acc = await self.api.get_account_balance()
         if Config.IS_VIRTUAL:
@@ -42,16 +48,25 @@ class TradingManager:
 
     async def stop(self):
         self.is_running = False
+        await self.sentiment.stop_prefetch()
         await self.api.close()
         logger.info("Trading Manager Stopped")
         self.notifier.send("Trading System Stopped")
 
+    def sentiment_symbols(self):
+        """백그라운드 감성 갱신 대상 (관심종목 + 보유종목)"""
+        return list(self.watchlist | set(self.portfolio))
+
+    def watch(self, codes):
+        """감성 점수를 미리 갱신할 종목 추가"""
+        self.watchlist.update(codes)
+
     async def analyze_market_sentiment(self, code):
         """
         Analyzes sentiment for a stock and returns a score.
         """
         try:
-            score = await self.sentiment.get_sentiment_score(code)
+            score = await self.sentiment.get_score(code)
             logger.info(f"Sentiment Score for {code}: {score}")
             return score
         except Exception as e:
@@ -61,8 +76,11 @@ class TradingManager:
     async def buy(self, code, qty, price, reason="Strategy"):
         if not self.is_running: return
 
-        # 0. Sentiment Check (Optional Filter)
-        sentiment_score = await self.analyze_market_sentiment(code)
+        # 0. Sentiment Check (Optional Filter) - 캐시만 읽음 (없으면 중립, 다음 갱신 대상에 추가)
+        sentiment_score = self.sentiment.cached_score(code)
+        if sentiment_score is None:
+            self.watchlist.add(code)
+            sentiment_score = 0.0
         if sentiment_score < -0.5:
             logger.warning(f"Skipping BUY {code} due to negative sentiment: {sentiment_score}")
             return
@@ -0,0 +1,123 @@
+import time
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.getcwd())
+from strategy.ai_engine import AIEngine
+from strategy.model_export import export_sklearn, export_torch
+
+import torch
+
+FEATURES = [f"f{i}" for i in range(8)]
+
+class WindowMLP(torch.nn.Module):
+    def __init__(self, window, features):
+        super().__init__()
+        self.net = torch.nn.Sequential(torch.nn.Flatten(), torch.nn.Linear(window * features, 32),
+                                       torch.nn.ReLU(), torch.nn.Linear(32, 1))
+
+    def forward(self, x):
+        return self.net(x)
+
+class WindowLSTM(torch.nn.Module):
+    def __init__(self, features, hidden=32):
+        super().__init__()
+        self.lstm = torch.nn.LSTM(features, hidden, batch_first=True)
+        self.head = torch.nn.Linear(hidden, 1)
+
+    def forward(self, x):
+        out, _ = self.lstm(x)
+        return self.head(out[:, -1])
+
+def make_history(rows=200_000):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(rng.normal(size=(rows, len(FEATURES))).astype(np.float32), columns=FEATURES)
+
+def benchmark_predict_batch(window=20):
+    df = make_history()
+    torch.manual_seed(0)
+    for name, model in (("mlp", WindowMLP(window, len(FEATURES))), ("lstm", WindowLSTM(len(FEATURES)))):
+        engine = AIEngine()
+        engine.models[name] = model.eval()
+        engine.feature_configs[name] = FEATURES
+        engine.windows[name] = window
+        rows = len(df) if name == "mlp" else 20_000
+
+        start = time.perf_counter()
+        scores = engine.predict_batch(df.iloc[:rows], name)
+        elapsed = time.perf_counter() - start
+        windows = rows - window + 1
+
+        # Reference: one predict() per window
+        sample = 200
+        start = time.perf_counter()
+        for end in range(window, window + sample):
+            engine.predict(df.iloc[end - window:end], name)
+        per_call = (time.perf_counter() - start) / sample
+        print(f"predict_batch {name} (window {window}): {windows:,} windows in {elapsed * 1000:.0f} ms "
+              f"({windows / elapsed / 1000:,.1f} windows/ms) | predict() loop: {1 / per_call / 1000:,.2f} windows/ms")
+        assert not np.isnan(scores[window - 1:]).any()
+
+def time_call(fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+def report(label, original, exported, ms_original, ms_exported):
+    agree = ((original > 0.5) == (exported > 0.5)).mean() * 100
+    print(f"  {label}: {ms_original:.3f} ms -> {ms_exported:.3f} ms ({ms_original / ms_exported:.1f}x) | "
+          f"max |score delta| {np.max(np.abs(original - exported)):.4f}, decisions agree {agree:.2f}%")
+
+def benchmark_export(window=20):
+    """Original vs exported artifact (latency per call, score deltas on held-out data)."""
+    import tempfile
+    from sklearn.ensemble import RandomForestClassifier
+
+    df = make_history(20_000)
+    rng = np.random.default_rng(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        print("LSTM (hidden 128) eager float32 vs frozen TorchScript (float32 / int8 dynamic-quantized):")
+        torch.manual_seed(0)
+        engine = AIEngine()
+        engine.models["eager"] = WindowLSTM(len(FEATURES), hidden=128).eval()
+        engine.feature_configs["eager"] = FEATURES
+        engine.windows["eager"] = window
+        example = df.values[:window * 4].reshape(4, window, -1)
+        for name, quantize in (("frozen", False), ("int8", True)):
+            path = os.path.join(tmp, f"{name}.pt")
+            export_torch(engine.models["eager"], path, example, feature_config=FEATURES, window=window, quantize=quantize)
+            engine.load_model(name, path)
+            print(f"  {name} artifact: {os.path.getsize(path) / 1024:.0f} KiB")
+        for name in ("frozen", "int8"):
+            for label, rows in (("single window", window), ("batch 1024", 1024 + window - 1)):
+                part = df.iloc[:rows]
+                original = engine.predict_batch(part, "eager")[window - 1:]
+                exported = engine.predict_batch(part, name)[window - 1:]
+                repeat = 200 if rows == window else 10
+                report(f"{name}, {label}", original, exported, time_call(lambda: engine.predict_batch(part, "eager"), repeat),
+                       time_call(lambda: engine.predict_batch(part, name), repeat))
+
+        print("RandomForest (100 trees, depth 10) sklearn vs compiled node array:")
+        X = df.values[:10_000]
+        y = (X[:, 0] + X[:, 1] * X[:, 2] + rng.normal(scale=0.5, size=len(X)) > 0).astype(int)
+        model = RandomForestClassifier(n_estimators=100, max_depth=10, random_state=0).fit(X[:8000], y[:8000])
+        path = os.path.join(tmp, "rf.npy")
+        export_sklearn(model, path, feature_config=FEATURES)
+        engine.load_model("trees", path)
+        compiled = engine.models["trees"]
+        for label, batch in (("single row", X[8000:8001]), ("batch 2000", X[8000:])):
+            original = model.predict_proba(batch)[:, 1]
+            exported = compiled.predict_proba(batch)[:, 1]
+            repeat = 200 if len(batch) == 1 else 10
+            report(label, original, exported, time_call(lambda: model.predict_proba(batch), repeat),
+                   time_call(lambda: compiled.predict_proba(batch), repeat))
+
+if __name__ == "__main__":
+    import logging
+    logging.disable(logging.CRITICAL)
+    benchmark_predict_batch()
+    benchmark_export()
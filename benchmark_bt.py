@@ -5,19 +5,20 @@ import sys
 import os
 
 sys.path.append(os.getcwd())
+sys.path.append(os.path.join(os.getcwd(), "KiwoomTrader"))
+from ai.synthetic_market import SyntheticMarket
 from strategy.backtester import EventDrivenBacktester
-from strategy.strategies import VolatilityBreakoutStrategy
+from strategy.strategies import VolatilityBreakoutStrategy, MovingAverageCrossoverStrategy
+from execution.execution_simulator import L2Book
+
+MARKET = SyntheticMarket()
+
+def make_data(seed=0):
+    # Simulate 4 years of daily data (approx 1000 days), regime-switching GBM
+    return MARKET.ohlcv(1000, start="2020-01-01", seed=seed)
 
 def benchmark():
-    # Simulate 4 years of daily data (approx 1000 days)
-    dates = pd.date_range(start="2020-01-01", periods=1000, freq="D")
-    df = pd.DataFrame({
-        "open": np.random.rand(1000) * 100 + 10000,
-        "high": np.random.rand(1000) * 100 + 10100,
-        "low": np.random.rand(1000) * 100 + 9900,
-        "close": np.random.rand(1000) * 100 + 10000,
-        "volume": np.random.randint(1000, 100000, 1000)
-    }, index=dates)
+    df = make_data()
     
     strategy = VolatilityBreakoutStrategy("Bench", "005930")
     strategy.initialize({})
@@ -41,5 +42,109 @@ def benchmark():
     parallel = total_serial / 8 / 0.7
     print(f"Estimated parallel time (8 cores): {parallel:.2f} seconds")
 
+def benchmark_param_sweep():
+    # 400-point (short_window x long_window) sweep: batched pass vs single runs
+    df = make_data()
+    param_sets = [
+        {"short_window": s, "long_window": l}
+        for s in range(3, 23) for l in range(20, 120, 5)
+    ]
+    
+    backtester = EventDrivenBacktester()
+    backtester.configure({})
+    
+    strategy = MovingAverageCrossoverStrategy("Bench", "005930")
+    start_time = time.time()
+    backtester.run_batch(strategy, df, param_sets)
+    batch_duration = time.time() - start_time
+    
+    start_time = time.time()
+    for params in param_sets[:10]:
+        single = MovingAverageCrossoverStrategy("Bench", "005930")
+        single.initialize(params)
+        backtester.run(single, df)
+    single_duration = (time.time() - start_time) / 10
+    
+    print(f"Batched sweep ({len(param_sets)} params): {batch_duration:.4f} seconds")
+    print(f"Single run: {single_duration:.4f} seconds")
+    print(f"Sweep cost = {batch_duration / single_duration:.1f} single runs (serial: {len(param_sets)})")
+
+def benchmark_ticks():
+    # 20M ticks (about 5 trading days of a very active stock) with TP/SL/time exits
+    n = 20_000_000
+    timestamps = np.datetime64("2024-01-02T09:00") + np.cumsum(np.random.randint(1, 20, n)).astype("timedelta64[ms]")
+    ticks = pd.DataFrame({
+        "price": 10000 * np.exp(np.cumsum(np.random.normal(0, 0.0002, n))),
+        "volume": np.random.randint(1, 100, n).astype(float)
+    }, index=timestamps)
+    
+    strategy = MovingAverageCrossoverStrategy("Bench", "005930")
+    strategy.initialize({"short_window": 5, "long_window": 20})
+    
+    backtester = EventDrivenBacktester()
+    backtester.configure({"use_tick_data": True, "take_profit": 0.5, "stop_loss": 0.3, "time_exit": 10})
+    
+    start_time = time.time()
+    result = backtester.run(strategy, ticks)
+    duration = time.time() - start_time
+    
+    print(f"Tick backtest ({n:,} ticks, {len(result.trades)} trades): {duration:.4f} seconds")
+    print(f"Throughput: {n / duration / 1e6:.1f}M ticks/s")
+
+def benchmark_l2():
+    # 5M 10-level 호가 snapshots (about 5 trading days at ~10 per second) against 1m bar signals
+    n, depth = 5_000_000, 10
+    timestamps = np.datetime64("2024-01-02T09:00") + np.cumsum(np.random.randint(50, 150, n)).astype("timedelta64[ms]")
+    mid = np.round(10000 * np.exp(np.cumsum(np.random.normal(0, 0.0001, n))), -1)
+    steps = 10.0 * np.arange(1, depth + 1)
+    sizes = np.random.randint(1, 500, (n, depth))
+    book = L2Book(timestamps.astype("datetime64[ns]").view(np.int64), mid[:, None] + steps, sizes, mid[:, None] - steps, sizes[:, ::-1])
+    
+    minutes = pd.Series(mid, index=pd.DatetimeIndex(timestamps)).resample("1min").ohlc().dropna()
+    bars = minutes.assign(volume=1000.0)
+    
+    strategy = MovingAverageCrossoverStrategy("Bench", "005930")
+    strategy.initialize({"short_window": 5, "long_window": 20})
+    backtester = EventDrivenBacktester()
+    backtester.configure({"l2_latency": 0.05})
+    
+    start_time = time.time()
+    result = backtester.run_l2(strategy, bars, book)
+    duration = time.time() - start_time
+    
+    print(f"L2 backtest ({n:,} snapshots, {len(result.trades)} trades): {duration:.4f} seconds")
+    print(f"Throughput: {n / duration / 1e6:.1f}M snapshots/s")
+
+def benchmark_synthetic():
+    # 1 year of session minutes: vectorized generator vs the old per-minute np.random loop
+    start_time = time.time()
+    bars = MARKET.minute_bars("2024-01-01", "2024-12-31", seed=0)
+    duration = time.time() - start_time
+    
+    n = 20_000
+    start_time = time.time()
+    price, regime, regime_duration = 10000, 0, 0
+    for _ in range(n):
+        if regime_duration <= 0:
+            regime = np.random.choice([0, 1, 2], p=[0.4, 0.4, 0.2])
+            regime_duration = np.random.randint(60, 300)
+        regime_duration -= 1
+        mu, sigma = [(0.0, 0.0005), (0.0002, 0.001), (-0.0002, 0.0015)][regime]
+        price = price * np.exp(mu - 0.5 * sigma**2 + sigma * np.random.normal(0, 1))
+    loop_per_bar = (time.time() - start_time) / n
+    
+    start_time = time.time()
+    MARKET.market_data("005930", "2024-01-01", "2024-12-31")
+    MARKET.market_data("005930", "2024-01-01", "2024-12-31")
+    cached = time.time() - start_time
+    
+    print(f"Synthetic minute bars ({len(bars):,} bars): {duration:.4f} seconds ({len(bars) / duration / 1e6:.1f}M bars/s)")
+    print(f"Per-minute loop estimate: {loop_per_bar * len(bars):.2f} seconds ({loop_per_bar * len(bars) / duration:.0f}x)")
+    print(f"Generate + cached reuse: {cached:.4f} seconds")
+
 if __name__ == "__main__":
+    benchmark_synthetic()
     benchmark()
+    benchmark_param_sweep()
+    benchmark_ticks()
+    benchmark_l2()
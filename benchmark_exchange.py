@@ -0,0 +1,43 @@
+import asyncio
+import time
+import random
+import sys
+import os
+
+sys.path.append(os.getcwd())
+from core.database import db
+from execution.paper_exchange import PaperExchange
+
+async def make_exchange(open_orders):
+    # Resting buy limits spread 1~5% below the market, plus one crossing order per quote
+    exchange = PaperExchange(initial_capital=1e15)
+    for _ in range(open_orders):
+        price = int(10000 * (1 - random.uniform(0.01, 0.05)))
+        await exchange.send_order("005930", 1, 10, price, "00")
+    return exchange
+
+async def benchmark_match(quotes=5000):
+    # Per-quote cost vs total resting orders (each quote fills one new order)
+    db.db_path = ":memory:" # state saves stay off the real database
+    await db.connect()
+    print(f"{'open orders':>12} | {'us/quote':>9}")
+    for open_orders in (100, 1000, 10000, 100000):
+        exchange = await make_exchange(open_orders)
+        quote = {"symbol": "005930", "current_price": 10000, "ask1": 10000, "ask_size1": 10, "bid1": 9990, "bid_size1": 10}
+
+        elapsed = 0.0
+        for _ in range(quotes):
+            await exchange.send_order("005930", 1, 10, 10000, "00")
+            start_time = time.perf_counter()
+            exchange.match_orders(quote)
+            elapsed += time.perf_counter() - start_time
+            # Let the fire-and-forget state save run (not timed)
+            await asyncio.sleep(0)
+
+        print(f"{open_orders:>12,} | {elapsed / quotes * 1e6:>9.2f}")
+    await db.close()
+
+if __name__ == "__main__":
+    import logging
+    logging.disable(logging.CRITICAL)
+    asyncio.run(benchmark_match())
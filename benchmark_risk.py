@@ -0,0 +1,50 @@
+import time
+import random
+import sys
+import os
+import numpy as np
+from datetime import datetime
+
+sys.path.append(os.getcwd())
+from execution.risk_manager import RiskManager
+from strategy.base_strategy import Signal
+
+def make_risk_manager(symbols):
+    rm = RiskManager()
+    rm.configure({"max_order_count_per_min": 1_000_000, "max_symbol_order_count_per_min": 1000,
+                  "max_symbol_exposure": 0.1, "max_market_exposure": 0.5, "max_strategy_exposure": 0.5})
+    rm.markets = {symbol: ("KOSPI" if i % 2 else "KOSDAQ") for i, symbol in enumerate(symbols)}
+    for symbol in symbols[:200]:
+        rm.on_fill(symbol, "BUY", 10, 10000, "Bench")
+    return rm
+
+def benchmark_check(checks=200_000):
+    # Per-check latency with 2,000 symbols, 200 held and a busy order window
+    symbols = [f"{i:06d}" for i in range(2000)]
+    rm = make_risk_manager(symbols)
+    account_info = {"daily_pnl": 0, "total_asset": 1e10, "deposit": 9e9}
+    signals = [Signal(random.choice(symbols), random.choice(("BUY", "SELL")), 10000, datetime.now(), "Bench") for _ in range(1000)]
+    
+    latencies = np.empty(checks)
+    for k in range(checks):
+        signal = signals[k % len(signals)]
+        start = time.perf_counter_ns()
+        rm.check_risk(signal, account_info, 10)
+        latencies[k] = time.perf_counter_ns() - start
+        if k % 10 == 0:
+            rm.record_order(signal.symbol)
+            rm.on_quote(signal.symbol, 10000 + k % 7)
+    
+    p50, p99, p999 = np.percentile(latencies, [50, 99, 99.9]) / 1000
+    print(f"check_risk ({checks:,} checks): p50 {p50:.2f} us | p99 {p99:.2f} us | p99.9 {p999:.2f} us")
+    
+    basket = [(signals[k], 10) for k in range(100)]
+    start = time.perf_counter()
+    for _ in range(1000):
+        rm.check_basket(basket, account_info)
+    print(f"check_basket (100 orders): {(time.perf_counter() - start) / 1000 * 1e6:.1f} us per basket")
+
+if __name__ == "__main__":
+    import logging
+    logging.disable(logging.CRITICAL)
+    benchmark_check()
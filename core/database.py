@@ -105,6 +105,20 @@ class Database:
                 )
             """)
 
+            # Paper Trading Fill Journal (append-only, replayed after the last paper_account snapshot)
+            await self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS paper_fills (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    order_id TEXT,
+                    symbol TEXT,
+                    side TEXT,
+                    qty INTEGER,
+                    price REAL,
+                    fee REAL,
+                    timestamp DATETIME
+                )
+            """)
+
             # Schema Version Table
             await self.conn.execute("""
                 CREATE TABLE IF NOT EXISTS schema_version (
@@ -132,7 +146,7 @@ class Database:
                 row = await cursor.fetchone()
                 current_version = row['version'] if row else 0
             
-            target_version = 1
+            target_version = 2
             
             if current_version < target_version:
                 self.logger.info(f"Migrating Database from v{current_version} to v{target_version}")
@@ -141,6 +155,14 @@ class Database:
                     # Initial Version (Already created tables above, just mark it)
                     await self.conn.execute("INSERT INTO schema_version (version) VALUES (1)")
                 
+                if current_version < 2:
+                    # v2: paper_account snapshot records the last journal entry it includes
+                    async with self.conn.execute("PRAGMA table_info(paper_account)") as cursor:
+                        columns = [row['name'] for row in await cursor.fetchall()]
+                    if 'journal_seq' not in columns:
+                        await self.conn.execute("ALTER TABLE paper_account ADD COLUMN journal_seq INTEGER DEFAULT 0")
+                    await self.conn.execute("INSERT INTO schema_version (version) VALUES (2)")
+                
                 await self.conn.commit()
                 self.logger.info(f"Database Migration to v{target_version} Completed")
                 
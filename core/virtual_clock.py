@@ -0,0 +1,146 @@
+import sys
+import time as _time
+import types
+import asyncio
+from datetime import datetime as _datetime
+from typing import Any, List, Tuple
+from core.logger import get_logger
+
+class VirtualClock:
+    """
+    Simulated time source for replaying the live code path against history.
+
+    install(loop) makes the following follow virtual time:
+    - loop.time(): asyncio.sleep / wait_for / call_later (Scheduler, AccountManager sync, monitors)
+    - datetime.now(): modules of the project packages that did `from datetime import datetime`
+    - time.time() / time.monotonic(): modules that did `import time` (RateLimiter)
+
+    When the loop has nothing ready, it jumps straight to the next timer instead of waiting,
+    so idle periods cost nothing. Time never jumps while tracked real I/O (track_io) is in
+    flight, so e.g. a DB write finishes at the virtual instant it started.
+    """
+    PATCH_PACKAGES = ("core", "data", "execution", "strategy")
+
+    def __init__(self, start: _datetime):
+        self.logger = get_logger("VirtualClock")
+        # Epoch at start + elapsed seconds: loop.time() stays small enough that the loop's
+        # clock resolution (1ns) is above float precision and due timers always fire
+        self._origin = start.timestamp()
+        self._elapsed = 0.0
+        self._io_in_flight = 0
+        self._patches: List[Tuple[Any, str, Any]] = []
+        self._loop = None
+
+    # --- Time Source ---
+    def time(self) -> float:
+        return self._origin + self._elapsed
+
+    def monotonic(self) -> float:
+        return self._elapsed
+
+    def now(self, tz=None) -> _datetime:
+        return _datetime.fromtimestamp(self.time(), tz)
+
+    def advance(self, seconds: float):
+        if seconds > 0:
+            self._elapsed += seconds
+
+    def set(self, when: _datetime):
+        """Move forward to `when` (never backwards)."""
+        self._elapsed = max(self._elapsed, when.timestamp() - self._origin)
+
+    # --- Installation ---
+    def install(self, loop: asyncio.AbstractEventLoop):
+        """
+        Drive `loop` and the project's time sources from this clock (until uninstall()).
+        """
+        self._loop = loop
+        self._patch(loop, "time", self.monotonic)
+
+        selector = loop._selector
+        real_select = selector.select
+
+        def select(timeout=None):
+            if timeout is None or timeout <= 0 or self._io_in_flight:
+                return real_select(timeout)
+            # Deliver anything already pending (thread callbacks) before skipping ahead
+            events = real_select(0)
+            if events:
+                return events
+            self.advance(timeout)
+            return events
+
+        self._patch(selector, "select", select)
+
+        virtual_datetime = self._make_datetime()
+        virtual_time = types.SimpleNamespace(**{
+            name: getattr(_time, name) for name in dir(_time) if not name.startswith("__")
+        })
+        virtual_time.time = self.time
+        virtual_time.monotonic = self.monotonic
+
+        for name, module in list(sys.modules.items()):
+            if module is None or name.split(".")[0] not in self.PATCH_PACKAGES:
+                continue
+            if getattr(module, "datetime", None) is _datetime:
+                self._patch(module, "datetime", virtual_datetime)
+            if getattr(module, "time", None) is _time:
+                self._patch(module, "time", virtual_time)
+
+        self.logger.info(f"Virtual clock installed at {self.now()}")
+
+    def track_io(self, obj: Any, *method_names: str):
+        """
+        Wrap async methods doing real I/O (e.g. Database.execute) so time holds while they run.
+        """
+        for name in method_names:
+            method = getattr(obj, name)
+
+            async def wrapper(*args, _method=method, **kwargs):
+                self._io_in_flight += 1
+                try:
+                    return await _method(*args, **kwargs)
+                finally:
+                    self._io_in_flight -= 1
+
+            self._patch(obj, name, wrapper)
+
+    def uninstall(self):
+        """Restore every patched attribute."""
+        for target, name, original in reversed(self._patches):
+            if original is None:
+                try:
+                    delattr(target, name)
+                except AttributeError:
+                    pass
+            else:
+                setattr(target, name, original)
+        self._patches.clear()
+        self._loop = None
+
+    def _patch(self, target: Any, name: str, value: Any):
+        if isinstance(target, types.ModuleType):
+            original = getattr(target, name)
+        else:
+            # Instance attribute shadowing a class method: removed again on restore (None)
+            original = vars(target).get(name)
+        self._patches.append((target, name, original))
+        setattr(target, name, value)
+
+    def _make_datetime(self):
+        clock = self
+
+        class _Meta(type):
+            def __instancecheck__(cls, obj):
+                return isinstance(obj, _datetime)
+
+        class VirtualDatetime(_datetime, metaclass=_Meta):
+            @classmethod
+            def now(cls, tz=None):
+                return clock.now(tz)
+
+            @classmethod
+            def today(cls):
+                return clock.now()
+
+        return VirtualDatetime
@@ -29,6 +29,7 @@ class DataCollector:
         
         # Last update time for Gap Filling
         self.last_update_time = {} 
+        self.gap_fill_enabled = True # Disabled for historical replay
         
         # UI Observers
         self.observers = []
@@ -188,7 +189,7 @@ class DataCollector:
             
             # Gap Filling Check
             last_time = self.last_update_time.get(symbol)
-            if last_time:
+            if last_time and self.gap_fill_enabled:
                 time_diff = (timestamp - last_time).total_seconds()
                 if time_diff > 60: 
                     self.logger.warning(f"Gap detected for {symbol} ({time_diff}s). Triggering Gap Filling...")
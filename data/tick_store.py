@@ -0,0 +1,85 @@
+import sqlite3
+import numpy as np
+from datetime import datetime
+from typing import Iterator, Optional, Tuple
+from core.config import config
+from core.logger import get_logger
+
+TickChunk = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+class TickStore:
+    """
+    Chunked reader for ticks saved by DataCollector (market_data, interval='tick').
+    Yields (timestamps[int64 ns], prices[float64], volumes[float64]) arrays of at most
+    chunk_size ticks, so memory stays bounded regardless of history length.
+
+    Uses a synchronous sqlite3 connection: intended for offline backtests,
+    not for the live event loop (which uses core.database).
+    """
+    def __init__(self, symbol: str, start: Optional[datetime] = None, end: Optional[datetime] = None, db_path: Optional[str] = None):
+        self.logger = get_logger("TickStore")
+        self.symbol = symbol
+        self.start = start
+        self.end = end
+        self.db_path = db_path or config.get("DB_PATH", "trade.db")
+
+    def iter_chunks(self, chunk_size: int = 1_000_000) -> Iterator[TickChunk]:
+        query = "SELECT timestamp, close, volume FROM market_data WHERE symbol = ? AND interval = 'tick'"
+        params = [self.symbol]
+        if self.start is not None:
+            query += " AND timestamp >= ?"
+            params.append(self.start)
+        if self.end is not None:
+            query += " AND timestamp <= ?"
+            params.append(self.end)
+        query += " ORDER BY timestamp"
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            cursor = conn.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                timestamps, prices, volumes = zip(*rows)
+                yield (
+                    np.asarray(timestamps, dtype="datetime64[ns]").view(np.int64),
+                    np.asarray(prices, dtype=float),
+                    np.asarray(volumes, dtype=float)
+                )
+        finally:
+            conn.close()
+
+    def append(self, timestamps, prices, volumes):
+        """
+        Bulk insert ticks (e.g. imported history) in the same layout as DataCollector.save_to_db.
+        """
+        # Same text format as sqlite3's datetime adapter ('YYYY-MM-DD HH:MM:SS.ffffff') so ordering stays consistent
+        stamps = np.char.replace(np.datetime_as_string(np.asarray(timestamps, dtype="datetime64[us]"), unit="us"), "T", " ")
+        rows = [
+            (ts, self.symbol, 'tick', float(p), float(p), float(p), float(p), float(v))
+            for ts, p, v in zip(stamps.tolist(), prices, volumes)
+        ]
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS market_data (
+                    timestamp DATETIME,
+                    symbol TEXT,
+                    interval TEXT,
+                    open INTEGER,
+                    high INTEGER,
+                    low INTEGER,
+                    close INTEGER,
+                    volume INTEGER,
+                    PRIMARY KEY (timestamp, symbol, interval)
+                )
+            """)
+            conn.executemany("""
+                INSERT OR REPLACE INTO market_data (timestamp, symbol, interval, open, high, low, close, volume)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            conn.commit()
+        finally:
+            conn.close()
+        self.logger.info(f"Stored {len(rows)} ticks for {self.symbol}")
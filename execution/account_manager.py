@@ -1,13 +1,19 @@
 import asyncio
+import time
 from typing import Dict, Any, Optional
 from datetime import datetime
 from core.logger import get_logger
 from core.config import config
+from execution.execution_simulator import FEE_RATE_BUY, FEE_RATE_SELL
 
 class AccountManager:
     """
     Manages account balance, positions, and PnL.
-    Syncs with Exchange (Real/Paper) periodically.
+
+    The balance is an in-memory ledger: fills ("order.filled") move cash and positions,
+    quotes (on_quote) re-mark held symbols, each in O(1), so equity, exposure and daily
+    P&L are live. The exchange is polled every reconcile_interval seconds to reconcile:
+    its numbers replace the ledger and the difference is reported as drift.
     """
     def __init__(self, exchange):
         self.logger = get_logger("AccountManager")
@@ -21,26 +27,44 @@ class AccountManager:
             "total_pnl": 0.0,
             "total_purchase": 0.0,
             "total_eval": 0.0,
-            "total_return": 0.0
+            "total_return": 0.0,
+            "exposure": 0.0 # total_eval / total_asset
         }
         self.positions: Dict[str, Dict[str, Any]] = {} # symbol -> position_info
+        self.last_drift: Dict[str, Any] = {}
         
         # Config
-        self.sync_interval = 60 # 1 minute
+        self.reconcile_interval = 600 # REST reconciliation (10 minutes)
         self.min_cash_ratio = 0.1 # Block buy if cash < 10% of total asset
+        self.fee_rate_buy = FEE_RATE_BUY
+        self.fee_rate_sell = FEE_RATE_SELL
+        self.drift_tolerance = 1.0 # KRW; larger cash/equity differences are logged
+        self.publish_interval = 1.0 # Throttle account.summary from quotes (seconds)
         
+        self._synced = False
+        self._day = None
+        self._day_start_equity = 0.0
+        self._last_publish = 0.0
         self._running = False
         self._task = None
+        self._fill_sub = None
 
     async def start(self):
-        """Start background sync task."""
+        """Start fill tracking and the background reconciliation task."""
+        from core.event_bus import event_bus
         self._running = True
+        if self._fill_sub is None:
+            self._fill_sub = event_bus.subscribe("order.filled", self._on_order_filled)
         self._task = asyncio.create_task(self._sync_loop())
         self.logger.info("AccountManager Started")
 
     async def stop(self):
         """Stop background sync task."""
         self._running = False
+        if self._fill_sub is not None:
+            from core.event_bus import event_bus
+            event_bus.unsubscribe(self._fill_sub)
+            self._fill_sub = None
         if self._task:
             self._task.cancel()
             try:
@@ -50,17 +74,110 @@ class AccountManager:
         self.logger.info("AccountManager Stopped")
 
     async def _sync_loop(self):
-        """Periodic sync loop."""
+        """Periodic reconciliation loop (the ledger is live in between)."""
         while self._running:
+            await asyncio.sleep(self.reconcile_interval)
             try:
                 await self.update_balance()
             except Exception as e:
                 self.logger.error(f"Sync Error: {e}")
-            
-            await asyncio.sleep(self.sync_interval)
 
-    async def update_balance(self):
-        """Fetch latest balance and positions from Exchange."""
+    def on_fill(self, symbol: str, side: str, qty: int, price: float):
+        """
+        Apply an execution to the ledger (cash, position, marks) in O(1).
+        side: "BUY" / "SELL"; fees use fee_rate_buy / fee_rate_sell.
+        """
+        if qty <= 0 or price <= 0:
+            return
+        amount = qty * price
+        pos = self.positions.get(symbol)
+        if side == "BUY":
+            self.balance["deposit"] -= amount * (1 + self.fee_rate_buy)
+            if pos is None:
+                pos = self.positions[symbol] = {"name": symbol, "qty": 0, "avg_price": 0.0, "current_price": price,
+                                                "eval_amt": 0.0, "earning_rate": 0.0}
+            pos["avg_price"] = (pos["qty"] * pos["avg_price"] + amount) / (pos["qty"] + qty)
+            self.balance["total_purchase"] += amount
+        else:
+            self.balance["deposit"] += amount * (1 - self.fee_rate_sell)
+            if pos is None:
+                self.logger.warning(f"Sell fill without ledger position: {symbol} (reconciled later)")
+                self._refresh_totals()
+                return
+            qty = min(qty, pos["qty"])
+            self.balance["total_purchase"] -= qty * pos["avg_price"]
+            qty = -qty
+        
+        old_eval = pos["eval_amt"]
+        pos["qty"] += qty
+        if pos["qty"] <= 0:
+            del self.positions[symbol]
+            self.balance["total_eval"] -= old_eval
+        else:
+            self._mark(pos, price)
+        self._refresh_totals()
+        self._publish()
+
+    def on_quote(self, symbol: str, price: float):
+        """Re-mark a held symbol at the latest price (O(1); ignored for symbols not held)."""
+        pos = self.positions.get(symbol)
+        if pos is None or price <= 0:
+            return
+        self._mark(pos, price)
+        self._refresh_totals()
+        self._publish(throttle=True)
+
+    def _mark(self, pos: Dict[str, Any], price: float):
+        eval_amt = pos["qty"] * price
+        self.balance["total_eval"] += eval_amt - pos["eval_amt"]
+        pos["current_price"] = price
+        pos["eval_amt"] = eval_amt
+        pos["earning_rate"] = (price / pos["avg_price"] - 1) * 100 if pos["avg_price"] else 0.0
+
+    def _refresh_totals(self):
+        """Derived balance fields from cash and the running stock evaluation."""
+        balance = self.balance
+        balance["total_asset"] = balance["deposit"] + balance["total_eval"]
+        balance["total_pnl"] = balance["total_eval"] - balance["total_purchase"]
+        balance["total_return"] = balance["total_pnl"] / balance["total_purchase"] * 100 if balance["total_purchase"] else 0.0
+        balance["exposure"] = balance["total_eval"] / balance["total_asset"] if balance["total_asset"] > 0 else 0.0
+        self._update_daily_pnl()
+
+    def _update_daily_pnl(self):
+        """Daily P&L against the first equity seen today."""
+        today = datetime.now().date()
+        if today != self._day:
+            self._day = today
+            self._day_start_equity = self.balance["total_asset"]
+        self.balance["daily_pnl"] = self.balance["total_asset"] - self._day_start_equity
+
+    def _on_order_filled(self, event):
+        data = event.data
+        price = data.get("exec_price") or data.get("price", 0)
+        try:
+            self.on_fill(data["symbol"], data["type"], int(data["qty"]), float(price))
+        except Exception as e:
+            self.logger.error(f"Failed to apply fill to ledger: {e}")
+
+    def _publish(self, throttle: bool = False):
+        """Publish balance/portfolio for the UI (quote-driven updates at most every publish_interval)."""
+        now = time.monotonic()
+        if throttle and now - self._last_publish < self.publish_interval:
+            return
+        self._last_publish = now
+        try:
+            from core.event_bus import event_bus
+            event_bus.publish("account.summary", {"balance": self.balance})
+            event_bus.publish("account.portfolio", [{**pos, "code": code} for code, pos in self.positions.items()])
+        except Exception as e:
+            self.logger.error(f"Failed to publish account update: {e}")
+
+    async def update_balance(self) -> Dict[str, Any]:
+        """
+        Fetch balance and positions from the Exchange and reconcile the ledger with them.
+        The exchange is the source of truth; returns the drift found
+        ({"deposit", "total_asset", "positions": {symbol: (ledger qty, exchange qty)}}).
+        """
         # This calls KiwoomRestClient.get_account_balance or PaperExchange.get_account_balance
         # Expected format: {"output": {"single": [...], "multi": [...]}}
         
@@ -68,10 +185,14 @@ class AccountManager:
             res = await self.exchange.get_account_balance()
             if not res:
                 self.logger.warning("Failed to fetch balance: No response (or API Error)")
-                return
+                return {}
 
             # Check if response is wrapped in "output" (Mock) or flat (Real)
             data = res.get("output", res)
+            # Mock (PaperExchange) keeps the summary in output.single[0]
+            single = data.get("single")
+            if isinstance(single, list) and single:
+                data = {**data, **single[0]}
             
             # Update Balance
             # Real API Keys:
@@ -79,8 +200,8 @@ class AccountManager:
             # tot_evlt_amt: Total Evaluation Amount (Stocks)
             # tot_evlt_pl: Total Profit/Loss
             
-            total_asset = float(data.get("prsm_dpst_aset_amt", 0))
-            stock_eval = float(data.get("tot_evlt_amt", 0))
+            total_asset = float(data.get("prsm_dpst_aset_amt", data.get("pres_asset_total", 0)))
+            stock_eval = float(data.get("tot_evlt_amt", data.get("total_eval_amt", 0)))
             
             # Estimate Cash = Total Asset - Stock Eval (if specific cash field missing)
             # Or use 'deposit' if available (Mock)
@@ -88,10 +209,13 @@ class AccountManager:
             if cash == 0 and total_asset > 0:
                 cash = total_asset - stock_eval
             
+            previous_balance = dict(self.balance)
+            previous_positions = {code: pos["qty"] for code, pos in self.positions.items()}
+            
             self.balance["deposit"] = cash
             self.balance["total_asset"] = total_asset
             self.balance["total_pnl"] = float(data.get("tot_evlt_pl", data.get("tot_evlt_pl_amt", 0)))
-            self.balance["total_purchase"] = float(data.get("tot_pur_amt", 0))
+            self.balance["total_purchase"] = float(data.get("tot_pur_amt", data.get("total_purchase_amt", 0)))
             self.balance["total_eval"] = stock_eval
             self.balance["total_return"] = float(data.get("tot_prft_rt", data.get("tot_earning_rate", 0)))
             
@@ -116,25 +240,40 @@ class AccountManager:
                 }
             
             self.positions = new_positions
+            self.balance["exposure"] = stock_eval / total_asset if total_asset > 0 else 0.0
             self.logger.debug(f"Balance Updated. Asset: {self.balance['total_asset']:,.0f}, Positions: {len(self.positions)}")
             
-            # Publish Event for UI
-            from core.event_bus import event_bus
-            # 1. Balance Summary
-            event_bus.publish("account.summary", {"balance": self.balance})
-            
-            # 2. Portfolio (List of positions)
-            # Add 'code' to each position dict for UI convenience if not already there
-            portfolio_list = []
-            for code, pos in self.positions.items():
-                pos_data = pos.copy()
-                pos_data["code"] = code
-                portfolio_list.append(pos_data)
+            self._update_daily_pnl()
+            drift = self._drift(previous_balance, previous_positions)
             
-            event_bus.publish("account.portfolio", portfolio_list)
+            # Publish Event for UI
+            self._publish()
+            return drift
             
         except Exception as e:
             self.logger.error(f"Error updating balance: {e}")
+        return {}
+
+    def _drift(self, previous_balance: Dict[str, float], previous_positions: Dict[str, int]) -> Dict[str, Any]:
+        """Difference between the ledger before reconciliation and the exchange."""
+        if not self._synced:
+            self._synced = True # First sync initializes the ledger
+            return {}
+        drift = {
+            "deposit": self.balance["deposit"] - previous_balance["deposit"],
+            "total_asset": self.balance["total_asset"] - previous_balance["total_asset"],
+            "positions": {
+                code: (previous_positions.get(code, 0), self.positions.get(code, {}).get("qty", 0))
+                for code in set(previous_positions) | set(self.positions)
+                if previous_positions.get(code, 0) != self.positions.get(code, {}).get("qty", 0)
+            }
+        }
+        self.last_drift = drift
+        if abs(drift["deposit"]) > self.drift_tolerance or drift["positions"]:
+            self.logger.warning(f"Ledger drift: deposit {drift['deposit']:+,.0f}, equity {drift['total_asset']:+,.0f}, positions {drift['positions']}")
+            from core.event_bus import event_bus
+            event_bus.publish("account.drift", drift)
+        return drift
 
     def get_summary(self) -> Dict[str, Any]:
         """Return account summary."""
@@ -1,7 +1,9 @@
 import asyncio
-from typing import Dict, Any
+import time
+from typing import Dict, Any, Optional, Set
 from execution.risk_manager import RiskManager
 from execution.order_manager import OrderManager
+from execution.order_dispatcher import OrderDispatcher
 from strategy.base_strategy import Signal
 from data.kiwoom_rest_client import KiwoomRestClient
 from core.logger import get_logger
@@ -9,6 +11,7 @@ from core.logger import get_logger
 class ExecutionEngine:
     """
     Orchestrates execution: Signal -> Risk Check -> Order.
+    Signals from ticks go through OrderDispatcher: in order per symbol, concurrently across symbols.
     """
     def __init__(self, kiwoom: KiwoomRestClient, mode: str = "REAL", config: Dict[str, Any] = None):
         self.logger = get_logger("ExecutionEngine")
@@ -20,11 +23,12 @@ class ExecutionEngine:
         # self.risk_manager.configure(self.config.get("risk", {})) # Moved to initialize or after notification init
         
         self.order_manager = OrderManager(kiwoom)
+        self.dispatcher = OrderDispatcher()
         self.account_num = "" # Set externally if needed, or from key manager
         
         if self.mode == "PAPER":
             from execution.paper_exchange import PaperExchange
-            self.exchange = PaperExchange(self.config.get("paper_capital", 100_000_000))
+            self.exchange = PaperExchange(self.config.get("paper_capital", 100_000_000), self.config.get("paper_latency", 0.0))
             # OrderManager needs to use this exchange
             self.order_manager.kiwoom = self.exchange
             self.logger.info("Execution Engine initialized in PAPER TRADING mode")
@@ -47,8 +51,12 @@ class ExecutionEngine:
         # Configure Risk Manager with Notification
         self.risk_manager.configure(self.config.get("risk", {}), self.notification_manager)
 
+        # Fire-and-forget tasks (notifications, state saves), referenced until done
+        self._background_tasks: Set[asyncio.Task] = set()
+
         # Strategies
         self.strategies: Dict[str, Any] = {}
+        self.screener = None # PanelScreener (config["screener"])
 
         # Initialize Strategy State DAO
         from strategy.persistence import StrategyStateDAO
@@ -78,7 +86,15 @@ class ExecutionEngine:
     async def on_realtime_data(self, data: Dict[str, Any]):
         """
         Dispatch real-time data to all registered strategies.
+        Signals are queued on the symbol's sequencer; the tick does not wait for the order.
         """
+        received_at = time.perf_counter()
+        # Live mark-to-market of held symbols (O(1) per tick)
+        if data.get('code') and data.get('price'):
+            price = abs(float(data['price']))
+            self.account_manager.on_quote(data['code'], price)
+            self.risk_manager.on_quote(data['code'], price)
+        
         if not self.is_running:
             return
 
@@ -89,6 +105,9 @@ class ExecutionEngine:
             if strategy.symbol == data.get('code'):
                 signal = await strategy.on_realtime_data(data)
                 if signal:
+                    # Attribute the order (risk exposure, fills, time-in-force) to this strategy
+                    if signal.strategy_id is None:
+                        signal.strategy_id = strategy_id
                     # Execute Signal
                     # Determine quantity (Position Sizing)
                     # For now, fixed quantity or based on config
@@ -96,7 +115,7 @@ class ExecutionEngine:
                     if hasattr(strategy, 'position_sizer') and strategy.position_sizer:
                          quantity = strategy.position_sizer.calculate(signal)
                     
-                    await self.execute_signal(signal, quantity)
+                    self.dispatcher.submit(signal.symbol, self.execute_signal, signal, quantity, received_at)
         
         # Emit Event for UI
         from core.event_bus import event_bus
@@ -115,7 +134,7 @@ class ExecutionEngine:
             summary = self.account_manager.get_summary()
             await self.notification_manager.send_daily_report(summary)
             
-        self.scheduler.register_cron(15, 40, daily_report_job, "DailyReport")
+        self.scheduler.register_cron_expression("40 15 * * 1-5", daily_report_job, "DailyReport") # Weekdays; runs late if missed
         
         # 3. Market Status Monitor (Every 1 minute)
         from data.market_schedule import market_schedule
@@ -155,23 +174,37 @@ class ExecutionEngine:
         """
         self.logger.warning(f"Stopping Trading Engine (Panic: {panic})")
         
-        # 1. Stop Scheduler
+        # 1. Set State first: signals still queued or arriving are ignored from here on
+        self.is_running = False
+        
+        # 2. Stop Scheduler
         if self.scheduler:
             # self.scheduler.stop() # Scheduler doesn't have stop? It should.
             # Assuming we just stop adding new tasks or ignore signals.
             pass
             
-        # 2. Cancel All Orders & Liquidate
+        # 3. Cancel All Orders & Liquidate
         if panic:
-            await self.order_manager.cancel_all_orders()
-            await self.order_manager.close_all_positions()
+            # Drop queued signals and let orders in flight finish, so flatten() sees (and cancels) them
+            dropped = self.dispatcher.cancel_pending()
+            await self.dispatcher.drain()
+            if dropped:
+                self.logger.warning(f"Dropped {dropped} queued signals")
             await self.notification_manager.send_message("🚨 [긴급 정지] 모든 주문 취소 및 전량 청산을 시도합니다.", level="WARNING")
+            report = await self.order_manager.flatten()
+            failed = len(report["cancel"]["failed"]) + len(report["liquidation"]["failed"])
+            await self.notification_manager.send_message(
+                f"🚨 [긴급 정지 완료]\n\n"
+                f"• 취소: {report['cancel']['cancelled']}건\n"
+                f"• 청산: {report['liquidation']['sold']}종목\n"
+                f"• 실패: {failed}건\n"
+                f"• 소요: {report['time_to_flat']:.2f}초",
+                level="WARNING" if failed == 0 else "ERROR"
+            )
         else:
             await self.notification_manager.send_message("🛑 [시스템] 트레이딩을 중단합니다.", level="INFO")
 
-        # 3. Set State
-        # We need a state flag
-        self.is_running = False
+        await self.order_manager.flush()
 
     async def start_trading(self):
         """
@@ -197,15 +230,22 @@ class ExecutionEngine:
             "total_asset": summary["balance"].get("total_asset", 0),
             "daily_pnl": summary["balance"].get("daily_pnl", 0),
             "deposit": summary["balance"].get("deposit", 0),
-            "active_orders_count": active_orders_count
+            "active_orders_count": active_orders_count,
+            "order_latency": self.dispatcher.latency_stats()
         }
 
     async def initialize(self):
         """Async initialization."""
         self.is_running = True
         
+        # Recover Paper Account (snapshot + fill journal)
+        if self.mode == "PAPER":
+            await self.exchange.load_state()
+        
         # Initial Sync
         await self.account_manager.update_balance()
+        await self.risk_manager.load_markets()
+        self.risk_manager.load_positions(self.account_manager.positions)
         # Start Background Sync
         await self.account_manager.start()
         # Start Notification Worker
@@ -217,14 +257,73 @@ class ExecutionEngine:
         await self.order_manager.initialize()
 
         # Start background tasks
-        asyncio.create_task(self.order_manager.monitor_unfilled_orders())
+        self._spawn(self.order_manager.monitor_unfilled_orders())
         
         # Subscribe to Order Events for Strategy State Update
         from core.event_bus import event_bus
         event_bus.subscribe("order.filled", self._on_order_filled)
+        if self.mode == "PAPER":
+            event_bus.subscribe("market.data.orderbook", self._on_orderbook)
         
         # Restore Strategy States
         await self.restore_strategies_state()
+        
+        # Start Universe Screener (optional)
+        await self.start_screener()
+
+    async def start_screener(self):
+        """
+        Start the live PanelScreener if configured:
+        config["screener"] = {"strategy": <StrategyRegistry name>, "params": {...},
+                              "symbols": [...] (default: registered strategies' symbols), "lookback": 200}
+        It evaluates all symbols at each CANDLE_CLOSED and publishes 'screener.signals'.
+        """
+        screener_config = self.config.get("screener")
+        if not screener_config or self.screener is not None:
+            return
+        try:
+            from strategy.registry import StrategyRegistry
+            from strategy.screener import PanelScreener
+            from data.data_collector import data_collector
+            
+            if not StrategyRegistry.get_all_strategies():
+                StrategyRegistry.initialize()
+            strategy_cls = StrategyRegistry.get_strategy_class(screener_config.get("strategy", ""))
+            if strategy_cls is None:
+                self.logger.error(f"Unknown screener strategy: {screener_config.get('strategy')}")
+                return
+            
+            symbols = screener_config.get("symbols") or sorted({s.symbol for s in self.strategies.values()})
+            if not symbols:
+                self.logger.warning("Screener configured without symbols. Skipped.")
+                return
+            
+            strategy = strategy_cls("screener", "UNIVERSE")
+            strategy.initialize(screener_config.get("params", {}))
+            lookback = screener_config.get("lookback", 200)
+            screener = PanelScreener(strategy, symbols, lookback=lookback)
+            
+            # Warm up from stored 1m candles
+            frames = {}
+            for symbol in symbols:
+                df = await data_collector.get_recent_data(symbol, limit=lookback)
+                if not df.empty:
+                    frames[symbol] = df
+            if frames:
+                screener.warm_up(frames)
+            
+            screener.start()
+            self.screener = screener
+        except Exception as e:
+            self.logger.error(f"Failed to start screener: {e}")
+
+    async def _on_orderbook(self, event):
+        """PAPER: match resting orders against a 호가 snapshot and report the fills."""
+        try:
+            for execution in self.exchange.on_orderbook(event.data):
+                await self.order_manager.on_order_event(execution)
+        except Exception as e:
+            self.logger.error(f"Paper matching failed: {e}")
 
     def _on_order_filled(self, event):
         """
@@ -233,6 +332,11 @@ class ExecutionEngine:
         """
         data = event.data
         strategy_id = data.get("strategy_id")
+        try:
+            self.risk_manager.on_fill(data["symbol"], data["type"], int(data["qty"]),
+                                      float(data.get("exec_price") or data["price"]), strategy_id)
+        except Exception as e:
+            self.logger.error(f"Error updating risk exposure: {e}")
         
         if not strategy_id or strategy_id not in self.strategies:
             return
@@ -247,16 +351,34 @@ class ExecutionEngine:
             
             # Persist State
             state = strategy.get_state()
-            asyncio.create_task(self.strategy_dao.save_state(state))
+            self._spawn(self.strategy_dao.save_state(state))
             self.logger.info(f"Updated and saved state for {strategy_id}")
             
         except Exception as e:
             self.logger.error(f"Error updating strategy state: {e}")
 
-    async def execute_signal(self, signal: Signal, quantity: int):
+    def _spawn(self, coro) -> asyncio.Task:
+        """Run coro in the background; the task is kept referenced until it finishes."""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
+    async def _notify(self, msg: str, level: str = "INFO"):
+        """Fire and forget notification."""
+        try:
+            await self.notification_manager.send_message(msg, level=level)
+        except Exception as e:
+            self.logger.error(f"Notification failed: {e}")
+
+    async def execute_signal(self, signal: Signal, quantity: int, received_at: Optional[float] = None):
         """
         Execute a trading signal.
+        received_at: perf_counter() when the triggering tick arrived (default: now),
+        for the tick-to-order-sent latency.
         """
+        if received_at is None:
+            received_at = time.perf_counter()
         if not getattr(self, "is_running", True):
             self.logger.warning("Signal ignored: Trading is stopped.")
             return
@@ -281,19 +403,26 @@ class ExecutionEngine:
                 return
  
         # 2.2. RiskManager Check
-        if not self.risk_manager.check_risk(signal, account_info):
+        if not self.risk_manager.check_risk(signal, account_info, quantity):
             self.logger.warning("Signal rejected by Risk Manager")
             return
+        # Count the order now: signals of other symbols are checked while this one is in flight
+        recorded_at = self.risk_manager.record_order(signal.symbol)
  
         # 3. Send Order
         # Pass strategy_id to OrderManager so it can be returned in events
-        extra_data = {"strategy_id": signal.strategy_id} if hasattr(signal, "strategy_id") else {}
+        extra_data = {"strategy_id": signal.strategy_id}
+        # Per-strategy time-in-force for unfilled orders (e.g. a few seconds for scalping)
+        strategy = self.strategies.get(signal.strategy_id)
+        if strategy is not None and getattr(strategy, "config", None) and "time_in_force" in strategy.config:
+            extra_data["time_in_force"] = strategy.config["time_in_force"]
         
         order_id = await self.order_manager.send_order(signal, quantity, self.account_num, extra_data=extra_data)
         
         if order_id:
-            self.risk_manager.record_order()
-            self.logger.info(f"Signal Executed. Order ID: {order_id}")
+            latency = time.perf_counter() - received_at
+            self.dispatcher.record_latency(latency)
+            self.logger.info(f"Signal Executed. Order ID: {order_id} (tick-to-order {latency * 1000:.1f}ms)")
             
             # Send Notification
             # Premium Spec:
@@ -308,10 +437,13 @@ class ExecutionEngine:
                 f"{signal.symbol} ({signal.symbol})\n\n"
                 f"• 주문: {signal.type} {quantity}주 @ {signal.price:,.0f}원\n"
                 f"• 총액: {total_amt:,.0f}원\n"
-                f"• 전략: {signal.strategy_id if hasattr(signal, 'strategy_id') else 'Unknown'}"
+                f"• 전략: {signal.strategy_id or 'Unknown'}"
             )
-            await self.notification_manager.send_message(msg)
+            # Off the order path: the symbol's next signal does not wait for the messenger
+            self._spawn(self._notify(msg))
         else:
+            # Not sent: give the slot back to the per-minute order limits
+            self.risk_manager.release_order(recorded_at, signal.symbol)
             self.logger.error("Signal Execution Failed")
             await self.notification_manager.send_message(f"⚠️ [오류] 주문 실패: {signal.symbol}", level="ERROR")
 
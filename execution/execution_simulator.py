@@ -0,0 +1,196 @@
+import numpy as np
+import pandas as pd
+from collections import deque
+from typing import Dict, Any, List, Tuple
+from execution.order_book import OrderBook, Fill
+
+Levels = List[Tuple[float, int]] # [(price, size), ...] best level first
+
+# Fee schedule of the fill model (PaperExchange, AccountManager ledger, L2 backtest)
+FEE_RATE_BUY = 0.00015
+FEE_RATE_SELL = 0.00015 + 0.0020 # Includes Tax
+
+class L2Book:
+    """
+    Recorded order-book snapshots (호가) of one symbol as arrays.
+    timestamps: int64 ns (exchange time), ascending.
+    ask_px/ask_sz/bid_px/bid_sz: (snapshots x depth), best level first;
+    missing levels have price NaN and size 0.
+    """
+    def __init__(self, timestamps: np.ndarray, ask_px: np.ndarray, ask_sz: np.ndarray, bid_px: np.ndarray, bid_sz: np.ndarray):
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.ask_px = np.asarray(ask_px, dtype=float)
+        self.ask_sz = np.asarray(ask_sz, dtype=np.int64)
+        self.bid_px = np.asarray(bid_px, dtype=float)
+        self.bid_sz = np.asarray(bid_sz, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def depth(self) -> int:
+        return self.ask_px.shape[1]
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, depth: int = 10) -> "L2Book":
+        """
+        Snapshots in the quote layout used by PaperExchange.match_orders:
+        DatetimeIndex, columns ask1..askN, ask_size1..N, bid1..bidN, bid_size1..N.
+        """
+        def block(prefix: str, fill):
+            columns = [frame[f"{prefix}{i}"].to_numpy(dtype=float) if f"{prefix}{i}" in frame
+                       else np.full(len(frame), fill) for i in range(1, depth + 1)]
+            return np.column_stack(columns)
+
+        timestamps = frame.index.values.astype("datetime64[ns]").view(np.int64)
+        return cls(
+            timestamps,
+            block("ask", np.nan), np.nan_to_num(block("ask_size", 0)),
+            block("bid", np.nan), np.nan_to_num(block("bid_size", 0))
+        )
+
+    def levels(self, i: int, side: str) -> Levels:
+        """Displayed levels of snapshot i ("ask" or "bid") as [(price, size)]."""
+        prices, sizes = (self.ask_px[i], self.ask_sz[i]) if side == "ask" else (self.bid_px[i], self.bid_sz[i])
+        return [(p, s) for p, s in zip(prices.tolist(), sizes.tolist()) if p == p and s > 0]
+
+    def quote(self, i: int, symbol: str) -> Dict[str, Any]:
+        """Snapshot i as a PaperExchange quote (ask1.., ask_size1.., bid1.., bid_size1..)."""
+        quote = {"symbol": symbol}
+        for side in ("ask", "bid"):
+            for level, (price, size) in enumerate(self.levels(i, side), start=1):
+                quote[f"{side}{level}"] = price
+                quote[f"{side}_size{level}"] = size
+        asks, bids = quote.get("ask1"), quote.get("bid1")
+        quote["current_price"] = (asks + bids) / 2 if asks is not None and bids is not None else (asks or bids)
+        return quote
+
+class ExecutionSimulator:
+    """
+    Fills orders against order-book snapshots. Shared by PaperExchange (live quotes)
+    and EventDrivenBacktester.run_l2 (recorded snapshots), so both use the same rules:
+
+    - Latency: an order submitted at t reaches the book at t + latency (exchange time,
+      i.e. the snapshot clock); snapshots before that do not see it.
+    - Crossing orders walk the displayed levels best first (OrderBook.match);
+      the remainder rests (limit) or waits for the next snapshot (market).
+    - Queue position: a resting limit joins behind the size displayed at its price on arrival
+      (and behind our earlier orders there). Decreases of that level are assumed to come
+      from the front of the queue and are consumed in queue order; once the size ahead of
+      an order is used up, further decreases fill it at its limit.
+
+    Per snapshot the cost is the number of displayed levels plus the orders it fills.
+    """
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency # seconds
+        self.orders: Dict[str, Dict[str, Any]] = {} # order_id -> order (in flight or resting)
+        self.books: Dict[str, OrderBook] = {} # symbol -> resting orders
+        self._in_flight: Dict[str, deque] = {} # symbol -> (arrival, order), in arrival order
+        self._queues: Dict[str, Dict[Tuple[str, float], Dict[str, Any]]] = {} # symbol -> (side, price) -> {size, orders}
+
+    def submit(self, order: Dict[str, Any], now: float):
+        """
+        order: {order_id, symbol, side ("BUY"/"SELL"), qty, price, type ("LIMIT"/"MARKET")}
+        now: submission time in seconds (exchange clock).
+        """
+        order.setdefault('filled_qty', 0)
+        self.orders[order['order_id']] = order
+        self._in_flight.setdefault(order['symbol'], deque()).append((now + self.latency, order))
+
+    def cancel(self, order_id: str) -> bool:
+        order = self.orders.pop(order_id, None)
+        if order is None:
+            return False
+        book = self.books.get(order['symbol'])
+        if book and order_id in book.orders:
+            book.remove(order_id)
+            self._leave_queue(order)
+        return True # In-flight orders are skipped on arrival
+
+    def on_book(self, symbol: str, asks: Levels, bids: Levels, now: float) -> List[Fill]:
+        """
+        Apply a snapshot taken at exchange time now.
+        Returns fills (order, qty, price); order['filled_qty'] is updated and fully
+        filled orders leave the simulator.
+        """
+        in_flight = self._in_flight.get(symbol)
+        while in_flight and in_flight[0][0] <= now:
+            _, order = in_flight.popleft()
+            if order['order_id'] in self.orders:
+                self._arrive(order, asks, bids)
+
+        book = self.books.get(symbol)
+        if not book:
+            return []
+        fills = book.match(asks, bids)
+        queues = self._queues.get(symbol)
+        if queues:
+            self._advance_queues(book, queues, "BUY", bids, fills)
+            self._advance_queues(book, queues, "SELL", asks, fills)
+
+        for order, _, _ in fills:
+            if order['filled_qty'] >= order['qty'] and self.orders.pop(order['order_id'], None) is not None:
+                self._leave_queue(order)
+        return fills
+
+    def _arrive(self, order: Dict[str, Any], asks: Levels, bids: Levels):
+        symbol = order['symbol']
+        if symbol not in self.books:
+            self.books[symbol] = OrderBook(symbol)
+        self.books[symbol].add(order)
+        if order['type'] == "MARKET":
+            return
+
+        side, price = order['side'], order['price']
+        same_side = bids if side == "BUY" else asks
+        displayed = next((size for level_price, size in same_side if level_price == price), 0)
+        order['queue_ahead'] = displayed
+        entry = self._queues.setdefault(symbol, {}).setdefault((side, price), {"size": displayed, "orders": []})
+        entry["size"] = displayed
+        entry["orders"].append(order['order_id'])
+
+    def _advance_queues(self, book: OrderBook, queues: Dict, side: str, levels: Levels, fills: List[Fill]):
+        """Move queue estimates on the displayed levels that hold our orders."""
+        for price, size in levels:
+            entry = queues.get((side, price))
+            if entry is None:
+                continue
+            traded = entry["size"] - size
+            entry["size"] = size
+            if traded <= 0:
+                continue # Joined behind us
+            # The traded size runs down the queue in arrival order: the displayed size
+            # ahead of each order, then the order itself, then the next one.
+            consumed = 0 # displayed size used up so far
+            for order_id in list(entry["orders"]):
+                order = book.orders.get(order_id)
+                if order is None:
+                    continue
+                ahead = min(traded, order['queue_ahead'] - consumed)
+                if ahead > 0:
+                    consumed += ahead
+                    traded -= ahead
+                order['queue_ahead'] = max(order['queue_ahead'] - consumed, 0)
+                qty = min(order['qty'] - order['filled_qty'], traded)
+                if qty <= 0:
+                    continue
+                traded -= qty
+                order['filled_qty'] += qty
+                fills.append((order, qty, price))
+                if order['filled_qty'] >= order['qty']:
+                    book.remove(order_id)
+
+    def _leave_queue(self, order: Dict[str, Any]):
+        if order['type'] == "MARKET":
+            return
+        queues = self._queues.get(order['symbol'], {})
+        key = (order['side'], order['price'])
+        entry = queues.get(key)
+        if entry is None:
+            return
+        try:
+            entry["orders"].remove(order['order_id'])
+        except ValueError:
+            pass
+        if not entry["orders"]:
+            del queues[key]
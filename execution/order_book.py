@@ -0,0 +1,123 @@
+import heapq
+import itertools
+from collections import deque
+from typing import Dict, Any, List, Tuple
+
+Fill = Tuple[Dict[str, Any], int, float] # (order, qty, level price)
+
+class OrderBook:
+    """
+    Resting paper orders of one symbol, indexed by limit price.
+
+    Buy limits sit in a max-heap and sell limits in a min-heap (price, then arrival),
+    market orders in FIFO queues ahead of them. A quote only visits orders whose limit
+    crosses the displayed best price, so its cost depends on the orders it fills,
+    not on how many are resting.
+
+    Cancelled orders are dropped from the heaps lazily (when they reach the top,
+    or by compaction once they outnumber live ones).
+    """
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.orders: Dict[str, Dict[str, Any]] = {} # order_id -> order (live only)
+        self._bids: List[Tuple[float, int, str]] = [] # (-limit, seq, order_id)
+        self._asks: List[Tuple[float, int, str]] = [] # (limit, seq, order_id)
+        self._market_buys: deque = deque()
+        self._market_sells: deque = deque()
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self.orders)
+
+    def add(self, order: Dict[str, Any]):
+        order_id = order['order_id']
+        self.orders[order_id] = order
+        if order['type'] == "MARKET":
+            (self._market_buys if order['side'] == "BUY" else self._market_sells).append(order_id)
+        elif order['side'] == "BUY":
+            heapq.heappush(self._bids, (-order['price'], next(self._seq), order_id))
+        else:
+            heapq.heappush(self._asks, (order['price'], next(self._seq), order_id))
+
+    def remove(self, order_id: str):
+        if self.orders.pop(order_id, None) is not None:
+            self._compact()
+
+    def best_bid(self):
+        """Highest resting buy limit (None if empty)."""
+        self._drop_dead(self._bids)
+        return -self._bids[0][0] if self._bids else None
+
+    def best_ask(self):
+        """Lowest resting sell limit (None if empty)."""
+        self._drop_dead(self._asks)
+        return self._asks[0][0] if self._asks else None
+
+    def match(self, asks: List[Tuple[float, int]], bids: List[Tuple[float, int]]) -> List[Fill]:
+        """
+        Match resting orders against displayed liquidity.
+        asks/bids: [(price, size), ...] best level first.
+        Buys consume ask levels and sells bid levels, best order first; an order keeps
+        filling across levels while its limit allows, and stays on the book with the
+        remainder when the displayed size runs out.
+        Fully filled orders leave the book; order['filled_qty'] is updated.
+        """
+        fills: List[Fill] = []
+        self._match_side(self._market_buys, self._bids, -1, asks, lambda limit, price: limit >= price, fills)
+        self._match_side(self._market_sells, self._asks, 1, bids, lambda limit, price: limit <= price, fills)
+        return fills
+
+    def _match_side(self, market: deque, heap: List, sign: int, levels: List[Tuple[float, int]], crosses, fills: List[Fill]):
+        if not levels:
+            return
+        level = 0
+        level_price, level_left = levels[0]
+
+        while True:
+            # Next order by priority: market orders, then best limit
+            while market and market[0] not in self.orders:
+                market.popleft()
+            if market:
+                order = self.orders[market[0]]
+            else:
+                self._drop_dead(heap)
+                if not heap or not crosses(sign * heap[0][0], level_price):
+                    return
+                order = self.orders[heap[0][2]]
+
+            remaining = order['qty'] - order['filled_qty']
+            while remaining > 0:
+                if level_left <= 0:
+                    level += 1
+                    if level >= len(levels):
+                        return
+                    level_price, level_left = levels[level]
+                    if order['type'] != "MARKET" and not crosses(order['price'], level_price):
+                        break
+                    continue
+                qty = min(remaining, level_left)
+                fills.append((order, qty, level_price))
+                order['filled_qty'] += qty
+                level_left -= qty
+                remaining -= qty
+
+            if remaining > 0:
+                # Limit no longer crosses the next level: deeper orders cannot either
+                return
+            del self.orders[order['order_id']]
+            if order['type'] == "MARKET":
+                market.popleft()
+            else:
+                heapq.heappop(heap)
+
+    def _drop_dead(self, heap: List):
+        while heap and heap[0][2] not in self.orders:
+            heapq.heappop(heap)
+
+    def _compact(self):
+        # Rebuild heaps once cancelled entries dominate (keeps memory bounded)
+        live = len(self.orders)
+        for heap in (self._bids, self._asks):
+            if len(heap) > 2 * live + 64:
+                heap[:] = [entry for entry in heap if entry[2] in self.orders]
+                heapq.heapify(heap)
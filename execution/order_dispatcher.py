@@ -0,0 +1,81 @@
+import asyncio
+import numpy as np
+from collections import deque
+from typing import Dict, Any, Callable, Awaitable
+from core.logger import get_logger
+
+class OrderDispatcher:
+    """
+    Runs order jobs through one sequencer per symbol: jobs of the same symbol run one at
+    a time in submission order, jobs of different symbols run concurrently.
+    A sequencer is a deque plus a worker task that exits once the deque is empty,
+    so idle symbols cost nothing.
+
+    Also keeps the recent tick-to-order-sent latencies (record_latency / latency_stats).
+    """
+    def __init__(self, latency_window: int = 1000):
+        self.logger = get_logger("OrderDispatcher")
+        self._queues: Dict[str, deque] = {} # symbol -> (job, args, future)
+        self._workers: Dict[str, asyncio.Task] = {} # symbol -> running sequencer
+        self.latencies: deque = deque(maxlen=latency_window) # seconds, most recent orders
+
+    def submit(self, symbol: str, job: Callable[..., Awaitable[Any]], *args) -> asyncio.Future:
+        """Queue job(*args) behind the symbol's pending jobs. The future gets its result (None on error)."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queues.setdefault(symbol, deque()).append((job, args, future))
+        if symbol not in self._workers:
+            self._workers[symbol] = loop.create_task(self._run(symbol))
+        return future
+
+    async def _run(self, symbol: str):
+        queue = self._queues[symbol]
+        try:
+            while queue:
+                job, args, future = queue.popleft()
+                try:
+                    result = await job(*args)
+                except Exception as e:
+                    self.logger.error(f"Order job for {symbol} failed: {e}")
+                    result = None
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            # No await between the empty check and here: submit() cannot slip in
+            del self._workers[symbol]
+            for _, _, future in queue:
+                future.cancel() # Worker cancelled (shutdown)
+            del self._queues[symbol]
+
+    async def drain(self):
+        """Wait until every queued job has run."""
+        while self._workers:
+            await asyncio.gather(*self._workers.values(), return_exceptions=True)
+
+    def cancel_pending(self) -> int:
+        """Drop queued jobs that have not started (their futures are cancelled); running jobs finish."""
+        dropped = 0
+        for queue in self._queues.values():
+            while queue:
+                _, _, future = queue.popleft()
+                future.cancel()
+                dropped += 1
+        return dropped
+
+    def pending(self, symbol: str) -> int:
+        return len(self._queues.get(symbol, ()))
+
+    def record_latency(self, seconds: float):
+        self.latencies.append(seconds)
+
+    def latency_stats(self) -> Dict[str, float]:
+        """Tick-to-order-sent latency over the recent orders, in milliseconds."""
+        if not self.latencies:
+            return {"count": 0, "p50_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+        samples = np.fromiter(self.latencies, dtype=float) * 1000
+        return {
+            "count": len(samples),
+            "p50_ms": float(np.percentile(samples, 50)),
+            "p99_ms": float(np.percentile(samples, 99)),
+            "max_ms": float(samples.max())
+        }
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import os
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+from core.logger import get_logger
+
+# Order fields kept in the journal (runtime fields such as expires_at are rebuilt on load)
+ORDER_FIELDS = ('symbol', 'type', 'quantity', 'filled_qty', 'price', 'source', 'timestamp', 'strategy_id', 'time_in_force')
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot journal {type(value).__name__}")
+
+class OrderJournal:
+    """
+    Append-only journal of order state changes, one JSON line per record:
+        {"seq": n, "op": "put", "order_id": ..., "order": {...}}  # accepted / partial fill
+        {"seq": n, "op": "del", "order_id": ...}                  # filled / cancelled
+
+    append() only buffers the record. A background writer commits everything buffered
+    since its last write with one write + fsync (group commit), in a worker thread,
+    so callers on the event loop never wait for the disk.
+    replay() folds the file back into the live orders; compact() rewrites it as one
+    put per live order. path=None keeps no file (in-memory database).
+    """
+    def __init__(self, path: Optional[str], commit_delay: float = 0.005):
+        self.logger = get_logger("OrderJournal")
+        self.path = path
+        self.commit_delay = commit_delay # Gather a burst of events into one commit
+        self.seq = 0
+        self.records = 0 # Records in the file
+        self.commits = 0
+        self._buffer: List[str] = []
+        self._writer: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock() # One file writer at a time (commit / compact)
+
+    def exists(self) -> bool:
+        return self.path is not None and os.path.exists(self.path)
+
+    def append(self, op: str, order_id: str, order: Optional[Dict[str, Any]] = None):
+        """Buffer a record ("put" with the order fields, or "del") for the next commit."""
+        self.seq += 1
+        if self.path is None:
+            return
+        record = {"seq": self.seq, "op": op, "order_id": order_id}
+        if order is not None:
+            record["order"] = {key: order.get(key) for key in ORDER_FIELDS}
+        self._buffer.append(json.dumps(record, default=_encode, ensure_ascii=False) + "\n")
+        if self._writer is None or self._writer.done():
+            try:
+                self._writer = asyncio.get_running_loop().create_task(self._writer_loop())
+            except RuntimeError:
+                pass # No running loop: committed by the next flush()
+
+    async def _writer_loop(self):
+        try:
+            while self._buffer:
+                await asyncio.sleep(self.commit_delay)
+                await self.flush()
+        except Exception as e:
+            self.logger.error(f"Order journal commit failed: {e}")
+
+    async def flush(self):
+        """Commit buffered records (write + fsync)."""
+        async with self._lock:
+            lines, self._buffer = self._buffer, []
+            if not lines:
+                return
+            try:
+                await asyncio.to_thread(self._write, lines)
+            except Exception:
+                self._buffer = lines + self._buffer # Retried with the next commit
+                raise
+            self.records += len(lines)
+            self.commits += 1
+
+    def _write(self, lines: List[str]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(lines))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def replay(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Rebuild the live orders from the file (order_id -> order fields).
+        A torn last line (crash during a write) is cut off.
+        """
+        orders: Dict[str, Dict[str, Any]] = {}
+        if self.path is None or not os.path.exists(self.path):
+            return orders
+        good = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if not line.endswith(b"\n"):
+                    break
+                good += len(line)
+                self.records += 1
+                self.seq = max(self.seq, record["seq"])
+                if record["op"] == "put":
+                    orders[record["order_id"]] = record["order"]
+                else:
+                    orders.pop(record["order_id"], None)
+        if good < os.path.getsize(self.path):
+            self.logger.warning(f"Order journal: dropped a torn record at byte {good}")
+            with open(self.path, "r+b") as f:
+                f.truncate(good)
+        return orders
+
+    async def compact(self, orders: Dict[str, Dict[str, Any]]):
+        """
+        Rewrite the file as one put per order in orders (the current live state, which
+        already includes every buffered record) and swap it in atomically.
+        """
+        if self.path is None:
+            return
+        async with self._lock:
+            pending, self._buffer = self._buffer, []
+            lines = []
+            for order_id, order in orders.items():
+                self.seq += 1
+                record = {"seq": self.seq, "op": "put", "order_id": order_id,
+                          "order": {key: order.get(key) for key in ORDER_FIELDS}}
+                lines.append(json.dumps(record, default=_encode, ensure_ascii=False) + "\n")
+            try:
+                await asyncio.to_thread(self._rewrite, lines)
+            except Exception:
+                self._buffer = pending + self._buffer
+                raise
+            self.records = len(lines)
+            self.commits += 1
+
+    def _rewrite(self, lines: List[str]):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("".join(lines))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
@@ -1,28 +1,54 @@
 import asyncio
+import heapq
 import json
-from typing import Dict, Any, List, Optional
+import os
+import time
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from strategy.base_strategy import Signal
 from data.kiwoom_rest_client import KiwoomRestClient
 from core.logger import get_logger
 from core.database import db
 from core.event_bus import event_bus
+from execution.order_journal import OrderJournal
 
 class OrderManager:
     """
     Manages order lifecycle: Send, Monitor, Cancel/Modify.
+
+    Unfilled orders expire after their time-in-force (per order, default max_unfilled_time).
+    Expiries sit in a min-heap of (expires_at, order_id); the monitor sleeps until the
+    earliest one and cancels everything due in one batch. Entries of orders that were filled,
+    cancelled or re-armed are dropped when they surface (lazy deletion).
+
+    Persistence: order state changes are appended to an OrderJournal (group commit, off
+    the event loop) and active_orders is rebuilt from it at startup. The active_orders
+    SQLite table is a compacted view for queries, synced in the background every view_interval.
     """
     def __init__(self, kiwoom: KiwoomRestClient, notification_manager=None):
         self.logger = get_logger("OrderManager")
         self.kiwoom = kiwoom
         self.notification = notification_manager
         self.active_orders: Dict[str, Dict[str, Any]] = {} # order_id -> order_info
-        self.unfilled_check_interval = 5 # seconds
-        self.max_unfilled_time = 60 # seconds
+        self.max_unfilled_time = 60 # seconds, default time-in-force
+        self.cancel_retry_interval = 10 # seconds before re-cancelling an expired order
+        self._deadlines: List[Tuple[float, str]] = [] # min-heap of (expires_at, order_id)
+        self._deadline_changed = asyncio.Event() # An earlier deadline was pushed
+        # Bulk operations: requests run concurrently, paced by the client's rate limiter;
+        # throttled requests are retried with exponential backoff
+        self.bulk_max_retries = 3
+        self.retry_backoff = 0.5 # seconds, doubled per attempt
+        self.reconcile_delay = 1.0 # seconds before re-reading the balance after an unanswered sell
+        self.journal = OrderJournal(None) # Opened by initialize()
+        self.view_interval = 1.0 # seconds between syncs of the SQLite view
+        self.compact_ratio = 4 # Compact the journal when it holds this many records per live order
+        self._view_dirty: Dict[str, bool] = {} # order_id -> still active (upsert) / removed (delete)
+        self._view_task: Optional[asyncio.Task] = None
+        self._view_enabled = False
 
     async def initialize(self):
         """
-        Initialize DB table and load active orders.
+        Initialize DB table, open the order journal and load active orders.
         """
         await db.execute("""
             CREATE TABLE IF NOT EXISTS active_orders (
@@ -34,64 +60,139 @@ class OrderManager:
                 price REAL,
                 source TEXT,
                 timestamp DATETIME,
-                strategy_id TEXT
+                strategy_id TEXT,
+                time_in_force REAL
             )
         """)
         
-        # Migration: Add strategy_id column if not exists
+        # Migration: Add strategy_id / time_in_force columns if not exists
         try:
             # Check if column exists
-            columns = await db.fetch_all("PRAGMA table_info(active_orders)")
-            has_strategy_id = any(col['name'] == 'strategy_id' for col in columns)
-            
-            if not has_strategy_id:
-                await db.execute("ALTER TABLE active_orders ADD COLUMN strategy_id TEXT")
-                self.logger.info("Migrated active_orders table: Added strategy_id column")
+            columns = {col['name'] for col in await db.fetch_all("PRAGMA table_info(active_orders)")}
+            for column, column_type in (("strategy_id", "TEXT"), ("time_in_force", "REAL")):
+                if column not in columns:
+                    await db.execute(f"ALTER TABLE active_orders ADD COLUMN {column} {column_type}")
+                    self.logger.info(f"Migrated active_orders table: Added {column} column")
         except Exception as e:
             self.logger.error(f"Migration failed: {e}")
             
+        self.journal = OrderJournal(self._journal_path())
+        self._view_enabled = True
         await self.load_active_orders()
 
+    @staticmethod
+    def _journal_path() -> Optional[str]:
+        """Journal file next to the database (none for an in-memory database)."""
+        if db.db_path == ":memory:":
+            return None
+        return os.path.splitext(db.db_path)[0] + "_orders.jsonl"
+
     async def load_active_orders(self):
-        """Load active orders from DB."""
-        # Check columns to handle legacy schema if needed, but we did migration above.
-        # We need to select all columns.
-        rows = await db.fetch_all("SELECT * FROM active_orders")
-        for row in rows:
-            # row: order_id, symbol, type, quantity, filled_qty, price, source, timestamp, strategy_id
-            order_id = row[0]
-            self.active_orders[order_id] = {
-                'symbol': row[1],
-                'type': row[2],
-                'quantity': row[3],
-                'filled_qty': row[4],
-                'price': row[5],
-                'source': row[6],
-                'timestamp': row[7],
-                'strategy_id': row[8] if len(row) > 8 else None
-            }
-        self.logger.info(f"Loaded {len(self.active_orders)} active orders from DB.")
+        """
+        Rebuild active orders from the journal. Without a journal file (first run after
+        migrating, or in-memory database) they are loaded from the SQLite view and journaled.
+        The view is then rewritten to match (it may lag the journal after a crash).
+        """
+        source = "journal"
+        if self.journal.exists():
+            orders = await asyncio.to_thread(self.journal.replay)
+        else:
+            source = "DB"
+            orders = {}
+            rows = await db.fetch_all("SELECT * FROM active_orders")
+            for row in rows:
+                # row: order_id, symbol, type, quantity, filled_qty, price, source, timestamp, strategy_id, time_in_force
+                orders[row[0]] = {
+                    'symbol': row[1],
+                    'type': row[2],
+                    'quantity': row[3],
+                    'filled_qty': row[4],
+                    'price': row[5],
+                    'source': row[6],
+                    'timestamp': row[7],
+                    'strategy_id': row[8] if len(row) > 8 else None,
+                    'time_in_force': row[9] if len(row) > 9 else None
+                }
+            await self.journal.compact(orders)
+        for order_id, info in orders.items():
+            self.active_orders[order_id] = info
+            self._track_deadline(order_id)
+        
+        await db.execute("DELETE FROM active_orders")
+        await self._write_view({order_id: True for order_id in self.active_orders})
+        self.logger.info(f"Loaded {len(self.active_orders)} active orders from {source}.")
 
     async def save_order(self, order_id: str, info: Dict[str, Any]):
-        """Save order to DB."""
+        """Journal the order state (committed in the background; no disk wait)."""
+        self.journal.append("put", order_id, info)
+        self._mark_view(order_id, True)
+
+    async def remove_order(self, order_id: str):
+        """Journal the order's removal (committed in the background; no disk wait)."""
+        self.journal.append("del", order_id)
+        self._mark_view(order_id, False)
+
+    def _mark_view(self, order_id: str, active: bool):
+        self._view_dirty[order_id] = active
+        if not self._view_enabled or (self._view_task and not self._view_task.done()):
+            return
+        try:
+            self._view_task = asyncio.get_running_loop().create_task(self._view_loop())
+        except RuntimeError:
+            pass # No running loop: synced by the next flush()
+
+    async def _view_loop(self):
+        """Background sync of the SQLite view (and journal compaction)."""
+        try:
+            while self._view_dirty:
+                await asyncio.sleep(self.view_interval)
+                await self._sync_view()
+        except Exception as e:
+            self.logger.error(f"Failed to sync active_orders view: {e}")
+
+    async def _sync_view(self):
+        dirty, self._view_dirty = self._view_dirty, {}
+        try:
+            await self._write_view(dirty)
+        except Exception:
+            self._view_dirty = {**dirty, **self._view_dirty}
+            raise
+        if self.journal.records > self.compact_ratio * len(self.active_orders) + 1000:
+            await self.journal.compact(self.active_orders)
+
+    async def _write_view(self, dirty: Dict[str, bool]):
+        """Upsert the current state of still-active orders, delete the removed ones."""
+        upserts = [order_id for order_id, active in dirty.items() if active and order_id in self.active_orders]
+        deletes = [(order_id,) for order_id, active in dirty.items() if not active]
         query = """
             INSERT OR REPLACE INTO active_orders 
-            (order_id, symbol, type, quantity, filled_qty, price, source, timestamp, strategy_id)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            (order_id, symbol, type, quantity, filled_qty, price, source, timestamp, strategy_id, time_in_force)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
-        await db.execute(query, (
-            order_id, info['symbol'], info['type'], info['quantity'], 
-            info['filled_qty'], info['price'], info['source'], info['timestamp'],
-            info.get('strategy_id')
-        ))
+        if upserts:
+            rows = []
+            for order_id in upserts:
+                info = self.active_orders[order_id]
+                rows.append((
+                    order_id, info['symbol'], info['type'], info['quantity'], 
+                    info['filled_qty'], info['price'], info['source'], info['timestamp'],
+                    info.get('strategy_id'), info.get('time_in_force')
+                ))
+            await db.execute_many(query, rows)
+        if deletes:
+            await db.execute_many("DELETE FROM active_orders WHERE order_id = ?", deletes)
 
-    async def remove_order(self, order_id: str):
-        """Remove order from DB."""
-        await db.execute("DELETE FROM active_orders WHERE order_id = ?", (order_id,))
+    async def flush(self):
+        """Commit the journal and sync the SQLite view now (e.g. before shutdown)."""
+        await self.journal.flush()
+        if self._view_enabled:
+            await self._sync_view()
 
     async def send_order(self, signal: Signal, quantity: int, account_num: str, extra_data: Dict[str, Any] = None) -> Optional[str]:
         """
         Send order to Kiwoom.
+        extra_data: strategy_id, time_in_force (seconds before an unfilled order is cancelled;
+        None = max_unfilled_time, 0 = no expiry).
         """
         try:
             # 1: Buy, 2: Sell
@@ -120,9 +221,11 @@ class OrderManager:
                         'price': price,
                         'source': 'STRATEGY',
                         'timestamp': datetime.now(),
-                        'strategy_id': extra_data.get('strategy_id') if extra_data else None
+                        'strategy_id': extra_data.get('strategy_id') if extra_data else None,
+                        'time_in_force': extra_data.get('time_in_force') if extra_data else None
                     }
                     self.active_orders[order_no] = order_info
+                    self._track_deadline(order_no)
                     await self.save_order(order_no, order_info)
                     return order_no
             
@@ -133,7 +236,8 @@ class OrderManager:
             self.logger.error(f"Order Send Exception: {e}")
             return None
 
-    async def send_manual_order(self, symbol: str, order_type: str, price: int, quantity: int) -> Optional[str]:
+    async def send_manual_order(self, symbol: str, order_type: str, price: int, quantity: int,
+                                time_in_force: Optional[float] = None) -> Optional[str]:
         """
         Send a manual order from UI.
         """
@@ -162,9 +266,11 @@ class OrderManager:
                         'price': price,
                         'source': 'MANUAL',
                         'timestamp': datetime.now(),
-                        'strategy_id': None
+                        'strategy_id': None,
+                        'time_in_force': time_in_force
                     }
                     self.active_orders[order_no] = order_info
+                    self._track_deadline(order_no)
                     await self.save_order(order_no, order_info)
                     return order_no
             
@@ -211,70 +317,176 @@ class OrderManager:
         """
         try:
             self.logger.info(f"Cancelling Order {order_id} ({symbol})")
-            
-            order_info = self.active_orders.get(order_id)
-            qty = 0 # Default to 0 (Cancel All remaining)
-            
-            if order_info:
-                # Cancel remaining quantity
-                total_qty = order_info.get('quantity', 0)
-                filled_qty = order_info.get('filled_qty', 0)
-                qty = total_qty - filled_qty
-            
-            await self.kiwoom.cancel_order(order_id, symbol, qty)
+            return await self.kiwoom.cancel_order(order_id, symbol, self._remaining_qty(order_id))
             
         except Exception as e:
             self.logger.error(f"Cancel Order Exception: {e}")
 
-    async def cancel_all_orders(self):
+    def _remaining_qty(self, order_id: str) -> int:
+        """Unfilled quantity of a tracked order (0 = cancel all remaining)."""
+        order_info = self.active_orders.get(order_id)
+        if not order_info:
+            return 0
+        return order_info.get('quantity', 0) - order_info.get('filled_qty', 0)
+
+    @staticmethod
+    def _is_success(result) -> bool:
+        if not isinstance(result, dict):
+            return bool(result)
+        code = result.get("rt_cd", result.get("return_code", result.get("result_code")))
+        return str(code) == "0"
+
+    @staticmethod
+    def _is_throttled(result) -> bool:
+        """No response (HTTP error / 429 is logged by the client) or a rate-limit rejection."""
+        if not result:
+            return True
+        if not isinstance(result, dict):
+            return False
+        msg = str(result.get("msg1", result.get("return_msg", result.get("msg", ""))))
+        code = str(result.get("rt_cd", result.get("return_code", result.get("result_code"))))
+        return code == "5" or "초과" in msg or "429" in msg
+
+    async def _request_with_retry(self, call, *args, retry_unanswered: bool = True) -> Dict[str, Any]:
+        """
+        Run one order request, retrying throttled attempts with exponential backoff.
+        retry_unanswered=False: no response (None / exception) is not retried, since the
+        request may have reached the broker (new orders); only explicit rate-limit rejections are.
+        Returns {"ok", "attempts", "elapsed", "response"}.
+        """
+        start = time.monotonic()
+        result = None
+        attempts = 0
+        for attempts in range(1, self.bulk_max_retries + 2):
+            try:
+                result = await call(*args)
+            except Exception as e:
+                self.logger.error(f"Order request exception: {e}")
+                result = None
+            if self._is_success(result) or not self._is_throttled(result) or attempts > self.bulk_max_retries:
+                break
+            if not result and not retry_unanswered:
+                break
+            await asyncio.sleep(self.retry_backoff * 2 ** (attempts - 1))
+        return {"ok": self._is_success(result), "attempts": attempts, "elapsed": time.monotonic() - start, "response": result}
+
+    async def cancel_orders(self, order_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Cancel orders concurrently (all active orders by default).
+        Returns {"orders": {order_id: {ok, attempts, elapsed}}, "cancelled", "failed", "elapsed"}.
+        Orders leave active_orders on the broker's CANCELLED event (on_order_event).
+        """
+        start = time.monotonic()
+        order_ids = [oid for oid in (order_ids if order_ids is not None else list(self.active_orders)) if oid in self.active_orders]
+        
+        async def cancel(order_id):
+            info = self.active_orders[order_id]
+            self.logger.info(f"Cancelling Order {order_id} ({info['symbol']})")
+            outcome = await self._request_with_retry(self.kiwoom.cancel_order, order_id, info['symbol'], self._remaining_qty(order_id))
+            return order_id, outcome
+        
+        results = dict(await asyncio.gather(*(cancel(oid) for oid in order_ids)))
+        report = {
+            "orders": {oid: {k: v for k, v in outcome.items() if k != "response"} for oid, outcome in results.items()},
+            "cancelled": sum(outcome["ok"] for outcome in results.values()),
+            "failed": [oid for oid, outcome in results.items() if not outcome["ok"]],
+            "elapsed": time.monotonic() - start
+        }
+        if report["failed"]:
+            self.logger.error(f"Cancel failed for {len(report['failed'])} orders: {report['failed']}")
+        return report
+
+    async def cancel_all_orders(self) -> Dict[str, Any]:
         """
         Cancel all active orders.
         """
         self.logger.warning("Cancelling ALL active orders...")
         if not self.active_orders:
             self.logger.info("No active orders to cancel.")
-        else:
-            order_ids = list(self.active_orders.keys())
-            for oid in order_ids:
-                info = self.active_orders[oid]
-                await self.cancel_order(oid, info['symbol'])
-                await asyncio.sleep(0.5) # Prevent burst rate limit
+        report = await self.cancel_orders()
+        self.logger.warning(f"Cancelled {report['cancelled']}/{len(report['orders'])} orders in {report['elapsed']:.2f}s")
+        return report
             
-    async def close_all_positions(self):
+    async def _get_holdings(self) -> Optional[Dict[str, int]]:
+        """Held quantity per symbol from the account balance (None if the balance is unavailable)."""
+        balance = await self.kiwoom.get_account_balance()
+        if not balance:
+            return None
+        # Output format depends on KiwoomRestClient implementation (mock/real)
+        # Based on mock: {'output': {'multi': [{'code': '...', 'qty': '...'}]}}
+        output = balance.get('output', balance)
+        positions = output.get('multi', output.get('acnt_evlt_remn_indv_tot', []))
+        holdings = {}
+        for pos in positions:
+            symbol = pos.get('code', pos.get('stk_cd', '')).replace("A", "")
+            qty = int(pos.get('qty', pos.get('rmnd_qty', 0)))
+            if symbol and qty > 0:
+                holdings[symbol] = qty
+        return holdings
+
+    async def close_all_positions(self) -> Dict[str, Any]:
         """
-        Liquidate all holding positions (Panic Sell).
+        Liquidate all holding positions (Panic Sell) with concurrent market orders.
+        A sell without a response is not sent again (it may have been accepted): after
+        reconcile_delay the balance is re-read, and the sell counts as done if the holding shrank.
+        Returns {"orders": {symbol: {ok, attempts, elapsed, qty, order_no[, reconciled]}}, "sold", "failed", "elapsed"}.
         """
         self.logger.warning("CLOSING ALL POSITIONS (Panic Liquidation)...")
+        start = time.monotonic()
+        report = {"orders": {}, "sold": 0, "failed": [], "elapsed": 0.0}
         try:
             # 1. Get Balance/Positions
-            balance = await self.kiwoom.get_account_balance()
-            if not balance:
+            holdings = await self._get_holdings()
+            if holdings is None:
                 self.logger.error("Failed to get balance for liquidation.")
-                return
-
-            # Parse positions
-            # Output format depends on KiwoomRestClient implementation (mock/real)
-            # Based on mock: {'output': {'multi': [{'code': '...', 'qty': '...'}]}}
-            positions = []
-            output = balance.get('output', {})
-            if 'multi' in output:
-                positions = output['multi']
-            elif 'single' in output: # Sometimes single list?
-                pass 
+                return report
             
-            # 2. Sell Each
-            for pos in positions:
-                symbol = pos.get('code')
-                qty = int(pos.get('qty', 0))
-                if qty > 0:
-                    self.logger.warning(f"Liquidating {symbol}: {qty} shares")
-                    # Send Market Sell Order
-                    # trade_type=2 (Sell), quote_type=03 (Market)
-                    await self.kiwoom.send_order(symbol, 2, qty, 0, "03")
-                    await asyncio.sleep(0.5) # Prevent burst rate limit
+            # 2. Sell Each (concurrently)
+            unanswered = []
+            async def sell(symbol, qty):
+                self.logger.warning(f"Liquidating {symbol}: {qty} shares")
+                # trade_type=2 (Sell), quote_type=03 (Market)
+                outcome = await self._request_with_retry(self.kiwoom.send_order, symbol, 2, qty, 0, "03", retry_unanswered=False)
+                response = outcome.pop("response")
+                if not response:
+                    unanswered.append(symbol)
+                response = response or {}
+                outcome.update(qty=qty, order_no=(response.get("output") or {}).get("order_no", response.get("ord_no")))
+                return symbol, outcome
+            
+            report["orders"] = dict(await asyncio.gather(*(sell(symbol, qty) for symbol, qty in holdings.items())))
+            
+            # 3. Reconcile unanswered sells against the balance
+            if unanswered:
+                self.logger.warning(f"No response to liquidation of {unanswered}. Reconciling with the balance...")
+                await asyncio.sleep(self.reconcile_delay)
+                remaining = await self._get_holdings()
+                for symbol in unanswered:
+                    outcome = report["orders"][symbol]
+                    outcome["reconciled"] = remaining is not None
+                    outcome["ok"] = remaining is not None and remaining.get(symbol, 0) < holdings[symbol]
+            report["sold"] = sum(outcome["ok"] for outcome in report["orders"].values())
+            report["failed"] = [symbol for symbol, outcome in report["orders"].items() if not outcome["ok"]]
+            if report["failed"]:
+                self.logger.error(f"Liquidation failed for {report['failed']}")
                     
         except Exception as e:
             self.logger.error(f"Panic Liquidation Failed: {e}")
+        report["elapsed"] = time.monotonic() - start
+        return report
+
+    async def flatten(self) -> Dict[str, Any]:
+        """
+        Cancel all orders, then liquidate all positions.
+        Returns {"cancel": report, "liquidation": report, "time_to_flat": seconds}.
+        """
+        start = time.monotonic()
+        cancel_report = await self.cancel_all_orders()
+        liquidation_report = await self.close_all_positions()
+        time_to_flat = time.monotonic() - start
+        self.logger.warning(f"Flattened in {time_to_flat:.2f}s: cancelled {cancel_report['cancelled']}, "
+                            f"liquidated {liquidation_report['sold']} positions")
+        return {"cancel": cancel_report, "liquidation": liquidation_report, "time_to_flat": time_to_flat}
             
     async def on_order_event(self, event_data: Dict[str, Any]):
         """
@@ -298,9 +510,11 @@ class OrderManager:
                     'price': float(event_data.get('price', 0)),
                     'source': 'UNKNOWN', # External order
                     'timestamp': datetime.now(),
-                    'strategy_id': None
+                    'strategy_id': None,
+                    'time_in_force': None
                 }
                 self.active_orders[order_no] = order_info
+                self._track_deadline(order_no)
                 await self.save_order(order_no, order_info)
             return
 
@@ -321,6 +535,7 @@ class OrderManager:
                 "symbol": order_info['symbol'],
                 "type": order_info['type'],
                 "price": order_info['price'],
+                "exec_price": float(event_data.get('price') or order_info['price']),
                 "qty": current_fill,
                 "strategy_id": order_info.get('strategy_id')
             })
@@ -362,35 +577,82 @@ class OrderManager:
             await self.remove_order(order_no)
             self.logger.info(f"Order {order_no} Cancelled.")
 
+    def _track_deadline(self, order_id: str):
+        """Arm the expiry of a tracked order from its timestamp and time-in-force."""
+        info = self.active_orders.get(order_id)
+        if info is None:
+            return
+        tif = info.get('time_in_force')
+        if tif is None:
+            tif = self.max_unfilled_time
+        if tif <= 0:
+            return # Good till cancelled
+        timestamp = info.get('timestamp')
+        if isinstance(timestamp, str):
+            try:
+                timestamp = datetime.fromisoformat(timestamp)
+            except ValueError:
+                timestamp = None
+        created = timestamp.timestamp() if isinstance(timestamp, datetime) else time.time()
+        self._arm_deadline(order_id, created + tif)
+
+    def _arm_deadline(self, order_id: str, expires_at: float):
+        """Push (expires_at, order_id); a previous deadline of the order becomes stale."""
+        info = self.active_orders[order_id]
+        info['expires_at'] = expires_at
+        if self._deadlines and len(self._deadlines) > 2 * len(self.active_orders) + 64:
+            # Mostly stale entries: rebuild from the live deadlines
+            self._deadlines = [(info['expires_at'], oid) for oid, info in self.active_orders.items() if 'expires_at' in info]
+            heapq.heapify(self._deadlines)
+        else:
+            heapq.heappush(self._deadlines, (expires_at, order_id))
+        if self._deadlines[0] == (expires_at, order_id):
+            self._deadline_changed.set() # Wake the monitor to sleep less
+
+    def _pop_expired(self, now: float) -> List[str]:
+        """Pop due deadlines, skipping stale entries."""
+        expired = []
+        while self._deadlines and self._deadlines[0][0] <= now:
+            expires_at, order_id = heapq.heappop(self._deadlines)
+            info = self.active_orders.get(order_id)
+            if info is not None and info.get('expires_at') == expires_at:
+                expired.append(order_id)
+        return expired
+
+    async def cancel_expired_orders(self, order_ids: List[str]) -> Dict[str, Any]:
+        """
+        Cancel orders past their time-in-force in one batch (cancel_orders).
+        Orders still active afterwards (failed, or waiting for the CANCELLED event)
+        are re-armed cancel_retry_interval later.
+        """
+        self.logger.warning(f"{len(order_ids)} orders unfilled past their time-in-force. Cancelling...")
+        report = await self.cancel_orders(order_ids)
+        retry_at = time.time() + self.cancel_retry_interval
+        for order_id in order_ids:
+            if order_id in self.active_orders:
+                self._arm_deadline(order_id, retry_at)
+        return report
+
     async def monitor_unfilled_orders(self):
         """
-        Background task to monitor unfilled orders.
+        Background task to cancel orders past their time-in-force.
+        Sleeps until the earliest deadline (or until an earlier one is armed).
         """
         self.logger.info("Started monitoring unfilled orders.")
         while True:
             try:
-                await asyncio.sleep(self.unfilled_check_interval)
+                self._deadline_changed.clear()
+                now = time.time()
+                expired = self._pop_expired(now)
+                if expired:
+                    await self.cancel_expired_orders(expired)
+                    continue
                 
-                now = datetime.now()
-                # Check for stale orders
-                for order_id, info in list(self.active_orders.items()):
-                    timestamp = info.get('timestamp')
-                    if isinstance(timestamp, str):
-                        try:
-                            timestamp = datetime.fromisoformat(timestamp)
-                        except:
-                            continue
-                            
-                    # Check if we already tried to cancel recently
-                    last_cancel = info.get('last_cancel_attempt')
-                    if last_cancel and (now - last_cancel).total_seconds() < 10: # Wait 10s before retry
-                        continue
-
-                    if (now - timestamp).total_seconds() > self.max_unfilled_time:
-                        self.logger.warning(f"Order {order_id} is unfilled for too long. Cancelling...")
-                        info['last_cancel_attempt'] = now
-                        await self.cancel_order(order_id, info['symbol'])
-                        await asyncio.sleep(0.5) # Prevent burst rate limit (429)
+                timeout = self._deadlines[0][0] - now if self._deadlines else None
+                try:
+                    await asyncio.wait_for(self._deadline_changed.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
                         
             except asyncio.CancelledError:
                 self.logger.info("Stopped monitoring unfilled orders.")
@@ -1,16 +1,20 @@
 import asyncio
+import json
+import time
 import uuid
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from core.logger import get_logger
+from execution.execution_simulator import ExecutionSimulator, FEE_RATE_BUY, FEE_RATE_SELL
 
 class PaperExchange:
     """
     Simulates an exchange for Paper Trading.
     Maintains virtual account balance and positions.
-    Matches orders against real-time quotes (or current price).
+    Matches orders against real-time quotes (or current price) with ExecutionSimulator,
+    the same fill model as the L2 backtest (EventDrivenBacktester.run_l2).
     """
-    def __init__(self, initial_capital: float = 100_000_000):
+    def __init__(self, initial_capital: float = 100_000_000, latency: float = 0.0):
         self.logger = get_logger("PaperExchange")
         self.initial_capital = initial_capital
         self.balance = {
@@ -20,10 +24,25 @@ class PaperExchange:
         }
         self.positions: Dict[str, Dict[str, Any]] = {} # symbol -> {qty, avg_price, current_price}
         self.active_orders: Dict[str, Dict[str, Any]] = {} # order_id -> order_info
+        self.simulator = ExecutionSimulator(latency) # latency: seconds until an order reaches the book
+        self.books = self.simulator.books # symbol -> resting orders by price
+        self.book_depth = 10 # quote levels read (ask1..askN / bid1..bidN)
         
         # Fees
-        self.fee_rate_buy = 0.00015
-        self.fee_rate_sell = 0.00015 + 0.0020 # Includes Tax
+        self.fee_rate_buy = FEE_RATE_BUY
+        self.fee_rate_sell = FEE_RATE_SELL
+        
+        # Persistence: fills go to an append-only journal (paper_fills), the full state
+        # (paper_account) is snapshotted at most every snapshot_interval seconds
+        self.journal_delay = 0.05 # Group fills of a burst into one journal write
+        self.snapshot_interval = 5.0
+        self._pending_fills: List[Tuple] = []
+        self._snapshot_dirty = False
+        self._last_snapshot = 0.0
+        self._persist_task: Optional[asyncio.Task] = None
+        self._persist_lock = asyncio.Lock() # One writer at a time (background loop / save_state)
+        self._journal_seq: Optional[int] = None # id of the last fill written to paper_fills
+        self._journaled_state: Optional[Tuple[float, str, int]] = None # (deposit, positions_json, journal_seq)
         
         self.logger.info(f"Paper Exchange Initialized. Capital: {initial_capital:,.0f}")
 
@@ -48,6 +67,7 @@ class PaperExchange:
             "symbol": symbol,
             "side": side,
             "qty": qty,
+            "filled_qty": 0,
             "price": price,
             "type": "MARKET" if is_market else "LIMIT",
             "status": "PENDING",
@@ -55,6 +75,7 @@ class PaperExchange:
         }
         
         self.active_orders[order_id] = order_info
+        self.simulator.submit(order_info, time.time())
         self.logger.info(f"[PAPER] Order Accepted: {order_id} | {side} {symbol} {qty} @ {price if not is_market else 'MKT'}")
         
         # Try to match immediately (if market order or price allows)
@@ -71,6 +92,7 @@ class PaperExchange:
     async def cancel_order(self, order_no: str, symbol: str, qty: int) -> Dict[str, Any]:
         if order_no in self.active_orders:
             self.active_orders.pop(order_no)
+            self.simulator.cancel(order_no)
             self.logger.info(f"[PAPER] Order Cancelled: {order_no}")
             return {"result_code": 0, "msg": "Cancelled"}
         return {"result_code": -1, "msg": "Order Not Found"}
@@ -120,153 +142,239 @@ class PaperExchange:
         }
 
     async def load_state(self):
-        """Load account state from DB."""
+        """
+        Load account state from DB: last snapshot, then replay journal entries after it
+        (fills not yet snapshotted when the process stopped).
+        """
         from core.database import db
         try:
-            query = "SELECT deposit, positions_json FROM paper_account WHERE account_id = ?"
+            query = "SELECT deposit, positions_json, journal_seq FROM paper_account WHERE account_id = ?"
             rows = await db.fetch_all(query, ("PAPER_ACC",))
+            journal_seq = 0
             if rows:
-                import json
                 self.balance['deposit'] = rows[0]['deposit']
                 self.positions = json.loads(rows[0]['positions_json'])
-                self.logger.info(f"Paper Account Loaded. Deposit: {self.balance['deposit']:,.0f}")
+                journal_seq = rows[0]['journal_seq'] or 0
+            
+            fills = await db.fetch_all(
+                "SELECT id, symbol, side, qty, price, fee FROM paper_fills WHERE id > ? ORDER BY id", (journal_seq,)
+            )
+            if not rows and not fills:
+                return
+            for fill in fills:
+                self._apply_fill(fill['symbol'], fill['side'], fill['qty'], fill['price'], fill['fee'])
+            self._journal_seq = fills[-1]['id'] if fills else journal_seq
+            if fills:
+                # Fold the replayed fills into a fresh snapshot
+                self._snapshot_dirty = True
+                self._schedule_persist()
+            self.logger.info(f"Paper Account Loaded. Deposit: {self.balance['deposit']:,.0f} (Replayed {len(fills)} fills)")
         except Exception as e:
             self.logger.error(f"Failed to load paper account: {e}")
 
     async def save_state(self):
-        """Save account state to DB."""
-        from core.database import db
+        """Flush the fill journal and write a snapshot now (e.g. before shutdown)."""
         try:
-            import json
-            query = """
-                INSERT OR REPLACE INTO paper_account (account_id, deposit, positions_json, updated_at)
-                VALUES (?, ?, ?, CURRENT_TIMESTAMP)
-            """
-            await db.execute(query, ("PAPER_ACC", self.balance['deposit'], json.dumps(self.positions)))
+            async with self._persist_lock:
+                await self._write_snapshot()
         except Exception as e:
             self.logger.error(f"Failed to save paper account: {e}")
 
-    def match_orders(self, quote: Dict[str, Any]):
+    def _schedule_persist(self):
+        """Start the background writer if it is not running (no-op outside an event loop)."""
+        if self._persist_task and not self._persist_task.done():
+            return
+        try:
+            self._persist_task = asyncio.get_running_loop().create_task(self._persist_loop())
+        except RuntimeError:
+            pass # No running loop: state is persisted on the next save_state()
+
+    async def _persist_loop(self):
+        """
+        Background writer: journal writes are grouped per journal_delay,
+        snapshots debounced to snapshot_interval.
+        """
+        try:
+            while self._pending_fills or self._snapshot_dirty:
+                await asyncio.sleep(self.journal_delay)
+                async with self._persist_lock:
+                    await self._flush_journal()
+                if self._pending_fills:
+                    continue
+                wait = self._last_snapshot + self.snapshot_interval - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                    continue
+                async with self._persist_lock:
+                    await self._write_snapshot()
+        except Exception as e:
+            self.logger.error(f"Failed to persist paper account: {e}")
+
+    async def _flush_journal(self):
+        """
+        Append pending fills to the journal (caller holds _persist_lock).
+        Ids are assigned here, and the state is captured together with them
+        (no await in between), so a snapshot never includes fills above its journal_seq.
+        """
+        from core.database import db
+        if self._journal_seq is None:
+            rows = await db.fetch_all("SELECT MAX(id) AS seq FROM paper_fills")
+            self._journal_seq = rows[0]['seq'] or 0
+
+        fills, self._pending_fills = self._pending_fills, []
+        first_id = self._journal_seq + 1
+        self._journal_seq += len(fills)
+        state = (self.balance['deposit'], json.dumps(self.positions), self._journal_seq)
+        if fills:
+            try:
+                await db.execute_many("""
+                    INSERT INTO paper_fills (id, order_id, symbol, side, qty, price, fee, timestamp)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, [(first_id + k,) + fill for k, fill in enumerate(fills)])
+            except Exception:
+                # Retry with the next write (ids re-read from the journal)
+                self._pending_fills = fills + self._pending_fills
+                self._journal_seq = None
+                raise
+        self._journaled_state = state
+
+    async def _write_snapshot(self):
+        """Write the state as of the last journaled fill (caller holds _persist_lock)."""
+        from core.database import db
+        await self._flush_journal()
+        deposit, positions_json, journal_seq = self._journaled_state
+        self._snapshot_dirty = bool(self._pending_fills)
+        self._last_snapshot = time.monotonic()
+        query = """
+            INSERT OR REPLACE INTO paper_account (account_id, deposit, positions_json, journal_seq, updated_at)
+            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+        """
+        await db.execute(query, ("PAPER_ACC", deposit, positions_json, journal_seq))
+
+    def match_orders(self, quote: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         Called when real-time quote is received.
-        quote: {symbol, current_price, ask1, bid1, ask_size1, bid_size1}
+        quote: {symbol, current_price, ask1..askN, bid1..bidN, ask_size1..N, bid_size1..N}
+        Orders fill partially across levels up to the displayed sizes, resting limits
+        by queue position (see ExecutionSimulator).
+        Returns execution events in the broker event format (OrderManager.on_order_event),
+        one per (order, level) fill with the incremental quantity in exec_qty.
         """
-        import random
         symbol = quote['symbol']
         current_price = quote.get('current_price')
-        ask1 = quote.get('ask1', current_price) # Sell Price (Buy Order matches here)
-        bid1 = quote.get('bid1', current_price) # Buy Price (Sell Order matches here)
-        ask_size = quote.get('ask_size1', 1000000) # Default large if missing
-        bid_size = quote.get('bid_size1', 1000000)
-        
-        # DEBUG
-        # self.logger.debug(f"Match Quote: {ask_size=} {bid_size=} Keys: {list(quote.keys())}")
         
         # Update Position Current Price
         if symbol in self.positions:
             self.positions[symbol]['current_price'] = current_price
 
-        # Match Orders
-        filled_ids = []
-        for order_id, order in self.active_orders.items():
-            if order['symbol'] != symbol:
-                continue
-                
-            executed = False
-            exec_price = 0
+        fills = self.simulator.on_book(symbol, self._quote_levels(quote, "ask"), self._quote_levels(quote, "bid"), time.time())
+        
+        executions = []
+        for order, qty, price in fills:
+            order_id = order['order_id']
+            if order_id not in self.active_orders:
+                continue # Rejected earlier in this quote
             
-            if order['side'] == "BUY":
-                # Liquidity Check
-                if order['qty'] > ask_size:
-                    self.logger.debug(f"Liquidity Check Failed: Qty {order['qty']} > AskSize {ask_size}")
-                    # Partial fill logic could be here, but for now skip or fill max?
-                    # Let's assume we wait for enough liquidity or fill available.
-                    # Simpler: Only fill if enough liquidity (Conservative)
-                    continue
+            if self._execute_trade(order, price, qty):
+                executions.append({
+                    "order_no": order_id,
+                    "status": "FILLED",
+                    "code": symbol,
+                    "order_type": order['side'],
+                    "qty": order['qty'],
+                    "exec_qty": qty,
+                    "price": price
+                })
+            else:
+                # Rejected (funds/position): drop the rest of the order
+                self.active_orders.pop(order_id)
+                self.simulator.cancel(order_id)
+        
+        # Fully filled orders leave once all their level fills are applied
+        for order, _, _ in fills:
+            if order['filled_qty'] >= order['qty']:
+                self.active_orders.pop(order['order_id'], None)
+                
+        return executions
 
-                # Market Order or Limit >= Ask1
-                if order['type'] == "MARKET" or order['price'] >= ask1:
-                    # Slippage: Randomly add 0~2 ticks or 0.05%
-                    slippage = 0
-                    if order['type'] == "MARKET":
-                         slippage = ask1 * random.uniform(0, 0.0005) # Max 0.05%
-                    
-                    exec_price = ask1 + slippage
-                    executed = True
-                    
-            elif order['side'] == "SELL":
-                # Liquidity Check
-                if order['qty'] > bid_size:
-                    continue
+    def on_orderbook(self, snapshot: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Match against a 호가 snapshot in the "market.data.orderbook" event format:
+        {symbol, asks: [(price, size)] ascending, bids: [(price, size)] descending}.
+        """
+        quote = {"symbol": snapshot['symbol']}
+        for side, levels in (("ask", snapshot.get('asks', [])), ("bid", snapshot.get('bids', []))):
+            for level, (price, size) in enumerate(levels[:self.book_depth], start=1):
+                quote[f"{side}{level}"] = price
+                quote[f"{side}_size{level}"] = size
+        best = quote.get("ask1", quote.get("bid1"))
+        quote["current_price"] = snapshot.get('current_price', best)
+        if quote["current_price"] is None:
+            return []
+        return self.match_orders(quote)
 
-                # Market Order or Limit <= Bid1
-                if order['type'] == "MARKET" or order['price'] <= bid1:
-                    # Slippage
-                    slippage = 0
-                    if order['type'] == "MARKET":
-                         slippage = bid1 * random.uniform(0, 0.0005)
-                         
-                    exec_price = bid1 - slippage
-                    executed = True
-                    
-            if executed:
-                # We need to call save_state() but this method is sync (called from callback).
-                # So we schedule it or run it? 
-                # Ideally match_orders should be async or fire event.
-                # For now, we just update memory and save periodically or on critical events.
-                # Let's make _execute_trade async? No, match_orders is usually called from sync context?
-                # If match_orders is called from async loop, we can use create_task.
-                self._execute_trade(order, exec_price)
-                filled_ids.append(order_id)
-                
-        for oid in filled_ids:
-            self.active_orders.pop(oid)
+    def _quote_levels(self, quote: Dict[str, Any], side: str) -> List[Tuple[float, int]]:
+        """
+        Displayed liquidity [(price, size)] best first.
+        Level 1 defaults to current price with large size if missing.
+        """
+        levels = [(quote.get(f'{side}1', quote.get('current_price')), quote.get(f'{side}_size1', 1000000))]
+        for i in range(2, self.book_depth + 1):
+            price = quote.get(f'{side}{i}')
+            size = quote.get(f'{side}_size{i}')
+            if price is None or size is None:
+                break
+            levels.append((price, size))
+        return levels
 
-    def _execute_trade(self, order: Dict[str, Any], price: float):
-        qty = order['qty']
+    def _execute_trade(self, order: Dict[str, Any], price: float, qty: int) -> bool:
+        symbol = order['symbol']
         amount = price * qty
         
         if order['side'] == "BUY":
             fee = amount * self.fee_rate_buy
             cost = amount + fee
-            
-            if self.balance['deposit'] >= cost:
-                self.balance['deposit'] -= cost
-                
-                # Update Position
-                if order['symbol'] in self.positions:
-                    pos = self.positions[order['symbol']]
-                    total_qty = pos['qty'] + qty
-                    avg_price = (pos['qty'] * pos['avg_price'] + amount) / total_qty
-                    pos['qty'] = total_qty
-                    pos['avg_price'] = avg_price
-                else:
-                    self.positions[order['symbol']] = {
-                        "qty": qty,
-                        "avg_price": price,
-                        "current_price": price
-                    }
-                self.logger.info(f"[PAPER] BUY EXEC: {order['symbol']} {qty} @ {price:.0f} (Fee: {fee:.0f})")
-            else:
+            if self.balance['deposit'] < cost:
                 self.logger.warning(f"[PAPER] Insufficient Funds for BUY: {cost} > {self.balance['deposit']}")
-                
-        elif order['side'] == "SELL":
-            if order['symbol'] in self.positions:
-                pos = self.positions[order['symbol']]
-                if pos['qty'] >= qty:
-                    fee = amount * self.fee_rate_sell
-                    revenue = amount - fee
-                    self.balance['deposit'] += revenue
-                    
-                    pos['qty'] -= qty
-                    if pos['qty'] == 0:
-                        del self.positions[order['symbol']]
-                        
-                    self.logger.info(f"[PAPER] SELL EXEC: {order['symbol']} {qty} @ {price:.0f} (Fee: {fee:.0f})")
-                else:
-                    self.logger.warning(f"[PAPER] Insufficient Qty for SELL: {qty} > {pos['qty']}")
-            else:
-                self.logger.warning(f"[PAPER] No Position for SELL: {order['symbol']}")
+                return False
+        else:
+            pos = self.positions.get(symbol)
+            if not pos:
+                self.logger.warning(f"[PAPER] No Position for SELL: {symbol}")
+                return False
+            if pos['qty'] < qty:
+                self.logger.warning(f"[PAPER] Insufficient Qty for SELL: {qty} > {pos['qty']}")
+                return False
+            fee = amount * self.fee_rate_sell
+        
+        self._apply_fill(symbol, order['side'], qty, price, fee)
+        self.logger.info(f"[PAPER] {order['side']} EXEC: {symbol} {qty} @ {price:.0f} (Fee: {fee:.0f})")
         
-        # Trigger Save (Fire and Forget)
-        asyncio.create_task(self.save_state())
+        # Journal the fill (background writer, see _persist_loop)
+        self._pending_fills.append((order['order_id'], symbol, order['side'], qty, price, fee, datetime.now()))
+        self._snapshot_dirty = True
+        self._schedule_persist()
+        return True
+
+    def _apply_fill(self, symbol: str, side: str, qty: int, price: float, fee: float):
+        """Apply a validated fill to balance and positions (live matching and journal replay)."""
+        amount = price * qty
+        if side == "BUY":
+            self.balance['deposit'] -= amount + fee
+            if symbol in self.positions:
+                pos = self.positions[symbol]
+                total_qty = pos['qty'] + qty
+                pos['avg_price'] = (pos['qty'] * pos['avg_price'] + amount) / total_qty
+                pos['qty'] = total_qty
+            else:
+                self.positions[symbol] = {
+                    "qty": qty,
+                    "avg_price": price,
+                    "current_price": price
+                }
+        else:
+            self.balance['deposit'] += amount - fee
+            pos = self.positions[symbol]
+            pos['qty'] -= qty
+            if pos['qty'] == 0:
+                del self.positions[symbol]
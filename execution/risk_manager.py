@@ -1,127 +1,250 @@
-from typing import Dict, Any
-from datetime import datetime
+import asyncio
+import time
+from collections import deque, defaultdict
+from typing import Dict, Any, List, Optional, Tuple
 from strategy.base_strategy import Signal
 from core.logger import get_logger
 
+EXPOSURE_LABELS = {"symbol": "종목", "market": "시장", "strategy": "전략"}
+
 class RiskManager:
     """
     Manages account and portfolio level risks.
+
+    Pre-trade checks are O(1): order rates are counted in deque sliding windows
+    (expired entries leave from the left), and exposure (notional at the latest mark)
+    is kept per symbol, market and strategy, updated incrementally by fills (on_fill)
+    and quotes (on_quote) instead of rescanning positions.
+    Limits are fractions of total asset; 0 disables a limit.
     """
     def __init__(self):
         self.logger = get_logger("RiskManager")
         self.config = {
             "max_daily_loss_rate": 0.03, # 3%
             "max_order_count_per_min": 10,
-            "max_portfolio_exposure": 0.95 # 95%
+            "max_symbol_order_count_per_min": 0,
+            "max_portfolio_exposure": 0.95, # 95%
+            "max_symbol_exposure": 0.0,
+            "max_market_exposure": 0.0,
+            "max_strategy_exposure": 0.0
         }
         self.daily_loss = 0.0
-        self.order_count_window = [] # Timestamps of orders
+        self.order_count_window: deque = deque() # monotonic timestamps of orders
+        self.symbol_order_windows: Dict[str, deque] = defaultdict(deque)
         self.notification_manager = None
 
+        # Incremental exposure
+        self.markets: Dict[str, str] = {} # symbol -> market (KOSPI/KOSDAQ)
+        self.symbol_exposure: Dict[str, float] = defaultdict(float)
+        self.market_exposure: Dict[str, float] = defaultdict(float)
+        self.strategy_exposure: Dict[str, float] = defaultdict(float)
+        self._holdings: Dict[str, Dict[Optional[str], int]] = {} # symbol -> {strategy_id: qty}
+        self._marks: Dict[str, float] = {} # symbol -> last price
+
     def configure(self, config: Dict[str, Any], notification_manager=None):
         self.config.update(config)
         if notification_manager:
             self.notification_manager = notification_manager
 
+    async def load_markets(self):
+        """Symbol -> market from the symbol master (market_code) for market limits."""
+        from core.database import db
+        try:
+            rows = await db.fetch_all("SELECT code, market FROM market_code")
+            self.markets.update({row['code']: row['market'] for row in rows})
+        except Exception as e:
+            self.logger.error(f"Failed to load markets: {e}")
+
     async def _fire_alert(self, msg: str):
         """Fire and forget alert."""
         if self.notification_manager:
             try:
-                # If we are in an async context, we can just await if the caller awaits check_risk.
-                # But check_risk is currently sync in signature?
-                # The prompt said check_risk is sync.
-                # "def check_risk(self, signal: Signal, account_info: Dict[str, Any]) -> bool:"
-                # So we need to schedule it.
-                loop = asyncio.get_running_loop()
-                loop.create_task(self.notification_manager.send_message(msg, level="WARNING"))
-            except RuntimeError:
-                pass 
-
-    def check_risk(self, signal: Signal, account_info: Dict[str, Any]) -> bool:
+                await self.notification_manager.send_message(msg, level="WARNING")
+            except Exception:
+                pass
+
+    def _reject(self, reason: str, limit: str, current: str, action: str) -> bool:
+        """Log a rejection and send the alert off the caller's path."""
+        self.logger.warning(reason)
+        msg = (
+            f"⚠️ [리스크 경고]\n"
+            f"{reason}\n\n"
+            f"• 제한: {limit}\n"
+            f"• 현재: {current}\n"
+            f"• 조치: {action}"
+        )
+        try:
+            asyncio.get_running_loop().create_task(self._fire_alert(msg))
+        except RuntimeError:
+            pass # No running loop
+        return False
+
+    def check_risk(self, signal: Signal, account_info: Dict[str, Any], quantity: int = 0) -> bool:
         """
         Check if the signal can be executed based on risk rules.
+        quantity: order size, used for the projected symbol/market/strategy exposure of BUYs.
         """
+        return self._check(signal, quantity, account_info, time.monotonic(), 0, None, {})
+
+    def check_basket(self, orders: List[Tuple[Signal, int]], account_info: Dict[str, Any]) -> List[bool]:
+        """
+        Check a basket of (signal, quantity) in one pass.
+        Orders are evaluated in sequence as if the accepted ones before them were sent:
+        their order counts and BUY notional count toward the following checks.
+        """
+        now = time.monotonic()
+        accepted = 0
+        symbol_counts: Dict[str, int] = {}
+        pending: Dict[Tuple[str, Any], float] = {} # accepted BUY notional per (kind, key)
+        results = []
+        for signal, quantity in orders:
+            ok = self._check(signal, quantity, account_info, now, accepted, symbol_counts, pending)
+            if ok:
+                accepted += 1
+                symbol_counts[signal.symbol] = symbol_counts.get(signal.symbol, 0) + 1
+                if signal.type == "BUY":
+                    notional = signal.price * quantity
+                    for key in (("portfolio", None),) + self._exposure_keys(signal):
+                        pending[key] = pending.get(key, 0.0) + notional
+            results.append(ok)
+        return results
+
+    def _check(self, signal: Signal, quantity: int, account_info: Dict[str, Any], now: float,
+               in_basket: int, symbol_counts: Optional[Dict[str, int]], pending: Dict[Tuple[str, Any], float]) -> bool:
+        config = self.config
+
         # 1. Order Count Limit
-        now = datetime.now()
         self._clean_order_window(now)
-        if len(self.order_count_window) >= self.config["max_order_count_per_min"]:
-            msg_content = "분당 주문 횟수 초과"
-            self.logger.warning(msg_content)
-            # Fire alert (fire and forget)
-            try:
-                msg = (
-                    f"⚠️ [리스크 경고]\n"
-                    f"{msg_content}\n\n"
-                    f"• 제한: {self.config['max_order_count_per_min']}회/분\n"
-                    f"• 현재: {len(self.order_count_window)}회\n"
-                    f"• 조치: 주문 거부"
-                )
-                loop = asyncio.get_running_loop()
-                loop.create_task(self._fire_alert(msg))
-            except:
-                pass
-            return False
+        count = len(self.order_count_window) + in_basket
+        if count >= config["max_order_count_per_min"]:
+            return self._reject("분당 주문 횟수 초과", f"{config['max_order_count_per_min']}회/분", f"{count}회", "주문 거부")
+
+        symbol_limit = config["max_symbol_order_count_per_min"]
+        if symbol_limit:
+            window = self.symbol_order_windows.get(signal.symbol)
+            if window:
+                self._expire(window, now)
+            count = (len(window) if window else 0) + (symbol_counts.get(signal.symbol, 0) if symbol_counts else 0)
+            if count >= symbol_limit:
+                return self._reject(f"종목별 분당 주문 횟수 초과 ({signal.symbol})", f"{symbol_limit}회/분", f"{count}회", "주문 거부")
 
         # 2. Daily Loss Limit
         daily_pnl = float(account_info.get("daily_pnl", 0))
-        total_asset = float(account_info.get("total_asset", 1))
-        
+        total_asset = float(account_info.get("total_asset", 1)) or 1.0
+
         loss_rate = -daily_pnl / total_asset
-        if loss_rate > self.config["max_daily_loss_rate"]:
-            # Only block entry (BUY), allow exit (SELL)
-            if signal.type == "BUY":
-                msg_content = "일일 손실 한도 초과"
-                self.logger.warning(msg_content)
-                try:
-                    msg = (
-                        f"⚠️ [리스크 경고]\n"
-                        f"{msg_content}\n\n"
-                        f"• 제한: {self.config['max_daily_loss_rate']*100:.1f}%\n"
-                        f"• 현재: {loss_rate*100:.2f}%\n"
-                        f"• 조치: 매수 금지"
-                    )
-                    loop = asyncio.get_running_loop()
-                    loop.create_task(self._fire_alert(msg))
-                except:
-                    pass
-                return False
-
-        # 3. Portfolio Exposure Limit (For BUY)
-        if signal.type == "BUY":
-            current_cash = float(account_info.get("deposit", 0))
-            if current_cash < 0: 
-                return False
-                
-            # Exposure = (Total Asset - Cash) / Total Asset
-            exposure = (total_asset - current_cash) / total_asset
-            if exposure > self.config["max_portfolio_exposure"]:
-                msg_content = "포트폴리오 비중 한도 초과"
-                self.logger.warning(msg_content)
-                try:
-                    msg = (
-                        f"⚠️ [리스크 경고]\n"
-                        f"{msg_content}\n\n"
-                        f"• 제한: {self.config['max_portfolio_exposure']*100:.1f}%\n"
-                        f"• 현재: {exposure*100:.2f}%\n"
-                        f"• 조치: 매수 금지"
-                    )
-                    loop = asyncio.get_running_loop()
-                    loop.create_task(self._fire_alert(msg))
-                except:
-                    pass
-                return False
+        # Only block entry (BUY), allow exit (SELL)
+        if signal.type != "BUY":
+            return True
+        if loss_rate > config["max_daily_loss_rate"]:
+            return self._reject("일일 손실 한도 초과", f"{config['max_daily_loss_rate']*100:.1f}%", f"{loss_rate*100:.2f}%", "매수 금지")
 
+        # 3. Portfolio Exposure Limit
+        current_cash = float(account_info.get("deposit", 0))
+        if current_cash < 0:
+            return False
+        # Exposure = (Total Asset - Cash) / Total Asset
+        exposure = (total_asset - current_cash + pending.get(("portfolio", None), 0.0)) / total_asset
+        if exposure > config["max_portfolio_exposure"]:
+            return self._reject("포트폴리오 비중 한도 초과", f"{config['max_portfolio_exposure']*100:.1f}%", f"{exposure*100:.2f}%", "매수 금지")
+
+        # 4. Symbol / Market / Strategy Exposure (projected with this order)
+        notional = signal.price * quantity
+        for key in self._exposure_keys(signal):
+            kind, name = key
+            limit = config[f"max_{kind}_exposure"]
+            if not limit:
+                continue
+            current = getattr(self, f"{kind}_exposure").get(name, 0.0) + pending.get(key, 0.0)
+            projected = (current + notional) / total_asset
+            if projected > limit:
+                return self._reject(f"{EXPOSURE_LABELS[kind]} 비중 한도 초과 ({name})", f"{limit*100:.1f}%", f"{projected*100:.2f}%", "매수 금지")
         return True
 
-    def record_order(self):
+    def _exposure_keys(self, signal: Signal):
+        return (
+            ("symbol", signal.symbol),
+            ("market", self.markets.get(signal.symbol, "UNKNOWN")),
+            ("strategy", signal.strategy_id)
+        )
+
+    def record_order(self, symbol: Optional[str] = None) -> float:
         """
         Call this when an order is actually sent.
+        Returns the recorded timestamp (for release_order).
         """
-        self.order_count_window.append(datetime.now())
+        now = time.monotonic()
+        self.order_count_window.append(now)
+        if symbol is not None:
+            self.symbol_order_windows[symbol].append(now)
+        return now
 
-    def _clean_order_window(self, now: datetime):
+    def release_order(self, recorded_at: float, symbol: Optional[str] = None):
+        """Take back a record_order whose order was not sent after all."""
+        windows = [self.order_count_window]
+        if symbol is not None and symbol in self.symbol_order_windows:
+            windows.append(self.symbol_order_windows[symbol])
+        for window in windows:
+            try:
+                window.remove(recorded_at)
+            except ValueError:
+                pass # Already expired
+
+    def _clean_order_window(self, now: float):
         """
         Remove orders older than 1 minute.
         """
-        cutoff = now.timestamp() - 60
-        self.order_count_window = [t for t in self.order_count_window if t.timestamp() > cutoff]
+        self._expire(self.order_count_window, now)
+
+    @staticmethod
+    def _expire(window: deque, now: float):
+        cutoff = now - 60
+        while window and window[0] <= cutoff:
+            window.popleft()
+
+    def on_fill(self, symbol: str, side: str, qty: int, price: float, strategy_id: Optional[str] = None):
+        """Update exposure aggregates with an execution (O(1))."""
+        self.on_quote(symbol, price)
+        holdings = self._holdings.setdefault(symbol, {})
+        delta = qty if side == "BUY" else -min(qty, holdings.get(strategy_id, 0))
+        if side != "BUY" and delta == 0:
+            # Sold by another strategy's attribution (or untracked): reduce the largest holder
+            holder = max(holdings, key=holdings.get, default=None)
+            if holder is None:
+                return
+            strategy_id, delta = holder, -min(qty, holdings[holder])
+        holdings[strategy_id] = holdings.get(strategy_id, 0) + delta
+        if holdings[strategy_id] == 0:
+            del holdings[strategy_id]
+        self._add_exposure(symbol, strategy_id, delta * price)
+        if not holdings:
+            del self._holdings[symbol]
+
+    def on_quote(self, symbol: str, price: float):
+        """Re-mark a held symbol's exposure (O(strategies holding it))."""
+        last = self._marks.get(symbol)
+        self._marks[symbol] = price
+        holdings = self._holdings.get(symbol)
+        if not holdings or last is None or price == last:
+            return
+        move = price - last
+        for strategy_id, qty in holdings.items():
+            self._add_exposure(symbol, strategy_id, qty * move)
+
+    def load_positions(self, positions: Dict[str, Dict[str, Any]]):
+        """Reset aggregates from account positions (symbol -> {qty, current_price}); strategy unknown."""
+        for table in (self.symbol_exposure, self.market_exposure, self.strategy_exposure):
+            table.clear()
+        self._holdings.clear()
+        for symbol, pos in positions.items():
+            qty = int(pos.get("qty", 0))
+            price = float(pos.get("current_price", 0) or pos.get("avg_price", 0))
+            if qty > 0:
+                self._marks[symbol] = price
+                self._holdings[symbol] = {None: qty}
+                self._add_exposure(symbol, None, qty * price)
+
+    def _add_exposure(self, symbol: str, strategy_id: Optional[str], amount: float):
+        self.symbol_exposure[symbol] += amount
+        self.market_exposure[self.markets.get(symbol, "UNKNOWN")] += amount
+        self.strategy_exposure[strategy_id] += amount
@@ -1,29 +1,131 @@
 import asyncio
-from datetime import datetime, time, timedelta
-from typing import List, Dict, Any, Callable, Awaitable
+import heapq
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Callable, Awaitable, Optional, Set, Tuple
 from core.logger import get_logger
 from data.market_schedule import market_schedule
 
+CATCH_UP_POLICIES = ("skip", "once", "all")
+
+class CronExpression:
+    """
+    Standard 5-field cron expression: minute hour day-of-month month day-of-week.
+    Fields accept *, numbers, lists (1,15), ranges (1-5) and steps (*/5, 9-15/2).
+    Day of week is 0-6 from Sunday (7 is Sunday too). When both day fields are
+    restricted, a day matches either of them (as in cron).
+    """
+    FIELDS = (("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 7))
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: '{expression}'")
+        values = [self._parse(part, low, high) for part, (_, low, high) in zip(parts, self.FIELDS)]
+        self.minutes, self.hours, self.days, self.months, weekdays = (sorted(v) for v in values)
+        self.weekdays = {d % 7 for d in weekdays}
+        self._any_day = parts[2] == "*"
+        self._any_weekday = parts[4] == "*"
+
+    @staticmethod
+    def _parse(part: str, low: int, high: int) -> set:
+        values = set()
+        for item in part.split(","):
+            body, _, step = item.partition("/")
+            if body == "*":
+                start, end = low, high
+            elif "-" in body:
+                start, end = (int(x) for x in body.split("-"))
+            else:
+                start = end = int(body)
+                if step:
+                    end = high
+            if not (low <= start <= end <= high):
+                raise ValueError(f"Cron field out of range: '{part}'")
+            values.update(range(start, end + 1, int(step) if step else 1))
+        return values
+
+    def _day_matches(self, t: datetime) -> bool:
+        day_ok = t.day in self.days
+        weekday_ok = (t.weekday() + 1) % 7 in self.weekdays # Python: Monday=0, cron: Sunday=0
+        if self._any_day or self._any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, after: datetime) -> datetime:
+        """First matching minute strictly after `after`."""
+        t = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t + timedelta(days=366 * 5)
+        while t < limit:
+            if t.month not in self.months:
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+                continue
+            if not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+                continue
+            minute = next((m for m in self.minutes if m >= t.minute), None)
+            if minute is None:
+                t = t.replace(minute=0) + timedelta(hours=1)
+                continue
+            return t.replace(minute=minute)
+        raise ValueError(f"Cron expression never matches: '{self.expression}'")
+
+@dataclass(eq=False)
+class ScheduledJob:
+    """A registered task (handle for Scheduler.cancel)."""
+    name: str
+    callback: Callable[[], Awaitable[None]]
+    interval: Optional[float] = None # Interval job: seconds (loop clock)
+    cron: Optional[CronExpression] = None # Cron job (wall clock)
+    catch_up: str = "once"
+    jitter: float = 0.0
+    max_concurrent: int = 1
+    next_run: float = 0.0 # Un-jittered due time (loop time / wall timestamp)
+    running: int = 0
+    runs: int = 0
+    skipped: int = 0
+    cancelled: bool = False
+    seq: int = field(default=0, repr=False)
+
 class Scheduler:
     """
     Asyncio-based lightweight scheduler.
     Handles:
     - Interval tasks (every N seconds)
-    - Cron-like tasks (at HH:MM)
+    - Cron tasks (5-field expressions, e.g. "40 15 * * 1-5")
     - Market Event monitoring
+
+    Due times sit in two min-heaps: interval jobs on the event loop clock, cron jobs on the
+    wall clock. The loop sleeps until the earliest due time (or until an earlier job is
+    registered), so idle cost does not depend on the number of jobs. The wall clock is
+    re-read at least every loop_sleep_time to notice clock jumps and suspends.
+
+    Per job:
+    - catch_up: what to do with runs missed by more than misfire_grace (process stalled,
+      machine asleep): "skip" them, run "once", or run "all" of them back to back.
+    - jitter: random delay up to N seconds added to each run (spreads per-symbol timers).
+    - max_concurrent: runs still in progress at this count make the next run skip.
     """
     def __init__(self):
         self.logger = get_logger("Scheduler")
         self._running = False
         self._task = None
-        
-        self.interval_tasks: List[Dict[str, Any]] = []
-        self.cron_tasks: List[Dict[str, Any]] = []
-        
-        # State for cron tasks to avoid double execution in the same minute
-        self.last_cron_run = {} # task_id -> date_str
-        
-        self.loop_sleep_time = 1.0 # Configurable for testing
+
+        self.jobs: Set[ScheduledJob] = set()
+        self._timers: List[Tuple[float, int, ScheduledJob]] = [] # (due loop time, seq, job)
+        self._cron_timers: List[Tuple[float, int, ScheduledJob]] = [] # (due wall timestamp, seq, job)
+        self._seq = 0
+        self._wakeup = asyncio.Event() # An earlier due time was pushed
+
+        self.loop_sleep_time = 30.0 # Longest sleep between wall clock checks (configurable for testing)
+        self.misfire_grace = 5.0 # seconds late before a run counts as missed
+        self.max_catch_up_runs = 100 # Cap for catch_up="all"
 
     async def start(self):
         """Start the scheduler loop."""
@@ -43,62 +145,137 @@ class Scheduler:
                 pass
         self.logger.info("Scheduler Stopped")
 
-    def register_interval(self, interval_seconds: int, callback: Callable[[], Awaitable[None]], name: str = "Task"):
-        """Register a task to run every N seconds."""
-        self.interval_tasks.append({
-            "interval": interval_seconds,
-            "callback": callback,
-            "name": name,
-            "last_run": 0 # timestamp
-        })
+    def register_interval(self, interval_seconds: float, callback: Callable[[], Awaitable[None]], name: str = "Task",
+                          catch_up: str = "once", jitter: float = 0.0, max_concurrent: int = 1,
+                          first_run: float = 0.0) -> ScheduledJob:
+        """Register a task to run every N seconds (first run after first_run seconds)."""
+        job = self._make_job(name, callback, catch_up, jitter, max_concurrent, interval=interval_seconds)
+        job.next_run = self._loop_time() + first_run
+        self._push(job)
         self.logger.info(f"Registered Interval Task: {name} (every {interval_seconds}s)")
+        return job
 
-    def register_cron(self, hour: int, minute: int, callback: Callable[[], Awaitable[None]], name: str = "Task"):
+    def register_cron(self, hour: int, minute: int, callback: Callable[[], Awaitable[None]], name: str = "Task",
+                      **options) -> ScheduledJob:
         """Register a task to run daily at HH:MM."""
-        task_id = f"{name}_{hour}_{minute}"
-        self.cron_tasks.append({
-            "hour": hour,
-            "minute": minute,
-            "callback": callback,
-            "name": name,
-            "id": task_id
-        })
-        self.logger.info(f"Registered Cron Task: {name} (at {hour:02d}:{minute:02d})")
+        return self.register_cron_expression(f"{minute} {hour} * * *", callback, name, **options)
+
+    def register_cron_expression(self, expression: str, callback: Callable[[], Awaitable[None]], name: str = "Task",
+                                 catch_up: str = "once", jitter: float = 0.0, max_concurrent: int = 1) -> ScheduledJob:
+        """Register a task on a cron expression (see CronExpression)."""
+        job = self._make_job(name, callback, catch_up, jitter, max_concurrent, cron=CronExpression(expression))
+        job.next_run = job.cron.next_after(datetime.now()).timestamp()
+        self._push(job)
+        self.logger.info(f"Registered Cron Task: {name} ({expression})")
+        return job
+
+    def cancel(self, job: ScheduledJob):
+        """Unregister a job (its heap entry is dropped when it comes due)."""
+        job.cancelled = True
+        self.jobs.discard(job)
+
+    def _make_job(self, name, callback, catch_up, jitter, max_concurrent, **kind) -> ScheduledJob:
+        if catch_up not in CATCH_UP_POLICIES:
+            raise ValueError(f"catch_up must be one of {CATCH_UP_POLICIES}")
+        job = ScheduledJob(name=name, callback=callback, catch_up=catch_up, jitter=jitter,
+                           max_concurrent=max_concurrent, **kind)
+        self.jobs.add(job)
+        return job
+
+    @staticmethod
+    def _loop_time() -> float:
+        try:
+            return asyncio.get_running_loop().time()
+        except RuntimeError:
+            return time.monotonic() # Same clock as the default event loop
+
+    def _push(self, job: ScheduledJob):
+        heap = self._cron_timers if job.cron else self._timers
+        self._seq += 1
+        job.seq = self._seq
+        due = job.next_run + (random.uniform(0, job.jitter) if job.jitter else 0.0)
+        heapq.heappush(heap, (due, job.seq, job))
+        if heap[0][2] is job:
+            self._wakeup.set()
 
     async def _loop(self):
-        """Main scheduler loop."""
+        """Main scheduler loop: run due jobs, then sleep until the next one."""
         while self._running:
             try:
-                now = datetime.now()
-                now_ts = now.timestamp()
-                
+                self._wakeup.clear()
+                loop_now = self._loop_time()
+                wall = datetime.now()
+                wall_now = wall.timestamp()
+
                 # 1. Process Interval Tasks
-                for task in self.interval_tasks:
-                    if now_ts - task["last_run"] >= task["interval"]:
-                        # Run task
-                        asyncio.create_task(self._safe_execute(task["callback"], task["name"]))
-                        task["last_run"] = now_ts
+                while self._timers and self._timers[0][0] <= loop_now:
+                    due, seq, job = heapq.heappop(self._timers)
+                    if not job.cancelled and seq == job.seq:
+                        self._fire(job, due, loop_now, wall)
 
                 # 2. Process Cron Tasks
-                for task in self.cron_tasks:
-                    if now.hour == task["hour"] and now.minute == task["minute"]:
-                        today_str = now.strftime("%Y-%m-%d")
-                        # Check if already ran today
-                        if self.last_cron_run.get(task["id"]) != today_str:
-                            asyncio.create_task(self._safe_execute(task["callback"], task["name"]))
-                            self.last_cron_run[task["id"]] = today_str
-                
-                # 3. Market Status Check (Optional, if needed here or handled by interval task)
-                # For now, we assume MarketSchedule is checked via interval task if needed.
-                
-                await asyncio.sleep(self.loop_sleep_time) # Check every second
-                
+                while self._cron_timers and self._cron_timers[0][0] <= wall_now:
+                    due, seq, job = heapq.heappop(self._cron_timers)
+                    if not job.cancelled and seq == job.seq:
+                        self._fire(job, due, wall_now, wall)
+
+                # 3. Sleep until the next due time (re-reading the wall clock at least every loop_sleep_time)
+                timeout = self.loop_sleep_time
+                if self._timers:
+                    timeout = min(timeout, self._timers[0][0] - loop_now)
+                if self._cron_timers:
+                    timeout = min(timeout, self._cron_timers[0][0] - wall_now)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), max(timeout, 0))
+                except asyncio.TimeoutError:
+                    pass
+
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 self.logger.error(f"Scheduler Loop Error: {e}")
                 await asyncio.sleep(5) # Backoff on error
 
+    def _fire(self, job: ScheduledJob, due: float, now: float, wall: datetime):
+        """Run a due job according to its catch-up policy and schedule its next run."""
+        missed = now - due > self.misfire_grace
+        runs = 1
+        if job.cron:
+            if missed and job.catch_up == "all":
+                runs, t = 0, datetime.fromtimestamp(job.next_run)
+                while t <= wall and runs < self.max_catch_up_runs:
+                    runs += 1
+                    t = job.cron.next_after(t)
+            job.next_run = job.cron.next_after(wall).timestamp()
+        else:
+            next_run = job.next_run + job.interval
+            if next_run <= now:
+                if job.catch_up == "all":
+                    runs = min(int((now - job.next_run) // job.interval) + 1, self.max_catch_up_runs)
+                next_run = job.next_run + runs * job.interval if job.catch_up == "all" else now + job.interval
+            job.next_run = next_run
+        if missed and job.catch_up == "skip":
+            runs = 0
+            self.logger.warning(f"Task '{job.name}' missed its run ({now - due:.1f}s late), skipped")
+        self._push(job)
+
+        if runs == 0:
+            job.skipped += 1
+        elif job.running >= job.max_concurrent:
+            job.skipped += 1
+            self.logger.warning(f"Task '{job.name}' still running ({job.running}), run skipped")
+        else:
+            job.running += 1
+            asyncio.create_task(self._run_job(job, runs))
+
+    async def _run_job(self, job: ScheduledJob, runs: int):
+        try:
+            for _ in range(runs):
+                await self._safe_execute(job.callback, job.name)
+                job.runs += 1
+        finally:
+            job.running -= 1
+
     async def _safe_execute(self, callback, name):
         """Execute callback with exception handling."""
         try:
@@ -45,6 +45,11 @@ class Optimizer:
         
         results = []
         
+        # Vectorized strategies evaluate the whole grid in one pass (no process pool needed)
+        if strategy_cls.calculate_signals_batch is not BaseStrategy.calculate_signals_batch:
+            results = self._run_batch_backtest(strategy_cls, df, grid, initial_capital, commission, slippage)
+            return self._to_results_df(results)
+        
         # Helper function for parallel execution
         # Note: This must be picklable, so it might be better defined outside or as static
         
@@ -71,7 +76,13 @@ class Optimizer:
                 except Exception as e:
                     self.logger.error(f"Optimization failed for params {params}: {e}")
                     
-        # Convert to DataFrame
+        return self._to_results_df(results)
+
+    @staticmethod
+    def _to_results_df(results: List[Dict[str, Any]]) -> pd.DataFrame:
+        """
+        Convert result rows to DataFrame sorted by total return.
+        """
         results_df = pd.DataFrame(results)
         if not results_df.empty:
             # Sort by Total Return
@@ -97,8 +108,29 @@ class Optimizer:
             "slippage_rate": slippage
         })
         result = backtester.run(strategy, df)
+        return Optimizer._extract_metrics(result)
+
+    @staticmethod
+    def _run_batch_backtest(strategy_cls, df, grid, initial_capital, commission, slippage) -> List[Dict[str, Any]]:
+        """
+        Run the whole grid with EventDrivenBacktester.run_batch (single vectorized pass).
+        """
+        strategy = strategy_cls("OPT_TEST", "Unknown")
         
-        # Return only metrics to save memory
+        backtester = Backtester()
+        backtester.configure({
+            "initial_capital": initial_capital,
+            "commission_rate": commission,
+            "slippage_rate": slippage
+        })
+        batch_results = backtester.run_batch(strategy, df, grid)
+        return [{**params, **Optimizer._extract_metrics(result)} for params, result in zip(grid, batch_results)]
+
+    @staticmethod
+    def _extract_metrics(result) -> Dict[str, Any]:
+        """
+        Return only metrics to save memory.
+        """
         return {
             "total_return": result.total_return,
             "final_capital": result.final_capital,
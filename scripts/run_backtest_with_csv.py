@@ -10,6 +10,7 @@ import matplotlib.pyplot as plt
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from strategy.backtester import EventDrivenBacktester
+from strategy.panel import MarketPanel
 from strategy.strategies import VolatilityBreakoutStrategy, MovingAverageCrossoverStrategy, RSIStrategy, BollingerBandStrategy
 
 # Configuration
@@ -71,68 +72,100 @@ def get_benchmark_return_from_dict(index_data, start, end, market):
     if s == 0: return 0.0
     return (e - s) / s * 100
 
+def create_strategy(strategy_name, ticker):
+    if strategy_name == "VolatilityBreakout":
+        strategy = VolatilityBreakoutStrategy("BT_VB", ticker)
+    elif strategy_name == "RSI":
+        strategy = RSIStrategy("BT_RSI", ticker)
+    elif strategy_name == "MA":
+        strategy = MovingAverageCrossoverStrategy("BT_MA", ticker)
+    elif strategy_name == "BollingerBand":
+        strategy = BollingerBandStrategy("BT_BB", ticker)
+    else:
+        strategy = VolatilityBreakoutStrategy("BT_VB", ticker)
+        
+    strategy.initialize({})
+    return strategy
+
+def prepare_frame(group_df):
+    df = group_df.copy()
+    # Ensure columns are lowercase for backtester
+    df.columns = [c.lower() for c in df.columns]
+    return df.set_index('date').sort_index()
+
+def summarize_result(ticker, name, result, dates, index_df_dict):
+    start_date = dates[0]
+    end_date = dates[-1]
+    bench_return = get_benchmark_return_from_dict(index_df_dict, start_date, end_date, "KOSPI")
+    
+    # Add ticker info to trades
+    for t in result.trades:
+        t['ticker'] = ticker
+        t['name'] = name
+    
+    return {
+        "ticker": ticker,
+        "name": name,
+        "return": result.total_return,
+        "mdd": result.mdd,
+        "win_rate": result.win_rate,
+        "trades_count": len(result.trades),
+        "sharpe": result.sharpe_ratio,
+        "sortino": result.sortino_ratio,
+        "mdd_duration": result.max_drawdown_duration,
+        "benchmark_return": bench_return,
+        "alpha": result.total_return - bench_return,
+        "equity_curve": pd.Series(result.equity_curve, index=dates),
+        "trade_list": result.trades
+    }
+
+def run_panel_backtest(tasks, strategy_name, index_df_dict, config):
+    """
+    Whole-universe backtest in one pass: aligned (time x symbol) arrays, one signal
+    computation and one simulation for all stocks (no per-stock worker processes).
+    """
+    names = {}
+    frames = {}
+    for ticker, name, group, *_ in tasks:
+        df = prepare_frame(group)
+        if df.empty:
+            continue
+        names[ticker] = name
+        frames[ticker] = df
+    
+    panel = MarketPanel.from_frames(frames)
+    print(f"Panel: {panel.shape[0]} bars x {panel.shape[1]} stocks", flush=True)
+    
+    backtester = EventDrivenBacktester()
+    backtester.configure(config)
+    panel_results = backtester.run_panel(create_strategy(strategy_name, "UNIVERSE"), panel)
+    
+    results = []
+    for ticker, result in panel_results.items():
+        # Equity covers the stock's own (valid) bars
+        dates = panel.to_frame(ticker).index
+        results.append(summarize_result(ticker, names[ticker], result, dates, index_df_dict))
+    return results
+
 def run_single_backtest(args):
     ticker, name, group_df, strategy_name, index_df_dict, config = args
     
     try:
         # Preprocess
-        df = group_df.copy()
-        # Ensure columns are lowercase for backtester
-        df.columns = [c.lower() for c in df.columns]
-        df = df.set_index('date').sort_index()
+        df = prepare_frame(group_df)
         
         if df.empty:
             return None
             
-        start_date = df.index[0]
-        end_date = df.index[-1]
-        
         # Initialize Strategy
-        if strategy_name == "VolatilityBreakout":
-            strategy = VolatilityBreakoutStrategy("BT_VB", ticker)
-        elif strategy_name == "RSI":
-            strategy = RSIStrategy("BT_RSI", ticker)
-        elif strategy_name == "MA":
-            strategy = MovingAverageCrossoverStrategy("BT_MA", ticker)
-        elif strategy_name == "BollingerBand":
-            strategy = BollingerBandStrategy("BT_BB", ticker)
-        else:
-            strategy = VolatilityBreakoutStrategy("BT_VB", ticker)
-            
-        strategy.initialize({}) 
+        strategy = create_strategy(strategy_name, ticker)
         
         # Run Backtest
         backtester = EventDrivenBacktester()
         backtester.configure(config)
-        
-        # Calculate Signals
-        df_signals = strategy.calculate_signals(df) 
-
         result = backtester.run(strategy, df)
         
-        # Benchmark
-        bench_return = get_benchmark_return_from_dict(index_df_dict, start_date, end_date, "KOSPI")
-        
-        # Add ticker info to trades
-        for t in result.trades:
-            t['ticker'] = ticker
-            t['name'] = name
-        
-        return {
-            "ticker": ticker,
-            "name": name,
-            "return": result.total_return,
-            "mdd": result.mdd,
-            "win_rate": result.win_rate,
-            "trades_count": len(result.trades),
-            "sharpe": result.sharpe_ratio,
-            "sortino": result.sortino_ratio,
-            "mdd_duration": result.max_drawdown_duration,
-            "benchmark_return": bench_return,
-            "alpha": result.total_return - bench_return,
-            "equity_curve": pd.Series(result.equity_curve, index=df_signals.index),
-            "trade_list": result.trades
-        }
+        return summarize_result(ticker, name, result, df.index, index_df_dict)
         
     except Exception as e:
         return None
@@ -144,6 +177,7 @@ def main():
     parser.add_argument("--workers", type=int, default=cpu_count(), help="Number of worker processes")
     parser.add_argument("--commission", type=float, default=0.00015, help="Commission rate (0.00015 = 0.015%)")
     parser.add_argument("--slippage", type=float, default=0.0005, help="Slippage rate (0.0005 = 0.05%)")
+    parser.add_argument("--panel", action="store_true", help="Run all stocks in one vectorized panel pass")
     args = parser.parse_args()
     
     print(f"Starting Backtest: {args.strategy}")
@@ -175,15 +209,18 @@ def main():
         tasks.append((ticker, name, group, args.strategy, index_data_dict, backtest_config))
         count += 1
         
-    print(f"Processing {len(tasks)} stocks with {args.workers} workers...")
-    
     results = []
-    with Pool(processes=args.workers) as pool:
-        for i, res in enumerate(pool.imap_unordered(run_single_backtest, tasks)):
-            if res:
-                results.append(res)
-            if (i+1) % 100 == 0:
-                print(f"Done {i+1}/{len(tasks)}", flush=True)
+    if args.panel:
+        print(f"Processing {len(tasks)} stocks in panel mode...")
+        results = run_panel_backtest(tasks, args.strategy, index_data_dict, backtest_config)
+    else:
+        print(f"Processing {len(tasks)} stocks with {args.workers} workers...")
+        with Pool(processes=args.workers) as pool:
+            for i, res in enumerate(pool.imap_unordered(run_single_backtest, tasks)):
+                if res:
+                    results.append(res)
+                if (i+1) % 100 == 0:
+                    print(f"Done {i+1}/{len(tasks)}", flush=True)
                 
     if not results:
         print("No results.")
@@ -4,6 +4,7 @@ import pandas as pd
 import numpy as np
 from typing import Any, Dict, List, Optional
 from core.logger import get_logger
+from strategy.model_export import AffineScaler, load_artifact, read_metadata
 
 # Optional imports for AI frameworks
 try:
@@ -21,24 +22,42 @@ except ImportError:
 class AIEngine:
     """
     AI Engine for managing models and performing inference.
-    Supports PyTorch (.pt) and Scikit-learn (.pkl) models.
+    Supports PyTorch (.pt) and Scikit-learn (.pkl) models, and the CPU-optimized
+    artifacts of strategy.model_export.
+
+    A model scores a window of the last `window` feature rows (1 = a single row).
+    predict() scores the latest window; predict_batch() scores every window of a history
+    in chunks of batch_size, from a strided view over the features scaled once.
     """
     def __init__(self):
         self.logger = get_logger("AIEngine")
         self.models: Dict[str, Any] = {}
         self.scalers: Dict[str, Any] = {}
         self.feature_configs: Dict[str, List[str]] = {}
+        self.windows: Dict[str, int] = {} # model_name -> rows per input (default 1)
+        self.batch_size = 4096 # windows per forward pass in predict_batch
 
-    def load_model(self, model_name: str, model_path: str, scaler_path: Optional[str] = None, feature_config: Optional[List[str]] = None):
+    def load_model(self, model_name: str, model_path: str, scaler_path: Optional[str] = None,
+                   feature_config: Optional[List[str]] = None, window: Optional[int] = None):
         """
         Load a model from disk.
+        window: rows per input; > 1 feeds (batch, window, features) sequences (e.g. LSTM).
+
+        Artifacts from strategy.model_export (.pt TorchScript or .npy compiled trees) carry a
+        <name>.meta.json sidecar; its feature config, scaler and window apply unless given here.
+        Compiled trees are memory-mapped.
         """
         if not os.path.exists(model_path):
             self.logger.error(f"Model file not found: {model_path}")
             return
 
         try:
-            if model_path.endswith(".pt"):
+            metadata = read_metadata(model_path)
+            if metadata:
+                self.models[model_name] = load_artifact(model_path, metadata)
+                self.logger.info(f"Loaded {metadata['kind']} artifact v{metadata.get('version')}: {model_name}")
+
+            elif model_path.endswith(".pt"):
                 if not TORCH_AVAILABLE:
                     self.logger.error("PyTorch is not installed.")
                     return
@@ -60,10 +79,16 @@ class AIEngine:
             if scaler_path and os.path.exists(scaler_path):
                 self.scalers[model_name] = joblib.load(scaler_path)
                 self.logger.info(f"Loaded Scaler for {model_name}")
+            elif metadata and metadata.get("scaler"):
+                self.scalers[model_name] = AffineScaler.from_dict(metadata["scaler"])
 
             # Set Feature Config
+            if metadata:
+                feature_config = feature_config or metadata.get("feature_config")
+                window = window or metadata.get("window")
             if feature_config:
                 self.feature_configs[model_name] = feature_config
+            self.windows[model_name] = window or 1
 
         except Exception as e:
             self.logger.error(f"Failed to load model {model_name}: {e}")
@@ -90,47 +115,87 @@ class AIEngine:
             
         return features
 
+    def prepare_input(self, df: pd.DataFrame, model_name: str) -> np.ndarray:
+        """
+        One model input from the latest rows of df: (features,) for row models,
+        (window, features) for window models.
+        """
+        window = self.windows.get(model_name, 1)
+        if len(df) < window:
+            raise ValueError(f"{model_name} needs {window} rows, got {len(df)}")
+        features = self.preprocess(df.iloc[-window:], model_name)
+        return np.asarray(features, dtype=np.float32)[0 if window == 1 else slice(None)]
+
     def predict(self, df: pd.DataFrame, model_name: str) -> float:
         """
         Perform inference and return prediction score (0.0 ~ 1.0).
         Assumes binary classification (Up/Down) or regression.
+        Scores the latest window of df (the last row for row models).
         """
         if model_name not in self.models:
             self.logger.error(f"Model {model_name} not loaded.")
             return 0.0
 
         try:
-            model = self.models[model_name]
-            input_data = self.preprocess(df, model_name)
-            
-            # Inference
-            if isinstance(model, torch.jit.ScriptModule) or (TORCH_AVAILABLE and isinstance(model, torch.nn.Module)):
-                with torch.no_grad():
-                    tensor_input = torch.tensor(input_data, dtype=torch.float32)
-                    output = model(tensor_input)
-                    # Assuming output is probability or logit
-                    if output.shape[1] == 1:
-                        return float(torch.sigmoid(output).item())
-                    else:
-                        return float(torch.softmax(output, dim=1)[0][1].item()) # Prob of class 1
-            
-            elif hasattr(model, "predict_proba"):
-                # Scikit-learn Classifier
-                prob = model.predict_proba(input_data)
-                return float(prob[0][1]) # Prob of class 1
-            
-            elif hasattr(model, "predict"):
-                # Scikit-learn Regressor
-                return float(model.predict(input_data)[0])
-            
-            else:
-                self.logger.error(f"Unknown model type for {model_name}")
-                return 0.0
+            input_data = self.prepare_input(df, model_name)[np.newaxis]
+            return float(self.infer(self.models[model_name], input_data)[0])
 
         except Exception as e:
             self.logger.error(f"Inference failed for {model_name}: {e}")
             return 0.0
 
+    def predict_batch(self, df: pd.DataFrame, model_name: str, batch_size: Optional[int] = None) -> np.ndarray:
+        """
+        Score every row of a history at once (e.g. an ai_score column for a backtest).
+        Row i is scored on the window ending at row i; rows before the first full window are NaN.
+        Features are selected and scaled once, windows are a strided view of them (no copy)
+        and inference runs in chunks of batch_size windows.
+        """
+        scores = np.full(len(df), np.nan)
+        if model_name not in self.models:
+            self.logger.error(f"Model {model_name} not loaded.")
+            return scores
+
+        window = self.windows.get(model_name, 1)
+        if len(df) < window:
+            return scores
+        try:
+            features = np.ascontiguousarray(self.preprocess(df, model_name), dtype=np.float32)
+            if window > 1:
+                # (rows - window + 1, window, features) view over the same buffer (read only by the model;
+                # writeable so torch can wrap it without a copy)
+                windows = np.lib.stride_tricks.sliding_window_view(features, window, axis=0, writeable=True).transpose(0, 2, 1)
+            else:
+                windows = features
+            model = self.models[model_name]
+            batch_size = batch_size or self.batch_size
+            out = scores[window - 1:]
+            for start in range(0, len(windows), batch_size):
+                out[start:start + batch_size] = self.infer(model, windows[start:start + batch_size])
+        except Exception as e:
+            self.logger.error(f"Batch inference failed for {model_name}: {e}")
+        return scores
+
+    def infer(self, model: Any, inputs: np.ndarray) -> np.ndarray:
+        """Scores for a batch: (n, features) rows or (n, window, features) windows."""
+        if TORCH_AVAILABLE and isinstance(model, (torch.jit.ScriptModule, torch.nn.Module)):
+            with torch.inference_mode():
+                output = model(torch.as_tensor(inputs, dtype=torch.float32))
+                # Assuming output is probability or logit
+                if output.ndim == 1 or output.shape[1] == 1:
+                    return torch.sigmoid(output).reshape(-1).numpy()
+                return torch.softmax(output, dim=1)[:, 1].numpy() # Prob of class 1
+
+        if inputs.ndim == 3:
+            inputs = inputs.reshape(len(inputs), -1) # Flattened window for tabular models
+        if hasattr(model, "predict_proba"):
+            # Scikit-learn Classifier
+            return np.asarray(model.predict_proba(inputs))[:, 1] # Prob of class 1
+        if hasattr(model, "predict"):
+            # Scikit-learn Regressor
+            return np.asarray(model.predict(inputs), dtype=float).reshape(-1)
+        raise TypeError(f"Unknown model type: {type(model).__name__}")
+
     def train_model(self, model_name: str, data: pd.DataFrame, target_col: str, model_type: str = "sklearn_rf"):
         """
         Train a new model and save it.
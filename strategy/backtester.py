@@ -1,10 +1,17 @@
+import os
+import json
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List
-from strategy.base_strategy import StrategyInterface, Signal
+from typing import Dict, Any, List, Optional, Iterable
+from strategy.base_strategy import StrategyInterface, BaseStrategy, Signal
+from strategy.panel import MarketPanel, compact_rows
 from strategy.position_sizer import PositionSizer
+from execution.execution_simulator import ExecutionSimulator, L2Book, FEE_RATE_BUY, FEE_RATE_SELL
 from core.logger import get_logger
 
+NS_PER_MINUTE = 60_000_000_000
+NS_PER_DAY = 86_400_000_000_000
+
 class BacktestResult:
     def __init__(self):
         self.trades = []
@@ -30,6 +37,13 @@ class EventDrivenBacktester:
         self.use_tick_data = False # Default to 1m bars
         self.latency_ticks = 1
         self.impact_cost_factor = 0.0001
+        # Tick mode: intrabar exits (disabled when 0) and streaming chunk size
+        self.take_profit = 0.0 # %
+        self.stop_loss = 0.0 # %
+        self.time_exit = 0 # minutes
+        self.tick_chunk_size = 1_000_000
+        # L2 mode: seconds from bar close until the order reaches the book (exchange time)
+        self.l2_latency = 0.0
 
     def configure(self, config: Dict[str, Any]):
         self.initial_capital = config.get("initial_capital", 10_000_000)
@@ -39,12 +53,20 @@ class EventDrivenBacktester:
         # Refinement: Latency & Market Impact
         self.latency_ticks = config.get("latency_ticks", 1) # Delay in candles/ticks
         self.impact_cost_factor = config.get("impact_cost_factor", 0.0001) # Impact per 1% of volume
+        self.take_profit = config.get("take_profit", 0.0)
+        self.stop_loss = config.get("stop_loss", 0.0)
+        self.time_exit = config.get("time_exit", 0)
+        self.tick_chunk_size = config.get("tick_chunk_size", 1_000_000)
+        self.l2_latency = config.get("l2_latency", 0.0)
 
     def run(self, strategy: StrategyInterface, data: pd.DataFrame) -> BacktestResult:
         """
         Run backtest.
-        data: OHLCV DataFrame
+        data: OHLCV DataFrame (or a tick source when use_tick_data is set, see run_ticks)
         """
+        if self.use_tick_data:
+            return self.run_ticks(strategy, data)
+        
         # self.logger.info(f"Starting Backtest for {strategy.__class__.__name__}...")
         
         capital = self.initial_capital
@@ -132,65 +154,769 @@ class EventDrivenBacktester:
                     pass # Signal too late, ignore or execute at end? Ignore for now.
 
         # Finalize
-        final_equity = equity_curve[-1] if equity_curve else self.initial_capital
+        equity = pd.DataFrame({0: equity_curve}, index=df_signals.index, dtype=float)
+        return self._build_results(equity, [trades])[0]
+
+    def run_batch(self, strategy: BaseStrategy, data: pd.DataFrame, param_sets: List[Dict[str, Any]]) -> List[BacktestResult]:
+        """
+        Run one backtest per parameter set in a single vectorized pass.
+        data: OHLCV DataFrame
+        param_sets: [{"k": 0.3}, {"k": 0.5}, ...]
+        Returns BacktestResult list aligned with param_sets.
         
-        result = BacktestResult()
-        result.trades = trades
-        result.equity_curve = equity_curve
-        result.final_capital = final_equity
-        result.total_return = (final_equity - self.initial_capital) / self.initial_capital * 100
+        Signals come from strategy.calculate_signals_batch (time x params matrix) and all
+        columns are simulated together, so the cost grows with bars, not bars * params.
+        Execution rules (latency, slippage, impact, fees) are the same as run();
+        an order due on a bar with invalid price (<= 0) is dropped instead of deferred.
+        """
+        signals = strategy.calculate_signals_batch(data, param_sets)
+        closes = data['close'].to_numpy(dtype=float)[:, None]
+        volumes = data['volume'].to_numpy(dtype=float)[:, None]
         
-        # Calculate MDD & Duration
-        equity_series = pd.Series(equity_curve, index=df_signals.index)
-        rolling_max = equity_series.cummax()
-        drawdown = (equity_series - rolling_max) / rolling_max
-        result.mdd = drawdown.min() * 100 if not drawdown.empty else 0.0
-        
-        # MDD Duration (Longest time in drawdown)
-        if not drawdown.empty:
-            is_drawdown = drawdown < 0
-            # Group consecutive True values
-            # This is a bit complex in pandas, simplified approach:
-            # Count consecutive days where drawdown < 0
-            # Or just find the max duration between peaks
-            # Let's use a simpler approximation: Max days between new highs
-            high_indices = equity_series[equity_series == rolling_max].index
-            if len(high_indices) > 1:
-                durations = pd.Series(high_indices).diff().dt.days
-                result.max_drawdown_duration = durations.max()
-            else:
-                result.max_drawdown_duration = (equity_series.index[-1] - equity_series.index[0]).days
-
-        # Win Rate
-        sell_trades = [t for t in trades if t['type'] == 'SELL']
-        winning_trades = [t for t in trades if t.get('profit', 0) > 0]
-        result.win_rate = len(winning_trades) / len(sell_trades) * 100 if sell_trades else 0.0
-        
-        # Sharpe & Sortino Ratio
-        # Calculate daily returns
-        if not equity_series.empty:
-            # Resample to daily if data is intraday, or just use pct_change if daily
-            # Assuming daily data for now or taking pct_change of equity curve directly
-            # If intraday, this might be noisy. Let's resample to daily.
-            daily_equity = equity_series.resample('D').last().dropna()
-            if len(daily_equity) > 1:
-                daily_returns = daily_equity.pct_change().dropna()
+        equity, trades = self._simulate_matrix(
+            signals,
+            np.broadcast_to(closes, signals.shape),
+            np.broadcast_to(volumes, signals.shape),
+            data.index
+        )
+        return self._build_results(pd.DataFrame(equity, index=data.index), trades)
+
+    def run_panel(self, strategy: BaseStrategy, panel: MarketPanel) -> Dict[str, BacktestResult]:
+        """
+        Run an independent backtest for every symbol of the panel in a single vectorized pass.
+        Returns {symbol: BacktestResult}.
+        
+        Signals come from strategy.calculate_signals_panel (time x symbol matrix).
+        Each symbol starts with initial_capital and is simulated on its own valid bars
+        only (compacted columns), so listing gaps and halts behave exactly like run()
+        on that symbol's frame: an order due after a halted bar fills at the next bar
+        the symbol trades, and equity/metrics cover the symbol's bars.
+        """
+        signals = strategy.calculate_signals_panel(panel)
+        valid = panel.valid
+        closes = compact_rows(panel.close, valid)
+        volumes = np.nan_to_num(compact_rows(panel.volume, valid))
+        compact_signals = np.nan_to_num(compact_rows(signals.astype(float), valid)).astype(np.int8)
+        equity, trades = self._simulate_matrix(compact_signals, closes, volumes, np.arange(len(panel.index)))
+        
+        # Group symbols sharing the same bars so metrics are computed column-wise
+        results: Dict[str, BacktestResult] = {}
+        groups: Dict[bytes, List[int]] = {}
+        for j in range(len(panel.symbols)):
+            if valid[:, j].any():
+                groups.setdefault(valid[:, j].tobytes(), []).append(j)
+        
+        for cols in groups.values():
+            rows = np.flatnonzero(valid[:, cols[0]])
+            index = panel.index[rows]
+            for j in cols:
+                for trade in trades[j]:
+                    trade["time"] = index[trade["time"]] # compacted row -> bar timestamp
+            equity_df = pd.DataFrame(equity[:len(rows), cols], index=index)
+            for j, result in zip(cols, self._build_results(equity_df, [trades[j] for j in cols])):
+                results[panel.symbols[j]] = result
+        return results
+
+    def run_ticks(self, strategy: StrategyInterface, ticks) -> BacktestResult:
+        """
+        Tick-resolution backtest (run() dispatches here when use_tick_data is set).
+        ticks: TickStore (any object with iter_chunks(chunk_size)) or a tick DataFrame
+               (DatetimeIndex, 'price' or 'close' and 'volume' columns), sorted by time.
+        
+        The ticks are streamed twice in chunks of tick_chunk_size, so memory is bounded
+        by one chunk plus the 1m bars:
+        1. Ticks are aggregated into 1m OHLCV bars and strategy.calculate_signals runs on them.
+           A signal is known when its bar closes (like CANDLE_CLOSED in live trading).
+        2. The order fills at the latency_ticks-th tick after that bar close, with the same
+           slippage/impact/fee model as run(); impact uses the last closed bar's volume.
+           While holding, take_profit / stop_loss (%) and time_exit (minutes) are checked
+           on every tick and fill at the triggering tick.
+        Equity is marked to market at each 1m bar close, after the fills inside that bar.
+        """
+        bars, bar_last_tick = self._aggregate_tick_bars(self._iter_tick_chunks(ticks))
+        if bars.empty:
+            result = BacktestResult()
+            result.final_capital = self.initial_capital
+            return result
+        
+        df_signals = strategy.calculate_signals(bars)
+        signal = df_signals['signal'].to_numpy() if 'signal' in df_signals else np.zeros(len(bars))
+        signal_bars = np.flatnonzero(signal)
+        signal_side = signal[signal_bars]
+        signal_ready = bars.index.asi8[signal_bars] + NS_PER_MINUTE
+        bar_volume = bars['volume'].to_numpy(dtype=float)
+        
+        latency = max(int(self.latency_ticks), 1)
+        no_deadline = np.iinfo(np.int64).max
+        
+        capital = float(self.initial_capital)
+        position = 0
+        avg_price = 0.0
+        take_profit_price, stop_loss_price, deadline = np.inf, -np.inf, no_deadline
+        trades = []
+        # (global tick, capital, position) after each fill, for bar-close equity
+        fills = [(-1, capital, 0)]
+        
+        k = 0 # next signal
+        order_at = -1 # global tick where signal k fills (-1 until its bar close is reached)
+        offset = 0
+        for timestamps, prices, volumes in self._iter_tick_chunks(ticks):
+            n = len(timestamps)
+            pos = 0
+            while pos < n:
+                if order_at < 0 and k < len(signal_bars) and signal_ready[k] <= timestamps[-1]:
+                    order_at = offset + int(np.searchsorted(timestamps, signal_ready[k])) + latency - 1
+                stop = max(min(order_at - offset, n), pos) if order_at >= 0 else n
+                
+                # Intrabar exits up to the next order (vectorized over the segment)
+                if position > 0 and pos < stop:
+                    segment = prices[pos:stop]
+                    hit = (segment >= take_profit_price) | (segment <= stop_loss_price) | (timestamps[pos:stop] >= deadline)
+                    j = int(hit.argmax())
+                    if hit[j]:
+                        j += pos
+                        price = prices[j]
+                        reason = "TP" if price >= take_profit_price else ("SL" if price <= stop_loss_price else "TimeExit")
+                        sell_price, net_revenue = self._sell_fill(position, price, self._ref_volume(bar_volume, bar_last_tick, offset + j))
+                        capital += net_revenue
+                        trades.append({"type": "SELL", "price": sell_price, "qty": position, "time": pd.Timestamp(timestamps[j]), "profit": (sell_price - avg_price) * position, "reason": reason})
+                        position = 0
+                        avg_price = 0.0
+                        fills.append((offset + j, capital, position))
+                        pos = j + 1
+                        continue
                 
-                # Annualize factor (Crypto 365, Stock 252) -> Assuming Stock 252
-                annual_factor = np.sqrt(252)
+                pos = stop
+                if pos >= n:
+                    break
                 
-                mean_return = daily_returns.mean()
-                std_return = daily_returns.std()
+                # Signal order fill at tick pos
+                price = prices[pos]
+                ref_volume = self._ref_volume(bar_volume, bar_last_tick, offset + pos)
+                filled = False
+                if signal_side[k] == 1 and position == 0:
+                    fill = self._buy_fill(capital, price, ref_volume)
+                    if fill is not None:
+                        position, avg_price, total_cost = fill
+                        capital -= total_cost
+                        trades.append({"type": "BUY", "price": avg_price, "qty": position, "time": pd.Timestamp(timestamps[pos])})
+                        take_profit_price = avg_price * (1 + self.take_profit / 100) if self.take_profit else np.inf
+                        stop_loss_price = avg_price * (1 - self.stop_loss / 100) if self.stop_loss else -np.inf
+                        deadline = timestamps[pos] + int(self.time_exit * NS_PER_MINUTE) if self.time_exit else no_deadline
+                        fills.append((offset + pos, capital, position))
+                        filled = True
+                elif signal_side[k] == -1 and position > 0:
+                    sell_price, net_revenue = self._sell_fill(position, price, ref_volume)
+                    capital += net_revenue
+                    trades.append({"type": "SELL", "price": sell_price, "qty": position, "time": pd.Timestamp(timestamps[pos]), "profit": (sell_price - avg_price) * position, "reason": "Signal"})
+                    position = 0
+                    avg_price = 0.0
+                    fills.append((offset + pos, capital, position))
+                    filled = True
+                k += 1
+                order_at = -1
+                # A no-op signal (e.g. BUY while holding) leaves tick pos to the exit check
+                if filled:
+                    pos += 1
+            offset += n
+        
+        # Equity at each bar close = state after the last fill at or before the bar's last tick
+        fill_tick, fill_capital, fill_position = (np.array(col) for col in zip(*fills))
+        state = np.searchsorted(fill_tick, bar_last_tick, side='right') - 1
+        equity = fill_capital[state] + fill_position[state] * bars['close'].to_numpy(dtype=float)
+        return self._build_results(pd.DataFrame({0: equity}, index=bars.index), [trades])[0]
+
+    def run_l2(self, strategy: StrategyInterface, data: pd.DataFrame, book: L2Book) -> BacktestResult:
+        """
+        Backtest against recorded order-book snapshots with the paper-trading fill model:
+        orders go through ExecutionSimulator and pay FEE_RATE_BUY / FEE_RATE_SELL, as in
+        PaperExchange. commission_rate / slippage / impact do not apply: the displayed
+        depth is the impact.
+        data: 1m OHLCV bars (signals, mark to market); book: L2Book of the same symbol and period.
+        
+        A signal is submitted when its bar closes and reaches the book l2_latency seconds
+        later (exchange time). It is a market order, or a limit order at the bar's
+        'limit_price' when calculate_signals sets one (the limit then rests with a queue
+        position). Buys size to 95% of capital at the best ask (or the limit) of the first
+        snapshot at or after submission. One order is worked at a time: a new signal
+        cancels the unfilled remainder of the previous one.
+        Snapshots are only visited while an order is working (the gaps are skipped with
+        searchsorted), so the cost grows with orders, not with the number of snapshots.
+        Equity is marked to market at each bar close, after the fills up to that time.
+        """
+        df_signals = strategy.calculate_signals(data)
+        signal = df_signals['signal'].to_numpy() if 'signal' in df_signals else np.zeros(len(data))
+        limit = df_signals['limit_price'].to_numpy(dtype=float) if 'limit_price' in df_signals else np.full(len(data), np.nan)
+        signal_bars = np.flatnonzero(signal)
+        bar_close = data.index.values.astype("datetime64[ns]").view(np.int64) + NS_PER_MINUTE
+        submit_at = bar_close[signal_bars]
+        seconds = book.timestamps / 1e9
+        
+        simulator = ExecutionSimulator(self.l2_latency)
+        capital = float(self.initial_capital)
+        position = 0
+        avg_price = 0.0
+        trades = []
+        # (time ns, capital, position) after each fill, for bar-close equity
+        fills = [(np.iinfo(np.int64).min, capital, 0)]
+        working = None # order being worked: {order, entry, filled, notional, time}
+        
+        k = 0 # next signal
+        i = 0 # snapshot
+        while i < len(book):
+            # Signals whose bar closed by snapshot i are submitted
+            while k < len(signal_bars) and submit_at[k] <= book.timestamps[i]:
+                if working is not None:
+                    simulator.cancel(working["order"]["order_id"])
+                    self._close_l2_order(working, trades)
+                    working = None
+                b = signal_bars[k]
+                limit_price = limit[b]
+                qty = 0
+                if signal[b] == 1 and position == 0:
+                    reference = book.ask_px[i, 0] if limit_price != limit_price else limit_price
+                    qty = int((capital * 0.95) / reference) if reference > 0 else 0
+                elif signal[b] == -1 and position > 0:
+                    qty = position
+                if qty > 0:
+                    order = {"order_id": str(k), "symbol": "L2", "side": "BUY" if signal[b] == 1 else "SELL", "qty": qty}
+                    if limit_price == limit_price:
+                        order.update(price=limit_price, type="LIMIT")
+                    else:
+                        order.update(price=0, type="MARKET")
+                    simulator.submit(order, submit_at[k] / 1e9)
+                    working = {"order": order, "entry": avg_price, "filled": 0, "notional": 0.0, "time": 0}
+                k += 1
+            
+            if working is None:
+                if k >= len(signal_bars):
+                    break
+                i = int(np.searchsorted(book.timestamps, submit_at[k]))
+                continue
+            
+            for order, qty, price in simulator.on_book("L2", book.levels(i, "ask"), book.levels(i, "bid"), seconds[i]):
+                amount = qty * price
+                if order['side'] == "BUY":
+                    capital -= amount * (1 + FEE_RATE_BUY)
+                    avg_price = (avg_price * position + amount) / (position + qty)
+                    position += qty
+                else:
+                    capital += amount * (1 - FEE_RATE_SELL)
+                    position -= qty
+                    if position == 0:
+                        avg_price = 0.0
+                working["filled"] += qty
+                working["notional"] += amount
+                working["time"] = book.timestamps[i]
+                fills.append((int(book.timestamps[i]), capital, position))
+            if working["filled"] >= working["order"]["qty"]:
+                self._close_l2_order(working, trades)
+                working = None
+            i += 1
+        if working is not None:
+            self._close_l2_order(working, trades)
+        
+        fill_time, fill_capital, fill_position = (np.array(col) for col in zip(*fills))
+        state = np.searchsorted(fill_time, bar_close, side='right') - 1
+        equity = fill_capital[state] + fill_position[state] * data['close'].to_numpy(dtype=float)
+        return self._build_results(pd.DataFrame({0: equity}, index=data.index), [trades])[0]
+
+    @staticmethod
+    def _close_l2_order(working: Dict[str, Any], trades: List[Dict[str, Any]]):
+        """Record a finished (filled, cancelled or expired) L2 order as one trade at its average fill price."""
+        filled = working["filled"]
+        if filled == 0:
+            return
+        side = working["order"]["side"]
+        price = working["notional"] / filled
+        trade = {"type": side, "price": price, "qty": filled, "time": pd.Timestamp(working["time"])}
+        if side == "SELL":
+            trade["profit"] = (price - working["entry"]) * filled
+        trades.append(trade)
+
+    def _iter_tick_chunks(self, ticks):
+        """
+        Yield (timestamps[int64 ns], prices, volumes) chunks from a tick source.
+        """
+        if hasattr(ticks, "iter_chunks"):
+            yield from ticks.iter_chunks(self.tick_chunk_size)
+            return
+        
+        timestamps = ticks.index.values.astype("datetime64[ns]").view(np.int64)
+        prices = ticks['price' if 'price' in ticks else 'close'].to_numpy(dtype=float)
+        volumes = ticks['volume'].to_numpy(dtype=float)
+        for start in range(0, len(ticks), self.tick_chunk_size):
+            end = start + self.tick_chunk_size
+            yield timestamps[start:end], prices[start:end], volumes[start:end]
+
+    def _aggregate_tick_bars(self, chunks):
+        """
+        Aggregate streamed ticks into 1m OHLCV bars (same bucketing as DataCollector).
+        Returns (bars DataFrame indexed by minute start, global index of each bar's last tick).
+        """
+        parts = []
+        carry = None # last (possibly incomplete) bar of the previous chunk
+        offset = 0
+        for timestamps, prices, volumes in chunks:
+            n = len(timestamps)
+            if n == 0:
+                continue
+            minute = timestamps // NS_PER_MINUTE
+            starts = np.flatnonzero(np.r_[True, minute[1:] != minute[:-1]])
+            ends = np.r_[starts[1:], n] - 1
+            block = {
+                "minute": minute[starts],
+                "open": prices[starts],
+                "high": np.maximum.reduceat(prices, starts),
+                "low": np.minimum.reduceat(prices, starts),
+                "close": prices[ends],
+                "volume": np.add.reduceat(volumes, starts),
+                "last_tick": offset + ends
+            }
+            if carry is not None:
+                if carry["minute"][0] == block["minute"][0]:
+                    block["open"][0] = carry["open"][0]
+                    block["high"][0] = max(block["high"][0], carry["high"][0])
+                    block["low"][0] = min(block["low"][0], carry["low"][0])
+                    block["volume"][0] += carry["volume"][0]
+                else:
+                    parts.append(carry)
+            parts.append({key: values[:-1] for key, values in block.items()})
+            carry = {key: values[-1:] for key, values in block.items()}
+            offset += n
+        if carry is not None:
+            parts.append(carry)
+        
+        if not parts:
+            return pd.DataFrame(columns=['open', 'high', 'low', 'close', 'volume']), np.empty(0, dtype=np.int64)
+        
+        columns = {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+        index = pd.DatetimeIndex((columns.pop("minute") * NS_PER_MINUTE).astype("datetime64[ns]"))
+        last_tick = columns.pop("last_tick")
+        return pd.DataFrame(columns, index=index), last_tick
+
+    @staticmethod
+    def _ref_volume(bar_volume: np.ndarray, bar_last_tick: np.ndarray, tick: int) -> float:
+        """
+        Volume of the last closed 1m bar before the given tick (liquidity reference for impact).
+        """
+        b = int(np.searchsorted(bar_last_tick, tick))
+        return bar_volume[b - 1] if b > 0 else bar_volume[0]
+
+    def _buy_fill(self, capital: float, price: float, volume: float):
+        """
+        Buy with 95% of capital using the run() slippage/impact model.
+        Returns (shares, buy_price, cost + fee) or None if no fill.
+        """
+        est_price = price * (1 + self.slippage_rate)
+        max_shares = int((capital * 0.95) / est_price)
+        if max_shares <= 0 or volume <= 0:
+            return None
+        
+        impact = (max_shares / volume) * self.impact_cost_factor
+        buy_price = price * (1 + (self.slippage_rate + impact))
+        cost = max_shares * buy_price
+        fee = cost * self.commission_rate
+        if capital < cost + fee:
+            return None
+        return max_shares, buy_price, cost + fee
+
+    def _sell_fill(self, position: int, price: float, volume: float):
+        """
+        Sell the whole position using the run() slippage/impact model.
+        Returns (sell_price, revenue - fee).
+        """
+        volume_share = position / volume if volume > 0 else 0
+        sell_price = price * (1 - (self.slippage_rate + volume_share * self.impact_cost_factor))
+        revenue = position * sell_price
+        return sell_price, revenue - revenue * self.commission_rate
+
+    def run_stream(self, strategy: StrategyInterface, chunks: Iterable, output_dir: str, warmup_bars: int = 500, checkpoint_every: int = 10) -> BacktestResult:
+        """
+        Out-of-core backtest over an iterator of OHLCV chunks in time order.
+        chunks: DataFrames (DatetimeIndex) or dicts of equal-length arrays with a 'timestamp' key.
+        
+        - Strategy state: the last warmup_bars bars are prepended to each chunk before
+          calculate_signals, so indicators continue across chunk boundaries
+          (identical to a full run when warmup_bars exceeds the longest lookback).
+        - Account state (capital, position, orders in flight) carries across chunks;
+          execution rules are those of run_batch().
+        - equity.csv and trades.csv in output_dir are appended per chunk and metrics are
+          accumulated incrementally, so memory is bounded by chunk size + warmup_bars.
+        - Every checkpoint_every chunks (and at the end) checkpoint.json stores the state and a
+          summary. Calling run_stream again with the same output_dir and chunk sequence resumes
+          after the last checkpoint.
+        
+        Returns BacktestResult with metrics; equity_curve and trades stay on disk.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        equity_path = os.path.join(output_dir, "equity.csv")
+        trades_path = os.path.join(output_dir, "trades.csv")
+        checkpoint_path = os.path.join(output_dir, "checkpoint.json")
+        
+        state = self._load_stream_checkpoint(checkpoint_path)
+        if state is None:
+            state = {
+                "chunks_done": 0,
+                "bars_done": 0,
+                "carry": {},
+                "tail": None,
+                "metrics": {"peak": None, "mdd": 0.0, "first_ns": None, "last_ns": None, "last_high_ns": None,
+                            "highs": 0, "max_high_gap": 0, "daily": {}, "sells": 0, "wins": 0},
+                "files": {"equity": 0, "trades": 0}
+            }
+        else:
+            self.logger.info(f"Resuming stream backtest after {state['chunks_done']} chunks ({state['bars_done']} bars)")
+        
+        # Drop output written after the last checkpoint
+        for path, size in ((equity_path, state["files"]["equity"]), (trades_path, state["files"]["trades"])):
+            with open(path, "a+b") as f:
+                f.truncate(size)
+        
+        chunks = iter(chunks)
+        for _ in range(state["chunks_done"]):
+            if next(chunks, None) is None:
+                break
+        
+        for chunk in chunks:
+            frame = self._stream_frame(chunk)
+            if frame.empty:
+                continue
+            
+            # 1. Signals with warm-up history from previous chunks
+            history = frame if state["tail"] is None else pd.concat([state["tail"], frame])
+            df_signals = strategy.calculate_signals(history)
+            signals = df_signals['signal'].to_numpy()[len(history) - len(frame):] if 'signal' in df_signals else np.zeros(len(frame))
+            state["tail"] = history.iloc[-warmup_bars:] if warmup_bars > 0 else None
+            
+            # 2. Execution continuing the carried account state
+            equity, trades = self._simulate_matrix(
+                signals[:, None],
+                frame['close'].to_numpy(dtype=float)[:, None],
+                frame['volume'].to_numpy(dtype=float)[:, None],
+                frame.index,
+                carry=state["carry"]
+            )
+            equity = equity[:, 0]
+            trades = trades[0]
+            
+            # 3. Append output and update running metrics
+            pd.DataFrame({"equity": equity}, index=frame.index).to_csv(
+                equity_path, mode="a", header=state["files"]["equity"] == 0, index_label="timestamp"
+            )
+            if trades:
+                pd.DataFrame(trades, columns=["time", "type", "price", "qty", "profit"]).to_csv(
+                    trades_path, mode="a", header=state["files"]["trades"] == 0, index=False
+                )
+            state["files"] = {"equity": os.path.getsize(equity_path), "trades": os.path.getsize(trades_path)}
+            self._update_stream_metrics(state["metrics"], frame.index.asi8, equity, trades)
+            
+            state["chunks_done"] += 1
+            state["bars_done"] += len(frame)
+            if checkpoint_every and state["chunks_done"] % checkpoint_every == 0:
+                self._save_stream_checkpoint(checkpoint_path, state)
+        
+        self._save_stream_checkpoint(checkpoint_path, state)
+        return self._stream_result(state)
+
+    @staticmethod
+    def _stream_frame(chunk) -> pd.DataFrame:
+        if isinstance(chunk, pd.DataFrame):
+            return chunk
+        data = dict(chunk)
+        timestamps = np.asarray(data.pop("timestamp"))
+        if timestamps.dtype.kind != "M":
+            timestamps = timestamps.astype(np.int64)
+        return pd.DataFrame(data, index=pd.DatetimeIndex(timestamps.astype("datetime64[ns]")))
+
+    @staticmethod
+    def _update_stream_metrics(metrics: Dict[str, Any], index_ns: np.ndarray, equity: np.ndarray, trades: List[Dict[str, Any]]):
+        """
+        Same MDD / MDD duration / win rate definitions as _calculate_metrics, accumulated per chunk.
+        Daily closing equity is kept for Sharpe/Sortino (one value per day).
+        """
+        if metrics["peak"] is None:
+            metrics["peak"] = float(equity[0])
+            metrics["first_ns"] = int(index_ns[0])
+        metrics["last_ns"] = int(index_ns[-1])
+        
+        rolling_max = np.maximum.accumulate(np.r_[metrics["peak"], equity])[1:]
+        drawdown = (equity - rolling_max) / rolling_max
+        metrics["mdd"] = min(metrics["mdd"], float(drawdown.min()))
+        metrics["peak"] = float(rolling_max[-1])
+        
+        at_high = equity == rolling_max
+        high_ns = index_ns[at_high]
+        if metrics["last_high_ns"] is not None:
+            high_ns = np.r_[metrics["last_high_ns"], high_ns]
+        if len(high_ns) > 1:
+            metrics["max_high_gap"] = max(metrics["max_high_gap"], int((np.diff(high_ns) // NS_PER_DAY).max()))
+        if len(high_ns):
+            metrics["last_high_ns"] = int(high_ns[-1])
+        metrics["highs"] += int(at_high.sum())
+        
+        days = index_ns // NS_PER_DAY
+        day_close = np.flatnonzero(np.r_[days[1:] != days[:-1], True])
+        for day, value in zip(days[day_close].tolist(), equity[day_close].tolist()):
+            metrics["daily"][day] = value
+        
+        for trade in trades:
+            if trade["type"] == "SELL":
+                metrics["sells"] += 1
+                metrics["wins"] += int(trade["profit"] > 0)
+
+    def _stream_result(self, state: Dict[str, Any]) -> BacktestResult:
+        metrics = state["metrics"]
+        result = BacktestResult()
+        if metrics["peak"] is None:
+            result.final_capital = self.initial_capital
+            return result
+        
+        result.final_capital = float(state["carry"]["equity"][0])
+        result.total_return = (result.final_capital - self.initial_capital) / self.initial_capital * 100
+        result.mdd = metrics["mdd"] * 100
+        if metrics["highs"] > 1:
+            result.max_drawdown_duration = float(metrics["max_high_gap"])
+        else:
+            result.max_drawdown_duration = (metrics["last_ns"] - metrics["first_ns"]) // NS_PER_DAY
+        result.win_rate = metrics["wins"] / metrics["sells"] * 100 if metrics["sells"] else 0.0
+        
+        days = sorted(metrics["daily"])
+        daily_equity = pd.DataFrame(
+            {0: [metrics["daily"][d] for d in days]},
+            index=pd.DatetimeIndex((np.array(days, dtype=np.int64) * NS_PER_DAY).astype("datetime64[ns]"))
+        )
+        ratios = self._calculate_metrics(daily_equity)
+        result.sharpe_ratio = ratios["sharpe_ratio"][0]
+        result.sortino_ratio = ratios["sortino_ratio"][0]
+        return result
+
+    def _save_stream_checkpoint(self, path: str, state: Dict[str, Any]):
+        """
+        Atomically write the stream state (tmp file + rename) with a readable summary.
+        """
+        carry = {key: np.asarray(value).tolist() for key, value in state["carry"].items()}
+        tail = state["tail"]
+        metrics = dict(state["metrics"])
+        metrics["daily"] = sorted(metrics["daily"].items())
+        
+        equity = carry["equity"][0] if carry else self.initial_capital
+        checkpoint = {
+            "summary": {
+                "bars": state["bars_done"],
+                "last_timestamp": str(pd.Timestamp(metrics["last_ns"])) if metrics["last_ns"] is not None else None,
+                "equity": equity,
+                "return": (equity - self.initial_capital) / self.initial_capital * 100,
+                "mdd": metrics["mdd"] * 100,
+                "trades": metrics["sells"],
+            },
+            "chunks_done": state["chunks_done"],
+            "bars_done": state["bars_done"],
+            "carry": carry,
+            "tail": None if tail is None else {
+                "index": tail.index.asi8.tolist(),
+                "columns": {col: tail[col].tolist() for col in tail.columns}
+            },
+            "metrics": metrics,
+            "files": state["files"],
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, path)
+        
+        summary = checkpoint["summary"]
+        self.logger.info(f"Checkpoint: {summary['bars']} bars (to {summary['last_timestamp']}), Equity {summary['equity']:,.0f}, Return {summary['return']:.2f}%, MDD {summary['mdd']:.2f}%")
+
+    def _load_stream_checkpoint(self, path: str) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                checkpoint = json.load(f)
+        except Exception as e:
+            self.logger.error(f"Failed to read checkpoint {path}: {e}")
+            return None
+        
+        tail = checkpoint["tail"]
+        if tail is not None:
+            tail = pd.DataFrame(tail["columns"], index=pd.DatetimeIndex(np.array(tail["index"], dtype=np.int64).astype("datetime64[ns]")))
+        metrics = checkpoint["metrics"]
+        metrics["daily"] = {int(day): value for day, value in metrics["daily"]}
+        return {
+            "chunks_done": checkpoint["chunks_done"],
+            "bars_done": checkpoint["bars_done"],
+            "carry": checkpoint["carry"],
+            "tail": tail,
+            "metrics": metrics,
+            "files": checkpoint["files"],
+        }
+
+    def _simulate_matrix(self, signals: np.ndarray, closes: np.ndarray, volumes: np.ndarray, index: pd.Index, carry: Optional[Dict[str, Any]] = None):
+        """
+        Simulate independent accounts column by column, vectorized across columns.
+        signals/closes/volumes: (time x columns). Returns (equity matrix, trades per column).
+        carry: account state to continue from, updated in place at the end (used by run_stream):
+               capital / position / avg_price / equity per column and pending (signals still in flight).
+               An empty dict starts from initial_capital.
+        """
+        n, num_cols = signals.shape
+        # run() executes a signal from bar i at bar i + max(latency, 1) (FIFO, one order per bar)
+        delay = max(int(self.latency_ticks), 1)
+        
+        if carry:
+            capital = np.array(carry["capital"], dtype=float)
+            position = np.array(carry["position"], dtype=np.int64)
+            avg_price = np.array(carry["avg_price"], dtype=float)
+            previous_equity = np.array(carry["equity"], dtype=float)
+            in_flight = np.array(carry["pending"], dtype=signals.dtype).reshape(-1, num_cols)[-delay:]
+        else:
+            capital = np.full(num_cols, float(self.initial_capital))
+            position = np.zeros(num_cols, dtype=np.int64)
+            avg_price = np.zeros(num_cols)
+            previous_equity = capital.copy()
+            in_flight = np.zeros((0, num_cols), dtype=signals.dtype)
+        equity = np.empty((n, num_cols))
+        trades: List[List[Dict[str, Any]]] = [[] for _ in range(num_cols)]
+        
+        # due[i] = signal executed at bar i (the one generated delay bars earlier)
+        lead = np.zeros((delay - len(in_flight), num_cols), dtype=signals.dtype)
+        due = np.concatenate([lead, in_flight, signals])
+        has_signal = due[:n].any(axis=1)
+        
+        for i in range(n):
+            current_price = closes[i]
+            current_volume = volumes[i]
+            
+            # Skip invalid data (carry previous equity)
+            with np.errstate(invalid="ignore"):
+                valid = current_price > 0
+            
+            # Equity Calculation (Mark to Market)
+            previous = equity[i - 1] if i > 0 else previous_equity
+            equity[i] = np.where(valid, capital + current_price * position, previous)
+            
+            if not has_signal[i]:
+                continue
+            pending = due[i]
+            timestamp = index[i]
+            
+            # Buy: flat columns with pending buy
+            buy_cols = np.flatnonzero((pending == 1) & (position == 0) & valid & (current_volume > 0))
+            if buy_cols.size:
+                price = current_price[buy_cols]
+                est_price = price * (1 + self.slippage_rate)
+                max_shares = np.floor((capital[buy_cols] * 0.95) / est_price)
                 
-                if std_return != 0:
-                    result.sharpe_ratio = (mean_return / std_return) * annual_factor
+                impact = (max_shares / current_volume[buy_cols]) * self.impact_cost_factor
+                buy_price = price * (1 + (self.slippage_rate + impact))
+                cost = max_shares * buy_price
+                fee = cost * self.commission_rate
                 
-                # Sortino (Downside deviation)
-                downside_returns = daily_returns[daily_returns < 0]
-                downside_std = downside_returns.std()
+                ok = (max_shares > 0) & (capital[buy_cols] >= cost + fee)
+                for col, shares, fill_price, total in zip(buy_cols[ok], max_shares[ok], buy_price[ok], (cost + fee)[ok]):
+                    capital[col] -= total
+                    position[col] = int(shares)
+                    avg_price[col] = fill_price
+                    trades[col].append({"type": "BUY", "price": fill_price, "qty": int(shares), "time": timestamp})
+            
+            # Sell: long columns with pending sell
+            sell_cols = np.flatnonzero((pending == -1) & (position > 0) & valid)
+            if sell_cols.size:
+                qty = position[sell_cols]
+                vol = current_volume[sell_cols]
+                volume_share = np.divide(qty, vol, out=np.zeros(sell_cols.size), where=vol > 0)
+                impact = volume_share * self.impact_cost_factor
+                sell_price = current_price[sell_cols] * (1 - (self.slippage_rate + impact))
+                revenue = qty * sell_price
+                fee = revenue * self.commission_rate
+                profit = (sell_price - avg_price[sell_cols]) * qty
                 
-                if downside_std != 0:
-                    result.sortino_ratio = (mean_return / downside_std) * annual_factor
+                capital[sell_cols] += (revenue - fee)
+                position[sell_cols] = 0
+                avg_price[sell_cols] = 0.0
+                for col, price, q, p in zip(sell_cols, sell_price, qty, profit):
+                    trades[col].append({"type": "SELL", "price": price, "qty": int(q), "time": timestamp, "profit": p})
+        
+        if carry is not None:
+            carry.update(
+                capital=capital,
+                position=position,
+                avg_price=avg_price,
+                equity=equity[-1] if n else previous_equity,
+                pending=due[n:]
+            )
+        return equity, trades
 
-        # self.logger.info(f"Backtest Finished. Return: {result.total_return:.2f}%, MDD: {result.mdd:.2f}%")
-        return result
+    def _build_results(self, equity: pd.DataFrame, trades: List[List[Dict[str, Any]]]) -> List[BacktestResult]:
+        """
+        Build BacktestResult per equity column (column j pairs with trades[j]).
+        """
+        metrics = self._calculate_metrics(equity)
+        results = []
+        for j in range(equity.shape[1]):
+            result = BacktestResult()
+            result.trades = trades[j]
+            result.equity_curve = equity.iloc[:, j].tolist()
+            
+            final_equity = result.equity_curve[-1] if result.equity_curve else self.initial_capital
+            result.final_capital = final_equity
+            result.total_return = (final_equity - self.initial_capital) / self.initial_capital * 100
+            result.mdd = metrics["mdd"][j]
+            result.max_drawdown_duration = metrics["max_drawdown_duration"][j]
+            result.sharpe_ratio = metrics["sharpe_ratio"][j]
+            result.sortino_ratio = metrics["sortino_ratio"][j]
+            
+            # Win Rate
+            sell_trades = [t for t in result.trades if t['type'] == 'SELL']
+            winning_trades = [t for t in result.trades if t.get('profit', 0) > 0]
+            result.win_rate = len(winning_trades) / len(sell_trades) * 100 if sell_trades else 0.0
+            results.append(result)
+        return results
+
+    def _calculate_metrics(self, equity: pd.DataFrame) -> Dict[str, List[float]]:
+        """
+        Column-wise MDD, MDD duration, Sharpe and Sortino for an equity matrix (time x runs).
+        """
+        num_cols = equity.shape[1]
+        metrics = {
+            "mdd": [0.0] * num_cols,
+            "max_drawdown_duration": [0] * num_cols,
+            "sharpe_ratio": [0.0] * num_cols,
+            "sortino_ratio": [0.0] * num_cols,
+        }
+        if equity.empty:
+            return metrics
+        
+        # Calculate MDD & Duration
+        rolling_max = equity.cummax()
+        drawdown = (equity - rolling_max) / rolling_max
+        metrics["mdd"] = (drawdown.min() * 100).tolist()
+        
+        # MDD Duration: Max days between new highs
+        index_ns = equity.index.asi8
+        at_high = (equity == rolling_max).to_numpy()
+        for j in range(num_cols):
+            high_ns = index_ns[at_high[:, j]]
+            if len(high_ns) > 1:
+                metrics["max_drawdown_duration"][j] = float((np.diff(high_ns) // NS_PER_DAY).max())
+            else:
+                metrics["max_drawdown_duration"][j] = (equity.index[-1] - equity.index[0]).days
+        
+        # Sharpe & Sortino Ratio on daily returns
+        daily_equity = equity.resample('D').last().dropna()
+        if len(daily_equity) > 1:
+            daily_returns = daily_equity.pct_change().dropna()
+            
+            # Annualize factor (Crypto 365, Stock 252) -> Assuming Stock 252
+            annual_factor = np.sqrt(252)
+            
+            mean_return = daily_returns.mean()
+            std_return = daily_returns.std()
+            # Downside deviation
+            downside_std = daily_returns.where(daily_returns < 0).std()
+            
+            metrics["sharpe_ratio"] = np.where(std_return != 0, mean_return / std_return * annual_factor, 0.0).tolist()
+            metrics["sortino_ratio"] = np.where(downside_std != 0, mean_return / downside_std * annual_factor, 0.0).tolist()
+        
+        return metrics
@@ -2,6 +2,7 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Dict, Any, Optional, List
+import numpy as np
 import pandas as pd
 from core.logger import get_logger
 
@@ -16,6 +17,7 @@ class Signal:
     timestamp: datetime
     reason: str
     score: float = 0.0
+    strategy_id: Optional[str] = None # Emitting strategy (set by ExecutionEngine if left empty)
 
 @dataclass
 class StrategyState:
@@ -93,6 +95,7 @@ class StrategyInterface(ABC):
         pass
 
 from strategy.market_regime import MarketRegimeDetector
+from strategy.panel import MarketPanel
 
 class BaseStrategy(StrategyInterface):
     """
@@ -164,6 +167,44 @@ class BaseStrategy(StrategyInterface):
         """
         pass
 
+    def calculate_signals_batch(self, df: pd.DataFrame, param_sets: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Calculate signals for many parameter sets at once (for optimization).
+        Returns int8 matrix of shape (len(df), len(param_sets)), column j = signal of param_sets[j].
+
+        Default implementation runs calculate_signals once per parameter set.
+        Strategies whose signal is a pure function of a few scalars should override this
+        and compute shared pieces (e.g. each distinct MA window) only once.
+        """
+        signals = np.zeros((len(df), len(param_sets)), dtype=np.int8)
+        for j, params in enumerate(param_sets):
+            strategy = self.__class__(self.strategy_id, self.symbol)
+            strategy.initialize({**self.config, **params})
+            signals[:, j] = strategy.calculate_signals(df)['signal'].to_numpy()
+        return signals
+
+    def calculate_signals_panel(self, panel: MarketPanel) -> np.ndarray:
+        """
+        Calculate signals for the whole universe at once (bulk backtest / live screening).
+        Returns int8 matrix of shape panel.shape (time x symbol); invalid cells are 0.
+
+        Default implementation runs calculate_signals on each symbol's valid bars.
+        Strategies can override this with vectorized kernels from strategy.panel.
+        """
+        signals = np.zeros(panel.shape, dtype=np.int8)
+        for j, symbol in enumerate(panel.symbols):
+            rows = panel.valid[:, j]
+            if rows.any():
+                signals[rows, j] = self.calculate_signals(panel.to_frame(symbol))['signal'].to_numpy()
+        return signals
+
+    def _batch_param(self, param_sets: List[Dict[str, Any]], name: str, default: Any) -> np.ndarray:
+        """
+        Collect one parameter across param_sets as an array.
+        Missing entries fall back to default (usually the strategy's current value).
+        """
+        return np.array([params.get(name, default) for params in param_sets])
+
     async def on_realtime_data(self, data: Dict[str, Any]) -> Optional[Signal]:
         """
         Default implementation for realtime data processing.
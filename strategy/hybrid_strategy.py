@@ -1,7 +1,9 @@
 import pandas as pd
+from datetime import datetime
 from typing import Dict, Any, Optional
 from strategy.base_strategy import BaseStrategy, Signal
 from strategy.ai_engine import ai_engine
+from strategy.inference_service import inference_service
 from strategy.strategies import RSIStrategy
 
 class HybridStrategy(BaseStrategy):
@@ -9,6 +11,19 @@ class HybridStrategy(BaseStrategy):
     Hybrid Strategy: Technical Indicator (RSI) + AI Prediction.
     Buy if RSI < 30 AND AI Score > 0.6
     """
+    @classmethod
+    def get_parameter_schema(cls) -> Dict[str, Dict[str, Any]]:
+        return {
+            **RSIStrategy.get_parameter_schema(),
+            "ai_threshold": {
+                "type": "float", 
+                "min": 0.5, 
+                "max": 0.95, 
+                "default": 0.6, 
+                "desc": "AI 점수 임계값"
+            }
+        }
+
     def __init__(self, strategy_id: str, symbol: str):
         super().__init__(strategy_id, symbol)
         self.rsi_strategy = RSIStrategy(strategy_id + "_rsi", symbol)
@@ -24,25 +39,22 @@ class HybridStrategy(BaseStrategy):
         # Load Model (In real app, model path should be in config)
         model_path = config.get("model_path")
         if model_path:
-            ai_engine.load_model(self.model_name, model_path)
+            ai_engine.load_model(self.model_name, model_path, config.get("scaler_path"),
+                                 config.get("feature_columns"), config.get("model_window"))
 
     def calculate_signals(self, df: pd.DataFrame) -> pd.DataFrame:
         # 1. Get Technical Signals
         df = self.rsi_strategy.calculate_signals(df)
         
         # 2. Get AI Predictions (Batch Inference)
-        # Note: In backtesting, we might need a way to batch predict efficiently.
-        # For simplicity here, we assume AI prediction is added as a column or we iterate.
-        # Iterating row by row is slow for backtesting.
-        # Ideally, AIEngine supports batch prediction.
-        
-        # Let's assume we have a 'ai_score' column pre-calculated or we calculate it here.
-        # For demonstration, we'll simulate AI score if not present.
+        # Every bar is scored on the window ending at it (NaN during warm-up or without a model:
+        # no AI confirmation, no buy). A pre-computed 'ai_score' column is used as is.
         if 'ai_score' not in df.columns:
-            # In real scenario, we would call ai_engine.predict(df) but that expects single input usually for realtime.
-            # For backtest, we need batch_predict.
-            # Let's just use a placeholder logic for now or skip AI in backtest if model not loaded.
-            df['ai_score'] = 0.5 
+            if self.model_name in ai_engine.models:
+                df['ai_score'] = ai_engine.predict_batch(df, self.model_name)
+            else:
+                self.logger.warning(f"Model {self.model_name} not loaded: AI filter blocks all entries")
+                df['ai_score'] = float('nan')
         
         # 3. Combine
         # Buy: RSI Buy Signal (1) AND AI Score > Threshold
@@ -87,9 +99,10 @@ class HybridStrategy(BaseStrategy):
             if last_signal != 1: # Only interested in Buy for now
                 return None
                 
-            # 4. AI Prediction (Mock for now, or real if engine ready)
-            # ai_score = await ai_engine.predict_async(df) 
-            ai_score = 0.7 # Mock
+            # 4. AI Prediction
+            if self.model_name not in ai_engine.models:
+                return None
+            ai_score = await inference_service.predict(df, self.model_name) # Batched with other symbols, off the loop
             
             if ai_score > self.ai_threshold:
                 return Signal(
@@ -0,0 +1,120 @@
+import asyncio
+import bisect
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from core.logger import get_logger
+from strategy.ai_engine import AIEngine, ai_engine, TORCH_AVAILABLE
+
+if TORCH_AVAILABLE:
+    import torch
+
+class Histogram:
+    """Counts per bucket; bucket i holds values <= edges[i] (the last one everything above)."""
+    def __init__(self, edges: Sequence[float]):
+        self.edges = list(edges)
+        self.counts = [0] * (len(self.edges) + 1)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.edges, value)] += 1
+        self.total += 1
+        self.sum += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        buckets = {f"<={edge:g}": count for edge, count in zip(self.edges, self.counts)}
+        buckets[f">{self.edges[-1]:g}"] = self.counts[-1]
+        return {"count": self.total, "mean": self.sum / self.total if self.total else 0.0, "buckets": buckets}
+
+class InferenceService:
+    """
+    Micro-batching inference for live trading.
+
+    predict() is awaitable: strategies of many symbols queue their inputs per model, and a
+    batch is run when max_batch inputs are waiting or max_delay after the first one arrived,
+    whichever comes first. Batches run on a dedicated thread pool (AIEngine inference runs
+    under torch.inference_mode), with torch intra-op threads (process-wide) set to intra_op_threads,
+    so the event loop never waits for a forward pass.
+
+    stats() exposes the queue wait (ms) and batch size histograms.
+    """
+    def __init__(self, engine: AIEngine = ai_engine, max_batch: int = 64, max_delay: float = 0.002,
+                 workers: int = 1, intra_op_threads: int = 2):
+        self.logger = get_logger("InferenceService")
+        self.engine = engine
+        self.max_batch = max_batch
+        self.max_delay = max_delay # seconds the first request of a batch may wait
+        self.workers = workers
+        self.intra_op_threads = intra_op_threads
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Dict[str, List[Tuple[np.ndarray, asyncio.Future, float]]] = {} # model -> (input, future, enqueued)
+        self._timers: Dict[str, asyncio.TimerHandle] = {} # model -> deadline flush
+        self.queue_wait_ms = Histogram([0.1, 0.5, 1, 2, 5, 10, 50, 100])
+        self.batch_sizes = Histogram([1, 2, 4, 8, 16, 32, 64, 128])
+
+    async def predict(self, df: pd.DataFrame, model_name: str) -> float:
+        """Score the latest window of df (as AIEngine.predict), batched with concurrent requests."""
+        if model_name not in self.engine.models:
+            self.logger.error(f"Model {model_name} not loaded.")
+            return 0.0
+        try:
+            input_data = self.engine.prepare_input(df, model_name)
+        except Exception as e:
+            self.logger.error(f"Inference failed for {model_name}: {e}")
+            return 0.0
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault(model_name, [])
+        pending.append((input_data, future, time.perf_counter()))
+        if len(pending) >= self.max_batch:
+            self._flush(model_name)
+        elif model_name not in self._timers:
+            self._timers[model_name] = loop.call_later(self.max_delay, self._flush, model_name)
+        return await future
+
+    def _flush(self, model_name: str):
+        """Send the queued inputs of a model to the thread pool as one batch."""
+        timer = self._timers.pop(model_name, None)
+        if timer:
+            timer.cancel()
+        batch = self._pending.pop(model_name, [])
+        if not batch:
+            return
+        now = time.perf_counter()
+        for _, _, enqueued in batch:
+            self.queue_wait_ms.observe((now - enqueued) * 1000)
+        self.batch_sizes.observe(len(batch))
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="inference", initializer=self._init_worker)
+        inputs = np.stack([input_data for input_data, _, _ in batch])
+        task = asyncio.get_running_loop().run_in_executor(self._executor, self.engine.infer, self.engine.models[model_name], inputs)
+        task.add_done_callback(lambda done: self._resolve(model_name, batch, done))
+
+    def _init_worker(self):
+        if TORCH_AVAILABLE:
+            torch.set_num_threads(self.intra_op_threads)
+
+    def _resolve(self, model_name: str, batch, done: asyncio.Future):
+        try:
+            scores = done.result()
+        except Exception as e:
+            self.logger.error(f"Inference failed for {model_name}: {e}")
+            scores = np.zeros(len(batch))
+        for (_, future, _), score in zip(batch, scores):
+            if not future.done():
+                future.set_result(float(score))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"queue_wait_ms": self.queue_wait_ms.snapshot(), "batch_size": self.batch_sizes.snapshot()}
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+inference_service = InferenceService()
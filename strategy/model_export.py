@@ -0,0 +1,269 @@
+import json
+import os
+import warnings
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+try:
+    import torch
+    TORCH_AVAILABLE = True
+except ImportError:
+    TORCH_AVAILABLE = False
+
+FORMAT_VERSION = 1 # Bump when the sidecar or artifact layout changes
+
+def _node_dtype(count: int) -> np.dtype:
+    # One record of whole-column fields: every column is contiguous (fast gathers), one file to map
+    return np.dtype([("feature", "<i8", (count,)), ("children", "<i8", (count, 2)),
+                     ("threshold", "<f8", (count,)), ("value", "<f8", (count,))])
+
+def metadata_path(model_path: str) -> str:
+    """Sidecar of an artifact: models/lstm.pt -> models/lstm.meta.json"""
+    return os.path.splitext(model_path)[0] + ".meta.json"
+
+def read_metadata(model_path: str) -> Optional[Dict[str, Any]]:
+    """Sidecar of model_path (None if there is none). Rejects artifacts from a newer format."""
+    path = metadata_path(model_path)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        metadata = json.load(f)
+    if metadata.get("format_version", 0) > FORMAT_VERSION:
+        raise ValueError(f"{model_path} has format version {metadata['format_version']}, "
+                         f"this build reads up to {FORMAT_VERSION}")
+    return metadata
+
+def _write_metadata(model_path: str, metadata: Dict[str, Any]):
+    path = metadata_path(model_path)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=2)
+    os.replace(tmp, path)
+
+class AffineScaler:
+    """
+    Feature scaling as x * scale + offset (StandardScaler / MinMaxScaler fitted state),
+    so the sidecar carries the scaler as plain numbers instead of a pickle.
+    """
+    def __init__(self, scale, offset):
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.offset = np.asarray(offset, dtype=np.float64)
+
+    def transform(self, X) -> np.ndarray:
+        return np.asarray(X, dtype=np.float64) * self.scale + self.offset
+
+    @classmethod
+    def from_scaler(cls, scaler: Any) -> "AffineScaler":
+        if isinstance(scaler, cls):
+            return scaler
+        if hasattr(scaler, "data_min_") and hasattr(scaler, "min_"): # MinMaxScaler
+            return cls(scaler.scale_, scaler.min_)
+        if hasattr(scaler, "with_mean"): # StandardScaler
+            n = scaler.n_features_in_
+            mean = scaler.mean_ if scaler.with_mean else np.zeros(n)
+            std = scaler.scale_ if scaler.with_std else np.ones(n)
+            return cls(1.0 / std, -mean / std)
+        raise ValueError(f"Unsupported scaler for export: {type(scaler).__name__}")
+
+    def to_dict(self) -> Dict[str, List[float]]:
+        return {"scale": self.scale.tolist(), "offset": self.offset.tolist()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, List[float]]) -> "AffineScaler":
+        return cls(data["scale"], data["offset"])
+
+class CompiledTrees:
+    """
+    A scikit-learn tree model (decision tree, random forest, extra trees, gradient boosting)
+    flattened into node columns, scored without sklearn.
+
+    The nodes of all trees share columns (feature, [right, left] children, threshold,
+    value) with absolute child indices; leaves point at themselves with an infinite
+    threshold, so scoring is max_depth rounds of gathers over (samples, trees) - no
+    per-tree Python calls. Leaf values are P(class 1) (forests and trees) or raw values
+    (boosting and regressors), combined as base + scale * (mean or sum) and passed
+    through the link.
+
+    save() writes the columns as one .npy record; load(mmap=True) maps it read-only,
+    so processes loading the same artifact share its pages.
+    """
+    def __init__(self, nodes: np.ndarray, roots, max_depth: int, classifier: bool, average: bool,
+                 base: float = 0.0, scale: float = 1.0, link: str = "identity"):
+        self.nodes = nodes # Shape (1,) record of _node_dtype
+        self.feature = nodes["feature"][0]
+        self.children = nodes["children"][0].reshape(-1) # node * 2 + (goes left)
+        self.threshold = nodes["threshold"][0]
+        self.value = nodes["value"][0]
+        self.roots = np.asarray(roots, dtype=np.int64)
+        self.max_depth = int(max_depth)
+        self.classifier = classifier
+        self.average = average
+        self.base = float(base)
+        self.scale = float(scale)
+        self.link = link
+
+    @classmethod
+    def from_sklearn(cls, model: Any) -> "CompiledTrees":
+        name = type(model).__name__
+        classifier = hasattr(model, "predict_proba")
+        if classifier and len(getattr(model, "classes_", ())) != 2:
+            raise ValueError(f"Only binary classifiers can be compiled ({name})")
+
+        if hasattr(model, "tree_"): # Single decision tree
+            trees, average, base, scale, link = [model.tree_], True, 0.0, 1.0, "identity"
+        elif hasattr(model, "estimators_") and hasattr(model, "learning_rate"): # Gradient boosting
+            if model.estimators_.shape[1] != 1:
+                raise ValueError(f"Only single-output gradient boosting can be compiled ({name})")
+            init = getattr(model, "init_", None)
+            if init != "zero" and type(init).__name__ not in ("DummyClassifier", "DummyRegressor"):
+                raise ValueError(f"Custom init estimators cannot be compiled ({name})")
+            trees = [est.tree_ for est in model.estimators_[:, 0]]
+            average, scale = False, model.learning_rate
+            base = float(model._raw_predict_init(np.zeros((1, model.n_features_in_)))[0, 0])
+            link = "logistic" if classifier else "identity"
+        elif hasattr(model, "estimators_"): # Forests
+            trees, average, base, scale, link = [est.tree_ for est in model.estimators_], True, 0.0, 1.0, "identity"
+        else:
+            raise ValueError(f"Unsupported model for tree compilation: {name}")
+
+        nodes = np.zeros(1, dtype=_node_dtype(sum(tree.node_count for tree in trees)))
+        feature, children = nodes["feature"][0], nodes["children"][0]
+        threshold, value = nodes["threshold"][0], nodes["value"][0]
+        roots, offset = [], 0
+        for tree in trees:
+            block = slice(offset, offset + tree.node_count)
+            index = np.arange(block.start, block.stop)
+            leaf = tree.children_left == -1
+            feature[block] = np.where(leaf, 0, tree.feature)
+            threshold[block] = np.where(leaf, np.inf, tree.threshold)
+            children[block, 0] = np.where(leaf, index, tree.children_right + offset)
+            children[block, 1] = np.where(leaf, index, tree.children_left + offset)
+            values = tree.value[:, 0, :]
+            if classifier and average:
+                value[block] = values[:, 1] / values.sum(axis=1) # P(class 1) at the node
+            else:
+                value[block] = values[:, 0]
+            roots.append(offset)
+            offset += tree.node_count
+        max_depth = max(tree.max_depth for tree in trees)
+        return cls(nodes, roots, max_depth, classifier, average, base, scale, link)
+
+    def leaves(self, X) -> np.ndarray:
+        """Leaf node index per (sample, tree)."""
+        X = np.asarray(X, dtype=np.float32) # Splits compare float32 features, as in sklearn
+        flat = X.reshape(-1)
+        row_start = (np.arange(len(X)) * X.shape[1])[:, np.newaxis]
+        node = np.repeat(self.roots[np.newaxis], len(X), axis=0)
+        for _ in range(self.max_depth):
+            goes_left = flat[row_start + self.feature[node]] <= self.threshold[node]
+            node = self.children[node * 2 + goes_left]
+        return node
+
+    def decision_function(self, X) -> np.ndarray:
+        values = self.value[self.leaves(X)]
+        combined = values.mean(axis=1) if self.average else values.sum(axis=1)
+        return self.base + self.scale * combined
+
+    def predict(self, X) -> np.ndarray:
+        raw = self.decision_function(X)
+        if self.classifier:
+            return (self._apply_link(raw) > 0.5).astype(int)
+        return raw
+
+    @property
+    def predict_proba(self):
+        """[P(class 0), P(class 1)] per sample; classifiers only (hasattr is False otherwise)."""
+        if not self.classifier:
+            raise AttributeError("predict_proba is only available for classifiers")
+        return self._predict_proba
+
+    def _predict_proba(self, X) -> np.ndarray:
+        p = self._apply_link(self.decision_function(X))
+        return np.column_stack([1 - p, p])
+
+    def _apply_link(self, raw: np.ndarray) -> np.ndarray:
+        return 1.0 / (1.0 + np.exp(-raw)) if self.link == "logistic" else raw
+
+    def save(self, path: str) -> Dict[str, Any]:
+        """Write the node columns to path (.npy); returns the header for the sidecar."""
+        np.save(path, self.nodes)
+        return {"roots": self.roots.tolist(), "max_depth": self.max_depth, "classifier": self.classifier,
+                "average": self.average, "base": self.base, "scale": self.scale, "link": self.link}
+
+    @classmethod
+    def load(cls, path: str, header: Dict[str, Any], mmap: bool = True) -> "CompiledTrees":
+        nodes = np.load(path, mmap_mode="r" if mmap else None)
+        return cls(nodes, **header)
+
+def _metadata(kind: str, source: Any, feature_config, scaler, window: int, version: int) -> Dict[str, Any]:
+    return {
+        "format_version": FORMAT_VERSION,
+        "kind": kind,
+        "version": version,
+        "source": type(source).__name__,
+        "created_at": datetime.now().isoformat(),
+        "feature_config": list(feature_config) if feature_config is not None else None,
+        "scaler": AffineScaler.from_scaler(scaler).to_dict() if scaler is not None else None,
+        "window": window
+    }
+
+def _ignore_torch_deprecations():
+    """Inside catch_warnings: silence torch.ao / torch.jit / quantized tensor deprecation notices only."""
+    warnings.simplefilter("ignore", DeprecationWarning)
+    warnings.simplefilter("ignore", FutureWarning)
+    warnings.filterwarnings("ignore", message=r".*quantized tensor creation functions.*deprecated", category=UserWarning)
+
+def export_torch(model: "torch.nn.Module", path: str, example_input, feature_config: Optional[List[str]] = None,
+                 scaler: Any = None, window: int = 1, quantize: bool = True, version: int = 1) -> Dict[str, Any]:
+    """
+    Export a PyTorch model as a CPU inference artifact (.pt) plus its sidecar.
+    quantize: dynamic int8 weights for LSTM/GRU/Linear layers (activations stay float);
+    artifacts shrink about 4x, but the int8 recurrent kernels are not faster on every CPU -
+    compare with quantize=False in benchmark_ai.py on the target machine.
+    The model is traced on example_input ((n, features) or (n, window, features)), frozen
+    (weights folded in as constants) and optimized for inference (op fusion).
+    Returns the metadata written to the sidecar.
+    """
+    if not TORCH_AVAILABLE:
+        raise RuntimeError("PyTorch is not installed.")
+    model = model.eval()
+    example = torch.as_tensor(np.asarray(example_input), dtype=torch.float32)
+    with warnings.catch_warnings():
+        _ignore_torch_deprecations() # TracerWarning stays visible: it flags an unsound trace
+        if quantize:
+            from torch.ao.quantization import quantize_dynamic
+            model = quantize_dynamic(model, {torch.nn.LSTM, torch.nn.GRU, torch.nn.Linear}, dtype=torch.qint8)
+        with torch.inference_mode():
+            traced = torch.jit.trace(model, example)
+        frozen = torch.jit.optimize_for_inference(torch.jit.freeze(traced.eval()))
+        torch.jit.save(frozen, path)
+
+    metadata = _metadata("torchscript", model, feature_config, scaler, window, version)
+    metadata["quantized"] = "int8_dynamic" if quantize else None
+    _write_metadata(path, metadata)
+    return metadata
+
+def export_sklearn(model: Any, path: str, feature_config: Optional[List[str]] = None, scaler: Any = None,
+                   window: int = 1, version: int = 1) -> Dict[str, Any]:
+    """
+    Export a fitted scikit-learn tree model as a compiled node array (.npy) plus its sidecar.
+    Returns the metadata written to the sidecar.
+    """
+    trees = CompiledTrees.from_sklearn(model)
+    metadata = _metadata("trees", model, feature_config, scaler, window, version)
+    metadata["trees"] = trees.save(path)
+    _write_metadata(path, metadata)
+    return metadata
+
+def load_artifact(path: str, metadata: Dict[str, Any], mmap: bool = True) -> Any:
+    """Model object of an exported artifact (TorchScript module or CompiledTrees)."""
+    if metadata["kind"] == "trees":
+        return CompiledTrees.load(path, metadata["trees"], mmap=mmap)
+    if metadata["kind"] == "torchscript":
+        if not TORCH_AVAILABLE:
+            raise RuntimeError("PyTorch is not installed.")
+        with warnings.catch_warnings():
+            _ignore_torch_deprecations()
+            return torch.jit.load(path, map_location="cpu").eval()
+    raise ValueError(f"Unknown artifact kind: {metadata['kind']}")
@@ -27,14 +27,11 @@ class StrategyOptimizer:
         
         self.logger.info(f"Starting Grid Search with {len(combinations)} combinations...")
         
-        for params in combinations:
-            # Create Strategy Instance
-            strategy = strategy_cls("optim_temp", "005930")
-            strategy.initialize(params)
-            
-            # Run Backtest
-            result = self.backtester.run(strategy, data)
-            
+        # All combinations are simulated together (strategy may vectorize the signals)
+        strategy = strategy_cls("optim_temp", "005930")
+        results = self.backtester.run_batch(strategy, data, combinations)
+        
+        for params, result in zip(combinations, results):
             # Score (Total Return)
             score = result.total_return
             
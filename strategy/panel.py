@@ -0,0 +1,147 @@
+from dataclasses import dataclass
+from typing import Dict, List
+import numpy as np
+import pandas as pd
+
+@dataclass
+class MarketPanel:
+    """
+    Aligned (time x symbol) OHLCV arrays for the whole universe.
+    valid[t, j] is False where symbol j has no bar at t (not listed yet, delisted, halted).
+    Price arrays hold NaN at invalid cells.
+    """
+    index: pd.DatetimeIndex
+    symbols: List[str]
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    valid: np.ndarray
+
+    @classmethod
+    def from_frames(cls, frames: Dict[str, pd.DataFrame]) -> "MarketPanel":
+        """
+        Build a panel from per-symbol OHLCV DataFrames (aligned on the union of timestamps).
+        """
+        symbols = list(frames.keys())
+        index = pd.DatetimeIndex([])
+        for df in frames.values():
+            index = index.union(df.index)
+
+        fields = {}
+        for col in ["open", "high", "low", "close", "volume"]:
+            fields[col] = np.column_stack([
+                frames[sym][col].reindex(index).to_numpy(dtype=float) for sym in symbols
+            ]) if symbols else np.empty((len(index), 0))
+
+        valid = ~np.isnan(fields["close"]) & (fields["close"] > 0)
+        return cls(index=index, symbols=symbols, valid=valid, **fields)
+
+    def to_frame(self, symbol: str) -> pd.DataFrame:
+        """
+        Return one symbol's valid bars as an OHLCV DataFrame.
+        """
+        j = self.symbols.index(symbol)
+        rows = self.valid[:, j]
+        return pd.DataFrame({
+            "open": self.open[rows, j],
+            "high": self.high[rows, j],
+            "low": self.low[rows, j],
+            "close": self.close[rows, j],
+            "volume": self.volume[rows, j]
+        }, index=self.index[rows])
+
+    @property
+    def shape(self):
+        return self.close.shape
+
+def compact_rows(x: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """
+    Move each column's valid cells to the top (time order kept), NaN below.
+    Kernels applied to the result see each symbol's bars back to back, exactly like
+    calculate_signals on that symbol's own frame: missing bars are skipped, not a reset.
+    """
+    rank = np.cumsum(valid, axis=0) - 1
+    rows, cols = np.nonzero(valid)
+    out = np.full(x.shape, np.nan)
+    out[rank[rows, cols], cols] = x[rows, cols]
+    return out
+
+def expand_rows(y: np.ndarray, valid: np.ndarray, fill=np.nan) -> np.ndarray:
+    """
+    Inverse of compact_rows: put compacted results back on the panel's time axis.
+    Invalid cells get `fill`.
+    """
+    rank = np.cumsum(valid, axis=0) - 1
+    rows, cols = np.nonzero(valid)
+    out = np.full(y.shape, fill, dtype=y.dtype)
+    out[rows, cols] = y[rank[rows, cols], cols]
+    return out
+
+def shift_rows(x: np.ndarray, periods: int = 1) -> np.ndarray:
+    """
+    DataFrame.shift(periods) along the time axis (first rows become NaN).
+    """
+    shifted = np.full(x.shape, np.nan)
+    if periods < len(x):
+        shifted[periods:] = x[:len(x) - periods]
+    return shifted
+
+def rolling_sma(x: np.ndarray, window: int) -> np.ndarray:
+    """
+    Simple moving average along the time axis, vectorized across columns.
+    Uses the same running-sum order as TA-Lib SMA, so gap-free columns match talib.SMA exactly.
+    A missing value (NaN) restarts the window: output is NaN until `window` valid bars follow.
+    Panel strategies apply it to compact_rows() output, so halted bars don't blank the window.
+    """
+    out = np.full(x.shape, np.nan)
+    total = np.zeros(x.shape[1:])
+    count = np.zeros(x.shape[1:], dtype=np.int64)
+
+    for t in range(len(x)):
+        value = x[t]
+        ok = ~np.isnan(value)
+        count = np.where(ok, count + 1, 0)
+        total = np.where(ok, total + value, 0.0)
+
+        full = count >= window
+        out[t] = np.where(full, total / window, np.nan)
+
+        # Drop the oldest value of the window for the next step
+        if t - window + 1 >= 0:
+            total = np.where(full, total - x[t - window + 1], total)
+    return out
+
+def wilder_rsi(x: np.ndarray, period: int) -> np.ndarray:
+    """
+    RSI with Wilder smoothing along the time axis (TA-Lib RSI equivalent), vectorized across columns.
+    A missing value restarts the warm-up for that column (see compact_rows for panels).
+    """
+    out = np.full(x.shape, np.nan)
+    avg_gain = np.zeros(x.shape[1:])
+    avg_loss = np.zeros(x.shape[1:])
+    count = np.zeros(x.shape[1:], dtype=np.int64)
+
+    for t in range(1, len(x)):
+        diff = x[t] - x[t - 1]
+        ok = ~np.isnan(diff)
+        gain = np.where(ok & (diff > 0), diff, 0.0)
+        loss = np.where(ok & (diff < 0), -diff, 0.0)
+
+        count = np.where(ok, count + 1, 0)
+        warming = count <= period
+        # Warm-up: plain sum of the first `period` diffs, then average
+        avg_gain = np.where(warming, np.where(ok, avg_gain, 0.0) + gain, ((avg_gain * (period - 1)) + gain) / period)
+        avg_loss = np.where(warming, np.where(ok, avg_loss, 0.0) + loss, ((avg_loss * (period - 1)) + loss) / period)
+
+        seeded = count == period
+        avg_gain = np.where(seeded, avg_gain / period, avg_gain)
+        avg_loss = np.where(seeded, avg_loss / period, avg_loss)
+
+        total = avg_gain + avg_loss
+        ready = count >= period
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rsi = np.where(total > 1e-8, 100 * (avg_gain / total), 0.0)
+        out[t] = np.where(ready, rsi, np.nan)
+    return out
@@ -0,0 +1,233 @@
+import asyncio
+import time
+import pandas as pd
+import numpy as np
+from typing import Dict, Any, List, Optional
+from core.database import db
+from core.event_bus import event_bus
+from core.logger import get_logger
+from core.virtual_clock import VirtualClock
+from data.data_collector import data_collector
+from data.kiwoom_rest_client import kiwoom_client
+from execution.engine import ExecutionEngine
+from strategy.base_strategy import BaseStrategy
+from strategy.backtester import EventDrivenBacktester, BacktestResult
+
+class ReplayResult:
+    def __init__(self):
+        self.fills: List[Dict[str, Any]] = [] # live path executions
+        self.equity_curve = pd.Series(dtype=float) # paper account equity at each minute
+        self.candles: Dict[str, pd.DataFrame] = {} # 1m candles produced by DataCollector
+        self.backtest: Dict[str, BacktestResult] = {} # strategy_id -> EventDrivenBacktester on the same candles
+        self.divergence: Dict[str, Dict[str, Any]] = {} # strategy_id -> live vs backtest comparison
+        self.ticks = 0
+        self.simulated_seconds = 0.0
+        self.wall_seconds = 0.0
+
+    @property
+    def speedup(self) -> float:
+        return self.simulated_seconds / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+class LiveReplay:
+    """
+    Accelerated replay of the live code path against recorded or historical ticks.
+
+    Each tick goes through the same path as in PAPER trading:
+    PaperExchange.match_orders (resting orders) -> OrderManager.on_order_event ->
+    DataCollector.on_realtime_data -> ExecutionEngine.on_realtime_data -> strategy.on_realtime_data ->
+    ExecutionEngine.execute_signal (AccountManager / RiskManager) -> OrderManager -> PaperExchange.
+
+    Everything runs on a fresh event loop under a VirtualClock, so datetime.now(), asyncio.sleep,
+    the Scheduler, AccountManager sync, unfilled-order monitor and RateLimiter follow tick time
+    and idle periods are skipped. Data goes to a separate database (default in-memory).
+
+    After the replay, each strategy is also run through EventDrivenBacktester on the 1m candles
+    the live path produced, and the trade sequences are compared (ReplayResult.divergence).
+    """
+    def __init__(self, strategies: List[BaseStrategy], capital: float = 100_000_000, db_path: str = ":memory:",
+                 config: Optional[Dict[str, Any]] = None, match_tolerance: float = 60.0):
+        self.logger = get_logger("LiveReplay")
+        self.strategies = strategies
+        self.capital = capital
+        self.db_path = db_path
+        self.config = config or {}
+        self.match_tolerance = match_tolerance # seconds between a live fill and its backtest trade
+
+    def run(self, ticks: pd.DataFrame) -> ReplayResult:
+        """
+        Replay ticks (DatetimeIndex, columns: code, price, volume), sorted by time.
+        Must be called outside a running event loop.
+        """
+        if ticks.empty:
+            return ReplayResult()
+
+        clock = VirtualClock(ticks.index[0].to_pydatetime())
+        loop = asyncio.new_event_loop()
+        clock.install(loop)
+        start = time.perf_counter()
+        try:
+            asyncio.set_event_loop(loop)
+            result = loop.run_until_complete(self._replay(ticks, clock))
+        finally:
+            pending = [task for task in asyncio.all_tasks(loop) if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            clock.uninstall()
+            asyncio.set_event_loop(None)
+            loop.close()
+
+        result.wall_seconds = time.perf_counter() - start
+        self._measure_divergence(result)
+        self.logger.info(
+            f"Replay finished: {result.ticks} ticks, {len(result.fills)} fills, "
+            f"{result.simulated_seconds:,.0f}s simulated in {result.wall_seconds:.2f}s (x{result.speedup:,.0f})"
+        )
+        return result
+
+    @staticmethod
+    def bars_to_ticks(bars: pd.DataFrame, symbol: str) -> pd.DataFrame:
+        """
+        Turn 1m OHLCV bars into 4 ticks per bar (open, high/low, low/high, close at +0/15/30/45s),
+        which DataCollector aggregates back into the same OHLC candles.
+        """
+        up = (bars['close'] >= bars['open']).to_numpy()
+        path = np.column_stack([
+            bars['open'].to_numpy(),
+            np.where(up, bars['low'], bars['high']),
+            np.where(up, bars['high'], bars['low']),
+            bars['close'].to_numpy()
+        ]).ravel()
+        offsets = pd.to_timedelta(np.tile([0, 15, 30, 45], len(bars)), unit='s')
+        index = bars.index.repeat(4) + offsets
+        volume = np.repeat(bars['volume'].to_numpy(dtype=float) / 4, 4)
+        return pd.DataFrame({"code": symbol, "price": path, "volume": volume}, index=index)
+
+    async def _replay(self, ticks: pd.DataFrame, clock: VirtualClock) -> ReplayResult:
+        result = ReplayResult()
+        candles: Dict[str, List[Dict[str, Any]]] = {}
+
+        def on_candle(event):
+            candles.setdefault(event.data["symbol"], []).append(event.data)
+
+        # Isolated database, I/O tracked so virtual time holds during real DB work
+        saved_db = (db.db_path, db.conn)
+        db.db_path, db.conn = self.db_path, None
+        clock.track_io(db, "connect", "close", "execute", "execute_many", "fetch_all")
+
+        saved_collector = (data_collector.realtime_buffer, data_collector.last_update_time,
+                           data_collector.observers, data_collector.gap_fill_enabled)
+        candle_sub = event_bus.subscribe("CANDLE_CLOSED", on_candle)
+        engine = None
+        try:
+            await db.connect()
+
+            engine = ExecutionEngine(kiwoom_client, mode="PAPER", config={**self.config, "paper_capital": self.capital})
+            engine.notification_manager.enabled = False
+            for strategy in self.strategies:
+                engine.register_strategy(strategy)
+            await engine.initialize()
+            exchange = engine.exchange
+
+            data_collector.realtime_buffer = {}
+            data_collector.last_update_time = {}
+            data_collector.observers = [engine.on_realtime_data]
+            data_collector.gap_fill_enabled = False
+
+            day_ohlc: Dict[str, List[Any]] = {} # symbol -> [date, open, high, low]
+            equity_marks = {}
+            start_ts = clock.time()
+
+            for timestamp, code, price, volume in zip(ticks.index, ticks['code'], ticks['price'].astype(float), ticks['volume']):
+                when = timestamp.to_pydatetime() # naive = local time, as datetime.now()
+                delay = when.timestamp() - clock.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                clock.set(when)
+
+                # 1. Resting orders match against the new price (broker fill events)
+                for execution in exchange.match_orders({"symbol": code, "current_price": price}):
+                    result.fills.append({"time": clock.now(), "symbol": code, "side": execution["order_type"],
+                                         "qty": execution["exec_qty"], "price": execution["price"]})
+                    await engine.order_manager.on_order_event(execution)
+
+                # 2. Live ingestion path (realtime message with session open/high/low)
+                ohlc = day_ohlc.get(code)
+                if ohlc is None or ohlc[0] != timestamp.date():
+                    ohlc = day_ohlc[code] = [timestamp.date(), price, price, price]
+                ohlc[2] = max(ohlc[2], price)
+                ohlc[3] = min(ohlc[3], price)
+                await data_collector.on_realtime_data({
+                    "code": code, "price": price, "volume": volume,
+                    "open": ohlc[1], "high": ohlc[2], "low": ohlc[3]
+                })
+                await engine.dispatcher.drain() # Orders of this tick go out before the next tick
+
+                equity = exchange.balance['deposit'] + sum(
+                    pos['qty'] * pos.get('current_price', pos['avg_price']) for pos in exchange.positions.values()
+                )
+                equity_marks[timestamp.floor('min')] = equity
+                result.ticks += 1
+
+            # Let fire-and-forget work (events, state saves) settle
+            for _ in range(10):
+                await asyncio.sleep(0)
+
+            result.simulated_seconds = clock.time() - start_ts
+            result.equity_curve = pd.Series(equity_marks, dtype=float)
+            result.candles = {
+                symbol: pd.DataFrame(rows).set_index("timestamp")[["open", "high", "low", "close", "volume"]]
+                for symbol, rows in candles.items()
+            }
+            return result
+        finally:
+            event_bus.unsubscribe(candle_sub)
+            (data_collector.realtime_buffer, data_collector.last_update_time,
+             data_collector.observers, data_collector.gap_fill_enabled) = saved_collector
+            if engine is not None:
+                await engine.scheduler.stop()
+                await engine.account_manager.stop()
+            await db.close()
+            db.db_path, db.conn = saved_db
+
+    def _measure_divergence(self, result: ReplayResult):
+        """
+        Backtest each strategy on the replayed candles and match trades against live fills.
+        A live fill matches the next unmatched backtest trade of the same side within match_tolerance.
+        """
+        backtester = EventDrivenBacktester()
+        backtester.configure({**self.config, "initial_capital": self.capital})
+
+        for strategy in self.strategies:
+            bars = result.candles.get(strategy.symbol)
+            if bars is None or bars.empty:
+                continue
+            fresh = strategy.__class__(strategy.strategy_id, strategy.symbol)
+            fresh.initialize(strategy.config)
+            backtest = backtester.run(fresh, bars)
+            result.backtest[strategy.strategy_id] = backtest
+
+            live = [f for f in result.fills if f["symbol"] == strategy.symbol]
+            used = set()
+            lags, price_diffs = [], []
+            for fill in live:
+                for k, trade in enumerate(backtest.trades):
+                    if k in used or trade["type"] != fill["side"]:
+                        continue
+                    lag = (pd.Timestamp(fill["time"]) - pd.Timestamp(trade["time"])).total_seconds()
+                    if abs(lag) <= self.match_tolerance:
+                        used.add(k)
+                        lags.append(lag)
+                        price_diffs.append((fill["price"] - trade["price"]) / trade["price"] * 100)
+                        break
+
+            result.divergence[strategy.strategy_id] = {
+                "live_trades": len(live),
+                "backtest_trades": len(backtest.trades),
+                "matched": len(lags),
+                "unmatched_live": len(live) - len(lags),
+                "unmatched_backtest": len(backtest.trades) - len(lags),
+                "mean_lag_seconds": float(np.mean(lags)) if lags else 0.0,
+                "mean_price_diff_pct": float(np.mean(price_diffs)) if price_diffs else 0.0
+            }
@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, List, Optional
+from strategy.base_strategy import BaseStrategy
+from strategy.panel import MarketPanel
+from core.event_bus import event_bus
+from core.logger import get_logger
+
+class PanelScreener:
+    """
+    Live Universe Screener.
+    Keeps a rolling (lookback x symbol) panel of 1m candles and evaluates a strategy's
+    calculate_signals_panel for all symbols at once on each candle close.
+
+    Candles arrive per symbol via 'CANDLE_CLOSED'. The first candle of a newer minute
+    closes the previous minute; symbols without a candle for that minute are masked.
+    Results are published as 'screener.signals'.
+    """
+    FIELDS = ["open", "high", "low", "close", "volume"]
+
+    def __init__(self, strategy: BaseStrategy, symbols: List[str], lookback: int = 200):
+        self.logger = get_logger("PanelScreener")
+        self.strategy = strategy
+        self.symbols = list(symbols)
+        self.lookback = lookback
+        self._columns = {symbol: j for j, symbol in enumerate(self.symbols)}
+
+        shape = (lookback, len(self.symbols))
+        self._buffers = {field: np.full(shape, np.nan) for field in self.FIELDS}
+        self._times = np.full(lookback, np.datetime64("NaT"), dtype="datetime64[ns]")
+
+        # Minute currently being collected: {symbol: candle}
+        self._pending_time = None
+        self._pending: Dict[str, Dict[str, Any]] = {}
+
+        self.last_signals: Dict[str, int] = {}
+        self._sub_id = None
+
+    def start(self):
+        """Start listening to candle close events."""
+        if self._sub_id is None:
+            self._sub_id = event_bus.subscribe("CANDLE_CLOSED", self._on_candle_closed)
+            self.logger.info(f"Screener Started: {self.strategy.get_name()} on {len(self.symbols)} symbols")
+
+    def stop(self):
+        """Stop listening to candle close events."""
+        if self._sub_id is not None:
+            event_bus.unsubscribe(self._sub_id)
+            self._sub_id = None
+
+    def warm_up(self, frames: Dict[str, pd.DataFrame]):
+        """
+        Fill the rolling panel with historical candles (e.g. from DataCollector.get_recent_data).
+        """
+        panel = MarketPanel.from_frames({s: df for s, df in frames.items() if s in self._columns})
+        rows = min(len(panel.index), self.lookback)
+        for buffer in self._buffers.values():
+            buffer[:] = np.nan
+        self._times[:] = np.datetime64("NaT")
+        if rows == 0:
+            return
+
+        for field, buffer in self._buffers.items():
+            values = getattr(panel, field)[-rows:]
+            for j, symbol in enumerate(panel.symbols):
+                buffer[self.lookback - rows:, self._columns[symbol]] = values[:, j]
+        self._times[self.lookback - rows:] = panel.index[-rows:].values
+
+    async def _on_candle_closed(self, event):
+        try:
+            self.on_candle(event.data)
+        except Exception as e:
+            self.logger.exception(f"Screener failed on candle: {e}")
+
+    def on_candle(self, candle: Dict[str, Any]) -> Optional[Dict[str, int]]:
+        """
+        Add one closed candle. Returns signals if this candle completed the previous minute.
+        """
+        symbol = candle.get("symbol")
+        if symbol not in self._columns:
+            return None
+
+        timestamp = candle["timestamp"]
+        signals = None
+        if self._pending_time is not None and timestamp > self._pending_time:
+            signals = self.evaluate()
+
+        if self._pending_time is None or timestamp == self._pending_time:
+            self._pending_time = timestamp
+            self._pending[symbol] = candle
+        else:
+            self.logger.debug(f"Late candle ignored: {symbol} @ {timestamp}")
+        return signals
+
+    def evaluate(self) -> Dict[str, int]:
+        """
+        Commit the pending minute to the panel and evaluate all symbols.
+        Returns {symbol: signal} for non-zero signals.
+        """
+        if self._pending_time is None:
+            return {}
+
+        for field, buffer in self._buffers.items():
+            buffer[:-1] = buffer[1:]
+            buffer[-1] = np.nan
+            for symbol, candle in self._pending.items():
+                buffer[-1, self._columns[symbol]] = float(candle[field])
+        self._times[:-1] = self._times[1:]
+        self._times[-1] = np.datetime64(pd.Timestamp(self._pending_time))
+
+        timestamp = self._pending_time
+        self._pending_time = None
+        self._pending = {}
+
+        close = self._buffers["close"]
+        panel = MarketPanel(
+            index=pd.DatetimeIndex(self._times),
+            symbols=self.symbols,
+            valid=~np.isnan(close) & (close > 0),
+            **self._buffers
+        )
+        last_row = self.strategy.calculate_signals_panel(panel)[-1]
+
+        self.last_signals = {
+            self.symbols[j]: int(last_row[j]) for j in np.flatnonzero(last_row)
+        }
+        if self.last_signals:
+            event_bus.publish("screener.signals", {
+                "strategy": self.strategy.get_name(),
+                "timestamp": timestamp,
+                "signals": self.last_signals
+            })
+        return self.last_signals
@@ -1,10 +1,21 @@
 import pandas as pd
 import talib
 import numpy as np
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 from strategy.base_strategy import BaseStrategy, Signal
+from strategy.panel import MarketPanel, compact_rows, expand_rows, shift_rows, rolling_sma, wilder_rsi
 from datetime import datetime
 
+def _sma_matrix(close: np.ndarray, windows: np.ndarray) -> np.ndarray:
+    """
+    SMA for every entry of windows, shape (len(close), len(windows)).
+    Each distinct window is computed only once.
+    """
+    unique_windows, inverse = np.unique(windows.astype(int), return_inverse=True)
+    smas = np.column_stack([talib.SMA(close, timeperiod=int(w)) for w in unique_windows])
+    return smas[:, inverse]
+
+
 class VolatilityBreakoutStrategy(BaseStrategy):
     """
     래리 윌리엄스의 변동성 돌파 전략.
@@ -44,6 +55,28 @@ class VolatilityBreakoutStrategy(BaseStrategy):
         
         return df
 
+    def calculate_signals_batch(self, df: pd.DataFrame, param_sets: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Vectorized over k: range is shared, target = open + range * k per column.
+        """
+        k = self._batch_param(param_sets, "k", self.k).astype(float)
+        high = df['high'].to_numpy(dtype=float)
+        low = df['low'].to_numpy(dtype=float)
+        open_ = df['open'].to_numpy(dtype=float)
+        
+        rng = shift_rows(high) - shift_rows(low)
+        target = open_[:, None] + (rng[:, None] * k[None, :])
+        return (high[:, None] > target).astype(np.int8)
+
+    def calculate_signals_panel(self, panel: MarketPanel) -> np.ndarray:
+        # Previous bar = previous valid bar of the same symbol
+        high = compact_rows(panel.high, panel.valid)
+        low = compact_rows(panel.low, panel.valid)
+        open_ = compact_rows(panel.open, panel.valid)
+        rng = shift_rows(high) - shift_rows(low)
+        target = open_ + (rng * self.k)
+        return expand_rows((high > target).astype(np.int8), panel.valid, fill=0)
+
     def update_market_data(self, df: pd.DataFrame):
         """
         Calculate target price based on previous day's data.
@@ -148,6 +181,38 @@ class MovingAverageCrossoverStrategy(BaseStrategy):
         
         return df
 
+    def calculate_signals_batch(self, df: pd.DataFrame, param_sets: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Vectorized over (short_window, long_window): each distinct SMA window is computed once.
+        """
+        short_windows = self._batch_param(param_sets, "short_window", self.short_window)
+        long_windows = self._batch_param(param_sets, "long_window", self.long_window)
+        close = df['close'].to_numpy(dtype=float)
+        
+        # One SMA pass for the union of windows, then gather columns
+        smas = _sma_matrix(close, np.concatenate([short_windows, long_windows]))
+        ma_short = smas[:, :len(param_sets)]
+        ma_long = smas[:, len(param_sets):]
+        prev_short = shift_rows(ma_short)
+        prev_long = shift_rows(ma_long)
+        
+        signals = np.zeros(ma_short.shape, dtype=np.int8)
+        signals[(ma_short > ma_long) & (prev_short <= prev_long)] = 1
+        signals[(ma_short < ma_long) & (prev_short >= prev_long)] = -1
+        return signals
+
+    def calculate_signals_panel(self, panel: MarketPanel) -> np.ndarray:
+        close = compact_rows(panel.close, panel.valid)
+        ma_short = rolling_sma(close, self.short_window)
+        ma_long = rolling_sma(close, self.long_window)
+        prev_short = shift_rows(ma_short)
+        prev_long = shift_rows(ma_long)
+        
+        signals = np.zeros(panel.shape, dtype=np.int8)
+        signals[(ma_short > ma_long) & (prev_short <= prev_long)] = 1
+        signals[(ma_short < ma_long) & (prev_short >= prev_long)] = -1
+        return expand_rows(signals, panel.valid, fill=0)
+
     def update_market_data(self, df: pd.DataFrame):
         """
         Fill buffer with historical close prices.
@@ -247,6 +312,14 @@ class RSIStrategy(BaseStrategy):
         
         return df
 
+    def calculate_signals_panel(self, panel: MarketPanel) -> np.ndarray:
+        rsi = wilder_rsi(compact_rows(panel.close, panel.valid), self.period)
+        
+        signals = np.zeros(panel.shape, dtype=np.int8)
+        signals[rsi < self.buy_threshold] = 1
+        signals[rsi > self.sell_threshold] = -1
+        return expand_rows(signals, panel.valid, fill=0)
+
     def update_market_data(self, df: pd.DataFrame):
         if not df.empty:
             self.prices = df['close'].tolist()
@@ -627,6 +700,34 @@ class EnvelopeStrategy(BaseStrategy):
         
         return df
 
+    def calculate_signals_batch(self, df: pd.DataFrame, param_sets: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Vectorized over (period, rate): each distinct MA period is computed once.
+        """
+        periods = self._batch_param(param_sets, "period", self.period)
+        rates = self._batch_param(param_sets, "rate", self.rate).astype(float)
+        close = df['close'].to_numpy(dtype=float)[:, None]
+        
+        ma = _sma_matrix(close[:, 0], periods)
+        upper = ma * (1 + rates / 100)
+        lower = ma * (1 - rates / 100)
+        
+        signals = np.zeros(ma.shape, dtype=np.int8)
+        signals[close < lower] = 1
+        signals[close > upper] = -1
+        return signals
+
+    def calculate_signals_panel(self, panel: MarketPanel) -> np.ndarray:
+        close = compact_rows(panel.close, panel.valid)
+        ma = rolling_sma(close, self.period)
+        upper = ma * (1 + self.rate / 100)
+        lower = ma * (1 - self.rate / 100)
+        
+        signals = np.zeros(panel.shape, dtype=np.int8)
+        signals[close < lower] = 1
+        signals[close > upper] = -1
+        return expand_rows(signals, panel.valid, fill=0)
+
     def update_market_data(self, df: pd.DataFrame):
         # Envelope doesn't need much state other than MA calculation
         pass
@@ -47,3 +47,45 @@ async def test_account_manager_sync(tmp_path):
     summary = manager.get_summary()
     assert "005930" in summary["positions"]
     assert summary["positions"]["005930"]["qty"] == 95
+
+@pytest.mark.asyncio
+async def test_ledger_marks_fills_and_quotes_and_reconciles_drift():
+    exchange = PaperExchange(initial_capital=10_000_000)
+    manager = AccountManager(exchange)
+    await manager.update_balance() # Initial sync seeds the ledger
+    
+    # Same fill on the exchange and in the ledger
+    await exchange.send_order("005930", 1, 10, 0, "03")
+    exchange.match_orders({"symbol": "005930", "current_price": 50000, "ask1": 50000, "ask_size1": 100})
+    manager.on_fill("005930", "BUY", 10, 50000)
+    
+    assert manager.balance["deposit"] == pytest.approx(10_000_000 - 500_000 * 1.00015)
+    assert manager.positions["005930"]["qty"] == 10
+    
+    # Quotes re-mark held symbols only
+    manager.on_quote("005930", 51000)
+    manager.on_quote("000660", 99999)
+    assert manager.balance["total_eval"] == 510_000
+    assert manager.balance["total_asset"] == pytest.approx(manager.balance["deposit"] + 510_000)
+    assert manager.balance["daily_pnl"] == pytest.approx(10_000 - 500_000 * 0.00015)
+    assert manager.balance["exposure"] == pytest.approx(510_000 / manager.balance["total_asset"])
+    
+    # Partial sell realizes into cash
+    manager.on_fill("005930", "SELL", 4, 52000)
+    exchange.match_orders({"symbol": "005930", "current_price": 51000}) # Exchange marks at its last price
+    await exchange.send_order("005930", 2, 4, 0, "03")
+    exchange.match_orders({"symbol": "005930", "current_price": 52000, "bid1": 52000, "bid_size1": 100})
+    assert manager.positions["005930"]["qty"] == 6
+    assert manager.balance["total_eval"] == 6 * 52000
+    
+    # Reconciliation: ledger in line with the exchange -> no drift
+    drift = await manager.update_balance()
+    assert abs(drift["deposit"]) < 1 and drift["positions"] == {}
+    
+    # A fill the ledger never saw shows up as drift and is adopted
+    await exchange.send_order("005930", 1, 5, 0, "03")
+    exchange.match_orders({"symbol": "005930", "current_price": 52000, "ask1": 52000, "ask_size1": 100})
+    drift = await manager.update_balance()
+    assert drift["positions"] == {"005930": (6, 11)}
+    assert drift["deposit"] == pytest.approx(-5 * 52000 * 1.00015)
+    assert manager.positions["005930"]["qty"] == 11
@@ -60,3 +60,78 @@ def test_predict_missing_model(ai_engine_instance):
     """Test prediction with unknown model."""
     score = ai_engine_instance.predict(pd.DataFrame(), "unknown")
     assert score == 0.0
+
+class RowModel:
+    """Score = sigmoid of the first feature (row models see (n, features))."""
+    def predict_proba(self, X):
+        p = 1 / (1 + np.exp(-np.asarray(X)[:, 0]))
+        return np.column_stack([1 - p, p])
+
+def make_lstm(path, features=3):
+    import torch
+
+    class Net(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.lstm = torch.nn.LSTM(features, 8, batch_first=True)
+            self.head = torch.nn.Linear(8, 1)
+
+        def forward(self, x):
+            out, _ = self.lstm(x)
+            return self.head(out[:, -1])
+
+    torch.manual_seed(0)
+    torch.jit.script(Net()).save(str(path))
+    return str(path)
+
+def test_predict_batch_matches_predict_rows(ai_engine_instance, tmp_path):
+    path = tmp_path / "row.pkl"
+    joblib.dump(RowModel(), path)
+    ai_engine_instance.load_model("row", str(path), feature_config=['x'])
+    df = pd.DataFrame({'x': np.linspace(-3, 3, 50), 'y': 0.0})
+
+    scores = ai_engine_instance.predict_batch(df, "row", batch_size=7)
+
+    expected = [ai_engine_instance.predict(df.iloc[[i]], "row") for i in range(len(df))]
+    assert np.allclose(scores, expected)
+    # On a whole history, predict() scores the latest row (live signals)
+    assert ai_engine_instance.predict(df, "row") == pytest.approx(scores[-1])
+
+def test_predict_batch_sliding_windows_torch(ai_engine_instance, tmp_path):
+    features = ['a', 'b', 'c']
+    ai_engine_instance.load_model("lstm", make_lstm(tmp_path / "lstm.pt"), feature_config=features, window=20)
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(300, 3)), columns=features)
+
+    scores = ai_engine_instance.predict_batch(df, "lstm", batch_size=64)
+
+    assert np.isnan(scores[:19]).all() and not np.isnan(scores[19:]).any()
+    for end in (19, 20, 150, 299):
+        assert scores[end] == pytest.approx(ai_engine_instance.predict(df.iloc[:end + 1], "lstm"), abs=1e-6)
+    # Chunking does not change results
+    assert np.allclose(scores, ai_engine_instance.predict_batch(df, "lstm", batch_size=1000), equal_nan=True)
+
+def test_hybrid_strategy_scores_history(tmp_path):
+    from strategy.ai_engine import ai_engine
+    from strategy.hybrid_strategy import HybridStrategy
+
+    path = tmp_path / "hybrid.pkl"
+    joblib.dump(RowModel(), path)
+    strategy = HybridStrategy("hybrid", "005930")
+    strategy.initialize({"model_name": "hybrid_test", "model_path": str(path), "feature_columns": ["momentum"],
+                         "ai_threshold": 0.6})
+    try:
+        close = 10000 + 300 * np.sin(np.arange(400) / 8)
+        df = pd.DataFrame({"open": close, "high": close + 10, "low": close - 10, "close": close, "volume": 1000.0},
+                          index=pd.date_range("2024-01-01", periods=400, freq="min"))
+        df["momentum"] = np.where(np.arange(400) < 200, -5.0, 5.0) # Model agrees only in the second half
+
+        result = strategy.calculate_signals(df)
+
+        assert result["ai_score"].nunique() == 2
+        rsi = strategy.rsi_strategy.calculate_signals(df.drop(columns="momentum"))
+        entries = rsi.index[rsi["signal"] == 1]
+        assert (entries < df.index[200]).any() and (entries >= df.index[200]).any()
+        assert set(result.index[result["signal"] == 1]) == {t for t in entries if t >= df.index[200]}
+    finally:
+        ai_engine.models.pop("hybrid_test", None)
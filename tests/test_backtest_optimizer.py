@@ -3,7 +3,12 @@ import pandas as pd
 import numpy as np
 from strategy.backtester import EventDrivenBacktester
 from strategy.optimizer import StrategyOptimizer
-from strategy.strategies import VolatilityBreakoutStrategy
+from strategy.strategies import (
+    VolatilityBreakoutStrategy,
+    MovingAverageCrossoverStrategy,
+    EnvelopeStrategy,
+    RSIStrategy
+)
 
 @pytest.fixture
 def sample_data():
@@ -52,3 +57,48 @@ def test_optimizer_grid_search(sample_data):
     assert best['best_score'] > 0
     # k=0.1 or 0.5 should be better than 0.9
     assert best['best_params']['k'] in [0.1, 0.5]
+
+@pytest.mark.parametrize("strategy_cls, param_sets", [
+    (VolatilityBreakoutStrategy, [{"k": k} for k in [0.1, 0.3, 0.5, 0.9]]),
+    (MovingAverageCrossoverStrategy, [{"short_window": s, "long_window": l} for s in [3, 5] for l in [10, 20]]),
+    (EnvelopeStrategy, [{"period": p, "rate": r} for p in [10, 20] for r in [1.0, 5.0]]),
+])
+def test_run_batch_matches_single_runs(strategy_cls, param_sets):
+    rng = np.random.default_rng(42)
+    dates = pd.date_range(start='2024-01-01', periods=200, freq='D')
+    close = 10000 * np.exp(np.cumsum(rng.normal(0, 0.02, 200)))
+    data = pd.DataFrame({
+        'open': close * (1 + rng.normal(0, 0.005, 200)),
+        'high': close * 1.02,
+        'low': close * 0.98,
+        'close': close,
+        'volume': rng.integers(1000, 100000, 200)
+    }, index=dates)
+    
+    backtester = EventDrivenBacktester()
+    batch_results = backtester.run_batch(strategy_cls("batch", "005930"), data, param_sets)
+    assert len(batch_results) == len(param_sets)
+    
+    for params, batch in zip(param_sets, batch_results):
+        strategy = strategy_cls("single", "005930")
+        strategy.initialize(params)
+        single = backtester.run(strategy, data)
+        
+        assert batch.trades == single.trades
+        assert batch.equity_curve == single.equity_curve
+        assert batch.final_capital == single.final_capital
+        assert batch.mdd == single.mdd
+        assert batch.win_rate == single.win_rate
+        assert batch.sharpe_ratio == pytest.approx(single.sharpe_ratio, nan_ok=True)
+
+def test_calculate_signals_batch_default_fallback(sample_data):
+    # RSI has no vectorized override -> per-parameter fallback
+    strategy = RSIStrategy("rsi_batch", "005930")
+    param_sets = [{"period": 5}, {"period": 14}]
+    signals = strategy.calculate_signals_batch(sample_data, param_sets)
+    
+    assert signals.shape == (len(sample_data), 2)
+    for j, params in enumerate(param_sets):
+        single = RSIStrategy("rsi_single", "005930")
+        single.initialize(params)
+        assert np.array_equal(signals[:, j], single.calculate_signals(sample_data)['signal'].to_numpy())
@@ -0,0 +1,100 @@
+import asyncio
+import pytest
+from data.rate_limiter import RateLimiter
+from execution.order_manager import OrderManager
+
+class ThrottledBroker:
+    """Order endpoints behind a token bucket; every 4th request is rejected (429 -> None)."""
+    def __init__(self, positions=None):
+        self.rate_limiter = RateLimiter(max_tokens=10, refill_rate=200)
+        self.requests = 0
+        self.cancelled = []
+        self.sold = []
+        self.positions = positions or []
+
+    async def _admit(self):
+        await self.rate_limiter.acquire()
+        self.requests += 1
+        admitted = self.requests % 4 != 0
+        await asyncio.sleep(0.05) # Round trip
+        return admitted
+
+    async def cancel_order(self, order_no, symbol, qty):
+        if not await self._admit():
+            return None
+        self.cancelled.append((order_no, qty))
+        return {"return_code": 0}
+
+    async def send_order(self, symbol, order_type, qty, price=0, trade_type="00"):
+        if not await self._admit():
+            return {"return_code": 5, "return_msg": "허용된 요청 개수를 초과하였습니다"}
+        self.sold.append((symbol, order_type, qty, trade_type))
+        return {"return_code": 0, "ord_no": f"S{symbol}"}
+
+    async def get_account_balance(self):
+        return {"output": {"multi": self.positions}}
+
+@pytest.mark.asyncio
+async def test_cancel_all_orders_concurrent_with_retries():
+    broker = ThrottledBroker()
+    manager = OrderManager(broker)
+    manager.retry_backoff = 0.01
+    manager.active_orders = {f"O{i}": {"symbol": "005930", "quantity": 10, "filled_qty": i % 3} for i in range(80)}
+
+    report = await manager.cancel_all_orders()
+
+    assert report["cancelled"] == 80 and report["failed"] == []
+    assert sorted(broker.cancelled) == sorted((f"O{i}", 10 - i % 3) for i in range(80))
+    assert any(outcome["attempts"] > 1 for outcome in report["orders"].values())
+    # Pipelined: far below 80 sequential round trips (4s), bounded by the token bucket
+    assert report["elapsed"] < 1.5
+
+@pytest.mark.asyncio
+async def test_flatten_reports_failures_and_time_to_flat():
+    broker = ThrottledBroker(positions=[{"code": f"{i:06d}", "qty": str(i + 1)} for i in range(10)] + [{"code": "999999", "qty": "0"}])
+    manager = OrderManager(broker)
+    manager.retry_backoff = 0.01
+    manager.bulk_max_retries = 0 # Throttled requests fail straight away
+    manager.active_orders = {"O1": {"symbol": "005930", "quantity": 1, "filled_qty": 0}}
+
+    report = await manager.flatten()
+
+    liquidation = report["liquidation"]
+    assert len(liquidation["orders"]) == 10
+    assert liquidation["sold"] + len(liquidation["failed"]) == 10 and liquidation["failed"]
+    for symbol, outcome in liquidation["orders"].items():
+        assert outcome["qty"] == int(symbol) + 1
+        assert outcome["ok"] == (symbol not in liquidation["failed"])
+        assert outcome["order_no"] == (f"S{symbol}" if outcome["ok"] else None)
+    assert all(order_type == 2 and trade_type == "03" for _, order_type, _, trade_type in broker.sold)
+    assert report["time_to_flat"] >= report["cancel"]["elapsed"] + liquidation["elapsed"]
+
+class LostResponseBroker:
+    """Sells get no response; those in accepted still go through (the holding is sold)."""
+    def __init__(self, holdings, accepted):
+        self.holdings = dict(holdings)
+        self.accepted = set(accepted)
+        self.sent = []
+
+    async def send_order(self, symbol, order_type, qty, price=0, trade_type="00"):
+        self.sent.append(symbol)
+        if symbol in self.accepted:
+            self.holdings[symbol] -= qty
+        return None
+
+    async def get_account_balance(self):
+        return {"output": {"multi": [{"code": code, "qty": str(qty)} for code, qty in self.holdings.items()]}}
+
+@pytest.mark.asyncio
+async def test_unanswered_sell_is_reconciled_not_resent():
+    broker = LostResponseBroker({"005930": 10, "000660": 5}, accepted={"005930"})
+    manager = OrderManager(broker)
+    manager.retry_backoff = 0.01
+    manager.reconcile_delay = 0.01
+
+    report = await manager.close_all_positions()
+
+    # One sell per symbol: no double liquidation
+    assert sorted(broker.sent) == ["000660", "005930"]
+    assert report["orders"]["005930"]["ok"] and report["orders"]["005930"]["reconciled"]
+    assert report["failed"] == ["000660"] and report["sold"] == 1
@@ -1,5 +1,6 @@
 import pytest
 import asyncio
+import time
 from unittest.mock import MagicMock, AsyncMock
 from datetime import datetime
 from execution.risk_manager import RiskManager
@@ -75,3 +76,136 @@ async def test_execution_engine(mock_kiwoom):
     assert args[0] == "005930"
     assert args[2] == 10
     assert args[3] == 60000
+
+def test_risk_manager_incremental_exposure_and_basket(monkeypatch):
+    rm = RiskManager()
+    rm.configure({"max_order_count_per_min": 3, "max_symbol_exposure": 0.2, "max_market_exposure": 0.3,
+                  "max_strategy_exposure": 0.25})
+    rm.markets = {"005930": "KOSPI", "000660": "KOSPI", "035720": "KOSDAQ"}
+    account_info = {"daily_pnl": 0, "total_asset": 10_000_000, "deposit": 9_000_000}
+    
+    # 1.5M held by strategy A, re-marked by quotes
+    rm.on_fill("005930", "BUY", 100, 15000, "A")
+    rm.on_quote("005930", 16000)
+    assert rm.symbol_exposure["005930"] == 1_600_000
+    assert rm.market_exposure["KOSPI"] == 1_600_000
+    assert rm.strategy_exposure["A"] == 1_600_000
+    
+    signal = Signal("005930", "BUY", 16000, datetime.now(), "Test")
+    assert rm.check_risk(signal, account_info, 25) # 2.0M: at the symbol limit
+    assert not rm.check_risk(signal, account_info, 26)
+    
+    # Basket: earlier accepted orders count toward the later ones
+    orders = [
+        (Signal("000660", "BUY", 100000, datetime.now(), "Test"), 10), # KOSPI 2.6M
+        (Signal("000660", "BUY", 100000, datetime.now(), "Test"), 5), # KOSPI 3.1M > 30%
+        (Signal("035720", "BUY", 50000, datetime.now(), "Test"), 10),
+        (Signal("035720", "SELL", 50000, datetime.now(), "Test"), 1),
+        (Signal("035720", "SELL", 50000, datetime.now(), "Test"), 1), # 3 accepted: rate limit
+    ]
+    assert rm.check_basket(orders, account_info) == [True, False, True, True, False]
+    
+    # Sells release exposure; sliding window expires after a minute
+    rm.on_fill("005930", "SELL", 100, 16000, "A")
+    assert rm.symbol_exposure["005930"] == 0 and rm.strategy_exposure["A"] == 0
+    for _ in range(3):
+        rm.record_order("005930")
+    assert not rm.check_risk(signal, account_info, 1)
+    clock = time.monotonic() + 61
+    monkeypatch.setattr("execution.risk_manager.time.monotonic", lambda: clock)
+    assert rm.check_risk(signal, account_info, 1)
+    assert len(rm.order_count_window) == 0
+
+class TickBuyStrategy:
+    """Emits a BUY at the tick price; leaves Signal.strategy_id to the engine."""
+    def __init__(self, strategy_id, symbol, config=None):
+        self.strategy_id = strategy_id
+        self.symbol = symbol
+        self.position_sizer = None
+        self.config = config or {}
+
+    async def on_realtime_data(self, data):
+        return Signal(self.symbol, "BUY", data["price"], datetime.now(), "tick")
+
+    def update_position(self, price, qty, side):
+        pass
+
+    def get_state(self):
+        return None
+
+def make_engine(broker, risk=None):
+    engine = ExecutionEngine(broker, mode="REAL", config={"risk": risk or {}})
+    engine.is_running = True
+    engine.notification_manager = AsyncMock()
+    engine.strategy_dao = AsyncMock()
+    engine.account_manager = MagicMock()
+    engine.account_manager.get_summary.return_value = {
+        "balance": {"deposit": 10_000_000, "total_asset": 10_000_000, "daily_pnl": 0}, "positions": {}
+    }
+    engine.account_manager.check_buying_power.return_value = True
+    return engine
+
+@pytest.mark.asyncio
+async def test_engine_per_strategy_exposure_limit():
+    from core.event_bus import Event
+    broker = MagicMock()
+    broker.send_order = AsyncMock(side_effect=[{"rt_cd": "0", "output": {"order_no": f"O{i}"}} for i in range(3)])
+    engine = make_engine(broker, {"max_strategy_exposure": 0.1, "max_symbol_exposure": 0, "max_market_exposure": 0})
+    engine.register_strategy(TickBuyStrategy("A", "005930"))
+    engine.register_strategy(TickBuyStrategy("B", "000660"))
+
+    await engine.on_realtime_data({"code": "005930", "price": 600_000})
+    await engine.dispatcher.drain()
+    order = engine.order_manager.active_orders["O0"]
+    assert order["strategy_id"] == "A"
+    engine._on_order_filled(Event("order.filled", {"order_id": "O0", "symbol": "005930", "type": "BUY",
+                                                   "price": 600_000, "qty": 1, "strategy_id": order["strategy_id"]}))
+    assert engine.risk_manager.strategy_exposure["A"] == 600_000
+
+    # A would hold 12% > 10%; B's first order is within its own limit
+    await engine.on_realtime_data({"code": "005930", "price": 600_000})
+    await engine.on_realtime_data({"code": "000660", "price": 600_000})
+    await engine.dispatcher.drain()
+    assert [c.args[0] for c in broker.send_order.call_args_list] == ["005930", "000660"]
+    assert engine.order_manager.active_orders["O1"]["strategy_id"] == "B"
+
+@pytest.mark.asyncio
+async def test_engine_applies_strategy_time_in_force():
+    broker = MagicMock()
+    broker.send_order = AsyncMock(side_effect=[{"rt_cd": "0", "output": {"order_no": f"O{i}"}} for i in range(2)])
+    broker.cancel_order = AsyncMock(return_value={"return_code": 0})
+    engine = make_engine(broker)
+    engine.order_manager.max_unfilled_time = 60
+    engine.register_strategy(TickBuyStrategy("scalp", "005930", {"time_in_force": 0.1}))
+    engine.register_strategy(TickBuyStrategy("swing", "000660"))
+
+    monitor = asyncio.create_task(engine.order_manager.monitor_unfilled_orders())
+    try:
+        await engine.on_realtime_data({"code": "005930", "price": 60000})
+        await engine.on_realtime_data({"code": "000660", "price": 60000})
+        await engine.dispatcher.drain()
+        assert engine.order_manager.active_orders["O0"]["time_in_force"] == 0.1
+        await asyncio.sleep(0.3)
+    finally:
+        monitor.cancel()
+        await monitor
+
+    # Only the scalping order expired; the other keeps the default (60s)
+    broker.cancel_order.assert_awaited_once_with("O0", "005930", 1)
+    assert engine.order_manager.active_orders["O1"]["time_in_force"] is None
+
+@pytest.mark.asyncio
+async def test_failed_send_releases_order_count():
+    broker = MagicMock()
+    broker.send_order = AsyncMock(side_effect=[{"rt_cd": "1", "msg1": "주문 거부"}, {"rt_cd": "0", "output": {"order_no": "O1"}}])
+    engine = make_engine(broker, {"max_order_count_per_min": 1})
+    signal = Signal("005930", "BUY", 60000, datetime.now(), "Test")
+
+    await engine.execute_signal(signal, 1)
+    assert len(engine.risk_manager.order_count_window) == 0
+    assert len(engine.risk_manager.symbol_order_windows["005930"]) == 0
+
+    # The rejected order did not use up the one-per-minute limit
+    await engine.execute_signal(signal, 1)
+    assert broker.send_order.await_count == 2
+    assert len(engine.risk_manager.order_count_window) == 1
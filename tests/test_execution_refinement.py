@@ -71,7 +71,8 @@ class TestExecutionRefinement(unittest.IsolatedAsyncioTestCase):
         # Check Memory
         self.assertIn("ORD1", om.active_orders)
         
-        # Check DB
+        # Check DB (view synced in the background)
+        await om.flush()
         rows = await self.db.fetch_all("SELECT * FROM active_orders WHERE order_id='ORD1'")
         self.assertEqual(len(rows), 1)
         self.assertEqual(rows[0][1], "005930") # Symbol
@@ -93,6 +94,7 @@ class TestExecutionRefinement(unittest.IsolatedAsyncioTestCase):
         await om2.on_order_event(event_data)
         
         self.assertNotIn("ORD1", om2.active_orders)
+        await om2.flush()
         rows = await self.db.fetch_all("SELECT * FROM active_orders WHERE order_id='ORD1'")
         self.assertEqual(len(rows), 0)
 
@@ -0,0 +1,182 @@
+import pytest
+import numpy as np
+import pandas as pd
+from execution.execution_simulator import ExecutionSimulator, L2Book, FEE_RATE_BUY, FEE_RATE_SELL
+from execution.paper_exchange import PaperExchange
+from strategy.backtester import EventDrivenBacktester
+from strategy.base_strategy import BaseStrategy
+
+def make_order(order_id, side, qty, price=0, order_type="MARKET"):
+    return {"order_id": order_id, "symbol": "005930", "side": side, "qty": qty, "price": price, "type": order_type}
+
+def make_book(n=200, depth=10, size=50, seed=0):
+    # One snapshot every 10s from 09:00, 10 ticks of 10 KRW per side
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-03-04 09:00", periods=n, freq="10s")
+    mid = 10000 + 10 * np.cumsum(rng.integers(-1, 2, n))
+    frame = {}
+    for i in range(1, depth + 1):
+        frame[f"ask{i}"] = mid + 10 * i
+        frame[f"ask_size{i}"] = size
+        frame[f"bid{i}"] = mid - 10 * i
+        frame[f"bid_size{i}"] = size
+    return L2Book.from_frame(pd.DataFrame(frame, index=index))
+
+class BuyThenSell(BaseStrategy):
+    """Buys on bar 0 and sells on bar 5."""
+    async def on_realtime_data(self, data):
+        return None
+
+    def get_parameter_schema(self):
+        return {}
+
+    def calculate_signals(self, df):
+        df = df.copy()
+        df['signal'] = 0
+        df.iloc[0, df.columns.get_loc('signal')] = 1
+        df.iloc[5, df.columns.get_loc('signal')] = -1
+        return df
+
+def test_latency_and_level_walking():
+    simulator = ExecutionSimulator(latency=0.5)
+    simulator.submit(make_order("m1", "BUY", 12), now=100.0)
+    asks = [(101, 5), (102, 5), (103, 100)]
+
+    # Not at the exchange yet
+    assert simulator.on_book("005930", asks, [(99, 10)], now=100.2) == []
+
+    fills = simulator.on_book("005930", asks, [(99, 10)], now=100.5)
+    assert [(o["order_id"], q, p) for o, q, p in fills] == [("m1", 5, 101), ("m1", 5, 102), ("m1", 2, 103)]
+    assert simulator.orders == {}
+
+def test_cancel_in_flight():
+    simulator = ExecutionSimulator(latency=1.0)
+    simulator.submit(make_order("m1", "BUY", 1), now=0.0)
+    assert simulator.cancel("m1")
+    assert simulator.on_book("005930", [(101, 5)], [], now=2.0) == []
+    assert not simulator.cancel("m1")
+
+def test_queue_position_fills_after_size_ahead():
+    simulator = ExecutionSimulator()
+    simulator.submit(make_order("b1", "BUY", 10, 100, "LIMIT"), now=0.0)
+    asks = [(101, 50)]
+
+    # Joins behind 30 displayed at 100
+    assert simulator.on_book("005930", asks, [(100, 30)], now=1.0) == []
+    assert simulator.orders["b1"]["queue_ahead"] == 30
+    # 10 traded / cancelled ahead, then more joins behind: no fill
+    assert simulator.on_book("005930", asks, [(100, 20)], now=2.0) == []
+    assert simulator.on_book("005930", asks, [(100, 40)], now=3.0) == []
+    assert simulator.orders["b1"]["queue_ahead"] == 20
+    # 25 more leave the front: 20 ahead, then 5 against us
+    fills = simulator.on_book("005930", asks, [(100, 15)], now=4.0)
+    assert [(q, p) for _, q, p in fills] == [(5, 100)]
+    # Price moves through the limit: rest fills at the ask
+    fills = simulator.on_book("005930", [(100, 50)], [(99, 10)], now=5.0)
+    assert [(q, p) for _, q, p in fills] == [(5, 100)]
+    assert simulator.orders == {}
+    assert simulator._queues["005930"] == {}
+
+def test_queue_fills_two_orders_in_queue_order():
+    simulator = ExecutionSimulator()
+    simulator.submit(make_order("a", "BUY", 50, 99, "LIMIT"), now=0.0)
+    simulator.submit(make_order("b", "BUY", 50, 99, "LIMIT"), now=0.0)
+    asks = [(100, 50)]
+
+    # Both join behind 100 displayed; a arrived first
+    assert simulator.on_book("005930", asks, [(99, 100)], now=1.0) == []
+    assert simulator.on_book("005930", asks, [(99, 300)], now=2.0) == []
+    # 150 leave the front: 100 ahead, then 50 fill a; nothing is left for b
+    fills = simulator.on_book("005930", asks, [(99, 150)], now=3.0)
+    assert [(o["order_id"], q, p) for o, q, p in fills] == [("a", 50, 99)]
+    assert simulator.orders["b"]["queue_ahead"] == 0
+    assert simulator.orders["b"]["filled_qty"] == 0
+    # b is now at the front
+    fills = simulator.on_book("005930", asks, [(99, 120)], now=4.0)
+    assert [(o["order_id"], q, p) for o, q, p in fills] == [("b", 30, 99)]
+
+def test_l2_backtest_fills_match_simulator():
+    book = make_book()
+    index = pd.date_range("2024-03-04 09:00", periods=30, freq="min")
+    bars = pd.DataFrame({"open": 10000.0, "high": 10000.0, "low": 10000.0, "close": 10000.0, "volume": 1000.0}, index=index)
+    backtester = EventDrivenBacktester()
+    backtester.configure({"l2_latency": 0.25})
+
+    result = backtester.run_l2(BuyThenSell("l2", "005930"), bars, book)
+
+    buy, sell = result.trades
+    assert buy["type"] == "BUY" and sell["type"] == "SELL"
+    assert buy["qty"] == sell["qty"] > 500 # deeper than one snapshot: worked over two
+
+    # Same orders through the simulator PaperExchange runs on
+    simulator = ExecutionSimulator(latency=0.25)
+    seconds = book.timestamps / 1e9
+    # Signals of bars 0 and 5 are submitted when those bars close (= start of bars 1 and 6)
+    orders = {bars.index.asi8[1] / 1e9: ("BUY", buy["qty"]), bars.index.asi8[6] / 1e9: ("SELL", sell["qty"])}
+    executions = {"BUY": [], "SELL": []}
+    for i in range(len(book)):
+        for close, (side, qty) in list(orders.items()):
+            if close <= seconds[i]:
+                simulator.submit(make_order(side, side, qty), now=close)
+                del orders[close]
+        for order, qty, price in simulator.on_book("005930", book.levels(i, "ask"), book.levels(i, "bid"), seconds[i]):
+            executions[order["side"]].append((qty, price))
+
+    for trade in (buy, sell):
+        fills = executions[trade["type"]]
+        assert sum(q for q, _ in fills) == trade["qty"]
+        assert sum(q * p for q, p in fills) / trade["qty"] == pytest.approx(trade["price"])
+
+    # Equity marks the position at bar closes and ends flat; fees are PaperExchange's
+    assert result.final_capital == pytest.approx(
+        backtester.initial_capital - buy["qty"] * buy["price"] * (1 + FEE_RATE_BUY)
+        + sell["qty"] * sell["price"] * (1 - FEE_RATE_SELL))
+    exchange = PaperExchange()
+    assert (exchange.fee_rate_buy, exchange.fee_rate_sell) == (FEE_RATE_BUY, FEE_RATE_SELL)
+
+class LimitBuy(BaseStrategy):
+    """Bids 9990 on bar 0 (one tick below the book's best bid)."""
+    async def on_realtime_data(self, data):
+        return None
+
+    def get_parameter_schema(self):
+        return {}
+
+    def calculate_signals(self, df):
+        df = df.copy()
+        df['signal'] = 0
+        df['limit_price'] = np.nan
+        df.iloc[0, df.columns.get_loc('signal')] = 1
+        df.iloc[0, df.columns.get_loc('limit_price')] = 9990
+        return df
+
+def test_l2_backtest_limit_order_waits_in_queue():
+    # Flat book (mid 10000): 300 bid at 9990 when the order arrives, 200 join behind it,
+    # then 250 and 150 trade
+    index = pd.date_range("2024-03-04 09:01", periods=8, freq="10s")
+    frame = pd.DataFrame({"ask1": 10010.0, "ask_size1": 500, "bid1": 10000.0, "bid_size1": 500,
+                          "bid2": 9990.0, "bid_size2": [300, 500, 250, 100, 100, 100, 100, 100]}, index=index)
+    bars = pd.DataFrame({"open": 10000.0, "high": 10000.0, "low": 10000.0, "close": 10000.0, "volume": 1000.0},
+                        index=pd.date_range("2024-03-04 09:00", periods=3, freq="min"))
+    backtester = EventDrivenBacktester()
+    backtester.configure({"initial_capital": 1_000_000})
+
+    result = backtester.run_l2(LimitBuy("l2", "005930"), bars, L2Book.from_frame(frame, depth=2))
+
+    # 95 shares at the limit; filled once the 300 ahead of it have left
+    (buy,) = result.trades
+    assert (buy["qty"], buy["price"]) == (95, 9990)
+    assert buy["time"] == index[3]
+    assert result.final_capital == pytest.approx(1_000_000 - 95 * 9990 * (1 + FEE_RATE_BUY) + 95 * 10000)
+
+@pytest.mark.asyncio
+async def test_paper_exchange_matches_orderbook_event():
+    exchange = PaperExchange(initial_capital=10_000_000)
+    await exchange.send_order("005930", 1, 8, 0, "03")
+
+    executions = exchange.on_orderbook({"symbol": "005930",
+                                        "asks": [(60000, 5), (60100, 10)], "bids": [(59900, 10)]})
+
+    assert [(e["exec_qty"], e["price"]) for e in executions] == [(5, 60000), (3, 60100)]
+    assert exchange.positions["005930"]["qty"] == 8
+    assert exchange.active_orders == {}
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from strategy.ai_engine import AIEngine
+from strategy.inference_service import InferenceService
+
+class BatchRecordingModel:
+    """Score = sigmoid(first feature of the last row); records batch sizes and threads."""
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.batches = []
+        self.threads = set()
+
+    def predict_proba(self, X):
+        time.sleep(self.delay)
+        self.batches.append(len(X))
+        self.threads.add(threading.current_thread().name)
+        p = 1 / (1 + np.exp(-np.asarray(X)[:, -3]))
+        return np.column_stack([1 - p, p])
+
+def make_engine(model, window=4):
+    engine = AIEngine()
+    engine.models["m"] = model
+    engine.feature_configs["m"] = ["a", "b", "c"]
+    engine.windows["m"] = window
+    return engine
+
+def frames(n, rows=10):
+    rng = np.random.default_rng(0)
+    return [pd.DataFrame(rng.normal(size=(rows, 3)), columns=["a", "b", "c"]) for _ in range(n)]
+
+@pytest.mark.asyncio
+async def test_requests_are_micro_batched_across_callers():
+    model = BatchRecordingModel()
+    engine = make_engine(model)
+    service = InferenceService(engine, max_batch=16, max_delay=0.05)
+    dfs = frames(40)
+
+    scores = await asyncio.gather(*(service.predict(df, "m") for df in dfs))
+
+    # 16 + 16 on size, the last 8 on the deadline, all on the service's threads
+    assert model.batches == [16, 16, 8]
+    assert all(name.startswith("inference") for name in model.threads)
+    assert scores == pytest.approx([engine.predict(df, "m") for df in dfs])
+    stats = service.stats()
+    assert stats["batch_size"]["count"] == 3 and stats["batch_size"]["buckets"]["<=16"] == 2
+    assert stats["queue_wait_ms"]["count"] == 40
+    # Deadline-flushed requests waited about max_delay (50ms)
+    waits = stats["queue_wait_ms"]["buckets"]
+    assert waits["<=50"] + waits["<=100"] + waits[">100"] >= 8
+    service.close()
+
+@pytest.mark.asyncio
+async def test_inference_does_not_block_the_loop():
+    model = BatchRecordingModel(delay=0.2)
+    service = InferenceService(make_engine(model), max_batch=64, max_delay=0.002)
+    beats = []
+
+    async def heartbeat():
+        for _ in range(10):
+            beats.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+
+    start = time.perf_counter()
+    score, _ = await asyncio.gather(service.predict(frames(1)[0], "m"), heartbeat())
+
+    assert 0 < score < 1
+    assert time.perf_counter() - start >= 0.2
+    # The loop kept ticking while the forward pass ran
+    assert max(np.diff(beats)) < 0.1
+    service.close()
+
+@pytest.mark.asyncio
+async def test_missing_model_or_short_history():
+    service = InferenceService(make_engine(BatchRecordingModel()), max_delay=0.001)
+    assert await service.predict(frames(1)[0], "unknown") == 0.0
+    assert await service.predict(frames(1, rows=2)[0], "m") == 0.0
+    service.close()
@@ -0,0 +1,102 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeRegressor
+from strategy.ai_engine import AIEngine
+from strategy.model_export import (FORMAT_VERSION, CompiledTrees, export_sklearn, export_torch,
+                                   metadata_path)
+
+FEATURES = ["a", "b", "c", "d"]
+
+def make_data(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, len(FEATURES)))
+    y = (X[:, 0] + 0.5 * X[:, 1] * X[:, 2] + rng.normal(scale=0.5, size=n) > 0).astype(int)
+    return X, y
+
+def test_compiled_trees_match_sklearn():
+    X, y = make_data()
+    X_test, _ = make_data(500, seed=1)
+    for model in (RandomForestClassifier(n_estimators=30, max_depth=8, random_state=0),
+                  GradientBoostingClassifier(n_estimators=40, max_depth=3, random_state=0)):
+        model.fit(X, y)
+        compiled = CompiledTrees.from_sklearn(model)
+        assert np.allclose(compiled.predict_proba(X_test), model.predict_proba(X_test), atol=1e-9)
+        assert (compiled.predict(X_test) == model.predict(X_test)).all()
+
+    regressor = DecisionTreeRegressor(max_depth=6, random_state=0).fit(X, X[:, 0] * 2)
+    compiled = CompiledTrees.from_sklearn(regressor)
+    assert not hasattr(compiled, "predict_proba")
+    assert np.allclose(compiled.predict(X_test), regressor.predict(X_test))
+
+def test_exported_trees_load_memory_mapped_with_sidecar(tmp_path):
+    X, y = make_data()
+    scaler = StandardScaler().fit(X * 10 + 3)
+    model = RandomForestClassifier(n_estimators=20, max_depth=6, random_state=0).fit(scaler.transform(X * 10 + 3), y)
+    path = str(tmp_path / "rf.npy")
+
+    metadata = export_sklearn(model, path, feature_config=FEATURES, scaler=scaler, version=3)
+
+    with open(metadata_path(path)) as f:
+        assert json.load(f) == metadata
+    assert metadata["format_version"] == FORMAT_VERSION and metadata["kind"] == "trees"
+
+    engine = AIEngine()
+    engine.load_model("rf", path) # Features, scaler and window come from the sidecar
+    assert isinstance(engine.models["rf"].nodes, np.memmap)
+    assert engine.feature_configs["rf"] == FEATURES and engine.windows["rf"] == 1
+
+    df = pd.DataFrame(X[:300] * 10 + 3, columns=FEATURES)
+    expected = model.predict_proba(scaler.transform(df.values))[:, 1]
+    assert np.allclose(engine.predict_batch(df, "rf"), expected)
+
+def test_quantized_torchscript_export(tmp_path):
+    import torch
+
+    class Net(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.lstm = torch.nn.LSTM(len(FEATURES), 16, batch_first=True)
+            self.head = torch.nn.Linear(16, 1)
+
+        def forward(self, x):
+            out, _ = self.lstm(x)
+            return self.head(out[:, -1])
+
+    torch.manual_seed(0)
+    net = Net().eval()
+    X, _ = make_data(400)
+    df = pd.DataFrame(X, columns=FEATURES)
+    path = str(tmp_path / "lstm.pt")
+
+    metadata = export_torch(net, path, X[:40].reshape(2, 20, -1), feature_config=FEATURES, window=20)
+    assert metadata["quantized"] == "int8_dynamic"
+
+    engine = AIEngine()
+    engine.models["float"] = net
+    engine.feature_configs["float"] = FEATURES
+    engine.windows["float"] = 20
+    engine.load_model("int8", path)
+    assert engine.windows["int8"] == 20
+
+    reference = engine.predict_batch(df, "float")
+    scores = engine.predict_batch(df, "int8")
+    assert np.isnan(scores[:19]).all()
+    assert np.nanmax(np.abs(scores - reference)) < 0.02
+
+def test_newer_format_is_rejected(tmp_path):
+    X, y = make_data(200)
+    path = str(tmp_path / "tree.npy")
+    export_sklearn(RandomForestClassifier(n_estimators=2, random_state=0).fit(X, y), path)
+    with open(metadata_path(path)) as f:
+        metadata = json.load(f)
+    metadata["format_version"] = FORMAT_VERSION + 1
+    with open(metadata_path(path), "w") as f:
+        json.dump(metadata, f)
+
+    engine = AIEngine()
+    engine.load_model("tree", path)
+    assert "tree" not in engine.models
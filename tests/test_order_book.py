@@ -0,0 +1,75 @@
+import pytest
+from execution.order_book import OrderBook
+from execution.paper_exchange import PaperExchange
+
+def make_order(order_id, side, qty, price, order_type="LIMIT"):
+    return {"order_id": order_id, "symbol": "005930", "side": side, "qty": qty,
+            "filled_qty": 0, "price": price, "type": order_type}
+
+def test_order_book_priority_and_partial_fills():
+    book = OrderBook("005930")
+    book.add(make_order("b1", "BUY", 5, 100))
+    book.add(make_order("b2", "BUY", 5, 102)) # best price
+    book.add(make_order("b3", "BUY", 5, 102)) # same price, later
+    book.add(make_order("b4", "BUY", 5, 99)) # never crosses
+    book.add(make_order("m1", "BUY", 2, 0, "MARKET")) # ahead of limits
+
+    fills = book.match(asks=[(101, 4), (102, 10)], bids=[])
+
+    assert [(o["order_id"], q, p) for o, q, p in fills] == [
+        ("m1", 2, 101), ("b2", 2, 101), ("b2", 3, 102), ("b3", 5, 102)
+    ]
+    assert set(book.orders) == {"b1", "b4"}
+    assert book.best_bid() == 100
+
+    # b1 crosses 100 but only 3 are displayed: partial, stays on book
+    fills = book.match(asks=[(100, 3)], bids=[])
+    assert [(o["order_id"], q) for o, q, _ in fills] == [("b1", 3)]
+    assert book.orders["b1"]["filled_qty"] == 3
+
+def test_order_book_cancel_is_lazy_and_compacts():
+    book = OrderBook("005930")
+    for i in range(500):
+        book.add(make_order(f"s{i}", "SELL", 1, 1000 + i))
+    for i in range(499):
+        book.remove(f"s{i}")
+
+    assert len(book) == 1
+    assert book.best_ask() == 1499
+    assert len(book._asks) < 100
+
+    fills = book.match(asks=[], bids=[(1500, 10)])
+    assert [(o["order_id"], q, p) for o, q, p in fills] == [("s499", 1, 1500)]
+    assert len(book) == 0
+
+@pytest.mark.asyncio
+async def test_paper_exchange_partial_fills_across_levels():
+    exchange = PaperExchange(initial_capital=10_000_000)
+    res = await exchange.send_order("005930", 1, 10, 60100, "00")
+    order_id = res["output"]["order_no"]
+    await exchange.send_order("005930", 1, 10, 59000, "00") # below the ask: untouched
+
+    quote = {"symbol": "005930", "current_price": 60000,
+             "ask1": 60000, "ask_size1": 3, "ask2": 60100, "ask_size2": 4, "ask3": 60200, "ask_size3": 100,
+             "bid1": 59900, "bid_size1": 100}
+    executions = exchange.match_orders(quote)
+
+    assert [(e["order_no"], e["exec_qty"], e["price"]) for e in executions] == [
+        (order_id, 3, 60000), (order_id, 4, 60100)
+    ]
+    assert all(e["status"] == "FILLED" and e["qty"] == 10 for e in executions)
+    assert exchange.positions["005930"]["qty"] == 7
+    assert exchange.active_orders[order_id]["filled_qty"] == 7
+    assert len(exchange.active_orders) == 2
+
+    # Remainder fills on the next quote and leaves the book
+    executions = exchange.match_orders({"symbol": "005930", "current_price": 60100, "ask1": 60100, "ask_size1": 50})
+    assert [(e["exec_qty"], e["price"]) for e in executions] == [(3, 60100)]
+    assert order_id not in exchange.active_orders
+    assert exchange.positions["005930"]["qty"] == 10
+
+    # Cancel removes from the book
+    remaining_id = next(iter(exchange.active_orders))
+    await exchange.cancel_order(remaining_id, "005930", 10)
+    assert exchange.match_orders({"symbol": "005930", "current_price": 58000}) == []
+    assert len(exchange.books["005930"]) == 0
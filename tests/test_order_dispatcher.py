@@ -0,0 +1,129 @@
+import asyncio
+import time
+import pytest
+from datetime import datetime
+from unittest.mock import MagicMock, AsyncMock
+from execution.engine import ExecutionEngine
+from execution.order_dispatcher import OrderDispatcher
+from strategy.base_strategy import Signal
+
+class SlowBroker:
+    """Order endpoint with a fixed round trip."""
+    def __init__(self, rtt=0.05):
+        self.rtt = rtt
+        self.sent = []
+
+    async def send_order(self, symbol, order_type, qty, price=0, trade_type="00"):
+        await asyncio.sleep(self.rtt)
+        self.sent.append((symbol, price))
+        return {"rt_cd": "0", "output": {"order_no": f"O{len(self.sent)}"}}
+
+class SlowNotifier:
+    def __init__(self):
+        self.messages = []
+
+    async def send_message(self, msg, level="INFO"):
+        await asyncio.sleep(1.0)
+        self.messages.append(msg)
+
+class TickStrategy:
+    """Emits a BUY at the tick price for its symbol."""
+    def __init__(self, strategy_id, symbol):
+        self.strategy_id = strategy_id
+        self.symbol = symbol
+        self.position_sizer = None
+        self.config = {}
+
+    async def on_realtime_data(self, data):
+        signal = Signal(self.symbol, "BUY", data["price"], datetime.now(), "tick")
+        signal.strategy_id = self.strategy_id
+        return signal
+
+@pytest.mark.asyncio
+async def test_sequenced_per_symbol_parallel_across_symbols():
+    dispatcher = OrderDispatcher()
+    log = []
+
+    async def job(symbol, n):
+        log.append((symbol, n, "start"))
+        await asyncio.sleep(0.05)
+        log.append((symbol, n, "end"))
+        return n
+
+    start = time.monotonic()
+    futures = [dispatcher.submit(symbol, job, symbol, n) for n in range(3) for symbol in ("A", "B", "C")]
+    assert [await f for f in futures] == [0, 0, 0, 1, 1, 1, 2, 2, 2]
+    elapsed = time.monotonic() - start
+
+    assert 0.15 <= elapsed < 0.25 # 3 rounds, symbols side by side
+    for symbol in ("A", "B", "C"):
+        events = [(n, kind) for s, n, kind in log if s == symbol]
+        assert events == [(0, "start"), (0, "end"), (1, "start"), (1, "end"), (2, "start"), (2, "end")]
+    assert dispatcher._workers == {} and dispatcher._queues == {}
+
+@pytest.mark.asyncio
+async def test_tick_to_order_off_notification_path():
+    broker = SlowBroker()
+    engine = ExecutionEngine(broker, mode="REAL")
+    engine.is_running = True
+    engine.notification_manager = SlowNotifier()
+    engine.account_manager = MagicMock()
+    engine.account_manager.get_summary.return_value = {
+        "balance": {"deposit": 10_000_000, "total_asset": 10_000_000, "daily_pnl": 0}, "positions": {}
+    }
+    engine.account_manager.check_buying_power.return_value = True
+    for i, symbol in enumerate(("005930", "000660", "035720")):
+        engine.register_strategy(TickStrategy(f"s{i}", symbol))
+
+    start = time.monotonic()
+    for price in (100, 101):
+        for symbol in ("005930", "000660", "035720"):
+            await engine.on_realtime_data({"code": symbol, "price": price})
+    assert time.monotonic() - start < 0.02 # Ticks do not wait for orders
+    await engine.dispatcher.drain()
+    elapsed = time.monotonic() - start
+
+    # Two round trips, not six; notifications (1s each) not awaited
+    assert elapsed < 0.2
+    assert [price for symbol, price in broker.sent if symbol == "005930"] == [100, 101]
+    assert len(broker.sent) == 6
+    stats = engine.get_state()["order_latency"]
+    assert stats["count"] == 6 and 40 <= stats["p50_ms"] <= stats["max_ms"] < 200
+
+    # Pending notifications are referenced by the engine until they finish
+    tasks = list(engine._background_tasks)
+    assert len(tasks) == 6 and not any(task.done() for task in tasks)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    assert engine._background_tasks == set()
+
+@pytest.mark.asyncio
+async def test_panic_stop_drops_queued_signals_before_flatten():
+    broker = SlowBroker()
+    engine = ExecutionEngine(broker, mode="REAL")
+    engine.is_running = True
+    engine.notification_manager = MagicMock(send_message=AsyncMock())
+    engine.account_manager = MagicMock()
+    engine.account_manager.get_summary.return_value = {
+        "balance": {"deposit": 10_000_000, "total_asset": 10_000_000, "daily_pnl": 0}, "positions": {}
+    }
+    engine.account_manager.check_buying_power.return_value = True
+    engine.register_strategy(TickStrategy("s0", "005930"))
+
+    seen_by_flatten = []
+    async def flatten():
+        seen_by_flatten.extend(engine.order_manager.active_orders)
+        return {"cancel": {"cancelled": 1, "failed": []}, "liquidation": {"sold": 0, "failed": []}, "time_to_flat": 0.0}
+    engine.order_manager.flatten = flatten
+
+    for price in (100, 101, 102):
+        await engine.on_realtime_data({"code": "005930", "price": price})
+    await asyncio.sleep(0.01) # First order in flight, two queued
+    await engine.stop_trading(panic=True)
+
+    # The in-flight order finished before flatten() ran; the queued ones were never sent
+    assert broker.sent == [("005930", 100)]
+    assert seen_by_flatten == ["O1"]
+    await engine.on_realtime_data({"code": "005930", "price": 103})
+    assert engine.dispatcher.pending("005930") == 0 and broker.sent == [("005930", 100)]
@@ -0,0 +1,77 @@
+import asyncio
+import json
+import pytest
+from datetime import datetime
+from execution.order_journal import OrderJournal
+from execution.order_manager import OrderManager
+
+def make_order(qty=10, filled=0):
+    return {'symbol': "005930", 'type': "BUY", 'quantity': qty, 'filled_qty': filled, 'price': 60000,
+            'source': 'STRATEGY', 'timestamp': datetime(2024, 3, 4, 9, 0), 'strategy_id': "s1",
+            'time_in_force': 10, 'expires_at': 1.0}
+
+@pytest.mark.asyncio
+async def test_group_commit_and_replay(tmp_path):
+    journal = OrderJournal(str(tmp_path / "orders.jsonl"))
+    for i in range(500):
+        journal.append("put", f"O{i}", make_order())
+    for i in range(0, 500, 2):
+        journal.append("del", f"O{i}")
+    journal.append("put", "O1", make_order(filled=4))
+    await asyncio.sleep(0.1)
+
+    # One burst: a handful of write + fsync, not one per event
+    assert journal.records == 751
+    assert journal.commits <= 3
+
+    restored = OrderJournal(journal.path)
+    orders = restored.replay()
+    assert sorted(orders) == sorted(f"O{i}" for i in range(1, 500, 2))
+    assert orders["O1"]["filled_qty"] == 4
+    assert orders["O1"]["timestamp"] == "2024-03-04T09:00:00"
+    assert "expires_at" not in orders["O1"]
+    assert restored.seq == journal.seq
+
+@pytest.mark.asyncio
+async def test_torn_tail_and_compaction(tmp_path):
+    path = tmp_path / "orders.jsonl"
+    journal = OrderJournal(str(path))
+    journal.append("put", "A", make_order())
+    journal.append("put", "B", make_order())
+    journal.append("del", "A")
+    await journal.flush()
+    with open(path, "a") as f:
+        f.write('{"seq": 4, "op": "del", "order_id": "B"') # Crash mid-write
+
+    restored = OrderJournal(str(path))
+    assert list(restored.replay()) == ["B"]
+    assert path.read_text().count("\n") == 3
+
+    await restored.compact({"B": make_order()})
+    restored.append("put", "C", make_order())
+    await restored.flush()
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [(r["op"], r["order_id"]) for r in lines] == [("put", "B"), ("put", "C")]
+    assert lines[0]["seq"] < lines[1]["seq"]
+    assert list(OrderJournal(str(path)).replay()) == ["B", "C"]
+
+@pytest.mark.asyncio
+async def test_order_events_are_journaled_without_waiting(tmp_path):
+    class Broker:
+        async def send_order(self, *args):
+            return {"rt_cd": "0", "output": {"order_no": "ORD1"}}
+
+    manager = OrderManager(Broker())
+    manager.journal = OrderJournal(str(tmp_path / "orders.jsonl"))
+    assert await manager.send_manual_order("005930", "BUY", 60000, 10) == "ORD1"
+    await manager.on_order_event({"order_no": "ORD1", "status": "FILLED", "exec_qty": 4, "price": 60000})
+    # Nothing on disk yet: the handler did not wait for the commit
+    assert manager.journal.records == 0
+
+    await manager.flush()
+    orders = OrderJournal(manager.journal.path).replay()
+    assert orders["ORD1"]["filled_qty"] == 4 and orders["ORD1"]["source"] == "MANUAL"
+
+    await manager.on_order_event({"order_no": "ORD1", "status": "CANCELLED"})
+    await manager.flush()
+    assert OrderJournal(manager.journal.path).replay() == {}
@@ -0,0 +1,151 @@
+import pytest
+import pandas as pd
+import numpy as np
+import talib
+from unittest.mock import patch
+from strategy.backtester import EventDrivenBacktester
+from strategy.panel import MarketPanel, compact_rows, expand_rows, rolling_sma, wilder_rsi
+from strategy.screener import PanelScreener
+from strategy.strategies import (
+    VolatilityBreakoutStrategy,
+    MovingAverageCrossoverStrategy,
+    EnvelopeStrategy,
+    RSIStrategy,
+    BollingerBandStrategy
+)
+
+def make_frame(n, seed, start='2024-01-01'):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start=start, periods=n, freq='D')
+    close = 10000 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    open_p = close * (1 + rng.normal(0, 0.005, n))
+    return pd.DataFrame({
+        'open': open_p,
+        'high': np.maximum(open_p, close) * 1.01,
+        'low': np.minimum(open_p, close) * 0.99,
+        'close': close,
+        'volume': rng.integers(10_000, 100_000, n).astype(float)
+    }, index=dates)
+
+@pytest.fixture
+def universe():
+    # Full history, late listing, early delisting, mid-series halts
+    halted = make_frame(250, 4)
+    return {
+        "000001": make_frame(250, 1),
+        "000002": make_frame(200, 2, start='2024-02-20'),
+        "000003": make_frame(150, 3),
+        "000004": halted.drop(halted.index[[60, 61, 130]]),
+    }
+
+def test_kernels_match_talib():
+    close = make_frame(300, 7)['close'].to_numpy()
+    matrix = np.column_stack([close, close[::-1].copy()])
+
+    sma = rolling_sma(matrix, 20)
+    rsi = wilder_rsi(matrix, 14)
+    for j in range(matrix.shape[1]):
+        np.testing.assert_array_equal(sma[:, j], talib.SMA(matrix[:, j], timeperiod=20))
+        np.testing.assert_array_equal(rsi[:, j], talib.RSI(matrix[:, j], timeperiod=14))
+
+def test_compact_rows_skips_gaps():
+    x = np.array([[1.0, 10.0], [np.nan, 20.0], [3.0, np.nan], [4.0, 40.0]])
+    valid = ~np.isnan(x)
+
+    compact = compact_rows(x, valid)
+    np.testing.assert_array_equal(compact[:3, 0], [1.0, 3.0, 4.0])
+    np.testing.assert_array_equal(compact[:3, 1], [10.0, 20.0, 40.0])
+    assert np.isnan(compact[3]).all()
+    np.testing.assert_array_equal(expand_rows(compact, valid), x)
+
+def test_panel_masks_listing_and_delisting(universe):
+    panel = MarketPanel.from_frames(universe)
+
+    assert panel.shape == (len(panel.index), 4)
+    assert panel.valid.sum(axis=0).tolist() == [250, 200, 150, 247]
+    assert np.isnan(panel.close[~panel.valid]).all()
+    pd.testing.assert_frame_equal(panel.to_frame("000002"), universe["000002"], check_freq=False)
+
+@pytest.mark.parametrize("strategy_cls, params", [
+    (VolatilityBreakoutStrategy, {"k": 0.5}),
+    (MovingAverageCrossoverStrategy, {"short_window": 5, "long_window": 20}),
+    (RSIStrategy, {"period": 14, "buy_threshold": 40, "sell_threshold": 60}),
+    (EnvelopeStrategy, {"period": 20, "rate": 2.0}),
+    (BollingerBandStrategy, {"period": 20, "std_dev": 2.0}),
+])
+def test_run_panel_matches_single_runs(universe, strategy_cls, params):
+    backtester = EventDrivenBacktester()
+    panel = MarketPanel.from_frames(universe)
+
+    panel_strategy = strategy_cls("panel", "UNIVERSE")
+    panel_strategy.initialize(params)
+    panel_results = backtester.run_panel(panel_strategy, panel)
+
+    for symbol, df in universe.items():
+        strategy = strategy_cls("single", symbol)
+        strategy.initialize(params)
+        expected = backtester.run(strategy, df)
+        result = panel_results[symbol]
+
+        assert result.trades == expected.trades
+        assert result.equity_curve == expected.equity_curve
+        assert result.total_return == expected.total_return
+        assert result.mdd == expected.mdd
+        assert result.sharpe_ratio == pytest.approx(expected.sharpe_ratio)
+        assert result.sortino_ratio == pytest.approx(expected.sortino_ratio)
+
+def test_screener_matches_panel_last_row(universe):
+    strategy = MovingAverageCrossoverStrategy("screen", "UNIVERSE")
+    strategy.initialize({"short_window": 5, "long_window": 20})
+    panel = MarketPanel.from_frames(universe)
+    expected = strategy.calculate_signals_panel(panel)
+
+    screener = PanelScreener(strategy, panel.symbols, lookback=60)
+    with patch("strategy.screener.event_bus") as mock_bus:
+        for t, timestamp in enumerate(panel.index[:-1]):
+            for j, symbol in enumerate(panel.symbols):
+                if not panel.valid[t, j]:
+                    continue
+                screener.on_candle({
+                    "symbol": symbol,
+                    "timestamp": timestamp,
+                    "open": panel.open[t, j],
+                    "high": panel.high[t, j],
+                    "low": panel.low[t, j],
+                    "close": panel.close[t, j],
+                    "volume": panel.volume[t, j]
+                })
+        # Close the final pending minute
+        signals = screener.evaluate()
+
+    t = len(panel.index) - 2
+    assert signals == {
+        panel.symbols[j]: int(expected[t, j]) for j in np.flatnonzero(expected[t])
+    }
+    published = [c.args[1]["signals"] for c in mock_bus.publish.call_args_list]
+    assert published == [s for s in published if s]
+    assert sum(len(s) for s in published) > 0
+
+@pytest.mark.asyncio
+async def test_engine_starts_configured_screener(universe):
+    from unittest.mock import AsyncMock
+    from data.kiwoom_rest_client import KiwoomRestClient
+    from execution.engine import ExecutionEngine
+
+    engine = ExecutionEngine(KiwoomRestClient(), mode="PAPER", config={
+        "screener": {"strategy": "MovingAverageCrossoverStrategy",
+                     "params": {"short_window": 5, "long_window": 20},
+                     "symbols": list(universe), "lookback": 60}
+    })
+    recent = AsyncMock(side_effect=lambda symbol, limit: universe[symbol].tail(limit))
+    with patch("data.data_collector.data_collector.get_recent_data", recent):
+        await engine.start_screener()
+
+    screener = engine.screener
+    try:
+        assert screener is not None and screener._sub_id is not None
+        assert screener.symbols == list(universe)
+        assert screener.strategy.short_window == 5
+        assert recent.await_count == len(universe)
+    finally:
+        screener.stop()
@@ -0,0 +1,95 @@
+import pytest
+import pytest_asyncio
+import asyncio
+from core.database import db
+from execution.paper_exchange import PaperExchange
+
+@pytest_asyncio.fixture
+async def paper_db(tmp_path):
+    saved = (db.db_path, db.conn)
+    db.db_path, db.conn = str(tmp_path / "paper.db"), None
+    await db.connect()
+    yield db
+    await db.close()
+    db.db_path, db.conn = saved
+
+async def fill_burst(exchange, n, price=10000):
+    for _ in range(n):
+        await exchange.send_order("005930", 1, 1, price, "00")
+    exchange.match_orders({"symbol": "005930", "current_price": price, "ask1": price, "ask_size1": 1000})
+
+@pytest.mark.asyncio
+async def test_fill_burst_is_journaled_with_one_snapshot(paper_db):
+    exchange = PaperExchange(initial_capital=10_000_000)
+    exchange.journal_delay = 0.01
+    exchange.snapshot_interval = 0.05
+
+    await fill_burst(exchange, 50)
+    await asyncio.wait_for(exchange._persist_task, 2)
+
+    fills = await paper_db.fetch_all("SELECT * FROM paper_fills ORDER BY id")
+    assert len(fills) == 50
+    assert sum(row['qty'] for row in fills) == 50
+
+    rows = await paper_db.fetch_all("SELECT deposit, journal_seq FROM paper_account")
+    assert len(rows) == 1
+    assert rows[0]['journal_seq'] == fills[-1]['id']
+    assert rows[0]['deposit'] == pytest.approx(exchange.balance['deposit'])
+
+@pytest.mark.asyncio
+async def test_recovery_replays_journal_after_last_snapshot(paper_db):
+    exchange = PaperExchange(initial_capital=10_000_000)
+    exchange.journal_delay = 0.01
+    exchange.snapshot_interval = 0.05
+
+    await fill_burst(exchange, 10)
+    await asyncio.wait_for(exchange._persist_task, 2)
+
+    # Later fills reach the journal, then the process dies before the next snapshot
+    exchange.snapshot_interval = 3600
+    await fill_burst(exchange, 5, price=10100)
+    await exchange.send_order("005930", 2, 3, 10200, "00")
+    exchange.match_orders({"symbol": "005930", "current_price": 10200, "bid1": 10200, "bid_size1": 1000})
+    while exchange._pending_fills:
+        await asyncio.sleep(0.01)
+    exchange._persist_task.cancel()
+
+    snapshot = await paper_db.fetch_all("SELECT deposit FROM paper_account")
+    assert snapshot[0]['deposit'] != pytest.approx(exchange.balance['deposit'])
+
+    recovered = PaperExchange(initial_capital=1)
+    await recovered.load_state()
+
+    assert recovered.balance['deposit'] == pytest.approx(exchange.balance['deposit'])
+    assert recovered.positions["005930"]['qty'] == 12
+    assert recovered.positions["005930"]['avg_price'] == pytest.approx(exchange.positions["005930"]['avg_price'])
+
+    # Replayed fills are folded into a new snapshot
+    await recovered.save_state()
+    fills = await paper_db.fetch_all("SELECT id FROM paper_fills ORDER BY id")
+    assert len(fills) == 16
+    rows = await paper_db.fetch_all("SELECT deposit, journal_seq FROM paper_account")
+    assert rows[0]['journal_seq'] == fills[-1]['id']
+    assert rows[0]['deposit'] == pytest.approx(exchange.balance['deposit'])
+
+@pytest.mark.asyncio
+async def test_save_state_during_fills_does_not_double_count(paper_db):
+    exchange = PaperExchange(initial_capital=10_000_000)
+    exchange.snapshot_interval = 3600
+
+    await fill_burst(exchange, 3)
+    save = asyncio.create_task(exchange.save_state())
+    await asyncio.sleep(0) # save_state is now flushing
+    await fill_burst(exchange, 4)
+    await save
+    exchange._persist_task.cancel()
+    while exchange._pending_fills:
+        async with exchange._persist_lock:
+            await exchange._flush_journal()
+
+    recovered = PaperExchange(initial_capital=1)
+    await recovered.load_state()
+
+    assert exchange.positions["005930"]['qty'] == 7
+    assert recovered.positions["005930"]['qty'] == 7
+    assert recovered.balance['deposit'] == pytest.approx(exchange.balance['deposit'])
@@ -0,0 +1,99 @@
+import asyncio
+import time
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from core.database import db
+from core.virtual_clock import VirtualClock
+from data.data_collector import data_collector
+from data.rate_limiter import RateLimiter
+from execution import scheduler as scheduler_module
+from strategy.replay import LiveReplay
+from strategy.strategies import MovingAverageCrossoverStrategy
+
+def make_bars(n=120, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-03-04 09:00", periods=n, freq="min") # Monday, market hours
+    close = 10000 * np.exp(np.cumsum(rng.normal(0, 0.003, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    return pd.DataFrame({
+        "open": open_,
+        "high": np.maximum(open_, close) * 1.001,
+        "low": np.minimum(open_, close) * 0.999,
+        "close": close,
+        "volume": 1000.0
+    }, index=index)
+
+def test_virtual_clock_drives_sleep_datetime_and_rate_limiter():
+    start = datetime(2024, 3, 4, 9, 0)
+    clock = VirtualClock(start)
+    loop = asyncio.new_event_loop()
+    clock.install(loop)
+
+    async def scenario():
+        await asyncio.sleep(3600)
+        after_sleep = scheduler_module.datetime.now()
+
+        limiter = RateLimiter(max_tokens=1, refill_rate=1)
+        for _ in range(11):
+            await limiter.acquire()
+        return after_sleep
+
+    wall = time.perf_counter()
+    try:
+        after_sleep = loop.run_until_complete(scenario())
+    finally:
+        clock.uninstall()
+        loop.close()
+
+    assert time.perf_counter() - wall < 5
+    assert after_sleep == datetime(2024, 3, 4, 10, 0)
+    # 10 refills at 1 token/s on top of the hour slept
+    assert abs(clock.time() - (start.timestamp() + 3610)) < 1e-6
+    # Everything restored
+    assert scheduler_module.datetime is datetime
+    assert scheduler_module.datetime.now() > datetime(2025, 1, 1)
+
+def test_bars_to_ticks_roundtrip():
+    bars = make_bars(3)
+    ticks = LiveReplay.bars_to_ticks(bars, "005930")
+
+    assert len(ticks) == 12
+    grouped = ticks.groupby(ticks.index.floor("min"))["price"]
+    assert np.allclose(grouped.first(), bars["open"])
+    assert np.allclose(grouped.last(), bars["close"])
+    assert np.allclose(grouped.max(), bars["high"])
+    assert np.allclose(grouped.min(), bars["low"])
+
+def test_live_replay_runs_live_path_and_reports_divergence():
+    bars = make_bars()
+    strategy = MovingAverageCrossoverStrategy("ma", "005930")
+    strategy.initialize({"short_window": 5, "long_window": 20})
+    saved_observers = data_collector.observers
+    saved_db = (db.db_path, db.conn)
+
+    result = LiveReplay([strategy]).run(LiveReplay.bars_to_ticks(bars, "005930"))
+
+    assert result.ticks == len(bars) * 4
+    # Every bar but the last (still open) is closed by the live aggregator
+    candles = result.candles["005930"]
+    assert len(candles) == len(bars) - 1
+    assert np.allclose(candles[["open", "high", "low", "close"]].to_numpy(),
+                       bars[["open", "high", "low", "close"]].to_numpy()[:-1])
+
+    assert result.fills
+    assert all(fill["side"] in ("BUY", "SELL") for fill in result.fills)
+    assert result.equity_curve.index[0] == bars.index[0]
+
+    report = result.divergence["ma"]
+    assert report["live_trades"] == len(result.fills)
+    assert report["backtest_trades"] == len(result.backtest["ma"].trades)
+    assert report["matched"] + report["unmatched_live"] == report["live_trades"]
+
+    # Two simulated hours replay much faster than real time
+    assert result.simulated_seconds >= (len(bars) - 1) * 60
+    assert result.speedup > 10
+
+    # Shared singletons restored
+    assert data_collector.observers is saved_observers
+    assert (db.db_path, db.conn) == saved_db
@@ -1,8 +1,9 @@
 import pytest
 import asyncio
+import numpy as np
 from unittest.mock import MagicMock, AsyncMock, patch
 from datetime import datetime
-from execution.scheduler import Scheduler
+from execution.scheduler import Scheduler, CronExpression
 
 @pytest.mark.asyncio
 async def test_scheduler_interval():
@@ -71,3 +72,103 @@ async def test_scheduler_error_handling():
     
     assert scheduler._running is True
     await scheduler.stop()
+
+def test_cron_expression_next_after():
+    weekdays = CronExpression("40 15 * * 1-5")
+    # Friday 15:40 -> Monday 15:40
+    assert weekdays.next_after(datetime(2024, 11, 29, 15, 40)) == datetime(2024, 12, 2, 15, 40)
+    assert weekdays.next_after(datetime(2024, 11, 29, 15, 39, 59)) == datetime(2024, 11, 29, 15, 40)
+
+    every = CronExpression("*/15 9-15/3 * * *")
+    assert every.next_after(datetime(2024, 11, 27, 9, 50)) == datetime(2024, 11, 27, 12, 0)
+    assert every.next_after(datetime(2024, 11, 27, 15, 45)) == datetime(2024, 11, 28, 9, 0)
+
+    # Both day fields restricted: either matches (1st of month or Sunday)
+    either = CronExpression("0 0 1 * 0")
+    assert either.next_after(datetime(2024, 11, 27)) == datetime(2024, 12, 1)
+    assert either.next_after(datetime(2024, 12, 1)) == datetime(2024, 12, 8)
+    assert CronExpression("0 12 29 2 *").next_after(datetime(2024, 3, 1)) == datetime(2028, 2, 29, 12, 0)
+
+    for bad in ("0 25 * * *", "* * *", "61 * * * *"):
+        with pytest.raises(ValueError):
+            CronExpression(bad)
+
+@pytest.mark.asyncio
+async def test_missed_cron_runs_follow_catch_up_policy():
+    scheduler = Scheduler()
+    scheduler.loop_sleep_time = 0.01
+    callbacks = {policy: AsyncMock() for policy in ("skip", "once", "all")}
+
+    with patch("execution.scheduler.datetime") as mock_datetime:
+        mock_datetime.now.return_value = datetime(2024, 11, 27, 15, 0)
+        mock_datetime.fromtimestamp = datetime.fromtimestamp
+        for policy, callback in callbacks.items():
+            scheduler.register_cron_expression("*/10 * * * *", callback, policy, catch_up=policy)
+        await scheduler.start()
+        await asyncio.sleep(0.05)
+
+        # Machine slept through 15:10 .. 15:30 (3 runs)
+        mock_datetime.now.return_value = datetime(2024, 11, 27, 15, 35)
+        await asyncio.sleep(0.1)
+        await scheduler.stop()
+
+    assert callbacks["skip"].call_count == 0
+    assert callbacks["once"].call_count == 1
+    assert callbacks["all"].call_count == 3
+    for job in scheduler.jobs:
+        assert job.next_run == datetime(2024, 11, 27, 15, 40).timestamp()
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_and_cancel():
+    scheduler = Scheduler()
+    started = []
+
+    async def slow():
+        started.append(asyncio.get_running_loop().time())
+        await asyncio.sleep(0.25)
+
+    job = scheduler.register_interval(0.1, slow, "Slow", max_concurrent=1)
+    await scheduler.start()
+    await asyncio.sleep(0.55)
+    # Runs at 0 and ~0.3 (0.1 / 0.2 skipped while the first was running)
+    assert len(started) == 2 and job.skipped >= 2
+
+    scheduler.cancel(job)
+    await asyncio.sleep(0.3)
+    await scheduler.stop()
+    assert len(started) == 2
+
+@pytest.mark.asyncio
+async def test_many_jitter_timers_sleep_until_due():
+    scheduler = Scheduler()
+    runs = []
+
+    def make(symbol):
+        async def tick():
+            runs.append(symbol)
+        return tick
+
+    jobs = [scheduler.register_interval(60, make(i), f"Timer_{i}", jitter=5, first_run=60) for i in range(5000)]
+    timeouts = []
+    wait_for = asyncio.wait_for
+
+    async def recording_wait_for(awaitable, timeout):
+        timeouts.append(timeout)
+        return await wait_for(awaitable, timeout)
+
+    with patch("execution.scheduler.asyncio.wait_for", recording_wait_for):
+        await scheduler.start()
+        await asyncio.sleep(0.2)
+        # Idle: one sleep (capped at loop_sleep_time), no polling
+        assert len(timeouts) == 1 and timeouts[0] > 29
+
+        # An earlier job wakes the loop, which then sleeps until it is due
+        scheduler.register_interval(60, make("early"), "Early", first_run=0.1)
+        await asyncio.sleep(0.3)
+        await scheduler.stop()
+
+    assert runs == ["early"]
+    assert len(timeouts) == 3 and 0.05 < timeouts[1] <= 0.1
+    # Jitter spreads the due times over [next_run, next_run + jitter]
+    offsets = np.array([due - job.next_run for due, _, job in scheduler._timers if job in jobs])
+    assert len(offsets) == 5000 and offsets.min() >= 0 and offsets.max() <= 5 and offsets.std() > 1
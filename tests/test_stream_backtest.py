@@ -0,0 +1,79 @@
+import json
+import pytest
+import pandas as pd
+import numpy as np
+from strategy.backtester import EventDrivenBacktester
+from strategy.strategies import MovingAverageCrossoverStrategy, VolatilityBreakoutStrategy
+
+PARAMS = {"short_window": 5, "long_window": 20}
+
+@pytest.fixture
+def minute_data():
+    rng = np.random.default_rng(1)
+    n = 6000
+    index = pd.date_range('2024-01-02 09:00', periods=n, freq='min')
+    close = 10000 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    return pd.DataFrame({
+        'open': close * (1 + rng.normal(0, 0.001, n)),
+        'high': close * 1.003,
+        'low': close * 0.997,
+        'close': close,
+        'volume': rng.integers(1_000, 100_000, n).astype(float)
+    }, index=index)
+
+def make_strategy():
+    strategy = MovingAverageCrossoverStrategy("stream", "005930")
+    strategy.initialize(PARAMS)
+    return strategy
+
+def iter_chunks(df, size, fail_at=None):
+    for k, start in enumerate(range(0, len(df), size)):
+        if k == fail_at:
+            raise RuntimeError("crash")
+        yield df.iloc[start:start + size]
+
+def read_equity(output_dir):
+    return pd.read_csv(output_dir / "equity.csv", index_col=0, float_precision="round_trip")["equity"].to_numpy()
+
+def test_stream_matches_in_memory_run(tmp_path, minute_data):
+    backtester = EventDrivenBacktester()
+    expected = backtester.run_batch(make_strategy(), minute_data, [PARAMS])[0]
+    result = backtester.run_stream(make_strategy(), iter_chunks(minute_data, 700), str(tmp_path), warmup_bars=100)
+
+    np.testing.assert_array_equal(read_equity(tmp_path), expected.equity_curve)
+    assert len(pd.read_csv(tmp_path / "trades.csv")) == len(expected.trades)
+    assert result.total_return == expected.total_return
+    assert result.mdd == expected.mdd
+    assert result.max_drawdown_duration == expected.max_drawdown_duration
+    assert result.win_rate == expected.win_rate
+    assert result.sharpe_ratio == pytest.approx(expected.sharpe_ratio)
+    assert result.sortino_ratio == pytest.approx(expected.sortino_ratio)
+
+def test_stream_accepts_array_chunks(tmp_path, minute_data):
+    strategy = VolatilityBreakoutStrategy("stream", "005930")
+    strategy.initialize({"k": 0.5})
+    backtester = EventDrivenBacktester()
+    expected = backtester.run_batch(strategy, minute_data, [{"k": 0.5}])[0]
+
+    chunks = (
+        {"timestamp": chunk.index.asi8, **{col: chunk[col].to_numpy() for col in chunk.columns}}
+        for chunk in iter_chunks(minute_data, 1000)
+    )
+    result = backtester.run_stream(strategy, chunks, str(tmp_path), warmup_bars=10)
+    assert result.total_return == expected.total_return
+
+def test_stream_resumes_after_crash(tmp_path, minute_data):
+    backtester = EventDrivenBacktester()
+    with pytest.raises(RuntimeError):
+        backtester.run_stream(make_strategy(), iter_chunks(minute_data, 500, fail_at=7), str(tmp_path), warmup_bars=100, checkpoint_every=3)
+
+    checkpoint = json.loads((tmp_path / "checkpoint.json").read_text())
+    assert checkpoint["chunks_done"] == 6
+    assert checkpoint["summary"]["bars"] == 3000
+
+    result = backtester.run_stream(make_strategy(), iter_chunks(minute_data, 500), str(tmp_path), warmup_bars=100, checkpoint_every=3)
+    expected = backtester.run_batch(make_strategy(), minute_data, [PARAMS])[0]
+
+    np.testing.assert_array_equal(read_equity(tmp_path), expected.equity_curve)
+    assert len(pd.read_csv(tmp_path / "trades.csv")) == len(expected.trades)
+    assert result.total_return == expected.total_return
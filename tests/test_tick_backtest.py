@@ -0,0 +1,112 @@
+import pytest
+import pandas as pd
+import numpy as np
+from strategy.backtester import EventDrivenBacktester
+from strategy.base_strategy import BaseStrategy
+from strategy.strategies import MovingAverageCrossoverStrategy
+from data.tick_store import TickStore
+
+class BuyOnceStrategy(BaseStrategy):
+    """Buys on the first bar only."""
+    async def on_realtime_data(self, data):
+        return None
+
+    def get_parameter_schema(self):
+        return {}
+
+    def calculate_signals(self, df):
+        df = df.copy()
+        df['signal'] = 0
+        df.iloc[0, df.columns.get_loc('signal')] = 1
+        return df
+
+@pytest.fixture
+def minute_data():
+    rng = np.random.default_rng(0)
+    index = pd.date_range('2024-01-02 09:00', periods=600, freq='min')
+    close = 10000 * np.exp(np.cumsum(rng.normal(0, 0.003, len(index))))
+    bars = pd.DataFrame({'open': close, 'high': close, 'low': close, 'close': close, 'volume': 50000.0}, index=index)
+    # One tick per minute -> tick mode sees the same prices as bar mode
+    ticks = pd.DataFrame({'price': close, 'volume': 50000.0}, index=index + pd.Timedelta(seconds=5))
+    return bars, ticks
+
+def make_strategy():
+    strategy = MovingAverageCrossoverStrategy("tick", "005930")
+    strategy.initialize({"short_window": 5, "long_window": 20})
+    return strategy
+
+def make_backtester(**config):
+    backtester = EventDrivenBacktester()
+    backtester.configure({"use_tick_data": True, **config})
+    return backtester
+
+def test_tick_mode_matches_bar_mode_fills(minute_data):
+    bars, ticks = minute_data
+    expected = EventDrivenBacktester().run(make_strategy(), bars)
+    result = make_backtester(tick_chunk_size=97).run(make_strategy(), ticks)
+
+    assert len(result.trades) == len(expected.trades) > 0
+    for tick_trade, bar_trade in zip(result.trades, expected.trades):
+        assert tick_trade['type'] == bar_trade['type']
+        assert tick_trade['price'] == bar_trade['price']
+        assert tick_trade['qty'] == bar_trade['qty']
+
+def test_tick_mode_independent_of_chunk_size(minute_data):
+    _, ticks = minute_data
+    config = {"take_profit": 0.5, "stop_loss": 0.3, "time_exit": 10}
+    small = make_backtester(tick_chunk_size=7, **config).run(make_strategy(), ticks)
+    large = make_backtester(tick_chunk_size=10_000, **config).run(make_strategy(), ticks)
+
+    assert small.trades == large.trades
+    assert small.equity_curve == large.equity_curve
+
+def test_intrabar_stop_loss_and_take_profit():
+    index = pd.date_range('2024-01-02 09:00:00', periods=5, freq='20s')
+    # Bar 09:00 closes at 10000 -> buy at 09:01:00; SL (1%) hit intrabar at 09:01:20
+    ticks = pd.DataFrame({'price': [10000, 10000, 10000, 10000, 9890], 'volume': 1000.0}, index=index)
+    backtester = make_backtester(stop_loss=1.0, take_profit=2.0, slippage_rate=0.0, impact_cost_factor=0.0)
+    result = backtester.run(BuyOnceStrategy("tick", "005930"), ticks)
+
+    buy, sell = result.trades
+    assert buy['time'] == pd.Timestamp('2024-01-02 09:01:00')
+    assert sell['reason'] == "SL"
+    assert sell['price'] == 9890
+    assert sell['time'] == pd.Timestamp('2024-01-02 09:01:20')
+
+    ticks.iloc[4, 0] = 10250
+    result = backtester.run(BuyOnceStrategy("tick", "005930"), ticks)
+    assert result.trades[-1]['reason'] == "TP"
+
+class BuyTwiceStrategy(BuyOnceStrategy):
+    """Buys on the first two bars (the second BUY is a no-op while holding)."""
+    def calculate_signals(self, df):
+        df = df.copy()
+        df['signal'] = 0
+        df.iloc[:2, df.columns.get_loc('signal')] = 1
+        return df
+
+def test_exit_checked_on_noop_signal_tick():
+    index = pd.date_range('2024-01-02 09:00:00', periods=8, freq='20s')
+    # Buy at 09:01:00; the redundant BUY of bar 09:01 lands on 09:02:00, where SL (1%) is hit
+    ticks = pd.DataFrame({'price': [10000] * 6 + [9890, 9950], 'volume': 1000.0}, index=index)
+    backtester = make_backtester(stop_loss=1.0, take_profit=2.0, slippage_rate=0.0, impact_cost_factor=0.0)
+    result = backtester.run(BuyTwiceStrategy("tick", "005930"), ticks)
+
+    buy, sell = result.trades
+    assert buy['time'] == pd.Timestamp('2024-01-02 09:01:00')
+    assert sell['reason'] == "SL"
+    assert sell['price'] == 9890
+    assert sell['time'] == pd.Timestamp('2024-01-02 09:02:00')
+
+def test_tick_store_streaming(tmp_path, minute_data):
+    _, ticks = minute_data
+    store = TickStore("005930", db_path=str(tmp_path / "ticks.db"))
+    store.append(ticks.index.values, ticks['price'].to_numpy(), ticks['volume'].to_numpy())
+
+    chunks = list(store.iter_chunks(chunk_size=100))
+    assert [len(c[0]) for c in chunks] == [100] * 6
+    np.testing.assert_array_equal(np.concatenate([c[0] for c in chunks]), ticks.index.asi8)
+
+    expected = make_backtester().run(make_strategy(), ticks)
+    result = make_backtester(tick_chunk_size=50).run(make_strategy(), store)
+    assert result.trades == expected.trades
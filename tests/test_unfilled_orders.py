@@ -0,0 +1,68 @@
+import asyncio
+import time
+import pytest
+from datetime import datetime, timedelta
+from execution.order_manager import OrderManager
+
+class CancelBroker:
+    """Cancels succeed except for order ids in reject."""
+    def __init__(self, reject=()):
+        self.reject = set(reject)
+        self.batches = []
+
+    async def cancel_order(self, order_no, symbol, qty):
+        self.batches.append((time.monotonic(), order_no))
+        if order_no in self.reject:
+            return {"return_code": 1, "return_msg": "주문가능수량 없음"}
+        return {"return_code": 0}
+
+def track(manager, order_id, age=0.0, time_in_force=None):
+    manager.active_orders[order_id] = {
+        'symbol': "005930", 'type': "BUY", 'quantity': 10, 'filled_qty': 0, 'price': 60000,
+        'source': 'STRATEGY', 'timestamp': datetime.now() - timedelta(seconds=age),
+        'strategy_id': None, 'time_in_force': time_in_force
+    }
+    manager._track_deadline(order_id)
+
+@pytest.mark.asyncio
+async def test_orders_cancelled_at_their_time_in_force():
+    broker = CancelBroker()
+    manager = OrderManager(broker)
+    manager.max_unfilled_time = 5
+    for i in range(200):
+        track(manager, f"D{i}") # Default TIF: not due during the test
+    track(manager, "GTC", age=100, time_in_force=0)
+    monitor = asyncio.create_task(manager.monitor_unfilled_orders())
+    start = time.monotonic()
+    try:
+        await asyncio.sleep(0.05)
+        # Armed after the monitor went to sleep on the 5s deadline: wakes it up
+        track(manager, "S1", time_in_force=0.2)
+        track(manager, "S2", time_in_force=0.2)
+        track(manager, "F1", time_in_force=0.2)
+        manager.active_orders.pop("F1") # Filled before expiry: its entry is stale
+        await asyncio.sleep(0.4)
+    finally:
+        monitor.cancel()
+        await monitor
+
+    assert sorted(order_id for _, order_id in broker.batches) == ["S1", "S2"]
+    assert all(0.2 <= t - start < 0.35 for t, _ in broker.batches)
+
+@pytest.mark.asyncio
+async def test_failed_cancel_is_rearmed():
+    broker = CancelBroker(reject={"X"})
+    manager = OrderManager(broker)
+    manager.cancel_retry_interval = 30
+    track(manager, "X", age=61)
+    track(manager, "Y", age=120)
+
+    expired = manager._pop_expired(time.time())
+    assert sorted(expired) == ["X", "Y"]
+    report = await manager.cancel_expired_orders(expired)
+
+    assert report["failed"] == ["X"]
+    # Both stay active until the CANCELLED event; retried after cancel_retry_interval
+    assert manager._pop_expired(time.time()) == []
+    assert sorted(manager._pop_expired(time.time() + 31)) == ["X", "Y"]
+    assert len(manager._deadlines) == 0